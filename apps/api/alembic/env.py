@@ -13,6 +13,7 @@ if str(REPO_ROOT) not in sys.path:
 
 from app.core.db.session import get_sqlalchemy_url
 from app.core.db.base import Base
+from app.core.jobs import models as job_models  # noqa: F401
 from app.modules.auth.domain import models as auth_models  # noqa: F401
 from app.modules.food.domain import models as food_models  # noqa: F401
 from app.modules.nutrition.domain import models as nutrition_models  # noqa: F401
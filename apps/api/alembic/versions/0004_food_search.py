@@ -0,0 +1,54 @@
+"""food library search: trigram indexes + keyset ordering
+
+Revision ID: 0004_food_search
+Revises: 0003_food_library
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+
+
+revision = "0004_food_search"
+down_revision = "0003_food_library"
+branch_labels = None
+depends_on = None
+
+
+_TABLES = ("ingredients", "dish_templates")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() is only STABLE; pinning the dictionary makes the wrapper safe to index.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION food_search_key(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, value)) $$
+        """
+    )
+
+    for table in _TABLES:
+        op.execute(
+            f"CREATE INDEX ix_{table}_name_trgm ON {table} USING gin (food_search_key(name) gin_trgm_ops)"
+        )
+        # Keyset pagination orders by (name, id) inside a tenant.
+        op.create_index(f"ix_{table}_tenant_name_id", table, ["tenant_id", "name", "id"])
+        op.drop_index(f"ix_{table}_tenant_name", table_name=table)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table in _TABLES:
+        op.create_index(f"ix_{table}_tenant_name", table, ["tenant_id", "name"])
+        op.drop_index(f"ix_{table}_tenant_name_id", table_name=table)
+        op.drop_index(f"ix_{table}_name_trgm", table_name=table)
+
+    op.execute("DROP FUNCTION IF EXISTS food_search_key(text)")
@@ -0,0 +1,46 @@
+"""transactional email outbox
+
+Revision ID: 0005_email_outbox
+Revises: 0004_food_search
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_email_outbox"
+down_revision = "0004_food_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("tenant_id", sa.Uuid(), nullable=True),
+        sa.Column("to_email", sa.Text(), nullable=False),
+        sa.Column("subject", sa.Text(), nullable=False),
+        sa.Column("html", sa.Text(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+    )
+    # Only pending rows are ever polled; keep the index small as sent rows pile up.
+    op.create_index(
+        "ix_email_outbox_pending_next_attempt_at",
+        "email_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_outbox_pending_next_attempt_at", table_name="email_outbox")
+    op.drop_table("email_outbox")
@@ -0,0 +1,108 @@
+"""shared ingredient catalogue with per-tenant overlays
+
+Revision ID: 0007_ingredient_catalog
+Revises: 0006_jobs
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_ingredient_catalog"
+down_revision = "0006_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_ingredients",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("source", sa.Text(), nullable=False),
+        sa.Column("source_id", sa.Text(), nullable=True),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("kcal_per_100g", sa.Numeric(7, 2), nullable=False),
+        sa.Column("protein_g_per_100g", sa.Numeric(7, 2), nullable=False),
+        sa.Column("carbs_g_per_100g", sa.Numeric(7, 2), nullable=False),
+        sa.Column("fat_g_per_100g", sa.Numeric(7, 2), nullable=False),
+        sa.Column("serving_size_g", sa.Numeric(7, 2), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("source", "source_id", name="uq_catalog_ingredients_source"),
+    )
+    # Same keyset order as the tenant tables (see 0004_food_search), minus the tenant.
+    op.create_index("ix_catalog_ingredients_name_id", "catalog_ingredients", ["name", "id"])
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_catalog_ingredients_name_trgm ON catalog_ingredients "
+            "USING gin (food_search_key(name) gin_trgm_ops)"
+        )
+
+    op.add_column("ingredients", sa.Column("catalog_ingredient_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "fk_ingredients_catalog_ingredient_id",
+        "ingredients",
+        "catalog_ingredients",
+        ["catalog_ingredient_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ix_ingredients_tenant_catalog",
+        "ingredients",
+        ["tenant_id", "catalog_ingredient_id"],
+        unique=True,
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        # A customized catalogue item is listed under the catalogue id, so the
+        # keyset order is (name, library id); replaces the (name, id) index from 0004.
+        op.execute(
+            "CREATE INDEX ix_ingredients_tenant_name_library_id ON ingredients "
+            "(tenant_id, name, (coalesce(catalog_ingredient_id, id)))"
+        )
+        op.drop_index("ix_ingredients_tenant_name_id", table_name="ingredients")
+
+    op.alter_column("dish_template_items", "ingredient_id", existing_type=sa.Uuid(), nullable=True)
+    op.add_column("dish_template_items", sa.Column("catalog_ingredient_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "fk_dish_template_items_catalog_ingredient_id",
+        "dish_template_items",
+        "catalog_ingredients",
+        ["catalog_ingredient_id"],
+        ["id"],
+        ondelete="RESTRICT",
+    )
+    op.create_check_constraint(
+        "ck_dish_template_items_one_ingredient",
+        "dish_template_items",
+        "(ingredient_id IS NULL) <> (catalog_ingredient_id IS NULL)",
+    )
+    op.create_index(
+        "ix_dish_template_items_tenant_catalog_ingredient_id",
+        "dish_template_items",
+        ["tenant_id", "catalog_ingredient_id"],
+    )
+
+
+def downgrade() -> None:
+    # Template items pointing at the catalogue have no tenant row to fall back to.
+    op.execute("DELETE FROM dish_template_items WHERE catalog_ingredient_id IS NOT NULL")
+    op.drop_index("ix_dish_template_items_tenant_catalog_ingredient_id", table_name="dish_template_items")
+    op.drop_constraint("ck_dish_template_items_one_ingredient", "dish_template_items", type_="check")
+    op.drop_constraint("fk_dish_template_items_catalog_ingredient_id", "dish_template_items", type_="foreignkey")
+    op.drop_column("dish_template_items", "catalog_ingredient_id")
+    op.alter_column("dish_template_items", "ingredient_id", existing_type=sa.Uuid(), nullable=False)
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index("ix_ingredients_tenant_name_id", "ingredients", ["tenant_id", "name", "id"])
+        op.drop_index("ix_ingredients_tenant_name_library_id", table_name="ingredients")
+    op.drop_index("ix_ingredients_tenant_catalog", table_name="ingredients")
+    op.drop_constraint("fk_ingredients_catalog_ingredient_id", "ingredients", type_="foreignkey")
+    op.drop_column("ingredients", "catalog_ingredient_id")
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_catalog_ingredients_name_trgm")
+    op.drop_index("ix_catalog_ingredients_name_id", table_name="catalog_ingredients")
+    op.drop_table("catalog_ingredients")
@@ -0,0 +1,62 @@
+"""stored dish template macro totals
+
+Revision ID: 0008_dish_template_totals
+Revises: 0007_ingredient_catalog
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_dish_template_totals"
+down_revision = "0007_ingredient_catalog"
+branch_labels = None
+depends_on = None
+
+_TOTALS = {
+    "total_kcal": "kcal_per_100g",
+    "total_protein_g": "protein_g_per_100g",
+    "total_carbs_g": "carbs_g_per_100g",
+    "total_fat_g": "fat_g_per_100g",
+}
+
+
+def _item_total(macro: str) -> str:
+    # Same rounding as `refresh_template_totals`: per item, then the sum.
+    return (
+        f"round(sum(round(i.quantity_g * coalesce(own.{macro}, overlay.{macro}, c.{macro}) * 0.01, 2)), 2)"
+    )
+
+
+def upgrade() -> None:
+    for column in _TOTALS:
+        op.add_column(
+            "dish_templates",
+            sa.Column(column, sa.Numeric(10, 2), nullable=False, server_default=sa.text("0")),
+        )
+
+    sums = ", ".join(f"{_item_total(macro)} AS {column}" for column, macro in _TOTALS.items())
+    assignments = ", ".join(f"{column} = s.{column}" for column in _TOTALS)
+    op.execute(
+        f"UPDATE dish_templates SET {assignments} "
+        f"FROM (SELECT i.dish_template_id, {sums} "
+        "FROM dish_template_items i "
+        "LEFT JOIN ingredients own ON own.id = i.ingredient_id AND own.tenant_id = i.tenant_id "
+        "LEFT JOIN ingredients overlay ON overlay.tenant_id = i.tenant_id "
+        "AND overlay.catalog_ingredient_id = i.catalog_ingredient_id "
+        "LEFT JOIN catalog_ingredients c ON c.id = i.catalog_ingredient_id "
+        "GROUP BY i.dish_template_id) s "
+        "WHERE dish_templates.id = s.dish_template_id"
+    )
+
+    # Keyset order for the list sorted by a total, per tenant.
+    for column in _TOTALS:
+        op.create_index(f"ix_dish_templates_tenant_{column}_id", "dish_templates", ["tenant_id", column, "id"])
+
+
+def downgrade() -> None:
+    for column in _TOTALS:
+        op.drop_index(f"ix_dish_templates_tenant_{column}_id", table_name="dish_templates")
+        op.drop_column("dish_templates", column)
@@ -4,7 +4,9 @@ from app.bootstrap.dev_seed import ensure_dev_worker_seed
 from app.core.config import settings
 from app.core.web.cors import register_cors
 from app.core.web.health import router as health_router
+from app.core.web.metrics import register_metrics
 from app.modules.auth.api import router as auth_router
+from app.modules.auth.service.password_hasher import collect_password_hasher_metrics, password_hasher
 from app.modules.food.api import router as food_router
 from app.modules.nutrition.api import router as nutrition_router
 
@@ -13,6 +15,7 @@ def create_app() -> FastAPI:
     app = FastAPI(title="NutriOrxata API", version="0.1.0")
 
     register_cors(app, settings.api_cors_origins)
+    register_metrics(app, collectors=[collect_password_hasher_metrics], expose=settings.api_metrics_enabled)
 
     app.include_router(health_router)
     app.include_router(auth_router)
@@ -20,5 +23,6 @@ def create_app() -> FastAPI:
     app.include_router(nutrition_router)
 
     app.add_event_handler("startup", ensure_dev_worker_seed)
+    app.add_event_handler("shutdown", password_hasher.shutdown)
 
     return app
@@ -9,6 +9,19 @@ class Settings(BaseSettings):
     database_url: str = Field(default="", validation_alias="DATABASE_URL")
     api_cors_origins: str = Field(default="", validation_alias="API_CORS_ORIGINS")
     api_jwt_secret: str = Field(default="", validation_alias="API_JWT_SECRET")
+    api_metrics_enabled: bool = Field(default=True, validation_alias="API_METRICS_ENABLED")
+
+    # 0 disables the slow-query log / the repeated-statement (N+1) warning.
+    db_slow_query_ms: float = Field(default=0, validation_alias="DB_SLOW_QUERY_MS")
+    db_repeated_query_threshold: int = Field(default=0, validation_alias="DB_REPEATED_QUERY_THRESHOLD")
+
+    auth_user_cache_ttl_seconds: float = Field(default=30.0, validation_alias="AUTH_USER_CACHE_TTL_SECONDS")
+    auth_user_cache_max_entries: int = Field(default=10_000, validation_alias="AUTH_USER_CACHE_MAX_ENTRIES")
+
+    auth_bcrypt_rounds: int = Field(default=12, validation_alias="AUTH_BCRYPT_ROUNDS")
+    auth_password_hash_pool: str = Field(default="thread", validation_alias="AUTH_PASSWORD_HASH_POOL")
+    auth_password_hash_workers: int = Field(default=2, validation_alias="AUTH_PASSWORD_HASH_WORKERS")
+    auth_password_hash_max_pending: int = Field(default=64, validation_alias="AUTH_PASSWORD_HASH_MAX_PENDING")
 
     s3_endpoint_url: str = Field(default="", validation_alias="S3_ENDPOINT_URL")
     s3_access_key_id: str = Field(default="", validation_alias="S3_ACCESS_KEY_ID")
@@ -17,6 +30,20 @@ class Settings(BaseSettings):
 
     sendgrid_api_key: str = Field(default="", validation_alias="SENDGRID_API_KEY")
     sendgrid_from_email: str = Field(default="", validation_alias="SENDGRID_FROM_EMAIL")
+    sendgrid_api_base_url: str = Field(default="https://api.sendgrid.com", validation_alias="SENDGRID_API_BASE_URL")
+    sendgrid_timeout_seconds: float = Field(default=10.0, validation_alias="SENDGRID_TIMEOUT_SECONDS")
+
+    email_outbox_batch_size: int = Field(default=20, validation_alias="EMAIL_OUTBOX_BATCH_SIZE")
+    email_outbox_poll_seconds: float = Field(default=2.0, validation_alias="EMAIL_OUTBOX_POLL_SECONDS")
+    email_outbox_lease_seconds: int = Field(default=120, validation_alias="EMAIL_OUTBOX_LEASE_SECONDS")
+    email_outbox_max_attempts: int = Field(default=8, validation_alias="EMAIL_OUTBOX_MAX_ATTEMPTS")
+    email_outbox_backoff_seconds: int = Field(default=30, validation_alias="EMAIL_OUTBOX_BACKOFF_SECONDS")
+
+    jobs_workers: int = Field(default=2, validation_alias="JOBS_WORKERS")
+    jobs_poll_seconds: float = Field(default=1.0, validation_alias="JOBS_POLL_SECONDS")
+    jobs_visibility_timeout_seconds: int = Field(default=300, validation_alias="JOBS_VISIBILITY_TIMEOUT_SECONDS")
+    jobs_backoff_seconds: int = Field(default=15, validation_alias="JOBS_BACKOFF_SECONDS")
+    jobs_retention_days: int = Field(default=7, validation_alias="JOBS_RETENTION_DAYS")
 
     public_api_base_url: str = Field(default="http://localhost:8010/api", validation_alias="PUBLIC_API_BASE_URL")
 
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("app.db.queries")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+# psycopg/pysqlite/asyncpg placeholders and named binds (but not `::` casts).
+_PARAMS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):(?!:)\w+|\?")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize SQL so statements that differ only in literals/parameters compare equal."""
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PARAMS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _LISTS.sub("(?...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+@dataclass
+class QueryStats:
+    """SQL statements run on behalf of one request (or any other unit of work)."""
+
+    statements: int = 0
+    seconds: float = 0.0
+    # Resolved lazily: the route is only known once the router has matched.
+    label: Callable[[], str] | None = field(default=None, repr=False)
+    fingerprints: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def name(self) -> str:
+        return self.label() if self.label is not None else "-"
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Fingerprints run more than `threshold` times: the usual N+1 signature."""
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n > threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# Process-wide totals, for statements run outside any tracked unit too.
+_totals = QueryStats()
+_totals_lock = threading.Lock()
+_listeners_installed = False
+
+# Callbacks receiving every finished unit of work (test query budgets).
+_observers: list[Callable[[QueryStats], None]] = []
+
+
+def _fingerprints_wanted() -> bool:
+    return settings.db_repeated_query_threshold > 0 or bool(_observers)
+
+
+def start_query_stats(label: Callable[[], str] | None = None) -> tuple[QueryStats, Token]:
+    """
+    Start counting statements for the current context.
+
+    The stats object is shared (not copied) with threads the work is handed to,
+    e.g. sync endpoints in Starlette's threadpool, so their statements count too.
+    """
+    stats = QueryStats(label=label)
+    return stats, _current.set(stats)
+
+
+def stop_query_stats(token: Token) -> None:
+    stats = _current.get()
+    _current.reset(token)
+    if stats is None:
+        return
+
+    threshold = settings.db_repeated_query_threshold
+    if threshold > 0:
+        for sql, count in stats.repeated(threshold):
+            logger.warning("Possible N+1 on %s: %s runs of %s", stats.name, count, sql[:500])
+    for observer in list(_observers):
+        observer(stats)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current.get()
+
+
+def query_totals() -> QueryStats:
+    with _totals_lock:
+        return QueryStats(_totals.statements, _totals.seconds)
+
+
+@contextmanager
+def observe_query_stats() -> Iterator[list[QueryStats]]:
+    """Collect the stats of every unit of work (request) finished inside the block."""
+    finished: list[QueryStats] = []
+    _observers.append(finished.append)
+    try:
+        yield finished
+    finally:
+        _observers.remove(finished.append)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+        if _fingerprints_wanted():
+            stats.fingerprints[fingerprint(statement)] += 1
+    with _totals_lock:
+        _totals.statements += 1
+        _totals.seconds += elapsed
+
+    slow_ms = settings.db_slow_query_ms
+    if slow_ms > 0 and elapsed * 1000 >= slow_ms:
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            elapsed * 1000,
+            stats.name if stats is not None else "-",
+            fingerprint(statement)[:500],
+        )
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute; keep the stack balanced.
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+def install_query_listeners() -> None:
+    """Time every statement of every engine in the process. Idempotent."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _listeners_installed = True
+
+
+@dataclass
+class PoolWaitStats:
+    checkouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    timeouts: int = 0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """`QueuePool` that records how long checkouts wait for a free connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+        self._wait_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._wait_lock:
+                self.wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._wait_lock:
+                self.wait_stats.checkouts += 1
+                self.wait_stats.wait_seconds_total += waited
+                self.wait_stats.wait_seconds_max = max(self.wait_stats.wait_seconds_max, waited)
+
+    def recreate(self) -> InstrumentedQueuePool:
+        pool = super().recreate()
+        # Keep counters monotonic across `engine.dispose()`.
+        pool.wait_stats = self.wait_stats
+        pool._wait_lock = self._wait_lock
+        return pool
+
+
+@dataclass(frozen=True)
+class PoolStatus:
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    wait: PoolWaitStats | None
+
+
+def pool_status(engine: Engine) -> PoolStatus | None:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    wait = None
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._wait_lock:
+            wait = PoolWaitStats(**vars(pool.wait_stats))
+    return PoolStatus(
+        size=pool.size(),
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        # Negative while the pool has not yet opened `size` connections.
+        overflow=max(0, pool.overflow()),
+        wait=wait,
+    )
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from functools import lru_cache
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, make_url
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.db.instrumentation import InstrumentedQueuePool
 
 
 def get_sqlalchemy_url() -> str:
@@ -17,7 +18,11 @@ def get_sqlalchemy_url() -> str:
 def get_engine() -> Engine:
     if not settings.database_url:
         raise RuntimeError("DATABASE_URL is not configured")
-    return create_engine(settings.database_url, pool_pre_ping=True)
+    kwargs = {}
+    if make_url(settings.database_url).get_backend_name() != "sqlite":
+        # Same QueuePool as the default, plus checkout wait stats for /metrics.
+        kwargs["poolclass"] = InstrumentedQueuePool
+    return create_engine(settings.database_url, pool_pre_ping=True, **kwargs)
 
 
 def get_session() -> Session:
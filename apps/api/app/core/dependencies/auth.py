@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import uuid
+from dataclasses import dataclass
 from typing import Annotated
 
 from fastapi import Depends, Header, HTTPException
@@ -10,6 +11,7 @@ from sqlalchemy.orm import Session
 from app.core.db.session import get_session
 from app.modules.auth.domain.models import User
 from app.modules.auth.security.jwt_tokens import decode_access_token
+from app.modules.auth.service.user_cache import UserSnapshot, user_cache
 
 
 def db_session():
@@ -32,10 +34,17 @@ def _bearer_token(authorization: str | None) -> str | None:
     return None
 
 
-def current_user(
-    session: DbSession,
-    authorization: Annotated[str | None, Header()] = None,
-) -> User:
+@dataclass(frozen=True)
+class AuthContext:
+    """Verified bearer token claims; built once per request."""
+
+    user_id: uuid.UUID
+    issued_at: int | None
+    access_mode: str | None
+    claims: dict
+
+
+def auth_context(authorization: Annotated[str | None, Header()] = None) -> AuthContext:
     token = _bearer_token(authorization)
     if not token:
         raise HTTPException(status_code=401, detail="missing_token")
@@ -50,29 +59,38 @@ def current_user(
     except Exception:
         raise HTTPException(status_code=401, detail="invalid_token")
 
-    user = session.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
-    if user is None:
-        raise HTTPException(status_code=401, detail="user_not_found")
-    if not user.is_active:
-        raise HTTPException(status_code=403, detail="user_inactive")
-    return user
+    iat = payload.get("iat")
+    return AuthContext(
+        user_id=user_id,
+        issued_at=iat if isinstance(iat, int) else None,
+        access_mode=payload.get("access_mode"),
+        claims=payload,
+    )
 
 
-CurrentUser = Annotated[User, Depends(current_user)]
+AuthCtx = Annotated[AuthContext, Depends(auth_context)]
 
 
-def require_write_access(
-    authorization: Annotated[str | None, Header()] = None,
-) -> bool:
-    token = _bearer_token(authorization)
-    if not token:
-        raise HTTPException(status_code=401, detail="missing_token")
+def current_user(ctx: AuthCtx, session: DbSession) -> UserSnapshot:
+    key = (ctx.user_id, ctx.issued_at)
+    snapshot = user_cache.get(key)
+    if snapshot is None:
+        user = session.execute(select(User).where(User.id == ctx.user_id)).scalar_one_or_none()
+        if user is None:
+            raise HTTPException(status_code=401, detail="user_not_found")
+        snapshot = UserSnapshot.from_user(user)
+        user_cache.put(key, snapshot)
+
+    if not snapshot.is_active:
+        raise HTTPException(status_code=403, detail="user_inactive")
+    return snapshot
+
+
+CurrentUser = Annotated[UserSnapshot, Depends(current_user)]
 
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=401, detail="invalid_token")
 
-    if payload.get("access_mode") == "read_only":
+def require_write_access(ctx: AuthCtx) -> bool:
+    if ctx.access_mode == "read_only":
         raise HTTPException(status_code=403, detail="read_only")
 
     return True
@@ -0,0 +1,15 @@
+from app.core.jobs.models import Job, JobSchedule, JobStatus
+from app.core.jobs.queue import enqueue, job_handler, registry
+from app.core.jobs.runner import JobMetrics, JobRunner, Schedule
+
+__all__ = [
+    "Job",
+    "JobMetrics",
+    "JobRunner",
+    "JobSchedule",
+    "JobStatus",
+    "Schedule",
+    "enqueue",
+    "job_handler",
+    "registry",
+]
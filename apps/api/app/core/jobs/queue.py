@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.jobs.models import Job, JobStatus
+
+
+JobHandler = Callable[[Session, dict], None]
+
+_MAX_BACKOFF = timedelta(hours=1)
+
+
+class JobRegistry:
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+
+    def register(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator: `@registry.register("auth.purge_verification_tokens")`."""
+
+        def decorator(fn: JobHandler) -> JobHandler:
+            if kind in self._handlers and self._handlers[kind] is not fn:
+                raise ValueError(f"job kind already registered: {kind}")
+            self._handlers[kind] = fn
+            return fn
+
+        return decorator
+
+    def get(self, kind: str) -> JobHandler | None:
+        return self._handlers.get(kind)
+
+    @property
+    def kinds(self) -> list[str]:
+        return sorted(self._handlers)
+
+
+registry = JobRegistry()
+job_handler = registry.register
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back naive; they are always stored as UTC.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def enqueue(
+    session: Session,
+    kind: str,
+    payload: dict | None = None,
+    *,
+    priority: int = 0,
+    run_at: datetime | None = None,
+    max_attempts: int = 5,
+) -> Job:
+    """Add a job. Like any other write it only becomes visible when the caller commits."""
+    row = Job(
+        id=uuid.uuid4(),
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        status=JobStatus.queued.value,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=run_at or utcnow(),
+        created_at=utcnow(),
+    )
+    session.add(row)
+    return row
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: uuid.UUID
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    started_at: datetime
+
+
+def claim_next(
+    session: Session,
+    *,
+    kinds: Iterable[str],
+    worker_id: str,
+    visibility_timeout: timedelta,
+    now: datetime,
+) -> ClaimedJob | None:
+    """
+    Claim the most urgent due job and commit.
+
+    Queued jobs whose `run_at` has passed are candidates, and so are running
+    jobs whose visibility timeout expired (their worker died or hung).
+    `SKIP LOCKED` keeps concurrent workers from waiting on each other.
+    """
+    kinds = list(kinds)
+    while True:
+        job = session.execute(
+            select(Job)
+            .where(
+                Job.kind.in_(kinds),
+                or_(
+                    and_(Job.status == JobStatus.queued.value, Job.run_at <= now),
+                    and_(Job.status == JobStatus.running.value, Job.locked_until <= now),
+                ),
+            )
+            .order_by(Job.priority.desc(), Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if job is None:
+            session.commit()
+            return None
+
+        # Compare-and-set on what was read, so the claim also holds where the
+        # row lock is a no-op (SQLite in tests).
+        seen = and_(Job.id == job.id, Job.attempts == job.attempts, Job.status == job.status)
+        if job.attempts >= job.max_attempts:
+            # Only reachable for a running job that timed out on its last attempt.
+            session.execute(
+                update(Job)
+                .where(seen)
+                .values(
+                    status=JobStatus.failed.value,
+                    last_error="visibility_timeout",
+                    finished_at=now,
+                    locked_until=None,
+                )
+            )
+            session.commit()
+            continue
+
+        attempts = job.attempts + 1
+        claimed = session.execute(
+            update(Job)
+            .where(seen)
+            .values(
+                status=JobStatus.running.value,
+                attempts=attempts,
+                locked_by=worker_id,
+                locked_until=now + visibility_timeout,
+                started_at=now,
+            )
+        ).rowcount
+        if claimed != 1:
+            session.rollback()
+            continue
+
+        result = ClaimedJob(
+            id=job.id,
+            kind=job.kind,
+            payload=dict(job.payload or {}),
+            attempts=attempts,
+            max_attempts=job.max_attempts,
+            run_at=as_utc(job.run_at),
+            started_at=now,
+        )
+        session.commit()
+        return result
+
+
+def _owned(job: ClaimedJob):
+    # A worker only finishes the claim it holds; a re-claimed job has a higher attempt count.
+    return and_(Job.id == job.id, Job.attempts == job.attempts, Job.status == JobStatus.running.value)
+
+
+def mark_done(session: Session, job: ClaimedJob, *, now: datetime, duration_ms: int) -> bool:
+    res = session.execute(
+        update(Job)
+        .where(_owned(job))
+        .values(
+            status=JobStatus.done.value,
+            finished_at=now,
+            duration_ms=duration_ms,
+            locked_until=None,
+            last_error=None,
+        )
+    )
+    return res.rowcount == 1
+
+
+def retry_delay(attempts: int, base_seconds: float) -> timedelta:
+    return min(_MAX_BACKOFF, timedelta(seconds=base_seconds * 2 ** max(0, attempts - 1)))
+
+
+def mark_failed(
+    session: Session,
+    job: ClaimedJob,
+    *,
+    error: str,
+    now: datetime,
+    duration_ms: int,
+    backoff_seconds: float,
+) -> str:
+    """Requeue with backoff, or fail for good once `max_attempts` is used up. Returns the new status."""
+    if job.attempts < job.max_attempts:
+        values = {
+            "status": JobStatus.queued.value,
+            "run_at": now + retry_delay(job.attempts, backoff_seconds),
+        }
+    else:
+        values = {"status": JobStatus.failed.value, "finished_at": now}
+    session.execute(
+        update(Job)
+        .where(_owned(job))
+        .values(**values, locked_until=None, duration_ms=duration_ms, last_error=error[:2000])
+    )
+    return values["status"]
+
+
+def purge_finished(session: Session, *, older_than: datetime) -> int:
+    """Delete done/failed jobs that finished before `older_than`. Does not commit."""
+    res = session.execute(
+        delete(Job).where(
+            Job.status.in_([JobStatus.done.value, JobStatus.failed.value]),
+            Job.finished_at < older_than,
+        )
+    )
+    return res.rowcount or 0
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.jobs.models import JobSchedule, JobStatus
+from app.core.jobs.queue import (
+    ClaimedJob,
+    JobRegistry,
+    as_utc,
+    claim_next,
+    enqueue,
+    job_handler,
+    mark_done,
+    mark_failed,
+    purge_finished,
+    registry,
+    utcnow,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """A job enqueued every `interval`. Runners share the schedule through `job_schedules`."""
+
+    name: str
+    kind: str
+    interval: timedelta
+    payload: dict = field(default_factory=dict)
+    priority: int = 0
+
+
+def ensure_schedules(session: Session, schedules: Iterable[Schedule], *, now: datetime) -> None:
+    """Create missing schedule rows (first tick is due at once) and sync kind/interval/payload."""
+    schedules = list(schedules)
+    if not schedules:
+        return
+    existing = {
+        row.name: row
+        for row in session.execute(
+            select(JobSchedule).where(JobSchedule.name.in_([s.name for s in schedules]))
+        ).scalars()
+    }
+    for schedule in schedules:
+        row = existing.get(schedule.name)
+        if row is None:
+            session.add(
+                JobSchedule(
+                    name=schedule.name,
+                    kind=schedule.kind,
+                    payload=schedule.payload,
+                    interval_seconds=int(schedule.interval.total_seconds()),
+                    next_run_at=now,
+                )
+            )
+            continue
+        row.kind = schedule.kind
+        row.payload = schedule.payload
+        row.interval_seconds = int(schedule.interval.total_seconds())
+    try:
+        session.commit()
+    except IntegrityError:
+        # Another runner inserted the same rows first.
+        session.rollback()
+
+
+def enqueue_due_schedules(session: Session, *, now: datetime, priorities: dict[str, int] | None = None) -> int:
+    """
+    Enqueue one job per due schedule and move its `next_run_at` forward, in one commit.
+
+    Locking the due rows with `SKIP LOCKED` means that with several runners
+    each tick is enqueued exactly once. Ticks missed while no runner was up
+    are collapsed into a single run.
+    """
+    rows = (
+        session.execute(
+            select(JobSchedule)
+            .where(JobSchedule.next_run_at <= now)
+            .order_by(JobSchedule.next_run_at)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    for row in rows:
+        interval = timedelta(seconds=row.interval_seconds)
+        enqueue(session, row.kind, dict(row.payload or {}), priority=(priorities or {}).get(row.name, 0))
+        next_run_at = as_utc(row.next_run_at) + interval
+        row.next_run_at = next_run_at if next_run_at > now else now + interval
+        row.last_enqueued_at = now
+    session.commit()
+    return len(rows)
+
+
+@dataclass
+class JobKindStats:
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+    lost: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    # Time between `run_at` and the claim: how far behind the workers are.
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def runs(self) -> int:
+        return self.succeeded + self.retried + self.failed + self.lost
+
+
+class JobMetrics:
+    """In-process per-kind counters and timings for the runner."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[str, JobKindStats] = {}
+
+    def record(self, kind: str, outcome: str, *, seconds: float, wait_seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(kind, JobKindStats())
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.total_wait_seconds += wait_seconds
+            stats.max_wait_seconds = max(stats.max_wait_seconds, wait_seconds)
+
+    def snapshot(self) -> dict[str, JobKindStats]:
+        with self._lock:
+            return {kind: replace(stats) for kind, stats in self._stats.items()}
+
+
+_OUTCOMES = {
+    JobStatus.queued.value: "retried",
+    JobStatus.failed.value: "failed",
+}
+
+
+class JobRunner:
+    """
+    Runs registered handlers with `workers` threads, plus one scheduler thread.
+
+    Each worker claims one job at a time and runs its handler in a fresh
+    session; the handler's writes are committed together with the job's `done`
+    mark, so a job that lost its claim (visibility timeout) is rolled back
+    instead of being applied twice. Handlers must not commit themselves.
+
+    Shutdown is graceful: once `stop` is set, workers finish the job they are
+    running and exit.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        workers: int | None = None,
+        schedules: Iterable[Schedule] = (),
+        job_registry: JobRegistry | None = None,
+        visibility_timeout_seconds: float | None = None,
+        poll_seconds: float | None = None,
+        backoff_seconds: float | None = None,
+        clock: Callable[[], datetime] = utcnow,
+    ) -> None:
+        self._session_factory = session_factory
+        self.workers = workers if workers is not None else settings.jobs_workers
+        self.schedules = list(schedules)
+        self.registry = job_registry or registry
+        self.visibility_timeout = timedelta(
+            seconds=visibility_timeout_seconds
+            if visibility_timeout_seconds is not None
+            else settings.jobs_visibility_timeout_seconds
+        )
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.jobs_poll_seconds
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else settings.jobs_backoff_seconds
+        self._clock = clock
+        self.metrics = JobMetrics()
+        self._threads: list[threading.Thread] = []
+        self._name = f"{socket.gethostname()}:{os.getpid()}"
+
+    def tick_schedules(self) -> int:
+        with self._session_factory() as session:
+            return enqueue_due_schedules(
+                session,
+                now=self._clock(),
+                priorities={s.name: s.priority for s in self.schedules},
+            )
+
+    def run_one(self, worker_id: str = "worker-0") -> bool:
+        """Claim and run a single job. Returns False if nothing was due."""
+        with self._session_factory() as session:
+            job = claim_next(
+                session,
+                kinds=self.registry.kinds,
+                worker_id=f"{self._name}/{worker_id}",
+                visibility_timeout=self.visibility_timeout,
+                now=self._clock(),
+            )
+        if job is None:
+            return False
+        self._execute(job)
+        return True
+
+    def run_until_idle(self, max_jobs: int = 1000) -> int:
+        """Run due jobs on the calling thread until none is left (tests, one-off CLI runs)."""
+        ran = 0
+        while ran < max_jobs and self.run_one():
+            ran += 1
+        return ran
+
+    def _execute(self, job: ClaimedJob) -> None:
+        handler = self.registry.get(job.kind)
+        wait_seconds = max(0.0, (job.started_at - job.run_at).total_seconds())
+        started = time.perf_counter()
+        error: str | None = None
+
+        with self._session_factory() as session:
+            try:
+                handler(session, job.payload)
+                duration_ms = int((time.perf_counter() - started) * 1000)
+                if mark_done(session, job, now=self._clock(), duration_ms=duration_ms):
+                    session.commit()
+                    outcome = "succeeded"
+                else:
+                    session.rollback()
+                    outcome = "lost"
+                    logger.warning("Job %s (%s) lost its claim; its writes were rolled back", job.id, job.kind)
+            except Exception as exc:
+                session.rollback()
+                error = f"{type(exc).__name__}: {exc}"
+                logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+
+        if error is not None:
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            with self._session_factory() as session:
+                status = mark_failed(
+                    session,
+                    job,
+                    error=error,
+                    now=self._clock(),
+                    duration_ms=duration_ms,
+                    backoff_seconds=self.backoff_seconds,
+                )
+                session.commit()
+            outcome = _OUTCOMES[status]
+
+        seconds = time.perf_counter() - started
+        self.metrics.record(job.kind, outcome, seconds=seconds, wait_seconds=wait_seconds)
+        logger.info(
+            "Job %s (%s) %s in %.1f ms after waiting %.1f ms",
+            job.id,
+            job.kind,
+            outcome,
+            seconds * 1000,
+            wait_seconds * 1000,
+        )
+
+    def _worker_loop(self, worker_id: str, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                ran = self.run_one(worker_id)
+            except Exception:
+                logger.exception("Job worker %s could not claim a job", worker_id)
+                ran = False
+            if not ran:
+                stop.wait(self.poll_seconds)
+
+    def _scheduler_loop(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                with self._session_factory() as session:
+                    ensure_schedules(session, self.schedules, now=self._clock())
+                break
+            except Exception:
+                logger.exception("Could not register job schedules")
+                stop.wait(self.poll_seconds)
+
+        while not stop.is_set():
+            try:
+                self.tick_schedules()
+            except Exception:
+                logger.exception("Job scheduler tick failed")
+            stop.wait(self.poll_seconds)
+
+    def start(self, stop: threading.Event) -> None:
+        self._threads = [
+            threading.Thread(target=self._worker_loop, args=(f"worker-{i}", stop), name=f"jobs-worker-{i}")
+            for i in range(self.workers)
+        ]
+        if self.schedules:
+            self._threads.append(threading.Thread(target=self._scheduler_loop, args=(stop,), name="jobs-scheduler"))
+        for thread in self._threads:
+            thread.start()
+        logger.info("Job runner started: workers=%s kinds=%s", self.workers, ", ".join(self.registry.kinds))
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for kind, stats in sorted(self.metrics.snapshot().items()):
+            logger.info(
+                "Jobs %s: runs=%s succeeded=%s retried=%s failed=%s avg=%.1f ms max=%.1f ms",
+                kind,
+                stats.runs,
+                stats.succeeded,
+                stats.retried,
+                stats.failed,
+                stats.total_seconds / stats.runs * 1000 if stats.runs else 0.0,
+                stats.max_seconds * 1000,
+            )
+
+
+@job_handler("jobs.purge_finished")
+def purge_finished_jobs(session: Session, payload: dict) -> None:
+    days = payload.get("retention_days", settings.jobs_retention_days)
+    deleted = purge_finished(session, older_than=utcnow() - timedelta(days=days))
+    logger.info("Purged %s finished jobs older than %s days", deleted, days)
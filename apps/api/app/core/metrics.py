@@ -0,0 +1,24 @@
+"""
+Scrape-time metric samples, independent of how they are exposed.
+
+Service modules build `MetricFamily` values for their collectors;
+`app.core.web.metrics` renders them on `/metrics`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+
+@dataclass
+class MetricFamily:
+    """Samples produced at scrape time by a collector."""
+
+    name: str
+    kind: str
+    help: str
+    samples: list[tuple[dict[str, str], float]] = field(default_factory=list)
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
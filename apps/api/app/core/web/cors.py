@@ -20,4 +20,5 @@ def register_cors(app: FastAPI, raw_origins: str) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
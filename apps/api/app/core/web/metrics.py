@@ -0,0 +1,300 @@
+"""
+Prometheus text-format metrics for the API process.
+
+Deliberately small (no client library): counters, gauges and fixed-bucket
+histograms guarded by one lock each, a pure ASGI timing middleware and a
+`/metrics` route. Every uvicorn worker keeps its own numbers.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Iterable, Sequence
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.db.instrumentation import (
+    install_query_listeners,
+    pool_status,
+    query_totals,
+    start_query_stats,
+    stop_query_stats,
+)
+from app.core.metrics import Collector, MetricFamily
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PATH = "/metrics"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _render_family(family: MetricFamily) -> Iterable[str]:
+    yield f"# HELP {family.name} {family.help}"
+    yield f"# TYPE {family.name} {family.kind}"
+    for labels, value in family.samples:
+        yield f"{family.name}{_labels(list(labels), list(labels.values()))} {_number(value)}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        with self._lock:
+            series = sorted((labels, list(counts), total[0]) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for family in collector():
+                lines.extend(_render_family(family))
+        return "\n".join(lines) + "\n"
+
+
+class HttpMetrics:
+    def __init__(self, registry: MetricsRegistry) -> None:
+        labels = ("method", "route", "status")
+        self.requests = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route template.", labels
+        )
+        self.in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served.", ("method",))
+        self.db_statements = registry.histogram(
+            "http_request_db_statements",
+            "SQL statements executed per HTTP request.",
+            labels,
+            buckets=STATEMENT_BUCKETS,
+        )
+        self.db_seconds = registry.histogram(
+            "http_request_db_seconds", "Cumulative SQL time per HTTP request.", labels
+        )
+
+
+def _route_template(scope: Scope) -> str:
+    # Label by the route template (`/api/food/{food_id}`), never the raw path, to bound cardinality.
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: cheaper than `BaseHTTPMiddleware` and leaves streaming alone.
+
+    It also delimits the per-request SQL tracking that drives the slow-query
+    log, the N+1 warning and the test query budgets.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: HttpMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight.inc((method,))
+        stats, token = start_query_stats(lambda: f"{method} {_route_template(scope)}")
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            stop_query_stats(token)
+            self.metrics.in_flight.dec((method,))
+            labels = (method, _route_template(scope), str(status))
+            self.metrics.requests.observe(labels, elapsed)
+            self.metrics.db_statements.observe(labels, stats.statements)
+            self.metrics.db_seconds.observe(labels, stats.seconds)
+
+
+def collect_db_metrics() -> Iterable[MetricFamily]:
+    totals = query_totals()
+    yield MetricFamily("db_statements_total", "counter", "SQL statements executed.", [({}, totals.statements)])
+    yield MetricFamily("db_statement_seconds_total", "counter", "Time spent in SQL statements.", [({}, totals.seconds)])
+
+    from app.core.db.session import get_engine
+
+    # Only report the pool once the app has opened it; never create it from a scrape.
+    if get_engine.cache_info().currsize == 0:
+        return
+    status = pool_status(get_engine())
+    if status is None:
+        return
+    yield MetricFamily("db_pool_size", "gauge", "Configured pool size.", [({}, status.size)])
+    yield MetricFamily("db_pool_checked_out", "gauge", "Connections in use.", [({}, status.checked_out)])
+    yield MetricFamily("db_pool_checked_in", "gauge", "Idle connections in the pool.", [({}, status.checked_in)])
+    yield MetricFamily("db_pool_overflow", "gauge", "Connections open beyond the pool size.", [({}, status.overflow)])
+    if status.wait is not None:
+        wait = status.wait
+        yield MetricFamily("db_pool_checkouts_total", "counter", "Pool checkouts.", [({}, wait.checkouts)])
+        yield MetricFamily(
+            "db_pool_checkout_wait_seconds_total",
+            "counter",
+            "Time spent waiting for a pooled connection.",
+            [({}, wait.wait_seconds_total)],
+        )
+        yield MetricFamily(
+            "db_pool_checkout_wait_seconds_max",
+            "gauge",
+            "Longest wait for a pooled connection since start.",
+            [({}, wait.wait_seconds_max)],
+        )
+        yield MetricFamily("db_pool_timeouts_total", "counter", "Pool checkout timeouts.", [({}, wait.timeouts)])
+
+
+def register_metrics(app: FastAPI, collectors: Iterable[Collector] = (), *, expose: bool = True) -> MetricsRegistry:
+    """Install request instrumentation; `expose=False` keeps it but does not serve `/metrics`."""
+    registry = MetricsRegistry()
+    http = HttpMetrics(registry)
+    registry.register_collector(collect_db_metrics)
+    for collector in collectors:
+        registry.register_collector(collector)
+
+    install_query_listeners()
+    app.add_middleware(MetricsMiddleware, metrics=http)
+    app.state.metrics = registry
+    if not expose:
+        return registry
+
+    router = APIRouter(tags=["health"])
+
+    @router.get(METRICS_PATH, include_in_schema=False)
+    def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(request.app.state.metrics.render(), media_type=CONTENT_TYPE)
+
+    app.include_router(router)
+    return registry
@@ -0,0 +1,40 @@
+"""
+JSON responses serialized with orjson.
+
+Handlers that build their output from ORM rows return `json_response(...)`
+with plain dicts instead of response models. FastAPI passes a returned
+`Response` through untouched, so the payload is not validated and encoded a
+second time by `response_model`. Keep `response_model=` on those routes: it
+still publishes the schema in OpenAPI, and the tests check payloads against it.
+
+Decimals are written as floats and UUIDs as strings; datetimes match Pydantic
+(UTC as `Z`), so switching a route over does not change its bytes.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, *, status_code: int = 200, headers: Mapping[str, str] | None = None) -> ORJSONResponse:
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
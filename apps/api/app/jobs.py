@@ -1,15 +1,90 @@
-"""Job runner placeholder.
+"""Background job runner for the `jobs` container.
 
-This module will be implemented in Sprint 00/01.
-For now, keep an executable entrypoint for the `jobs` container.
+Runs two loops side by side, both safe to run in several containers at once:
+
+- the transactional email outbox: claims due rows in batches with
+  `FOR UPDATE SKIP LOCKED`, sends them over one keep-alive SendGrid client and
+  records each outcome;
+- the general job queue (`app.core.jobs`): `JOBS_WORKERS` threads running
+  handlers registered with `@job_handler`, plus the periodic schedules below.
 """
 
-import time
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+from datetime import timedelta
+
+from app.core.config import settings
+from app.core.db.session import get_session
+from app.core.jobs import JobRunner, Schedule
+from app.modules.auth.infrastructure.sendgrid_client import SendGridClient, sendgrid_configured
+from app.modules.auth.service.email_outbox import deliver_pending
+from app.modules.auth.service.maintenance import PURGE_VERIFICATION_TOKENS
+
+
+logger = logging.getLogger("app.jobs")
+
+SCHEDULES = (
+    Schedule("auth.purge-verification-tokens", PURGE_VERIFICATION_TOKENS, timedelta(hours=1)),
+    Schedule("jobs.purge-finished", "jobs.purge_finished", timedelta(hours=6)),
+)
+
+
+def run_outbox(stop: threading.Event) -> None:
+    sender = SendGridClient() if sendgrid_configured() else None
+    if sender is None:
+        logger.warning("SendGrid is not configured; outbox emails will be marked as skipped")
+
+    try:
+        while not stop.is_set():
+            try:
+                result = deliver_pending(get_session, sender)
+            except Exception:
+                logger.exception("Email outbox batch failed")
+                stop.wait(settings.email_outbox_poll_seconds)
+                continue
+
+            if result.claimed:
+                logger.info(
+                    "Email outbox: sent=%s retried=%s failed=%s skipped=%s released=%s",
+                    result.sent,
+                    result.retried,
+                    result.failed,
+                    result.skipped,
+                    result.released,
+                )
+            # A full batch probably means more are due; only sleep once caught up.
+            if result.claimed < settings.email_outbox_batch_size:
+                stop.wait(settings.email_outbox_poll_seconds)
+    finally:
+        if sender is not None:
+            sender.close()
+
+
+def run(stop: threading.Event) -> None:
+    runner = JobRunner(get_session, schedules=SCHEDULES)
+    runner.start(stop)
+    try:
+        run_outbox(stop)
+    finally:
+        # Workers finish the job in hand before exiting.
+        stop.set()
+        runner.join()
 
 
 def main() -> None:
-    while True:
-        time.sleep(5)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    stop = threading.Event()
+
+    def _stop(signum, frame) -> None:
+        logger.info("Stopping job runner (signal %s)", signum)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    run(stop)
 
 
 if __name__ == "__main__":
@@ -1,31 +1,51 @@
 from __future__ import annotations
 
 import uuid
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.dependencies.auth import CurrentUser, DbSession
+from app.core.web.responses import json_response
 from app.modules.auth.api.schemas import LoginIn, LoginOut, MeOut, RegisterWorkerIn, RegisterWorkerOut, VerifyEmailIn
 from app.modules.auth.domain import EmailVerificationToken, SubscriptionStatus, Tenant, TenantStatus, User, UserRole
-from app.modules.auth.infrastructure.sendgrid_client import send_email
 from app.modules.auth.security.jwt_tokens import create_access_token
-from app.modules.auth.security.passwords import hash_password, verify_password
+from app.modules.auth.security.passwords import needs_rehash
 from app.modules.auth.security.verification_tokens import new_token_urlsafe, token_hash_bytes
 from app.modules.auth.service.access_mode import now_utc, tenant_access_mode
+from app.modules.auth.service.email_outbox import enqueue_email
+from app.modules.auth.service.password_hasher import PasswordHasherBusy, password_hasher
+from app.modules.auth.service.user_cache import invalidate_user
 
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=RegisterWorkerOut)
-def register_worker(payload: RegisterWorkerIn, session: DbSession) -> RegisterWorkerOut:
+async def register_worker(payload: RegisterWorkerIn, session: DbSession) -> RegisterWorkerOut:
     email = payload.email.strip().lower()
-    if session.execute(select(User).where(User.email == email, User.role == UserRole.worker.value)).first() is not None:
+    if await run_in_threadpool(_worker_email_in_use, session, email):
         raise HTTPException(status_code=409, detail="email_in_use")
 
+    password_hash = await _hash_password(payload.password)
+    raw_token = await run_in_threadpool(_create_worker, session, email, password_hash)
+
+    dev_token = raw_token if settings.api_environment == "development" else None
+    return RegisterWorkerOut(status="ok", dev_verify_token=dev_token)
+
+
+def _worker_email_in_use(session: Session, email: str) -> bool:
+    in_use = session.execute(select(User).where(User.email == email, User.role == UserRole.worker.value)).first()
+    # Hand the connection back to the pool while the password is being hashed.
+    session.rollback()
+    return in_use is not None
+
+
+def _create_worker(session: Session, email: str, password_hash: str) -> str:
     tenant = Tenant(id=uuid.uuid4(), status=TenantStatus.active.value, subscription_status=SubscriptionStatus.trial.value)
     session.add(tenant)
 
@@ -34,7 +54,7 @@ def register_worker(payload: RegisterWorkerIn, session: DbSession) -> RegisterWo
         tenant_id=tenant.id,
         role=UserRole.worker.value,
         email=email,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         is_active=True,
         locale="es-ES",
         timezone="Europe/Madrid",
@@ -53,17 +73,18 @@ def register_worker(payload: RegisterWorkerIn, session: DbSession) -> RegisterWo
         expires_at=now_utc() + timedelta(hours=48),
     )
     session.add(token)
-    session.commit()
 
+    # Delivered by the jobs runner; committed together with the user and token.
     verify_url = f"{settings.public_api_base_url}/auth/verify-email?token={raw_token}"
-    send_email(
+    enqueue_email(
+        session,
+        tenant_id=tenant.id,
         to_email=email,
         subject="Verifica tu correo",
         html=f"<p>Confirma tu correo para acceder:</p><p><a href=\"{verify_url}\">{verify_url}</a></p>",
     )
-
-    dev_token = raw_token if settings.api_environment == "development" else None
-    return RegisterWorkerOut(status="ok", dev_verify_token=dev_token)
+    session.commit()
+    return raw_token
 
 
 @router.post("/verify-email")
@@ -92,6 +113,7 @@ def verify_email(payload: VerifyEmailIn, session: DbSession) -> dict[str, str]:
 
     row.consumed_at = now_utc()
     session.commit()
+    invalidate_user(user.id)
     return {"status": "ok"}
 
 
@@ -104,18 +126,25 @@ def verify_email_link(session: DbSession, token: str = Query(...)) -> dict[str,
 
 
 @router.post("/login", response_model=LoginOut)
-def login(payload: LoginIn, session: DbSession) -> LoginOut:
+async def login(payload: LoginIn, session: DbSession) -> Response:
     email = payload.email.strip().lower()
-    user = session.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    user = await run_in_threadpool(_find_login_user, session, email)
     if user is None:
         raise HTTPException(status_code=401, detail="invalid_credentials")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="user_inactive")
 
-    if not verify_password(payload.password, user.password_hash):
+    if not await _verify_password(payload.password, user.password_hash):
         raise HTTPException(status_code=401, detail="invalid_credentials")
 
-    tenant = session.execute(select(Tenant).where(Tenant.id == user.tenant_id)).scalar_one()
+    if needs_rehash(user.password_hash):
+        # Cost setting changed since this hash was made; upgrade it while we have the password.
+        new_hash = await _hash_password(payload.password)
+        await run_in_threadpool(_replace_password_hash, session, user.id, user.password_hash, new_hash)
+
+    tenant = await run_in_threadpool(
+        lambda: session.execute(select(Tenant).where(Tenant.id == user.tenant_id)).scalar_one()
+    )
     mode = tenant_access_mode(tenant)
 
     if user.role == UserRole.worker.value:
@@ -137,21 +166,55 @@ def login(payload: LoginIn, session: DbSession) -> LoginOut:
         minutes=60 * 24 * 7,
     )
 
-    return LoginOut(access_token=token.token, access_mode=access_mode)
+    return json_response({"access_token": token.token, "token_type": "bearer", "access_mode": access_mode})
+
+
+def _find_login_user(session: Session, email: str) -> User | None:
+    user = session.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    # Detach and end the read so no pooled connection is held while bcrypt runs.
+    if user is not None:
+        session.expunge(user)
+    session.rollback()
+    return user
+
+
+def _replace_password_hash(session: Session, user_id: uuid.UUID, old_hash: str, new_hash: str) -> None:
+    session.execute(
+        update(User)
+        .where(User.id == user_id, User.password_hash == old_hash)
+        .values(password_hash=new_hash, updated_at=datetime.now(timezone.utc))
+    )
+    session.commit()
+
+
+async def _hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="auth_busy") from None
+
+
+async def _verify_password(password: str, password_hash: str) -> bool:
+    try:
+        return await password_hasher.verify(password, password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="auth_busy") from None
 
 
 @router.get("/me", response_model=MeOut)
-def me(user: CurrentUser, session: DbSession) -> MeOut:
+def me(user: CurrentUser, session: DbSession) -> Response:
     tenant = session.execute(select(Tenant).where(Tenant.id == user.tenant_id)).scalar_one()
     mode = tenant_access_mode(tenant)
     access_mode = "active"
     if user.role == UserRole.worker.value and mode == "expired":
         access_mode = "read_only"
 
-    return MeOut(
-        id=str(user.id),
-        tenant_id=str(user.tenant_id),
-        role=user.role,
-        email=user.email,
-        access_mode=access_mode,
+    return json_response(
+        {
+            "id": user.id,
+            "tenant_id": user.tenant_id,
+            "role": user.role,
+            "email": user.email,
+            "access_mode": access_mode,
+        }
     )
@@ -1,7 +1,9 @@
-from app.modules.auth.domain.enums import SubscriptionStatus, TenantStatus, UserRole
-from app.modules.auth.domain.models import EmailVerificationToken, Tenant, User
+from app.modules.auth.domain.enums import EmailOutboxStatus, SubscriptionStatus, TenantStatus, UserRole
+from app.modules.auth.domain.models import EmailOutboxMessage, EmailVerificationToken, Tenant, User
 
 __all__ = [
+    "EmailOutboxMessage",
+    "EmailOutboxStatus",
     "EmailVerificationToken",
     "SubscriptionStatus",
     "Tenant",
@@ -19,3 +19,10 @@ class SubscriptionStatus(str, enum.Enum):
 class UserRole(str, enum.Enum):
     worker = "worker"
     client = "client"
+
+
+class EmailOutboxStatus(str, enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+    skipped = "skipped"
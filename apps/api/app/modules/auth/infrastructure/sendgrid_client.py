@@ -5,25 +5,74 @@ import httpx
 from app.core.config import settings
 
 
-def send_email(*, to_email: str, subject: str, html: str) -> None:
-    # MVP: if SendGrid not configured, do nothing.
-    if not settings.sendgrid_api_key or not settings.sendgrid_from_email:
-        return
+class EmailSendError(RuntimeError):
+    def __init__(self, message: str, *, retryable: bool) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def sendgrid_configured() -> bool:
+    return bool(settings.sendgrid_api_key and settings.sendgrid_from_email)
 
-    payload = {
-        "personalizations": [{"to": [{"email": to_email}]}],
-        "from": {"email": settings.sendgrid_from_email},
-        "subject": subject,
-        "content": [{"type": "text/html", "value": html}],
-    }
 
-    headers = {
-        "Authorization": f"Bearer {settings.sendgrid_api_key}",
-        "Content-Type": "application/json",
-    }
+class SendGridClient:
+    """
+    Keep-alive client for the SendGrid v3 mail API.
+
+    One instance is meant to be reused for many messages (the jobs runner keeps a
+    single one for its lifetime); `close()` releases the pooled connections.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str | None = None,
+        from_email: str | None = None,
+        base_url: str | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self.from_email = from_email if from_email is not None else settings.sendgrid_from_email
+        self._client = httpx.Client(
+            base_url=(base_url or settings.sendgrid_api_base_url).rstrip("/"),
+            timeout=timeout if timeout is not None else settings.sendgrid_timeout_seconds,
+            headers={"Authorization": f"Bearer {api_key if api_key is not None else settings.sendgrid_api_key}"},
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60.0),
+        )
+
+    def send(self, *, to_email: str, subject: str, html: str) -> None:
+        payload = {
+            "personalizations": [{"to": [{"email": to_email}]}],
+            "from": {"email": self.from_email},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html}],
+        }
+        try:
+            res = self._client.post("/v3/mail/send", json=payload)
+        except httpx.HTTPError as exc:
+            raise EmailSendError(f"sendgrid_unreachable: {type(exc).__name__}", retryable=True) from None
 
-    with httpx.Client(timeout=10.0) as client:
-        res = client.post("https://api.sendgrid.com/v3/mail/send", json=payload, headers=headers)
         if res.status_code >= 400:
-            # Avoid leaking provider responses.
-            raise RuntimeError("sendgrid_failed")
+            # Avoid leaking provider responses; the status is enough to triage.
+            retryable = res.status_code == 429 or res.status_code >= 500
+            raise EmailSendError(f"sendgrid_failed: {res.status_code}", retryable=retryable)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self) -> SendGridClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def send_email(*, to_email: str, subject: str, html: str) -> None:
+    # MVP: if SendGrid not configured, do nothing.
+    if not sendgrid_configured():
+        return
+
+    with SendGridClient() as client:
+        try:
+            client.send(to_email=to_email, subject=subject, html=html)
+        except EmailSendError:
+            raise RuntimeError("sendgrid_failed") from None
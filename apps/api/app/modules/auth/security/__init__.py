@@ -1,5 +1,5 @@
 from app.modules.auth.security.jwt_tokens import AccessToken, create_access_token, decode_access_token
-from app.modules.auth.security.passwords import hash_password, verify_password
+from app.modules.auth.security.passwords import hash_password, needs_rehash, verify_password
 from app.modules.auth.security.verification_tokens import new_token_urlsafe, token_hash_bytes
 
 __all__ = [
@@ -7,6 +7,7 @@ __all__ = [
     "create_access_token",
     "decode_access_token",
     "hash_password",
+    "needs_rehash",
     "new_token_urlsafe",
     "token_hash_bytes",
     "verify_password",
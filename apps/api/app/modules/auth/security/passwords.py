@@ -4,6 +4,8 @@ import hashlib
 
 import bcrypt
 
+from app.core.config import settings
+
 
 def _normalize_password_bytes(password: str) -> bytes:
     b = password.encode("utf-8")
@@ -13,9 +15,9 @@ def _normalize_password_bytes(password: str) -> bytes:
     return b
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: int | None = None) -> str:
     pw = _normalize_password_bytes(password)
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds or settings.auth_bcrypt_rounds)
     return bcrypt.hashpw(pw, salt).decode("utf-8")
 
 
@@ -25,3 +27,15 @@ def verify_password(password: str, password_hash: str) -> bool:
         return bcrypt.checkpw(pw, password_hash.encode("utf-8"))
     except Exception:
         return False
+
+
+def hash_rounds(password_hash: str) -> int | None:
+    # Modular crypt format: $2b$<rounds>$<salt+hash>
+    parts = password_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(password_hash: str, rounds: int | None = None) -> bool:
+    return hash_rounds(password_hash) != (rounds or settings.auth_bcrypt_rounds)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.modules.auth.domain.enums import EmailOutboxStatus
+from app.modules.auth.domain.models import EmailOutboxMessage
+from app.modules.auth.infrastructure.sendgrid_client import EmailSendError, SendGridClient
+
+
+logger = logging.getLogger(__name__)
+
+_MAX_BACKOFF = timedelta(hours=1)
+
+
+def enqueue_email(
+    session: Session,
+    *,
+    to_email: str,
+    subject: str,
+    html: str,
+    tenant_id: uuid.UUID | None = None,
+) -> EmailOutboxMessage:
+    """Add an email to the outbox. It is only sent if the caller's transaction commits."""
+    row = EmailOutboxMessage(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        to_email=to_email,
+        subject=subject,
+        html=html,
+        status=EmailOutboxStatus.pending.value,
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    session.add(row)
+    return row
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    # 1x, 2x, 4x ... the base delay, capped at one hour.
+    return min(_MAX_BACKOFF, timedelta(seconds=settings.email_outbox_backoff_seconds * 2 ** max(0, attempts - 1)))
+
+
+@dataclass(frozen=True)
+class ClaimedEmail:
+    id: uuid.UUID
+    to_email: str
+    subject: str
+    html: str
+    attempts: int
+
+
+@dataclass
+class OutboxBatchResult:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    skipped: int = 0
+    # Claimed but handed back unsent because the lease was about to run out.
+    released: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def claim_batch(session: Session, *, limit: int, now: datetime) -> list[ClaimedEmail]:
+    """
+    Lease up to `limit` due messages to this runner and commit.
+
+    `SKIP LOCKED` lets several runners claim disjoint batches. The lease is the
+    pushed-back `next_attempt_at`: a runner that dies mid-send leaves the row
+    to be picked up again once the lease runs out.
+    """
+    rows = (
+        session.execute(
+            select(EmailOutboxMessage)
+            .where(
+                EmailOutboxMessage.status == EmailOutboxStatus.pending.value,
+                EmailOutboxMessage.next_attempt_at <= now,
+            )
+            .order_by(EmailOutboxMessage.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    lease_until = now + timedelta(seconds=settings.email_outbox_lease_seconds)
+    claimed = []
+    for row in rows:
+        row.attempts += 1
+        row.next_attempt_at = lease_until
+        claimed.append(ClaimedEmail(row.id, row.to_email, row.subject, row.html, row.attempts))
+    session.commit()
+    return claimed
+
+
+def _record(session: Session, message: ClaimedEmail, **values) -> None:
+    # Guard on `attempts` so a runner whose lease expired cannot overwrite a newer claim.
+    session.execute(
+        update(EmailOutboxMessage)
+        .where(EmailOutboxMessage.id == message.id, EmailOutboxMessage.attempts == message.attempts)
+        .values(**values)
+    )
+
+
+def _outcome(message: ClaimedEmail, sender: SendGridClient | None, result: OutboxBatchResult, clock) -> dict:
+    if sender is None:
+        result.skipped += 1
+        return {"status": EmailOutboxStatus.skipped.value, "last_error": None}
+
+    try:
+        sender.send(to_email=message.to_email, subject=message.subject, html=message.html)
+    except EmailSendError as exc:
+        result.errors.append(str(exc))
+        if exc.retryable and message.attempts < settings.email_outbox_max_attempts:
+            result.retried += 1
+            # Back off from when the send failed, not from when the batch was claimed.
+            return {"next_attempt_at": clock() + backoff_delay(message.attempts), "last_error": str(exc)}
+        result.failed += 1
+        logger.warning("Email %s failed after %s attempts: %s", message.id, message.attempts, exc)
+        return {"status": EmailOutboxStatus.failed.value, "last_error": str(exc)}
+
+    result.sent += 1
+    return {"status": EmailOutboxStatus.sent.value, "sent_at": clock(), "last_error": None}
+
+
+def deliver_pending(
+    session_factory: Callable[[], Session],
+    sender: SendGridClient | None,
+    *,
+    batch_size: int | None = None,
+    now: datetime | None = None,
+) -> OutboxBatchResult:
+    """
+    Claim one batch, send it and record each outcome as soon as it is known.
+
+    Retryable failures (network, 429, 5xx) go back to pending with exponential
+    backoff until `EMAIL_OUTBOX_MAX_ATTEMPTS`; other provider errors fail at once.
+    With no sender (SendGrid not configured) messages are marked `skipped`.
+
+    A message is only sent while a send that takes the full
+    `SENDGRID_TIMEOUT_SECONDS` still ends inside the lease; once it would not,
+    the rest of the batch is handed back so no other runner can claim and send
+    it a second time.
+    """
+    started = datetime.now(timezone.utc)
+    now = now or started
+
+    def clock() -> datetime:
+        # `now` can be given (tests); time still moves on from it.
+        return now + (datetime.now(timezone.utc) - started)
+
+    result = OutboxBatchResult()
+    with session_factory() as session:
+        batch = claim_batch(session, limit=batch_size or settings.email_outbox_batch_size, now=now)
+    result.claimed = len(batch)
+    if not batch:
+        return result
+
+    send_deadline = now + timedelta(
+        seconds=settings.email_outbox_lease_seconds - settings.sendgrid_timeout_seconds
+    )
+    with session_factory() as session:
+        for index, message in enumerate(batch):
+            if sender is not None and clock() >= send_deadline:
+                rest = batch[index:]
+                for unsent in rest:
+                    _record(session, unsent, attempts=unsent.attempts - 1, next_attempt_at=clock())
+                session.commit()
+                result.released = len(rest)
+                logger.warning("Email outbox lease running out; released %s unsent messages", len(rest))
+                break
+
+            _record(session, message, **_outcome(message, sender, result, clock))
+            # One short transaction per message: an outcome is never lost to a later slow send.
+            session.commit()
+    return result
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, or_
+from sqlalchemy.orm import Session
+
+from app.core.jobs import job_handler
+from app.modules.auth.domain.models import EmailVerificationToken
+
+
+logger = logging.getLogger(__name__)
+
+PURGE_VERIFICATION_TOKENS = "auth.purge_verification_tokens"
+
+
+def purge_verification_tokens(session: Session, *, now: datetime) -> int:
+    """Delete verification tokens that expired or were consumed before `now`. Does not commit."""
+    res = session.execute(
+        delete(EmailVerificationToken).where(
+            or_(EmailVerificationToken.expires_at < now, EmailVerificationToken.consumed_at < now)
+        )
+    )
+    return res.rowcount or 0
+
+
+@job_handler(PURGE_VERIFICATION_TOKENS)
+def purge_verification_tokens_job(session: Session, payload: dict) -> None:
+    # A grace period keeps just-expired tokens around for support lookups.
+    grace = timedelta(hours=payload.get("grace_hours", 24))
+    deleted = purge_verification_tokens(session, now=datetime.now(timezone.utc) - grace)
+    logger.info("Purged %s email verification tokens", deleted)
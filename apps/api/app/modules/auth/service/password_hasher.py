@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.metrics import MetricFamily
+from app.modules.auth.security.passwords import hash_password, verify_password
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class PasswordHasherStats:
+    pool: str
+    workers: int
+    max_pending: int
+    pending: int
+    queue_depth: int
+    max_queue_depth: int
+    completed: int
+    rejected: int
+    wait_seconds_total: float
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated executor so it never holds an event-loop or AnyIO
+    threadpool slot.
+
+    At most `max_pending` operations may be queued or running; beyond that new
+    ones fail fast with `PasswordHasherBusy` instead of piling up behind a burst.
+    `pool="process"` sidesteps the GIL for the few parts of bcrypt that hold it,
+    at the cost of pickling each call.
+    """
+
+    def __init__(self, *, pool: str = "thread", workers: int = 2, max_pending: int = 64) -> None:
+        if pool not in ("thread", "process"):
+            raise ValueError(f"unknown password hash pool: {pool}")
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_queue_depth = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.pool == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers,
+                            thread_name_prefix="password-hash",
+                        )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusy("password hashing queue is full")
+            self._pending += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._pending - self.workers)
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._wait_seconds_total += time.perf_counter() - started
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, settings.auth_bcrypt_rounds)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    def stats(self) -> PasswordHasherStats:
+        with self._lock:
+            return PasswordHasherStats(
+                pool=self.pool,
+                workers=self.workers,
+                max_pending=self.max_pending,
+                pending=self._pending,
+                queue_depth=max(0, self._pending - self.workers),
+                max_queue_depth=self._max_queue_depth,
+                completed=self._completed,
+                rejected=self._rejected,
+                wait_seconds_total=round(self._wait_seconds_total, 6),
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    pool=settings.auth_password_hash_pool,
+    workers=settings.auth_password_hash_workers,
+    max_pending=settings.auth_password_hash_max_pending,
+)
+
+
+def collect_password_hasher_metrics() -> list[MetricFamily]:
+    stats = password_hasher.stats()
+    return [
+        MetricFamily("auth_password_hash_pending", "gauge", "Hash/verify calls queued or running.", [({}, stats.pending)]),
+        MetricFamily(
+            "auth_password_hash_completed_total", "counter", "Hash/verify calls completed.", [({}, stats.completed)]
+        ),
+        MetricFamily(
+            "auth_password_hash_rejected_total",
+            "counter",
+            "Hash/verify calls rejected with auth_busy.",
+            [({}, stats.rejected)],
+        ),
+        MetricFamily(
+            "auth_password_hash_wait_seconds_total",
+            "counter",
+            "Time spent in hash/verify calls, queueing included.",
+            [({}, stats.wait_seconds_total)],
+        ),
+    ]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.config import settings
+from app.modules.auth.domain.models import User
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of the `User` fields request handlers rely on."""
+
+    id: uuid.UUID
+    tenant_id: uuid.UUID
+    role: str
+    email: str
+    is_active: bool
+    email_verified_at: datetime | None
+
+    @classmethod
+    def from_user(cls, user: User) -> UserSnapshot:
+        return cls(
+            id=user.id,
+            tenant_id=user.tenant_id,
+            role=user.role,
+            email=user.email,
+            is_active=user.is_active,
+            email_verified_at=user.email_verified_at,
+        )
+
+
+CacheKey = tuple[uuid.UUID, int | None]
+
+
+class UserCache:
+    """
+    Process-local LRU of user snapshots keyed by `(user_id, token iat)`.
+
+    Entries live for `ttl_seconds`; that is also the longest a change made by
+    another worker process can go unnoticed. Changes made in this process should
+    call `invalidate` right after commit. `ttl_seconds <= 0` disables caching.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, UserSnapshot]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: CacheKey) -> UserSnapshot | None:
+        if not self.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if now >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+
+    def put(self, key: CacheKey, snapshot: UserSnapshot) -> None:
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Drop every cached token of `user_id` (deactivation, role or verification changes)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+user_cache = UserCache(
+    ttl_seconds=settings.auth_user_cache_ttl_seconds,
+    max_entries=settings.auth_user_cache_max_entries,
+)
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    user_cache.invalidate(user_id)
@@ -3,40 +3,110 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Literal
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.dependencies.auth import CurrentUser, DbSession, WriteAccess
+from app.core.web.responses import json_response
 from app.modules.food.api.schemas import (
     DishTemplateIn,
     DishTemplateListItemOut,
     DishTemplateOut,
     DishTemplateUsedByOut,
+    IngredientImportOut,
     IngredientIn,
     IngredientOut,
-    MacroTotalsOut,
 )
-from app.modules.food.domain.models import DishTemplate, DishTemplateItem, Ingredient
-from app.modules.food.service.macros import MacroPer100g, compute_template_totals
+from app.modules.food.domain.models import CatalogIngredient, DishTemplate, DishTemplateItem, Ingredient
+from app.modules.food.service.bulk import (
+    FORMATS,
+    ImportFormatError,
+    encode_export,
+    format_for_content_type,
+    iter_rows,
+)
+from app.modules.food.service.library import (
+    library_branches,
+    library_ingredients,
+    library_select,
+    refresh_template_totals,
+    resolve_library_ids,
+    template_item_rows,
+    templates_using,
+)
+from app.modules.food.service.search import (
+    NEXT_CURSOR_HEADER,
+    InvalidCursor,
+    Page,
+    search_filter,
+    search_page,
+    search_union_page,
+    sorted_page,
+)
 
 
 router = APIRouter(prefix="/api/food", tags=["food"])
 
-
-def _ingredient_out(row: Ingredient) -> IngredientOut:
-    return IngredientOut(
-        id=str(row.id),
-        tenant_id=str(row.tenant_id),
-        name=row.name,
-        kcal_per_100g=float(row.kcal_per_100g),
-        protein_g_per_100g=float(row.protein_g_per_100g),
-        carbs_g_per_100g=float(row.carbs_g_per_100g),
-        fat_g_per_100g=float(row.fat_g_per_100g),
-        serving_size_g=None if row.serving_size_g is None else float(row.serving_size_g),
-        created_at=row.created_at,
-        updated_at=row.updated_at,
-    )
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_ROWS = 20_000
+MAX_IMPORT_ERRORS = 100
+EXPORT_CHUNK_SIZE = 1_000
+
+
+def _library_page(
+    session: Session,
+    stmt,
+    *,
+    name_col,
+    id_col,
+    query: str | None,
+    limit: int,
+    after: str | None,
+    offset: int,
+) -> Page:
+    try:
+        page = search_page(
+            session,
+            stmt,
+            name_col=name_col,
+            id_col=id_col,
+            query=query,
+            limit=limit,
+            after=after,
+            offset=offset,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid_cursor") from None
+    return page
+
+
+def _page_response(page: Page, content: list[dict]) -> Response:
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    return json_response(content, headers=headers)
+
+
+# Output builders return plain dicts shaped like the *Out schemas; see app/core/web/responses.py.
+def _ingredient_out(row) -> dict:
+    """`row` is an `Ingredient` or a library row; a customized copy is listed under its catalogue id."""
+    return {
+        "id": row.catalog_ingredient_id or row.id,
+        "tenant_id": row.tenant_id,
+        "catalog_ingredient_id": row.catalog_ingredient_id,
+        "name": row.name,
+        "kcal_per_100g": row.kcal_per_100g,
+        "protein_g_per_100g": row.protein_g_per_100g,
+        "carbs_g_per_100g": row.carbs_g_per_100g,
+        "fat_g_per_100g": row.fat_g_per_100g,
+        "serving_size_g": row.serving_size_g,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
 
 
 @router.get("/ingredients", response_model=list[IngredientOut])
@@ -45,17 +115,25 @@ def list_ingredients(
     session: DbSession,
     query: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
+    after: str | None = Query(default=None),
     offset: int = Query(default=0, ge=0),
-) -> list[IngredientOut]:
-    stmt = select(Ingredient).where(Ingredient.tenant_id == user.tenant_id)
-    if query:
-        stmt = stmt.where(Ingredient.name.ilike(f"%{query.strip()}%"))
-    rows = session.execute(stmt.order_by(Ingredient.name.asc()).limit(limit).offset(offset)).scalars().all()
-    return [_ingredient_out(row) for row in rows]
+) -> Response:
+    try:
+        page = search_union_page(
+            session,
+            library_branches(user.tenant_id),
+            query=query,
+            limit=limit,
+            after=after,
+            offset=offset,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid_cursor") from None
+    return _page_response(page, [_ingredient_out(row) for row in page.rows])
 
 
 @router.post("/ingredients", response_model=IngredientOut)
-def create_ingredient(payload: IngredientIn, user: CurrentUser, session: DbSession, _: WriteAccess) -> IngredientOut:
+def create_ingredient(payload: IngredientIn, user: CurrentUser, session: DbSession, _: WriteAccess) -> Response:
     now = datetime.now(timezone.utc)
     row = Ingredient(
         id=uuid.uuid4(),
@@ -71,20 +149,160 @@ def create_ingredient(payload: IngredientIn, user: CurrentUser, session: DbSessi
     )
     session.add(row)
     session.commit()
-    return _ingredient_out(row)
+    return json_response(_ingredient_out(row))
+
+
+def _row_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def _insert_ingredients(session: Session, tenant_id: uuid.UUID, batch: list[IngredientIn], now: datetime) -> None:
+    # Core insert on the table: one executemany per batch (multi-row VALUES on
+    # Postgres). The ORM bulk path would split the batch wherever a None
+    # serving size changes the set of keys.
+    session.execute(
+        insert(Ingredient.__table__),
+        [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant_id,
+                "name": payload.name.strip(),
+                "kcal_per_100g": Decimal(str(payload.kcal_per_100g)),
+                "protein_g_per_100g": Decimal(str(payload.protein_g_per_100g)),
+                "carbs_g_per_100g": Decimal(str(payload.carbs_g_per_100g)),
+                "fat_g_per_100g": Decimal(str(payload.fat_g_per_100g)),
+                "serving_size_g": None if payload.serving_size_g is None else Decimal(str(payload.serving_size_g)),
+                "created_at": now,
+                "updated_at": None,
+            }
+            for payload in batch
+        ],
+    )
+
+
+@router.post("/ingredients:import", response_model=IngredientImportOut)
+async def import_ingredients(
+    request: Request,
+    user: CurrentUser,
+    session: DbSession,
+    _: WriteAccess,
+    fmt: Literal["csv", "ndjson"] | None = Query(default=None, alias="format"),
+) -> Response:
+    """
+    Bulk-create ingredients from a CSV (header row) or NDJSON body.
+
+    The body is read and validated as it streams in; valid rows are inserted
+    in batches and committed together at the end, invalid ones are reported
+    by line and skipped.
+    """
+    fmt = fmt or format_for_content_type(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="unsupported_import_format")
+
+    now = datetime.now(timezone.utc)
+    rows = 0
+    imported = 0
+    failed = 0
+    errors: list[dict] = []
+    batch: list[IngredientIn] = []
+    try:
+        async for line, row in iter_rows(request.stream(), fmt):
+            rows += 1
+            if rows > MAX_IMPORT_ROWS:
+                raise HTTPException(status_code=413, detail="import_too_large")
+
+            error = row if isinstance(row, str) else None
+            if error is None:
+                try:
+                    batch.append(IngredientIn.model_validate(row))
+                except ValidationError as exc:
+                    error = _row_error(exc)
+            if error is not None:
+                failed += 1
+                if len(errors) < MAX_IMPORT_ERRORS:
+                    errors.append({"line": line, "error": error})
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await run_in_threadpool(_insert_ingredients, session, user.tenant_id, batch, now)
+                imported += len(batch)
+                batch = []
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+    if batch:
+        await run_in_threadpool(_insert_ingredients, session, user.tenant_id, batch, now)
+        imported += len(batch)
+    await run_in_threadpool(session.commit)
+    return json_response({"imported": imported, "failed": failed, "errors": errors})
+
+
+@router.get(
+    "/ingredients:export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in FORMATS.values()}}},
+)
+def export_ingredients(
+    user: CurrentUser,
+    session: DbSession,
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+) -> StreamingResponse:
+    """
+    Stream the tenant's own and customized ingredients (not the untouched
+    shared catalogue), fetched through a server-side cursor
+    `EXPORT_CHUNK_SIZE` rows at a time.
+    """
+    library_id = func.coalesce(Ingredient.catalog_ingredient_id, Ingredient.id)
+    stmt = (
+        select(
+            library_id.label("id"),
+            Ingredient.name,
+            Ingredient.kcal_per_100g,
+            Ingredient.protein_g_per_100g,
+            Ingredient.carbs_g_per_100g,
+            Ingredient.fat_g_per_100g,
+            Ingredient.serving_size_g,
+            Ingredient.created_at,
+            Ingredient.updated_at,
+        )
+        .where(Ingredient.tenant_id == user.tenant_id)
+        .order_by(Ingredient.name.asc(), library_id.asc())
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+
+    def chunks():
+        # FastAPI closes `session` before the body is streamed. Using it here
+        # checks out a fresh connection, so this generator closes it again.
+        try:
+            for partition in session.execute(stmt).mappings().partitions():
+                yield [dict(row) for row in partition]
+        finally:
+            session.close()
+
+    return StreamingResponse(
+        encode_export(chunks(), fmt),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="ingredients.{fmt}"'},
+    )
 
 
 @router.get("/ingredients/{ingredient_id}", response_model=IngredientOut)
-def get_ingredient(ingredient_id: uuid.UUID, user: CurrentUser, session: DbSession) -> IngredientOut:
-    row = session.execute(
+def get_ingredient(ingredient_id: uuid.UUID, user: CurrentUser, session: DbSession) -> Response:
+    row = session.execute(library_select(library_ingredients(user.tenant_id, ids=[ingredient_id]))).scalar()
+    if row is None:
+        raise HTTPException(status_code=404, detail="ingredient_not_found")
+    return json_response(_ingredient_out(row))
+
+
+def _tenant_ingredient(session: Session, tenant_id: uuid.UUID, ingredient_id: uuid.UUID) -> Ingredient | None:
+    """The tenant's own row for a library id: its ingredient, or its customized copy of a catalogue item."""
+    return session.execute(
         select(Ingredient).where(
-            Ingredient.tenant_id == user.tenant_id,
-            Ingredient.id == ingredient_id,
+            Ingredient.tenant_id == tenant_id,
+            or_(Ingredient.id == ingredient_id, Ingredient.catalog_ingredient_id == ingredient_id),
         )
     ).scalar_one_or_none()
-    if row is None:
-        raise HTTPException(status_code=404, detail="ingredient_not_found")
-    return _ingredient_out(row)
 
 
 @router.put("/ingredients/{ingredient_id}", response_model=IngredientOut)
@@ -94,15 +312,15 @@ def update_ingredient(
     user: CurrentUser,
     session: DbSession,
     _: WriteAccess,
-) -> IngredientOut:
-    row = session.execute(
-        select(Ingredient).where(
-            Ingredient.tenant_id == user.tenant_id,
-            Ingredient.id == ingredient_id,
-        )
-    ).scalar_one_or_none()
+) -> Response:
+    now = datetime.now(timezone.utc)
+    row = _tenant_ingredient(session, user.tenant_id, ingredient_id)
     if row is None:
-        raise HTTPException(status_code=404, detail="ingredient_not_found")
+        if session.get(CatalogIngredient, ingredient_id) is None:
+            raise HTTPException(status_code=404, detail="ingredient_not_found")
+        # Copy on write: the first edit of a catalogue item gives the tenant its own copy.
+        row = Ingredient(id=uuid.uuid4(), tenant_id=user.tenant_id, catalog_ingredient_id=ingredient_id, created_at=now)
+        session.add(row)
 
     row.name = payload.name.strip()
     row.kcal_per_100g = Decimal(str(payload.kcal_per_100g))
@@ -110,20 +328,18 @@ def update_ingredient(
     row.carbs_g_per_100g = Decimal(str(payload.carbs_g_per_100g))
     row.fat_g_per_100g = Decimal(str(payload.fat_g_per_100g))
     row.serving_size_g = None if payload.serving_size_g is None else Decimal(str(payload.serving_size_g))
-    row.updated_at = datetime.now(timezone.utc)
+    row.updated_at = now
 
+    session.flush()
+    refresh_template_totals(session, templates_using(user.tenant_id, ingredient_id))
     session.commit()
-    return _ingredient_out(row)
+    return json_response(_ingredient_out(row))
 
 
 @router.get("/ingredients/{ingredient_id}/used-by", response_model=list[DishTemplateUsedByOut])
-def ingredient_used_by(ingredient_id: uuid.UUID, user: CurrentUser, session: DbSession) -> list[DishTemplateUsedByOut]:
-    exists = session.execute(
-        select(Ingredient.id).where(
-            Ingredient.tenant_id == user.tenant_id,
-            Ingredient.id == ingredient_id,
-        )
-    ).first()
+def ingredient_used_by(ingredient_id: uuid.UUID, user: CurrentUser, session: DbSession) -> Response:
+    library = library_ingredients(user.tenant_id, ids=[ingredient_id])
+    exists = session.execute(select(library.c.id)).first()
     if exists is None:
         raise HTTPException(status_code=404, detail="ingredient_not_found")
 
@@ -134,128 +350,206 @@ def ingredient_used_by(ingredient_id: uuid.UUID, user: CurrentUser, session: DbS
         .where(
             DishTemplate.tenant_id == user.tenant_id,
             DishTemplateItem.tenant_id == user.tenant_id,
-            DishTemplateItem.ingredient_id == ingredient_id,
+            or_(
+                DishTemplateItem.ingredient_id == ingredient_id,
+                DishTemplateItem.catalog_ingredient_id == ingredient_id,
+            ),
         )
         .order_by(DishTemplate.name.asc())
     ).all()
 
-    return [DishTemplateUsedByOut(id=str(row[0]), name=row[1]) for row in rows]
+    return json_response([{"id": row[0], "name": row[1]} for row in rows])
 
 
 @router.delete("/ingredients/{ingredient_id}")
 def delete_ingredient(ingredient_id: uuid.UUID, user: CurrentUser, session: DbSession, _: WriteAccess) -> dict[str, str]:
-    row = session.execute(
-        select(Ingredient).where(
-            Ingredient.tenant_id == user.tenant_id,
-            Ingredient.id == ingredient_id,
-        )
-    ).scalar_one_or_none()
+    row = _tenant_ingredient(session, user.tenant_id, ingredient_id)
     if row is None:
+        if session.get(CatalogIngredient, ingredient_id) is not None:
+            raise HTTPException(status_code=409, detail="catalog_ingredient_read_only")
         raise HTTPException(status_code=404, detail="ingredient_not_found")
 
-    in_use = session.execute(
-        select(DishTemplateItem.id).where(
-            DishTemplateItem.tenant_id == user.tenant_id,
-            DishTemplateItem.ingredient_id == ingredient_id,
-        )
-    ).first()
-    if in_use is not None:
-        raise HTTPException(status_code=409, detail="ingredient_in_use")
+    # Deleting a customized copy reverts to the catalogue values; templates keep resolving.
+    if row.catalog_ingredient_id is None:
+        in_use = session.execute(
+            select(DishTemplateItem.id).where(
+                DishTemplateItem.tenant_id == user.tenant_id,
+                DishTemplateItem.ingredient_id == row.id,
+            )
+        ).first()
+        if in_use is not None:
+            raise HTTPException(status_code=409, detail="ingredient_in_use")
 
     session.delete(row)
+    if row.catalog_ingredient_id is not None:
+        session.flush()
+        refresh_template_totals(session, templates_using(user.tenant_id, row.catalog_ingredient_id))
     session.commit()
     return {"status": "ok"}
 
 
-def _template_totals(rows: list[tuple[DishTemplateItem, Ingredient]]) -> MacroTotalsOut:
-    totals = compute_template_totals(
-        [
-            (
-                MacroPer100g(
-                    kcal=ingredient.kcal_per_100g,
-                    protein_g=ingredient.protein_g_per_100g,
-                    carbs_g=ingredient.carbs_g_per_100g,
-                    fat_g=ingredient.fat_g_per_100g,
-                ),
-                item.quantity_g,
-            )
-            for item, ingredient in rows
-        ]
-    )
-    return MacroTotalsOut(
-        kcal=float(totals.kcal),
-        protein_g=float(totals.protein_g),
-        carbs_g=float(totals.carbs_g),
-        fat_g=float(totals.fat_g),
+def _template_totals(template: DishTemplate) -> dict:
+    return {
+        "kcal": template.total_kcal,
+        "protein_g": template.total_protein_g,
+        "carbs_g": template.total_carbs_g,
+        "fat_g": template.total_fat_g,
+    }
+
+
+def _template_item(
+    tenant_id: uuid.UUID,
+    template_id: uuid.UUID,
+    ingredient_id: uuid.UUID,
+    kind: str,
+    quantity_g: float,
+    now: datetime,
+) -> DishTemplateItem:
+    return DishTemplateItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        dish_template_id=template_id,
+        ingredient_id=ingredient_id if kind == "ingredient" else None,
+        catalog_ingredient_id=ingredient_id if kind == "catalog" else None,
+        quantity_g=Decimal(str(quantity_g)),
+        created_at=now,
     )
 
 
+_TEMPLATE_TOTALS = {
+    "kcal": DishTemplate.total_kcal,
+    "protein_g": DishTemplate.total_protein_g,
+    "carbs_g": DishTemplate.total_carbs_g,
+    "fat_g": DishTemplate.total_fat_g,
+}
+TemplateSort = Literal["name", "kcal", "-kcal", "protein_g", "-protein_g", "carbs_g", "-carbs_g", "fat_g", "-fat_g"]
+
+
 @router.get("/dish-templates", response_model=list[DishTemplateListItemOut])
 def list_dish_templates(
     user: CurrentUser,
     session: DbSession,
     query: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
+    after: str | None = Query(default=None),
     offset: int = Query(default=0, ge=0),
-) -> list[DishTemplateListItemOut]:
+    sort: TemplateSort = Query(default="name"),
+    min_kcal: float | None = Query(default=None, ge=0),
+    max_kcal: float | None = Query(default=None, ge=0),
+    min_protein_g: float | None = Query(default=None, ge=0),
+    max_protein_g: float | None = Query(default=None, ge=0),
+    min_carbs_g: float | None = Query(default=None, ge=0),
+    max_carbs_g: float | None = Query(default=None, ge=0),
+    min_fat_g: float | None = Query(default=None, ge=0),
+    max_fat_g: float | None = Query(default=None, ge=0),
+) -> Response:
+    """
+    `sort=name` lists by name, or by relevance first when `query` is set.
+    A macro sort (`kcal`, or `-kcal` for highest first) orders by the
+    stored totals and uses `query` only as a filter. `min_*` / `max_*`
+    bound the totals, inclusive.
+    """
     stmt = select(DishTemplate).where(DishTemplate.tenant_id == user.tenant_id)
-    if query:
-        stmt = stmt.where(DishTemplate.name.ilike(f"%{query.strip()}%"))
-    rows = session.execute(stmt.order_by(DishTemplate.name.asc()).limit(limit).offset(offset)).scalars().all()
-    return [
-        DishTemplateListItemOut(
-            id=str(row.id),
-            tenant_id=str(row.tenant_id),
-            name=row.name,
-            created_at=row.created_at,
-            updated_at=row.updated_at,
+    bounds = {
+        "kcal": (min_kcal, max_kcal),
+        "protein_g": (min_protein_g, max_protein_g),
+        "carbs_g": (min_carbs_g, max_carbs_g),
+        "fat_g": (min_fat_g, max_fat_g),
+    }
+    for macro, (low, high) in bounds.items():
+        if low is not None:
+            stmt = stmt.where(_TEMPLATE_TOTALS[macro] >= Decimal(str(low)))
+        if high is not None:
+            stmt = stmt.where(_TEMPLATE_TOTALS[macro] <= Decimal(str(high)))
+
+    if sort == "name":
+        page = _library_page(
+            session,
+            stmt,
+            name_col=DishTemplate.name,
+            id_col=DishTemplate.id,
+            query=query,
+            limit=limit,
+            after=after,
+            offset=offset,
         )
-        for row in rows
-    ]
+    else:
+        match = search_filter(session, DishTemplate.name, query)
+        if match is not None:
+            stmt = stmt.where(match)
+        try:
+            page = sorted_page(
+                session,
+                stmt,
+                key_col=_TEMPLATE_TOTALS[sort.lstrip("-")],
+                id_col=DishTemplate.id,
+                descending=sort.startswith("-"),
+                scope=f"{sort}:{query or ''}",
+                limit=limit,
+                after=after,
+                offset=offset,
+            )
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="invalid_cursor") from None
+
+    return _page_response(
+        page,
+        [
+            {
+                "id": row.id,
+                "tenant_id": row.tenant_id,
+                "name": row.name,
+                "totals": _template_totals(row),
+                "created_at": row.created_at,
+                "updated_at": row.updated_at,
+            }
+            for row in page.rows
+        ],
+    )
 
 
 @router.get("/dish-templates/{template_id}", response_model=DishTemplateOut)
-def get_dish_template(template_id: uuid.UUID, user: CurrentUser, session: DbSession) -> DishTemplateOut:
+def get_dish_template(template_id: uuid.UUID, user: CurrentUser, session: DbSession) -> Response:
     template = session.execute(
-        select(DishTemplate).where(
+        select(DishTemplate)
+        .where(
             DishTemplate.tenant_id == user.tenant_id,
             DishTemplate.id == template_id,
         )
+        # Totals are written with a Core UPDATE, which does not refresh loaded objects.
+        .execution_options(populate_existing=True)
     ).scalar_one_or_none()
     if template is None:
         raise HTTPException(status_code=404, detail="dish_template_not_found")
 
     rows = session.execute(
-        select(DishTemplateItem, Ingredient)
-        .join(Ingredient, Ingredient.id == DishTemplateItem.ingredient_id)
-        .where(
-            DishTemplateItem.tenant_id == user.tenant_id,
-            DishTemplateItem.dish_template_id == template.id,
-            Ingredient.tenant_id == user.tenant_id,
-        )
+        template_item_rows(user.tenant_id)
+        .where(DishTemplateItem.dish_template_id == template.id)
         .order_by(DishTemplateItem.created_at.asc())
     ).all()
 
-    return DishTemplateOut(
-        id=str(template.id),
-        tenant_id=str(template.tenant_id),
-        name=template.name,
-        items=[
-            {
-                "ingredient_id": str(item.ingredient_id),
-                "ingredient_name": ingredient.name,
-                "quantity_g": float(item.quantity_g),
-            }
-            for item, ingredient in rows
-        ],
-        totals=_template_totals(rows),
-        created_at=template.created_at,
-        updated_at=template.updated_at,
+    return json_response(
+        {
+            "id": template.id,
+            "tenant_id": template.tenant_id,
+            "name": template.name,
+            "items": [
+                {
+                    "ingredient_id": ingredient.id,
+                    "ingredient_name": ingredient.name,
+                    "quantity_g": item.quantity_g,
+                }
+                for item, ingredient in rows
+            ],
+            "totals": _template_totals(template),
+            "created_at": template.created_at,
+            "updated_at": template.updated_at,
+        }
     )
 
 
 @router.post("/dish-templates", response_model=DishTemplateOut)
-def create_dish_template(payload: DishTemplateIn, user: CurrentUser, session: DbSession, _: WriteAccess) -> DishTemplateOut:
+def create_dish_template(payload: DishTemplateIn, user: CurrentUser, session: DbSession, _: WriteAccess) -> Response:
     now = datetime.now(timezone.utc)
     item_ids: list[uuid.UUID] = []
     for item in payload.items:
@@ -264,14 +558,8 @@ def create_dish_template(payload: DishTemplateIn, user: CurrentUser, session: Db
         except Exception:
             raise HTTPException(status_code=400, detail="invalid_ingredient_id")
 
-    ingredients = session.execute(
-        select(Ingredient).where(
-            Ingredient.tenant_id == user.tenant_id,
-            Ingredient.id.in_(item_ids),
-        )
-    ).scalars().all()
-    ingredients_by_id = {ingredient.id: ingredient for ingredient in ingredients}
-    if len(ingredients_by_id) != len(set(item_ids)):
+    kinds = resolve_library_ids(session, user.tenant_id, item_ids)
+    if len(kinds) != len(set(item_ids)):
         raise HTTPException(status_code=404, detail="ingredient_not_found")
 
     template = DishTemplate(
@@ -283,19 +571,11 @@ def create_dish_template(payload: DishTemplateIn, user: CurrentUser, session: Db
     )
     session.add(template)
 
-    for item in payload.items:
-        ingredient_id = uuid.UUID(item.ingredient_id)
-        session.add(
-            DishTemplateItem(
-                id=uuid.uuid4(),
-                tenant_id=user.tenant_id,
-                dish_template_id=template.id,
-                ingredient_id=ingredient_id,
-                quantity_g=Decimal(str(item.quantity_g)),
-                created_at=now,
-            )
-        )
+    for item, ingredient_id in zip(payload.items, item_ids):
+        session.add(_template_item(user.tenant_id, template.id, ingredient_id, kinds[ingredient_id], item.quantity_g, now))
 
+    session.flush()
+    refresh_template_totals(session, [template.id])
     session.commit()
     return get_dish_template(template.id, user, session)
 
@@ -307,7 +587,7 @@ def update_dish_template(
     user: CurrentUser,
     session: DbSession,
     _: WriteAccess,
-) -> DishTemplateOut:
+) -> Response:
     template = session.execute(
         select(DishTemplate).where(
             DishTemplate.tenant_id == user.tenant_id,
@@ -324,14 +604,8 @@ def update_dish_template(
         except Exception:
             raise HTTPException(status_code=400, detail="invalid_ingredient_id")
 
-    ingredients = session.execute(
-        select(Ingredient).where(
-            Ingredient.tenant_id == user.tenant_id,
-            Ingredient.id.in_(item_ids),
-        )
-    ).scalars().all()
-    ingredients_by_id = {ingredient.id: ingredient for ingredient in ingredients}
-    if len(ingredients_by_id) != len(set(item_ids)):
+    kinds = resolve_library_ids(session, user.tenant_id, item_ids)
+    if len(kinds) != len(set(item_ids)):
         raise HTTPException(status_code=404, detail="ingredient_not_found")
 
     now = datetime.now(timezone.utc)
@@ -347,18 +621,11 @@ def update_dish_template(
     for row in existing:
         session.delete(row)
 
-    for item in payload.items:
-        session.add(
-            DishTemplateItem(
-                id=uuid.uuid4(),
-                tenant_id=user.tenant_id,
-                dish_template_id=template.id,
-                ingredient_id=uuid.UUID(item.ingredient_id),
-                quantity_g=Decimal(str(item.quantity_g)),
-                created_at=now,
-            )
-        )
+    for item, ingredient_id in zip(payload.items, item_ids):
+        session.add(_template_item(user.tenant_id, template.id, ingredient_id, kinds[ingredient_id], item.quantity_g, now))
 
+    session.flush()
+    refresh_template_totals(session, [template.id])
     session.commit()
     return get_dish_template(template.id, user, session)
 
@@ -16,7 +16,10 @@ class IngredientIn(BaseModel):
 
 class IngredientOut(BaseModel):
     id: str
-    tenant_id: str
+    # None for a shared catalogue item the tenant uses as is.
+    tenant_id: str | None
+    # The catalogue item this is, or customizes; None for the tenant's own ingredients.
+    catalog_ingredient_id: str | None
     name: str
     kcal_per_100g: float
     protein_g_per_100g: float
@@ -27,6 +30,18 @@ class IngredientOut(BaseModel):
     updated_at: datetime | None
 
 
+class IngredientImportErrorOut(BaseModel):
+    line: int
+    error: str
+
+
+class IngredientImportOut(BaseModel):
+    imported: int
+    failed: int
+    # The first errors only; `failed` has the full count.
+    errors: list[IngredientImportErrorOut]
+
+
 class DishTemplateItemIn(BaseModel):
     ingredient_id: str
     quantity_g: float = Field(gt=0)
@@ -64,6 +79,7 @@ class DishTemplateListItemOut(BaseModel):
     id: str
     tenant_id: str
     name: str
+    totals: MacroTotalsOut
     created_at: datetime
     updated_at: datetime | None
 
@@ -4,17 +4,61 @@ import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, Numeric, Text
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Index, Numeric, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db.base import Base
 
 
+class CatalogIngredient(Base):
+    """
+    Shared, read-only reference food (e.g. BEDCA) visible to every tenant.
+
+    Tenants use catalogue rows directly; an `Ingredient` with
+    `catalog_ingredient_id` set is one tenant's customized copy and shadows
+    the catalogue row for that tenant only.
+    """
+
+    __tablename__ = "catalog_ingredients"
+    __table_args__ = (
+        UniqueConstraint("source", "source_id", name="uq_catalog_ingredients_source"),
+        Index("ix_catalog_ingredients_name_id", "name", "id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    source: Mapped[str] = mapped_column(Text, nullable=False)
+    source_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    name: Mapped[str] = mapped_column(Text, nullable=False)
+
+    kcal_per_100g: Mapped[Decimal] = mapped_column(Numeric(7, 2), nullable=False)
+    protein_g_per_100g: Mapped[Decimal] = mapped_column(Numeric(7, 2), nullable=False)
+    carbs_g_per_100g: Mapped[Decimal] = mapped_column(Numeric(7, 2), nullable=False)
+    fat_g_per_100g: Mapped[Decimal] = mapped_column(Numeric(7, 2), nullable=False)
+
+    serving_size_g: Mapped[Decimal | None] = mapped_column(Numeric(7, 2), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class Ingredient(Base):
     __tablename__ = "ingredients"
+    __table_args__ = (
+        # At most one customized copy of a catalogue item per tenant.
+        Index("ix_ingredients_tenant_catalog", "tenant_id", "catalog_ingredient_id", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    catalog_ingredient_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("catalog_ingredients.id", ondelete="SET NULL"),
+        nullable=True,
+    )
 
     name: Mapped[str] = mapped_column(Text, nullable=False)
 
@@ -35,12 +79,25 @@ class Ingredient(Base):
 
 class DishTemplate(Base):
     __tablename__ = "dish_templates"
+    __table_args__ = (
+        # Keyset order for the list's macro sorts.
+        Index("ix_dish_templates_tenant_total_kcal_id", "tenant_id", "total_kcal", "id"),
+        Index("ix_dish_templates_tenant_total_protein_g_id", "tenant_id", "total_protein_g", "id"),
+        Index("ix_dish_templates_tenant_total_carbs_g_id", "tenant_id", "total_carbs_g", "id"),
+        Index("ix_dish_templates_tenant_total_fat_g_id", "tenant_id", "total_fat_g", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
 
     name: Mapped[str] = mapped_column(Text, nullable=False)
 
+    # Sum of the items' macros, kept current on write by `refresh_template_totals`.
+    total_kcal: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=Decimal("0"))
+    total_protein_g: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=Decimal("0"))
+    total_carbs_g: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=Decimal("0"))
+    total_fat_g: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=Decimal("0"))
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -51,6 +108,13 @@ class DishTemplate(Base):
 
 class DishTemplateItem(Base):
     __tablename__ = "dish_template_items"
+    __table_args__ = (
+        CheckConstraint(
+            "(ingredient_id IS NULL) <> (catalog_ingredient_id IS NULL)",
+            name="ck_dish_template_items_one_ingredient",
+        ),
+        Index("ix_dish_template_items_tenant_catalog_ingredient_id", "tenant_id", "catalog_ingredient_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     tenant_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
@@ -59,9 +123,15 @@ class DishTemplateItem(Base):
         ForeignKey("dish_templates.id", ondelete="CASCADE"),
         nullable=False,
     )
-    ingredient_id: Mapped[uuid.UUID] = mapped_column(
+    # Exactly one is set: a tenant-owned ingredient, or a catalogue item
+    # (resolved through the tenant's customized copy when there is one).
+    ingredient_id: Mapped[uuid.UUID | None] = mapped_column(
         ForeignKey("ingredients.id", ondelete="RESTRICT"),
-        nullable=False,
+        nullable=True,
+    )
+    catalog_ingredient_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("catalog_ingredients.id", ondelete="RESTRICT"),
+        nullable=True,
     )
 
     quantity_g: Mapped[Decimal] = mapped_column(Numeric(8, 2), nullable=False)
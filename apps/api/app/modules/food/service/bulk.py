@@ -0,0 +1,178 @@
+"""
+Streaming CSV / NDJSON codecs for bulk ingredient import and export.
+
+Import bodies are decoded as they arrive and yielded one row at a time, so a
+large spreadsheet never sits in memory whole. Rows are plain dicts; the API
+layer validates them against `IngredientIn` and reports errors by line.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import re
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+import orjson
+
+from app.core.web.responses import dumps
+
+
+IMPORT_FIELDS = (
+    "name",
+    "kcal_per_100g",
+    "protein_g_per_100g",
+    "carbs_g_per_100g",
+    "fat_g_per_100g",
+    "serving_size_g",
+)
+REQUIRED_IMPORT_FIELDS = IMPORT_FIELDS[:5]
+
+EXPORT_FIELDS = ("id", *IMPORT_FIELDS, "created_at", "updated_at")
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+
+# Spreadsheets exported with a Spanish locale write "12,5".
+_DECIMAL_COMMA = re.compile(r"^\s*-?\d+,\d+\s*$")
+
+
+class ImportFormatError(ValueError):
+    """The body cannot be read as rows at all (as opposed to one bad row)."""
+
+
+def format_for_content_type(content_type: str | None) -> str | None:
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Decode a UTF-8 byte stream (BOM allowed) into numbered lines without line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                number += 1
+                yield number, line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ImportFormatError("invalid_encoding") from None
+    if pending.rstrip("\r"):
+        yield number + 1, pending.rstrip("\r")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[tuple[int, str]]) -> AsyncIterator[tuple[int, dict | str]]:
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield number, "invalid JSON"
+            continue
+        yield number, row if isinstance(row, dict) else "expected a JSON object"
+
+
+async def _csv_records(lines: AsyncIterator[tuple[int, str]]) -> AsyncIterator[tuple[int, str]]:
+    # A quoted field may span lines; a record is complete once its quotes balance.
+    start = 0
+    parts: list[str] = []
+    async for number, line in lines:
+        if not parts:
+            start = number
+        parts.append(line)
+        record = "\n".join(parts)
+        if record.count('"') % 2 == 0:
+            parts = []
+            yield start, record
+    if parts:
+        yield start, "\n".join(parts)
+
+
+def _csv_value(value: str) -> str | None:
+    value = value.strip()
+    if not value:
+        return None
+    if _DECIMAL_COMMA.match(value):
+        return value.replace(",", ".")
+    return value
+
+
+async def iter_csv_rows(
+    lines: AsyncIterator[tuple[int, str]], fields: tuple[str, ...] = IMPORT_FIELDS
+) -> AsyncIterator[tuple[int, dict | str]]:
+    header: list[str] | None = None
+    delimiter = ","
+    async for number, record in _csv_records(lines):
+        if not record.strip():
+            continue
+        if header is None:
+            # Excel with a comma decimal separator writes `;`-separated CSV.
+            delimiter = ";" if record.count(";") > record.count(",") else ","
+            header = [name.strip().lower() for name in next(csv.reader(io.StringIO(record), delimiter=delimiter))]
+            missing = [name for name in REQUIRED_IMPORT_FIELDS if name not in header]
+            if missing:
+                raise ImportFormatError("missing_columns:" + ",".join(missing))
+            continue
+        try:
+            values = next(csv.reader(io.StringIO(record), delimiter=delimiter))
+        except csv.Error as exc:
+            yield number, f"invalid CSV: {exc}"
+            continue
+        if len(values) != len(header):
+            yield number, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield number, {
+            name: _csv_value(value) for name, value in zip(header, values) if name in fields
+        }
+
+
+def iter_rows(
+    chunks: AsyncIterator[bytes], fmt: str, fields: tuple[str, ...] = IMPORT_FIELDS
+) -> AsyncIterator[tuple[int, dict | str]]:
+    """`(line, row)` for every data row, or `(line, error)` for one that cannot be read. CSV keeps only `fields`."""
+    lines = iter_lines(chunks)
+    return iter_csv_rows(lines, fields) if fmt == "csv" else iter_ndjson_rows(lines)
+
+
+def _csv_line(values: Iterable[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(["" if value is None else value for value in values])
+    return buffer.getvalue()
+
+
+def _csv_export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Same text as the JSON APIs (UTC as `Z`).
+        return dumps(value).decode().strip('"')
+    return value
+
+
+def encode_export(chunks: Iterable[list[dict]], fmt: str) -> Iterator[bytes]:
+    """Encode export rows one chunk at a time: one body chunk out per chunk of rows in."""
+    if fmt == "csv":
+        yield _csv_line(EXPORT_FIELDS).encode()
+    for rows in chunks:
+        if fmt == "csv":
+            yield "".join(_csv_line(_csv_export_value(row[name]) for name in EXPORT_FIELDS) for row in rows).encode()
+        else:
+            yield b"".join(dumps(row) + b"\n" for row in rows)
@@ -0,0 +1,194 @@
+"""
+Loader for the shared ingredient catalogue (`catalog_ingredients`).
+
+The catalogue is reference data such as BEDCA, loaded once for every tenant
+instead of being copied into each one; see `library.py` for how tenants read
+and customize it. Rows are keyed on `(source, source_id)`, so reloading a
+newer export of the same source updates items in place and keeps their ids,
+which dish templates and tenant copies point at.
+
+    python -m app.modules.food.service.catalog bedca bedca.ndjson
+
+The file uses the ingredient import format (CSV or NDJSON, see `bulk.py`)
+plus a `source_id` column with the item's id in the source.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import uuid
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.db.session import get_session
+from app.modules.food.domain.models import CatalogIngredient, DishTemplateItem
+from app.modules.food.service.bulk import IMPORT_FIELDS, REQUIRED_IMPORT_FIELDS, ImportFormatError, iter_rows
+from app.modules.food.service.library import refresh_template_totals
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_BATCH_SIZE = 1_000
+CATALOG_FIELDS = ("source_id", *IMPORT_FIELDS)
+_READ_CHUNK = 64 * 1024
+
+_MACROS = REQUIRED_IMPORT_FIELDS[1:]
+_UPDATED = ("name", *_MACROS, "serving_size_g", "updated_at")
+
+
+@dataclass
+class CatalogLoadResult:
+    written: int = 0
+    # `(line, error)` for rows that were skipped.
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+def _decimal(row: dict, name: str, *, required: bool) -> Decimal | None:
+    value = row.get(name)
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"{name}: required")
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"{name}: not a number") from None
+    if not number.is_finite() or number < 0:
+        raise ValueError(f"{name}: must be a non-negative number")
+    return number
+
+
+def catalog_row(row: dict, *, source: str, now: datetime) -> dict:
+    """A `catalog_ingredients` row from an import row; raises `ValueError` when it cannot be one."""
+    name = str(row.get("name") or "").strip()
+    if not name:
+        raise ValueError("name: required")
+    source_id = str(row.get("source_id") or "").strip()
+    if not source_id:
+        raise ValueError("source_id: required")
+    return {
+        "id": uuid.uuid4(),
+        "source": source,
+        "source_id": source_id,
+        "name": name,
+        **{column: _decimal(row, column, required=True) for column in _MACROS},
+        "serving_size_g": _decimal(row, "serving_size_g", required=False),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _upsert(session: Session, rows: list[dict]) -> None:
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(CatalogIngredient.__table__)
+    # Existing items keep their id and created_at.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "source_id"],
+        set_={column: stmt.excluded[column] for column in _UPDATED},
+    )
+    session.execute(stmt, rows)
+
+
+def upsert_catalog_ingredients(
+    session: Session,
+    rows: Iterable[dict],
+    *,
+    batch_size: int = CATALOG_BATCH_SIZE,
+) -> int:
+    """
+    Insert or update catalogue rows (as built by `catalog_row`) in batches of
+    `batch_size`. Later duplicates of a `(source, source_id)` win. Does not commit.
+    """
+    written = 0
+    batch: dict[tuple[str, str], dict] = {}
+    for row in rows:
+        batch[(row["source"], row["source_id"])] = row
+        if len(batch) >= batch_size:
+            _upsert(session, list(batch.values()))
+            written += len(batch)
+            batch = {}
+    if batch:
+        _upsert(session, list(batch.values()))
+        written += len(batch)
+    return written
+
+
+async def _read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(_READ_CHUNK):
+            yield chunk
+
+
+def _read_rows(path: Path, fmt: str, *, source: str, errors: list[tuple[int, str]]) -> list[dict]:
+    # A catalogue export is a few thousand rows; reading it whole keeps this simple.
+    async def collect() -> list[dict]:
+        now = datetime.now(timezone.utc)
+        rows = []
+        async for line, row in iter_rows(_read_chunks(path), fmt, fields=CATALOG_FIELDS):
+            if isinstance(row, str):
+                errors.append((line, row))
+                continue
+            try:
+                rows.append(catalog_row(row, source=source, now=now))
+            except ValueError as exc:
+                errors.append((line, str(exc)))
+        return rows
+
+    return asyncio.run(collect())
+
+
+def load_catalog_file(
+    session: Session, path: Path, *, source: str, batch_size: int = CATALOG_BATCH_SIZE
+) -> CatalogLoadResult:
+    """
+    Upsert every valid row of a CSV / NDJSON file (by extension), refresh the
+    totals of the dish templates using the source's items, and commit.
+    """
+    fmt = "csv" if path.suffix.lower() == ".csv" else "ndjson"
+    result = CatalogLoadResult()
+    rows = _read_rows(path, fmt, source=source, errors=result.errors)
+    result.written = upsert_catalog_ingredients(session, rows, batch_size=batch_size)
+    refresh_template_totals(
+        session,
+        select(DishTemplateItem.dish_template_id)
+        .join(CatalogIngredient, CatalogIngredient.id == DishTemplateItem.catalog_ingredient_id)
+        .where(CatalogIngredient.source == source),
+    )
+    session.commit()
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load a reference food database into the shared ingredient catalogue.")
+    parser.add_argument("source", help="source name, e.g. bedca")
+    parser.add_argument("path", type=Path, help="CSV or NDJSON file in the ingredient import format, plus source_id")
+    parser.add_argument("--batch-size", type=int, default=CATALOG_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    session = get_session()
+    try:
+        result = load_catalog_file(session, args.path, source=args.source, batch_size=args.batch_size)
+    except ImportFormatError as exc:
+        logger.error("Cannot read %s: %s", args.path, exc)
+        return 1
+    finally:
+        session.close()
+
+    for line, error in result.errors[:20]:
+        logger.warning("Line %s skipped: %s", line, error)
+    logger.info("Catalogue %s: %s items written, %s rows skipped", args.source, result.written, len(result.errors))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
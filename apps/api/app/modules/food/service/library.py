@@ -0,0 +1,206 @@
+"""
+A tenant's ingredient library: its own rows merged with the shared catalogue.
+
+Library ids are stable across customization. A tenant-owned ingredient is
+listed under its own id; a catalogue item is listed under the catalogue id,
+whether the tenant uses it as is or has a customized copy (an `Ingredient`
+with `catalog_ingredient_id` set, which then replaces the catalogue values).
+Dish template items store whichever of the two ids they were given, so
+customizing an ingredient changes the templates that use it; every write that
+changes an item's macros calls `refresh_template_totals` for those templates.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Collection
+
+from sqlalchemy import (
+    Select,
+    Subquery,
+    and_,
+    cast,
+    exists,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import Bundle, Session, aliased
+
+from app.modules.food.domain.models import CatalogIngredient, DishTemplate, DishTemplateItem, Ingredient
+
+
+_MACROS = ("kcal_per_100g", "protein_g_per_100g", "carbs_g_per_100g", "fat_g_per_100g")
+
+
+def library_branches(tenant_id: uuid.UUID, ids: Collection[uuid.UUID] | None = None) -> list[Select]:
+    """
+    Every ingredient `tenant_id` can see, as the two selects of a `UNION ALL`:
+    the tenant's rows, then the catalogue items it has not customized.
+
+    Columns match the `Ingredient` attributes the API renders; `tenant_id` is
+    NULL for catalogue rows. Page them with `search_union_page`, which keeps
+    each branch on its own `(…, name, id)` index.
+    """
+    own = select(
+        func.coalesce(Ingredient.catalog_ingredient_id, Ingredient.id).label("id"),
+        Ingredient.tenant_id,
+        Ingredient.catalog_ingredient_id,
+        Ingredient.name,
+        *(getattr(Ingredient, column) for column in _MACROS),
+        Ingredient.serving_size_g,
+        Ingredient.created_at,
+        Ingredient.updated_at,
+    ).where(Ingredient.tenant_id == tenant_id)
+
+    shared = select(
+        CatalogIngredient.id,
+        cast(null(), Ingredient.tenant_id.type).label("tenant_id"),
+        CatalogIngredient.id.label("catalog_ingredient_id"),
+        CatalogIngredient.name,
+        *(getattr(CatalogIngredient, column) for column in _MACROS),
+        CatalogIngredient.serving_size_g,
+        CatalogIngredient.created_at,
+        CatalogIngredient.updated_at,
+    ).where(
+        ~exists().where(
+            Ingredient.tenant_id == tenant_id,
+            Ingredient.catalog_ingredient_id == CatalogIngredient.id,
+        )
+    )
+
+    if ids is not None:
+        ids = list(ids)
+        own = own.where(or_(Ingredient.id.in_(ids), Ingredient.catalog_ingredient_id.in_(ids)))
+        shared = shared.where(CatalogIngredient.id.in_(ids))
+
+    return [own, shared]
+
+
+def library_ingredients(tenant_id: uuid.UUID, ids: Collection[uuid.UUID]) -> Subquery:
+    """The library rows for `ids`, as one subquery; for lookups, not listings."""
+    return union_all(*library_branches(tenant_id, ids)).subquery("library")
+
+
+def library_select(library: Subquery) -> Select:
+    """`select()` yielding one attribute-style row per ingredient (as `row[0]`)."""
+    return select(Bundle("ingredient", *library.c))
+
+
+def resolve_library_ids(
+    session: Session, tenant_id: uuid.UUID, ids: Collection[uuid.UUID]
+) -> dict[uuid.UUID, str]:
+    """Map each id the tenant may reference to `"ingredient"` or `"catalog"`; unknown ids are left out."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    rows = session.execute(
+        union_all(
+            select(Ingredient.id, literal("ingredient").label("kind")).where(
+                Ingredient.tenant_id == tenant_id,
+                Ingredient.catalog_ingredient_id.is_(None),
+                Ingredient.id.in_(ids),
+            ),
+            select(CatalogIngredient.id, literal("catalog").label("kind")).where(CatalogIngredient.id.in_(ids)),
+        )
+    ).all()
+    return {row[0]: row[1] for row in rows}
+
+
+_OWN = aliased(Ingredient, name="own_ingredient")
+_OVERLAY = aliased(Ingredient, name="overlay_ingredient")
+_SHARED = aliased(CatalogIngredient, name="catalog_ingredient")
+
+# Stored template total -> per-100 g ingredient column.
+_TOTALS = {
+    "total_kcal": "kcal_per_100g",
+    "total_protein_g": "protein_g_per_100g",
+    "total_carbs_g": "carbs_g_per_100g",
+    "total_fat_g": "fat_g_per_100g",
+}
+
+
+def _join_item_ingredients(stmt: Select) -> Select:
+    # Every join is on a primary key or a unique index.
+    return (
+        stmt.outerjoin(
+            _OWN,
+            and_(_OWN.id == DishTemplateItem.ingredient_id, _OWN.tenant_id == DishTemplateItem.tenant_id),
+        )
+        .outerjoin(
+            _OVERLAY,
+            and_(
+                _OVERLAY.tenant_id == DishTemplateItem.tenant_id,
+                _OVERLAY.catalog_ingredient_id == DishTemplateItem.catalog_ingredient_id,
+            ),
+        )
+        .outerjoin(_SHARED, _SHARED.id == DishTemplateItem.catalog_ingredient_id)
+    )
+
+
+def _item_ingredient(column: str):
+    """An item's ingredient `column`: the tenant's own row, else its customized copy, else the catalogue item."""
+    return func.coalesce(getattr(_OWN, column), getattr(_OVERLAY, column), getattr(_SHARED, column))
+
+
+def template_item_rows(tenant_id: uuid.UUID) -> Select:
+    """
+    `(DishTemplateItem, ingredient)` rows with each item's ingredient resolved in SQL.
+
+    `ingredient` carries the library id plus name and macros of the item's
+    ingredient (see `_item_ingredient`).
+    """
+    ingredient = Bundle(
+        "ingredient",
+        func.coalesce(DishTemplateItem.ingredient_id, DishTemplateItem.catalog_ingredient_id).label("id"),
+        _item_ingredient("name").label("name"),
+        *(_item_ingredient(column).label(column) for column in _MACROS),
+    )
+    stmt = select(DishTemplateItem, ingredient).select_from(DishTemplateItem)
+    return _join_item_ingredients(stmt).where(DishTemplateItem.tenant_id == tenant_id)
+
+
+def templates_using(tenant_id: uuid.UUID, ingredient_id: uuid.UUID) -> Select:
+    """Ids of the tenant's dish templates with an item for library id `ingredient_id`."""
+    return select(DishTemplateItem.dish_template_id).where(
+        DishTemplateItem.tenant_id == tenant_id,
+        or_(
+            DishTemplateItem.ingredient_id == ingredient_id,
+            DishTemplateItem.catalog_ingredient_id == ingredient_id,
+        ),
+    )
+
+
+def refresh_template_totals(session: Session, template_ids: Select | Collection[uuid.UUID]) -> None:
+    """
+    Recompute the stored totals of the dish templates in `template_ids` (ids,
+    or a select of ids) in one `UPDATE … FROM`. Does not commit; flush pending
+    item and ingredient changes first.
+
+    Rounds like `compute_template_totals`: each item to the cent, then the sum.
+    """
+    sums = _join_item_ingredients(
+        select(
+            DishTemplateItem.dish_template_id.label("id"),
+            *(
+                func.round(
+                    func.sum(
+                        # A literal, not a bound float, keeps this NUMERIC math on Postgres.
+                        func.round(DishTemplateItem.quantity_g * _item_ingredient(column) * literal_column("0.01"), 2)
+                    ),
+                    2,
+                ).label(total)
+                for total, column in _TOTALS.items()
+            ),
+        ).select_from(DishTemplateItem)
+    )
+    sums = sums.where(DishTemplateItem.dish_template_id.in_(template_ids)).group_by(DishTemplateItem.dish_template_id)
+    sums = sums.subquery("sums")
+
+    table = DishTemplate.__table__
+    session.execute(update(table).where(table.c.id == sums.c.id).values({total: sums.c[total] for total in _TOTALS}))
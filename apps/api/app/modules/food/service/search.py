@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Float, Select, and_, case, cast, func, literal, or_, select, tuple_, union_all
+from sqlalchemy.orm import Bundle, Session
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_PREFIX_RANK = 2
+_CONTAINS_RANK = 1
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Cursor:
+    score: float | None
+    name: str
+    id: uuid.UUID
+
+
+@dataclass(frozen=True)
+class Page:
+    rows: list[Any]
+    next_cursor: str | None
+
+
+def encode_cursor(cursor: Cursor, query: str | None) -> str:
+    raw = json.dumps(
+        {"s": cursor.score, "n": cursor.name, "i": str(cursor.id), "q": query or ""},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, query: str | None) -> Cursor:
+    """Cursors are only valid for the query they were issued for."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if data["q"] != (query or ""):
+            raise InvalidCursor("cursor issued for a different query")
+        score = data["s"]
+        return Cursor(
+            score=None if score is None else float(score),
+            name=str(data["n"]),
+            id=uuid.UUID(data["i"]),
+        )
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def normalize_query(query: str | None) -> str | None:
+    if query is None:
+        return None
+    query = " ".join(query.split())
+    return query or None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _supports_trigram(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def _score(session: Session, name_col, query: str):
+    """
+    Relevance score, higher is better.
+
+    Prefix matches rank above infix matches, which rank above fuzzy-only
+    matches. On PostgreSQL trigram word similarity (0..1) breaks ties inside a
+    bucket; buckets are spaced by 2 so it never reorders them.
+    """
+    if _supports_trigram(session):
+        # Same expression as the trigram indexes from migration 0004_food_search.
+        key = func.food_search_key(name_col)
+        term = func.food_search_key(literal(query))
+        escaped = func.food_search_key(literal(_escape_like(query)))
+        prefix = key.like(escaped.op("||")("%"), escape="\\")
+        contains = key.like(literal("%").op("||")(escaped).op("||")("%"), escape="\\")
+        fuzzy = term.op("<%")(key)
+        similarity = cast(func.word_similarity(term, key), Float)
+    else:
+        key = func.lower(name_col)
+        escaped = _escape_like(query.lower())
+        prefix = key.like(f"{escaped}%", escape="\\")
+        contains = key.like(f"%{escaped}%", escape="\\")
+        fuzzy = None
+        similarity = literal(0.0, Float)
+
+    bucket = case((prefix, _PREFIX_RANK), (contains, _CONTAINS_RANK), else_=0)
+    score = bucket * 2 + similarity
+    match = contains if fuzzy is None else or_(contains, fuzzy)
+    return score, match
+
+
+def search_filter(session: Session, name_col, query: str | None):
+    """The `WHERE` clause of a search for `query` without its ranking, or None for no query."""
+    query = normalize_query(query)
+    if query is None:
+        return None
+    return _score(session, name_col, query)[1]
+
+
+def _after_key(cursor: Cursor, name_col, id_col):
+    return tuple_(literal(cursor.name, name_col.type), literal(cursor.id, id_col.type))
+
+
+def _decode_page_cursor(after: str | None, query: str | None) -> Cursor | None:
+    cursor = decode_cursor(after, query) if after else None
+    if cursor is not None and (cursor.score is None) != (query is None):
+        raise InvalidCursor("cursor does not match the listing")
+    return cursor
+
+
+def _ordered(session: Session, stmt: Select, name_col, id_col, query: str | None, cursor: Cursor | None):
+    """`stmt` filtered to the rows after `cursor` and put in listing order; returns `(stmt, score)`."""
+    if query is None:
+        if cursor is not None:
+            stmt = stmt.where(tuple_(name_col, id_col) > _after_key(cursor, name_col, id_col))
+        return stmt.order_by(name_col.asc(), id_col.asc()), None
+
+    score, match = _score(session, name_col, query)
+    stmt = stmt.add_columns(score.label("search_score")).where(match)
+    if cursor is not None:
+        stmt = stmt.where(
+            or_(
+                score < cursor.score,
+                and_(
+                    score == cursor.score,
+                    tuple_(name_col, id_col) > _after_key(cursor, name_col, id_col),
+                ),
+            )
+        )
+    return stmt.order_by(score.desc(), name_col.asc(), id_col.asc()), score
+
+
+def search_page(
+    session: Session,
+    stmt: Select,
+    *,
+    name_col,
+    id_col,
+    query: str | None,
+    limit: int,
+    after: str | None = None,
+    offset: int = 0,
+) -> Page:
+    """
+    One page of a tenant-scoped library listing.
+
+    Without a query rows come in `(name, id)` order; with one they come by
+    relevance, then `(name, id)`. `after` is the opaque cursor returned with the
+    previous page and continues from that row with a keyset predicate, so each
+    page costs the same no matter how deep it is. `offset` is kept for older
+    clients and is ignored when a cursor is given.
+    """
+    query = normalize_query(query)
+    cursor = _decode_page_cursor(after, query)
+    stmt, score = _ordered(session, stmt, name_col, id_col, query, cursor)
+
+    if cursor is None and offset:
+        stmt = stmt.offset(offset)
+
+    result = session.execute(stmt.limit(limit + 1)).all()
+    has_more = len(result) > limit
+    result = result[:limit]
+    rows = [r[0] for r in result]
+
+    next_cursor = None
+    if has_more and result:
+        last = result[-1]
+        last_row = last[0]
+        next_cursor = encode_cursor(
+            Cursor(
+                score=None if score is None else float(last.search_score),
+                name=getattr(last_row, name_col.key),
+                id=getattr(last_row, id_col.key),
+            ),
+            query,
+        )
+    return Page(rows=rows, next_cursor=next_cursor)
+
+
+def search_union_page(
+    session: Session,
+    branches: Sequence[Select],
+    *,
+    query: str | None,
+    limit: int,
+    after: str | None = None,
+    offset: int = 0,
+    name: str = "library",
+) -> Page:
+    """
+    `search_page` over the `UNION ALL` of `branches`, selects with the same
+    columns, including `name` and `id`.
+
+    Each branch is cut to one page on its own before the union, so it walks
+    its own `(…, name, id)` index with its own keyset predicate; the planner
+    will not push an outer `ORDER BY … LIMIT` through a branch that has an
+    anti-join. Rows are `Bundle`s named `name`, with one attribute per column.
+    """
+    query = normalize_query(query)
+    cursor = _decode_page_cursor(after, query)
+    window = limit + 1 + (offset if cursor is None else 0)
+
+    paged = []
+    for branch in branches:
+        columns = branch.selected_columns
+        branch, _ = _ordered(session, branch, columns.name, columns.id, query, cursor)
+        branch = branch.with_only_columns(*columns).limit(window).subquery()
+        paged.append(select(*branch.c))
+    merged = union_all(*paged).subquery(name)
+
+    return search_page(
+        session,
+        select(Bundle(name, *merged.c)),
+        name_col=merged.c.name,
+        id_col=merged.c.id,
+        query=query,
+        limit=limit,
+        after=after,
+        offset=offset,
+    )
+
+
+def sorted_page(
+    session: Session,
+    stmt: Select,
+    *,
+    key_col,
+    id_col,
+    descending: bool = False,
+    scope: str,
+    limit: int,
+    after: str | None = None,
+    offset: int = 0,
+) -> Page:
+    """
+    One page ordered by `(key_col, id_col)`, both descending when `descending`.
+
+    Same cursor contract as `search_page`. The cursor carries the key as text
+    in `name`, and is only valid for the `scope` (sort and query) it was
+    issued for.
+    """
+    cursor = decode_cursor(after, scope) if after else None
+    if cursor is not None and cursor.score is not None:
+        raise InvalidCursor("cursor does not match the listing")
+
+    key = tuple_(key_col, id_col)
+    if cursor is not None:
+        try:
+            value = key_col.type.python_type(cursor.name)
+        except (ArithmeticError, ValueError) as exc:
+            raise InvalidCursor(str(exc)) from exc
+        bound = tuple_(literal(value, key_col.type), literal(cursor.id, id_col.type))
+        stmt = stmt.where(key < bound if descending else key > bound)
+    if descending:
+        stmt = stmt.order_by(key_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(key_col.asc(), id_col.asc())
+
+    if cursor is None and offset:
+        stmt = stmt.offset(offset)
+
+    result = session.execute(stmt.limit(limit + 1)).all()
+    has_more = len(result) > limit
+    rows = [r[0] for r in result[:limit]]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            Cursor(score=None, name=str(getattr(last, key_col.key)), id=getattr(last, id_col.key)),
+            scope,
+        )
+    return Page(rows=rows, next_cursor=next_cursor)
@@ -4,10 +4,11 @@ import uuid
 from datetime import date, datetime, timezone
 from decimal import Decimal
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from sqlalchemy import select
 
 from app.core.dependencies.auth import CurrentUser, DbSession, WriteAccess
+from app.core.web.responses import json_response
 from app.modules.nutrition.api.schemas import NutritionProfileIn, NutritionProfileOut, NutritionTargetsOut
 from app.modules.nutrition.domain.models import NutritionProfile
 from app.modules.nutrition.service.calculators import NutritionInputs, age_years_from_birth_date, calculate_targets
@@ -16,28 +17,28 @@ from app.modules.nutrition.service.calculators import NutritionInputs, age_years
 router = APIRouter(prefix="/api/nutrition", tags=["nutrition"])
 
 
-def _profile_out(row: NutritionProfile) -> NutritionProfileOut:
-    return NutritionProfileOut(
-        id=str(row.id),
-        tenant_id=str(row.tenant_id),
-        user_id=str(row.user_id),
-        sex=row.sex,
-        birth_date=row.birth_date,
-        height_cm=row.height_cm,
-        weight_kg=float(row.weight_kg),
-        activity_level=row.activity_level,
-        goal=row.goal,
-        override_kcal=row.override_kcal,
-        override_protein_g=row.override_protein_g,
-        override_carbs_g=row.override_carbs_g,
-        override_fat_g=row.override_fat_g,
-        created_at=row.created_at,
-        updated_at=row.updated_at,
-    )
+def _profile_out(row: NutritionProfile) -> dict:
+    return {
+        "id": row.id,
+        "tenant_id": row.tenant_id,
+        "user_id": row.user_id,
+        "sex": row.sex,
+        "birth_date": row.birth_date,
+        "height_cm": row.height_cm,
+        "weight_kg": row.weight_kg,
+        "activity_level": row.activity_level,
+        "goal": row.goal,
+        "override_kcal": row.override_kcal,
+        "override_protein_g": row.override_protein_g,
+        "override_carbs_g": row.override_carbs_g,
+        "override_fat_g": row.override_fat_g,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
 
 
 @router.get("/profile/me", response_model=NutritionProfileOut)
-def get_profile_me(user: CurrentUser, session: DbSession) -> NutritionProfileOut:
+def get_profile_me(user: CurrentUser, session: DbSession) -> Response:
     row = session.execute(
         select(NutritionProfile).where(
             NutritionProfile.tenant_id == user.tenant_id,
@@ -46,11 +47,11 @@ def get_profile_me(user: CurrentUser, session: DbSession) -> NutritionProfileOut
     ).scalar_one_or_none()
     if row is None:
         raise HTTPException(status_code=404, detail="nutrition_profile_not_found")
-    return _profile_out(row)
+    return json_response(_profile_out(row))
 
 
 @router.put("/profile/me", response_model=NutritionProfileOut)
-def put_profile_me(payload: NutritionProfileIn, user: CurrentUser, session: DbSession, _: WriteAccess) -> NutritionProfileOut:
+def put_profile_me(payload: NutritionProfileIn, user: CurrentUser, session: DbSession, _: WriteAccess) -> Response:
     row = session.execute(
         select(NutritionProfile).where(
             NutritionProfile.tenant_id == user.tenant_id,
@@ -92,11 +93,11 @@ def put_profile_me(payload: NutritionProfileIn, user: CurrentUser, session: DbSe
         row.updated_at = now
 
     session.commit()
-    return _profile_out(row)
+    return json_response(_profile_out(row))
 
 
 @router.get("/targets/me", response_model=NutritionTargetsOut)
-def get_targets_me(user: CurrentUser, session: DbSession) -> NutritionTargetsOut:
+def get_targets_me(user: CurrentUser, session: DbSession) -> Response:
     row = session.execute(
         select(NutritionProfile).where(
             NutritionProfile.tenant_id == user.tenant_id,
@@ -122,18 +123,20 @@ def get_targets_me(user: CurrentUser, session: DbSession) -> NutritionTargetsOut
         )
     )
 
-    return NutritionTargetsOut(
-        daily={
-            "kcal": targets.daily_kcal,
-            "protein_g": targets.daily_protein_g,
-            "carbs_g": targets.daily_carbs_g,
-            "fat_g": targets.daily_fat_g,
-        },
-        weekly={
-            "kcal": targets.weekly_kcal,
-            "protein_g": targets.weekly_protein_g,
-            "carbs_g": targets.weekly_carbs_g,
-            "fat_g": targets.weekly_fat_g,
-        },
-        warnings=targets.warnings,
+    return json_response(
+        {
+            "daily": {
+                "kcal": targets.daily_kcal,
+                "protein_g": targets.daily_protein_g,
+                "carbs_g": targets.daily_carbs_g,
+                "fat_g": targets.daily_fat_g,
+            },
+            "weekly": {
+                "kcal": targets.weekly_kcal,
+                "protein_g": targets.weekly_protein_g,
+                "carbs_g": targets.weekly_carbs_g,
+                "fat_g": targets.weekly_fat_g,
+            },
+            "warnings": targets.warnings,
+        }
     )
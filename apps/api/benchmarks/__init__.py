@@ -0,0 +1,11 @@
+"""
+Performance tooling for the API.
+
+- `datagen`: deterministic synthetic tenants (food library, profiles and
+  v1-beta weekly plans) for benchmarks and load tests.
+- `runner`: micro-benchmarks of the macro and target calculators plus
+  in-process end-to-end requests, written to JSON and compared with a baseline.
+- `load`: closed- and open-loop HTTP load tests of the coach and client flows,
+  swept over uvicorn worker counts and concurrency.
+- `login_burst`: login throughput against a running API.
+"""
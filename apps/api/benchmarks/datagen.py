@@ -0,0 +1,451 @@
+"""
+Deterministic synthetic tenant data.
+
+The same `DatasetSpec` (including `seed`) always yields the same rows, ids
+included, so benchmark runs and load tests compare like with like. Each
+tenant gets a worker, `clients` client users with nutrition profiles, a food
+library (ingredients, dish templates with items) and `weeks` of v1-beta
+weekly plans per client.
+
+    cd apps/api
+    python -m benchmarks.datagen --database-url sqlite:////tmp/bench.db --create-schema
+    python -m benchmarks.datagen --target v1 --database-url postgresql://.../nutriorxata_bench
+
+`--target api` loads the modern schema (run the migrations first, or pass
+`--create-schema` on a scratch database). `--target v1` loads the same tenants
+into a v1-beta database created from `v1-beta/database/init.sql`: the worker
+becomes an admin, dish templates become platos and the plans fill
+`planificacion_semanal` / `planificacion_items`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import Engine, MetaData, create_engine, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.db.base import Base
+from app.modules.auth.domain.enums import SubscriptionStatus, TenantStatus, UserRole
+from app.modules.auth.domain.models import Tenant, User
+from app.modules.auth.security import hash_password
+from app.modules.food.domain.models import DishTemplate, DishTemplateItem, Ingredient
+from app.modules.food.service.library import refresh_template_totals
+from app.modules.nutrition.domain.models import NutritionProfile
+
+
+PASSWORD = "Bench-pass-123"
+CREATED_AT = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+FIRST_WEEK = date(2026, 1, 5)  # a Monday
+
+DAYS = ("lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo")
+MEALS = ("desayuno", "almuerzo", "comida", "merienda", "cena")
+REPERTOIRE = 15
+
+FOODS = (
+    "pollo", "arroz", "tomate", "lenteja", "atún", "avena", "yogur", "pan", "huevo", "manzana",
+    "garbanzo", "salmón", "patata", "espinaca", "queso", "pasta", "pavo", "plátano", "merluza", "nuez",
+)
+_STYLES = ("crudo", "cocido", "integral", "light", "en conserva", "a la plancha", "al horno", "congelado")
+_DISHES = ("Ensalada", "Guiso", "Bowl", "Crema", "Salteado", "Tortilla", "Wrap", "Potaje")
+_ACTIVITY = ("sedentary", "light", "moderate", "very_active", "athlete")
+_GOALS = ("maintain", "cut", "bulk")
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    tenants: int = 1
+    ingredients: int = 5_000
+    dish_templates: int = 500
+    items_per_template: int = 6
+    clients: int = 30
+    weeks: int = 2
+    seed: int = 20261018
+
+
+@dataclass
+class TenantData:
+    index: int
+    tenant: dict
+    worker: dict
+    clients: list[dict]
+    profiles: list[dict]
+    ingredients: list[dict]
+    templates: list[dict]
+    items: list[dict]
+    # (client index, week start, day, meal, template indexes)
+    plans: list[tuple[int, date, str, str, list[int]]] = field(default_factory=list)
+
+    @property
+    def worker_email(self) -> str:
+        return self.worker["email"]
+
+
+def worker_email(index: int) -> str:
+    return f"bench-worker-{index:03d}@example.com"
+
+
+def client_email(index: int, client: int) -> str:
+    return f"bench-client-{index:03d}-{client:03d}@example.com"
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _money(rng: random.Random, low: float, high: float) -> Decimal:
+    return Decimal(f"{rng.uniform(low, high):.2f}")
+
+
+def _tenant(spec: DatasetSpec, index: int, password_hash: str) -> TenantData:
+    # One stream per tenant: tenant N does not change when the tenant count does.
+    rng = random.Random(f"{spec.seed}:{index}")
+    tenant_id = _uuid(rng)
+
+    tenant = {
+        "id": tenant_id,
+        "status": TenantStatus.active.value,
+        "subscription_status": SubscriptionStatus.active.value,
+        "trial_starts_at": CREATED_AT,
+        "created_at": CREATED_AT,
+    }
+
+    def user(role: str, email: str) -> dict:
+        return {
+            "id": _uuid(rng),
+            "tenant_id": tenant_id,
+            "role": role,
+            "email": email,
+            "email_verified_at": CREATED_AT,
+            "password_hash": password_hash,
+            "is_active": True,
+            "created_at": CREATED_AT,
+        }
+
+    worker = user(UserRole.worker.value, worker_email(index))
+    clients = [user(UserRole.client.value, client_email(index, c)) for c in range(spec.clients)]
+
+    profiles = [
+        {
+            "id": _uuid(rng),
+            "tenant_id": tenant_id,
+            "user_id": person["id"],
+            "sex": rng.choice(("male", "female")),
+            "birth_date": date(1960 + rng.randrange(45), 1 + rng.randrange(12), 1 + rng.randrange(28)),
+            "height_cm": rng.randint(150, 200),
+            "weight_kg": _money(rng, 48, 120),
+            "activity_level": rng.choice(_ACTIVITY),
+            "goal": rng.choice(_GOALS),
+            "override_kcal": rng.randint(1400, 3200) if rng.random() < 0.1 else None,
+            "created_at": CREATED_AT,
+        }
+        for person in [worker, *clients]
+    ]
+
+    ingredients = []
+    for i in range(spec.ingredients):
+        protein = rng.uniform(0, 35)
+        carbs = rng.uniform(0, 80)
+        fat = rng.uniform(0, 40)
+        ingredients.append(
+            {
+                "id": _uuid(rng),
+                "tenant_id": tenant_id,
+                "name": f"{rng.choice(FOODS)} {rng.choice(_STYLES)} {i:05d}",
+                "kcal_per_100g": Decimal(f"{protein * 4 + carbs * 4 + fat * 9:.2f}"),
+                "protein_g_per_100g": Decimal(f"{protein:.2f}"),
+                "carbs_g_per_100g": Decimal(f"{carbs:.2f}"),
+                "fat_g_per_100g": Decimal(f"{fat:.2f}"),
+                "serving_size_g": Decimal(rng.choice((30, 50, 100, 125, 150))) if rng.random() < 0.4 else None,
+                "created_at": CREATED_AT,
+            }
+        )
+
+    templates = []
+    items = []
+    # Recipes draw from a popular subset, like a real library where most ingredients are rarely used.
+    popular = max(1, min(len(ingredients), spec.dish_templates * 2))
+    for t in range(spec.dish_templates):
+        template_id = _uuid(rng)
+        templates.append(
+            {
+                "id": template_id,
+                "tenant_id": tenant_id,
+                "name": f"{rng.choice(_DISHES)} {t:04d}",
+                "created_at": CREATED_AT,
+            }
+        )
+        for k, ingredient in enumerate(rng.sample(ingredients[:popular], min(popular, spec.items_per_template))):
+            items.append(
+                {
+                    "id": _uuid(rng),
+                    "tenant_id": tenant_id,
+                    "dish_template_id": template_id,
+                    "ingredient_id": ingredient["id"],
+                    "quantity_g": Decimal(rng.choice((20, 40, 60, 80, 100, 150, 200))),
+                    "created_at": CREATED_AT + timedelta(microseconds=k),
+                }
+            )
+
+    plans = []
+    if templates:
+        for c in range(spec.clients):
+            # Each client rotates through a small repertoire of dishes.
+            repertoire = rng.sample(range(len(templates)), min(len(templates), REPERTOIRE))
+            for w in range(spec.weeks):
+                week = FIRST_WEEK + timedelta(days=7 * w)
+                for day in DAYS:
+                    for meal in MEALS:
+                        picks = rng.sample(repertoire, min(len(repertoire), rng.randint(1, 2)))
+                        plans.append((c, week, day, meal, picks))
+
+    return TenantData(
+        index=index,
+        tenant=tenant,
+        worker=worker,
+        clients=clients,
+        profiles=profiles,
+        ingredients=ingredients,
+        templates=templates,
+        items=items,
+        plans=plans,
+    )
+
+
+def generate(spec: DatasetSpec, *, password_hash: str | None = None) -> Iterator[TenantData]:
+    """Yield the tenants one at a time (a 5k-ingredient tenant is a few MB of rows)."""
+    password_hash = password_hash or hash_password(PASSWORD)
+    for index in range(spec.tenants):
+        yield _tenant(spec, index, password_hash)
+
+
+def _insert(session: Session, model, rows: list[dict], *, chunk: int = 1_000) -> None:
+    for start in range(0, len(rows), chunk):
+        session.execute(insert(model), rows[start : start + chunk])
+
+
+def load_api(session: Session, spec: DatasetSpec) -> list[TenantData]:
+    """Insert the dataset into the API schema, committing per tenant."""
+    loaded = []
+    for data in generate(spec):
+        _insert(session, Tenant, [data.tenant])
+        _insert(session, User, [data.worker, *data.clients])
+        _insert(session, NutritionProfile, data.profiles)
+        _insert(session, Ingredient, data.ingredients)
+        _insert(session, DishTemplate, data.templates)
+        _insert(session, DishTemplateItem, data.items)
+        refresh_template_totals(session, select(DishTemplate.id).where(DishTemplate.tenant_id == data.tenant["id"]))
+        session.commit()
+        loaded.append(data)
+    return loaded
+
+
+def _v1_plato_totals(conn, t, plato_ids: list[int]) -> None:
+    """
+    Per-ingredient and per-dish totals, as v1-beta's `recalcular_platos` computes them.
+
+    init.sql has no triggers for these any more; the app fills them in explicitly.
+    """
+    lines, ingredients, platos = t["plato_ingredientes"], t["ingredientes"], t["platos"]
+
+    def share(column):
+        return func.round(column * lines.c.cantidad_gramos / 100, 2)
+
+    conn.execute(
+        update(lines)
+        .where(lines.c.ingrediente_id == ingredients.c.id, lines.c.plato_id.in_(plato_ids))
+        .values(
+            calorias_aportadas=share(ingredients.c.calorias_por_100g),
+            proteinas_aportadas=share(ingredients.c.proteinas_por_100g),
+            carbohidratos_aportados=share(ingredients.c.carbohidratos_por_100g),
+            grasas_aportadas=share(ingredients.c.grasas_por_100g),
+        )
+    )
+    sums = (
+        select(
+            lines.c.plato_id,
+            func.sum(lines.c.calorias_aportadas).label("calorias"),
+            func.sum(lines.c.proteinas_aportadas).label("proteinas"),
+            func.sum(lines.c.carbohidratos_aportados).label("carbohidratos"),
+            func.sum(lines.c.grasas_aportadas).label("grasas"),
+            func.sum(share(func.coalesce(ingredients.c.fibra_por_100g, 0))).label("fibra"),
+            func.sum(lines.c.cantidad_gramos).label("peso"),
+        )
+        .join(ingredients, ingredients.c.id == lines.c.ingrediente_id)
+        .where(lines.c.plato_id.in_(plato_ids))
+        .group_by(lines.c.plato_id)
+        .subquery()
+    )
+    conn.execute(
+        update(platos)
+        .where(platos.c.id == sums.c.plato_id)
+        .values(
+            calorias_totales=sums.c.calorias,
+            proteinas_totales=sums.c.proteinas,
+            carbohidratos_totales=sums.c.carbohidratos,
+            grasas_totales=sums.c.grasas,
+            fibra_totales=sums.c.fibra,
+            peso_total_gramos=sums.c.peso,
+        )
+    )
+
+
+def load_v1(engine: Engine, spec: DatasetSpec) -> int:
+    """Insert the dataset into a v1-beta database; returns the number of planned slots."""
+    meta = MetaData()
+    meta.reflect(
+        bind=engine,
+        only=[
+            "usuarios",
+            "ingredientes",
+            "platos",
+            "plato_ingredientes",
+            "cliente_platos",
+            "cliente_plato_ingredientes",
+            "planificacion_semanal",
+            "planificacion_items",
+        ],
+    )
+    t = meta.tables
+    slots = 0
+
+    def ids(conn, table, rows: list[dict]) -> list[int]:
+        result = []
+        for start in range(0, len(rows), 1_000):
+            chunk = rows[start : start + 1_000]
+            result.extend(conn.execute(insert(table).values(chunk).returning(table.c.id)).scalars())
+        return result
+
+    with engine.begin() as conn:
+        for data in generate(spec):
+            admin = {
+                "nombre": f"Worker {data.index:03d}",
+                "email": data.worker_email,
+                "password_hash": data.worker["password_hash"],
+                "rol": "admin",
+                "activo": True,
+            }
+            admin_id = ids(conn, t["usuarios"], [admin])[0]
+            profiles = {p["user_id"]: p for p in data.profiles}
+            client_ids = ids(conn, t["usuarios"], [
+                {
+                    "nombre": f"Cliente {data.index:03d}-{c:03d}",
+                    "email": client["email"],
+                    "password_hash": client["password_hash"],
+                    "rol": "cliente",
+                    "activo": True,
+                    "trabajador_id": admin_id,
+                    "altura": profiles[client["id"]]["height_cm"],
+                    "peso": float(profiles[client["id"]]["weight_kg"]),
+                    "sexo": "hombre" if profiles[client["id"]]["sex"] == "male" else "mujer",
+                }
+                for c, client in enumerate(data.clients)
+            ])
+
+            ingrediente_ids = ids(conn, t["ingredientes"], [
+                {
+                    "nombre": row["name"],
+                    "categoria": "Otros",
+                    "calorias_por_100g": row["kcal_per_100g"],
+                    "proteinas_por_100g": row["protein_g_per_100g"],
+                    "carbohidratos_por_100g": row["carbs_g_per_100g"],
+                    "grasas_por_100g": row["fat_g_per_100g"],
+                }
+                for row in data.ingredients
+            ])
+            by_uuid = {row["id"]: new_id for row, new_id in zip(data.ingredients, ingrediente_ids)}
+
+            plato_ids = ids(conn, t["platos"], [
+                {"nombre": row["name"], "momentos_dia": list(MEALS)} for row in data.templates
+            ])
+            template_index = {row["id"]: n for n, row in enumerate(data.templates)}
+            recipes: dict[int, list[tuple[int, Decimal]]] = {n: [] for n in range(len(data.templates))}
+            for item in data.items:
+                recipe = recipes[template_index[item["dish_template_id"]]]
+                recipe.append((by_uuid[item["ingredient_id"]], item["quantity_g"]))
+            ids(conn, t["plato_ingredientes"], [
+                {"plato_id": plato_ids[n], "ingrediente_id": ing_id, "cantidad_gramos": grams}
+                for n, recipe in recipes.items()
+                for ing_id, grams in recipe
+            ])
+            _v1_plato_totals(conn, t, plato_ids)
+
+            # A client copy (cliente_plato) of each dish the client's plans use.
+            used: dict[tuple[int, int], None] = {}
+            for c, _, _, _, picks in data.plans:
+                for n in picks:
+                    used[(c, n)] = None
+            keys = list(used)
+            cliente_plato_ids = ids(conn, t["cliente_platos"], [
+                {"client_id": client_ids[c], "plato_id": plato_ids[n], "momentos_dia": list(MEALS)} for c, n in keys
+            ])
+            copy_of = dict(zip(keys, cliente_plato_ids))
+            ids(conn, t["cliente_plato_ingredientes"], [
+                {"cliente_plato_id": copy_of[(c, n)], "ingrediente_id": ing_id, "cantidad_gramos": grams}
+                for c, n in keys
+                for ing_id, grams in recipes[n]
+            ])
+
+            slot_ids = ids(conn, t["planificacion_semanal"], [
+                {"semana_inicio": week, "dia": day, "momento": meal, "client_id": client_ids[c]}
+                for c, week, day, meal, _ in data.plans
+            ])
+            ids(conn, t["planificacion_items"], [
+                {"planificacion_id": slot_id, "cliente_plato_id": copy_of[(c, n)], "orden": k}
+                for slot_id, (c, _, _, _, picks) in zip(slot_ids, data.plans)
+                for k, n in enumerate(picks)
+            ])
+            slots += len(slot_ids)
+    return slots
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--target", choices=("api", "v1"), default="api")
+    parser.add_argument("--create-schema", action="store_true", help="create the API tables (scratch databases only)")
+    parser.add_argument("--tenants", type=int, default=DatasetSpec.tenants)
+    parser.add_argument("--ingredients", type=int, default=DatasetSpec.ingredients)
+    parser.add_argument("--dish-templates", type=int, default=DatasetSpec.dish_templates)
+    parser.add_argument("--items-per-template", type=int, default=DatasetSpec.items_per_template)
+    parser.add_argument("--clients", type=int, default=DatasetSpec.clients)
+    parser.add_argument("--weeks", type=int, default=DatasetSpec.weeks)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    args = parser.parse_args()
+
+    spec = DatasetSpec(
+        tenants=args.tenants,
+        ingredients=args.ingredients,
+        dish_templates=args.dish_templates,
+        items_per_template=args.items_per_template,
+        clients=args.clients,
+        weeks=args.weeks,
+        seed=args.seed,
+    )
+    engine = create_engine(args.database_url)
+    try:
+        if args.target == "v1":
+            slots = load_v1(engine, spec)
+            print(f"loaded {spec.tenants} tenant(s), {slots} planned slots into v1-beta")
+            return 0
+
+        if args.create_schema:
+            Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            tenants = load_api(session, spec)
+        for data in tenants:
+            print(f"{data.tenant['id']}  {data.worker_email}  password={PASSWORD}")
+        return 0
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
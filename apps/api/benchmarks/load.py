@@ -0,0 +1,402 @@
+"""
+HTTP load test for the coach and client flows.
+
+Runs scenario scripts against a running API and reports throughput, latency
+percentiles and error rate per step. Load the synthetic tenants first
+(`python -m benchmarks.datagen`, same spec flags) so the logins exist.
+
+    cd apps/api
+    python -m benchmarks.load --base-url http://localhost:8010 --concurrency 1 8 32
+    python -m benchmarks.load --mode open --rate 2 5 10 --duration 60
+
+Scenarios, one login per iteration:
+
+- coach: login, browse the food library (list + search), open and save a dish
+  template; on `--target v1` also bulk-apply that dish to a client's week.
+- client: login, then the client's weekly summary (`/resumen` on v1-beta;
+  nutrition targets on the API, which has no weekly plans yet).
+
+`--mode closed` keeps `--concurrency` virtual users busy back to back, so it
+finds the saturation throughput. `--mode open` starts iterations at `--rate`
+per second (Poisson arrivals) whatever the server does, so queueing shows up
+as latency instead of being hidden; scenario latency is measured from the
+scheduled start.
+
+`--spawn-dir` starts `uvicorn app.main:app` from that directory once per
+`--workers` value (the process inherits DATABASE_URL and the rest of the
+environment), which is how to size UVICORN_WORKERS for infra/compose/prod.yml:
+
+    python -m benchmarks.load --spawn-dir . --workers 1 2 4 --concurrency 4 16 64
+    python -m benchmarks.load --target v1 --spawn-dir ../../v1-beta/backend/src --server-python <v1 venv python>
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+from benchmarks.datagen import DAYS, FIRST_WEEK, FOODS, MEALS, PASSWORD, DatasetSpec, client_email, worker_email
+from benchmarks.stats import summarize
+
+
+@dataclass
+class StepStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def report(self, elapsed: float) -> dict:
+        total = len(self.latencies) + self.errors
+        return {
+            **summarize(self.latencies),
+            "errors": self.errors,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "per_second": round(len(self.latencies) / elapsed, 2) if elapsed else 0.0,
+            "statuses": self.statuses,
+        }
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.steps: dict[str, StepStats] = {}
+        self.scenarios: dict[str, StepStats] = {}
+
+    async def step(self, client: httpx.AsyncClient, name: str, method: str, path: str, **kwargs) -> httpx.Response:
+        stats = self.steps.setdefault(name, StepStats())
+        started = time.perf_counter()
+        try:
+            res = await client.request(method, path, **kwargs)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.errors += 1
+            raise StepFailed(name) from exc
+        status = str(res.status_code)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if res.status_code >= 400:
+            stats.errors += 1
+            raise StepFailed(name)
+        stats.latencies.append(time.perf_counter() - started)
+        return res
+
+    def finished(self, scenario: str, seconds: float | None) -> None:
+        stats = self.scenarios.setdefault(scenario, StepStats())
+        if seconds is None:
+            stats.errors += 1
+        else:
+            stats.latencies.append(seconds)
+
+
+@dataclass
+class Fixtures:
+    """Ids discovered before the timed run, per tenant (the API) or per worker (v1-beta)."""
+
+    templates: list[list[str]]
+    clients: list[list[int]] = field(default_factory=list)
+
+
+def _bearer(res: httpx.Response) -> dict[str, str]:
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+class ApiTarget:
+    health = "/api/health"
+
+    def __init__(self, spec: DatasetSpec) -> None:
+        self.clients = spec.clients
+
+    async def discover(self, client: httpx.AsyncClient, spec: DatasetSpec) -> Fixtures:
+        templates = []
+        for index in range(spec.tenants):
+            res = await client.post("/api/auth/login", json={"email": worker_email(index), "password": PASSWORD})
+            res.raise_for_status()
+            page = await client.get("/api/food/dish-templates?limit=50", headers=_bearer(res))
+            page.raise_for_status()
+            templates.append([row["id"] for row in page.json()])
+        return Fixtures(templates=templates)
+
+    async def coach(self, client, rec: Recorder, rng: random.Random, fixtures: Fixtures, tenant: int) -> None:
+        login = {"email": worker_email(tenant), "password": PASSWORD}
+        headers = _bearer(await rec.step(client, "coach/login", "POST", "/api/auth/login", json=login))
+        await rec.step(client, "coach/ingredients", "GET", "/api/food/ingredients?limit=50", headers=headers)
+        await rec.step(
+            client, "coach/ingredients-search", "GET", "/api/food/ingredients",
+            params={"query": rng.choice(FOODS), "limit": 20}, headers=headers,
+        )
+        await rec.step(client, "coach/dish-templates", "GET", "/api/food/dish-templates?limit=50", headers=headers)
+        path = f"/api/food/dish-templates/{rng.choice(fixtures.templates[tenant])}"
+        detail = (await rec.step(client, "coach/dish-template", "GET", path, headers=headers)).json()
+        body = {
+            "name": detail["name"],
+            "items": [{"ingredient_id": i["ingredient_id"], "quantity_g": i["quantity_g"]} for i in detail["items"]],
+        }
+        await rec.step(client, "coach/dish-template-save", "PUT", path, json=body, headers=headers)
+
+    async def client(self, client, rec: Recorder, rng: random.Random, fixtures: Fixtures, tenant: int) -> None:
+        login = {"email": client_email(tenant, rng.randrange(self.clients)), "password": PASSWORD}
+        headers = _bearer(await rec.step(client, "client/login", "POST", "/api/auth/login", json=login))
+        await rec.step(client, "client/targets", "GET", "/api/nutrition/targets/me", headers=headers)
+
+
+class V1Target:
+    health = "/api/health"
+
+    def __init__(self, spec: DatasetSpec) -> None:
+        self.clients = spec.clients
+
+    async def discover(self, client: httpx.AsyncClient, spec: DatasetSpec) -> Fixtures:
+        templates, clients = [], []
+        for index in range(spec.tenants):
+            res = await client.post("/api/auth/login", json={"email": worker_email(index), "password": PASSWORD})
+            res.raise_for_status()
+            headers = _bearer(res)
+            # The v1-beta dish library is global; clients belong to a worker.
+            platos = await client.get("/api/platos?limit=100", headers=headers)
+            platos.raise_for_status()
+            usuarios = await client.get(
+                "/api/auth/usuarios",
+                params={"rol": "cliente", "trabajador_id": res.json()["usuario"]["id"], "limit": 100},
+                headers=headers,
+            )
+            usuarios.raise_for_status()
+            templates.append([row["id"] for row in platos.json()])
+            clients.append([row["id"] for row in usuarios.json()["items"]])
+        return Fixtures(templates=templates, clients=clients)
+
+    async def coach(self, client, rec: Recorder, rng: random.Random, fixtures: Fixtures, tenant: int) -> None:
+        login = {"email": worker_email(tenant), "password": PASSWORD}
+        headers = _bearer(await rec.step(client, "coach/login", "POST", "/api/auth/login", json=login))
+        await rec.step(client, "coach/ingredientes", "GET", "/api/ingredientes?limit=100", headers=headers)
+        await rec.step(
+            client, "coach/ingredientes-search", "GET", "/api/ingredientes",
+            params={"q": rng.choice(FOODS), "limit": 20}, headers=headers,
+        )
+        await rec.step(client, "coach/platos", "GET", "/api/platos?limit=100", headers=headers)
+        plato_id = rng.choice(fixtures.templates[tenant])
+        path = f"/api/platos/{plato_id}"
+        detail = (await rec.step(client, "coach/plato", "GET", path, headers=headers)).json()
+        await rec.step(
+            client, "coach/plato-save", "PUT", path, json={"descripcion": detail.get("descripcion")}, headers=headers
+        )
+        bulk = {
+            "semana_inicio": FIRST_WEEK.isoformat(),
+            "client_id": rng.choice(fixtures.clients[tenant]),
+            "momento": rng.choice(MEALS),
+            "dias": list(DAYS),
+            "base_plato_ids": [plato_id],
+            "mode": "replace",
+        }
+        await rec.step(client, "coach/plan-bulk-apply", "POST", "/api/planificacion/bulk", json=bulk, headers=headers)
+
+    async def client(self, client, rec: Recorder, rng: random.Random, fixtures: Fixtures, tenant: int) -> None:
+        login = {"email": client_email(tenant, rng.randrange(self.clients)), "password": PASSWORD}
+        res = await rec.step(client, "client/login", "POST", "/api/auth/login", json=login)
+        path = f"/api/planificacion/resumen/{res.json()['usuario']['id']}"
+        await rec.step(
+            client, "client/resumen", "GET", path, params={"semana_inicio": FIRST_WEEK.isoformat()}, headers=_bearer(res)
+        )
+
+
+TARGETS = {"api": ApiTarget, "v1": V1Target}
+
+
+def parse_mix(values: list[str]) -> list[tuple[str, int]]:
+    mix = []
+    for value in values:
+        name, _, weight = value.partition(":")
+        if name not in ("coach", "client"):
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+async def _iteration(target, client, rec, rng, fixtures, spec, mix, scheduled: float) -> None:
+    names, weights = zip(*mix)
+    scenario = rng.choices(names, weights)[0]
+    tenant = rng.randrange(spec.tenants)
+    try:
+        await getattr(target, scenario)(client, rec, rng, fixtures, tenant)
+    except StepFailed:
+        rec.finished(scenario, None)
+    else:
+        rec.finished(scenario, time.perf_counter() - scheduled)
+
+
+async def run_level(args: argparse.Namespace, spec: DatasetSpec, level: float) -> dict:
+    target = TARGETS[args.target](spec)
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        fixtures = await target.discover(client, spec)
+        rec = Recorder()
+        rng = random.Random(args.seed)
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+
+        if args.mode == "closed":
+
+            async def virtual_user(n: int) -> None:
+                user_rng = random.Random(f"{args.seed}:{n}")
+                while time.perf_counter() < deadline:
+                    await _iteration(target, client, rec, user_rng, fixtures, spec, mix, time.perf_counter())
+
+            await asyncio.gather(*(virtual_user(n) for n in range(int(level))))
+        else:
+            tasks = set()
+            scheduled = started
+            while True:
+                scheduled += rng.expovariate(level)
+                if scheduled >= deadline:
+                    break
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                task = asyncio.create_task(
+                    _iteration(target, client, rec, random.Random(rng.random()), fixtures, spec, mix, scheduled)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks, timeout=args.timeout)
+        elapsed = time.perf_counter() - started
+
+    iterations = sum(len(s.latencies) for s in rec.scenarios.values())
+    return {
+        "mode": args.mode,
+        "concurrency" if args.mode == "closed" else "rate": level,
+        "elapsed_s": round(elapsed, 2),
+        "iterations": iterations,
+        "iterations_per_s": round(iterations / elapsed, 2) if elapsed else 0.0,
+        "scenarios": {name: stats.report(elapsed) for name, stats in sorted(rec.scenarios.items())},
+        "steps": {name: stats.report(elapsed) for name, stats in sorted(rec.steps.items())},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def spawn_server(python: str, app_dir: Path, workers: int, health: str) -> Iterator[str]:
+    port = _free_port()
+    cmd = [
+        python, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd, cwd=app_dir, env={**os.environ, "UVICORN_WORKERS": str(workers)})
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+            try:
+                if httpx.get(base_url + health, timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become healthy in 60s")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def sweep(args: argparse.Namespace, spec: DatasetSpec) -> list[dict]:
+    levels = args.concurrency if args.mode == "closed" else args.rate
+    results = []
+
+    def run_levels(workers: int | None) -> None:
+        for level in levels:
+            result = {"workers": workers, **asyncio.run(run_level(args, spec, level))}
+            results.append(result)
+            print(_summary_line(result), file=sys.stderr)
+
+    if not args.spawn_dir:
+        run_levels(None)
+        return results
+    for workers in args.workers:
+        with spawn_server(args.server_python, args.spawn_dir, workers, TARGETS[args.target].health) as base_url:
+            args.base_url = base_url
+            run_levels(workers)
+    return results
+
+
+def _summary_line(result: dict) -> str:
+    level = result.get("concurrency", result.get("rate"))
+    errors = sum(s["errors"] for s in result["scenarios"].values())
+    p95 = {name: s["p95_ms"] for name, s in result["scenarios"].items()}
+    return (
+        f"workers={result['workers'] or '-'} {result['mode']}={level} "
+        f"it/s={result['iterations_per_s']} errors={errors} p95_ms={p95}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=tuple(TARGETS), default="api")
+    parser.add_argument("--base-url", default="http://localhost:8010")
+    parser.add_argument("--spawn-dir", type=Path, help="start uvicorn from here for each --workers value")
+    parser.add_argument("--server-python", default=sys.executable, help="interpreter for --spawn-dir (v1-beta venv)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2])
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="virtual users (closed)")
+    parser.add_argument("--rate", type=float, nargs="+", default=[1.0, 5.0, 10.0], help="iterations/s (open)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per level")
+    parser.add_argument("--mix", nargs="+", default=["coach:1", "client:3"], help="scenario weights")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path, help="write results JSON here (default: stdout)")
+    parser.add_argument("--tenants", type=int, default=DatasetSpec.tenants)
+    parser.add_argument("--clients", type=int, default=DatasetSpec.clients)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    args = parser.parse_args()
+    try:
+        parse_mix(args.mix)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+
+    spec = DatasetSpec(tenants=args.tenants, clients=args.clients, seed=args.seed)
+    payload = json.dumps(
+        {
+            "meta": {
+                "target": args.target,
+                "mode": args.mode,
+                "duration_s": args.duration,
+                "mix": args.mix,
+                "spec": {"tenants": spec.tenants, "clients": spec.clients, "seed": spec.seed},
+            },
+            "runs": sweep(args, spec),
+        },
+        indent=2,
+    )
+    if args.output:
+        args.output.write_text(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
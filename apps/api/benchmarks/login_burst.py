@@ -0,0 +1,116 @@
+"""Login burst benchmark.
+
+Measures login throughput and how much a burst of logins slows down the rest of
+the API. Food library probes (`GET /api/food/ingredients`,
+`GET /api/food/dish-templates`) run first with the API otherwise idle, then again
+while `--concurrency` clients log in back to back.
+
+    cd apps/api
+    python -m benchmarks.login_burst --base-url http://localhost:8010 --logins 200 --concurrency 32
+
+The defaults use the development seed worker (DEV_SEED_WORKER_EMAIL / DEV_SEED_WORKER_PASSWORD).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+from benchmarks.stats import summarize
+
+
+PROBES = ("/api/food/ingredients?limit=20", "/api/food/dish-templates?limit=20")
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> httpx.Response:
+    return await client.post("/api/auth/login", json={"email": email, "password": password})
+
+
+async def probe_loop(client: httpx.AsyncClient, token: str, stop: asyncio.Event, interval: float) -> dict[str, list[float]]:
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: dict[str, list[float]] = {path: [] for path in PROBES}
+    while not stop.is_set():
+        for path in PROBES:
+            started = time.perf_counter()
+            res = await client.get(path, headers=headers)
+            if res.status_code == 200:
+                latencies[path].append(time.perf_counter() - started)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+    return latencies
+
+
+async def measure(client: httpx.AsyncClient, token: str, interval: float, workload) -> tuple[dict[str, list[float]], float]:
+    stop = asyncio.Event()
+    probes = asyncio.create_task(probe_loop(client, token, stop, interval))
+    started = time.perf_counter()
+    try:
+        await workload()
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+    return await probes, elapsed
+
+
+async def run(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 4, max_keepalive_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60.0, limits=limits) as client:
+        res = await login(client, args.email, args.password)
+        res.raise_for_status()
+        token = res.json()["access_token"]
+
+        idle, _ = await measure(client, token, args.probe_interval, lambda: asyncio.sleep(args.idle_seconds))
+
+        login_latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        remaining = iter(range(args.logins))
+
+        async def login_worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                res = await login(client, args.email, args.password)
+                statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+                if res.status_code == 200:
+                    login_latencies.append(time.perf_counter() - started)
+
+        async def burst():
+            await asyncio.gather(*(login_worker() for _ in range(args.concurrency)))
+
+        during, elapsed = await measure(client, token, args.probe_interval, burst)
+
+    return {
+        "logins": {
+            **summarize(login_latencies),
+            "per_second": round(len(login_latencies) / elapsed, 2) if elapsed else 0.0,
+            "statuses": statuses,
+        },
+        "idle": {path: summarize(values) for path, values in idle.items()},
+        "during_burst": {path: summarize(values) for path, values in during.items()},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8010")
+    parser.add_argument("--email", default=os.environ.get("DEV_SEED_WORKER_EMAIL", "s04_test_worker@example.com"))
+    parser.add_argument("--password", default=os.environ.get("DEV_SEED_WORKER_PASSWORD", "TestPass123!"))
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""
+Benchmark runner.
+
+Micro-benchmarks time the pure calculators (`compute_template_totals`,
+`calculate_targets`) over a synthetic tenant. End-to-end benchmarks load the
+same data into SQLite (always) and Postgres (`--postgres-url`: a throwaway
+database migrated with `alembic upgrade head`, whose tables are truncated) and
+time in-process requests through `TestClient`, recording SQL statements per
+request as well.
+
+    cd apps/api
+    python -m benchmarks.runner --output /tmp/bench.json
+    python -m benchmarks.runner --postgres-url postgresql+psycopg://... --baseline baseline.json
+    python -m benchmarks.runner --compare /tmp/bench.json --baseline baseline.json
+
+With `--baseline`, results are compared on the median (micro) or p50 (e2e):
+a slowdown beyond `--threshold`, or any extra SQL statement, is a regression
+and the exit status is 1. Keep baselines from the same machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import anyio
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_model_field
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.bootstrap.api import create_app
+from app.core.db.base import Base
+from app.core.db.instrumentation import install_query_listeners, observe_query_stats
+from app.core.dependencies.auth import db_session
+from app.core.web.responses import json_response
+from app.modules.auth.security.jwt_tokens import create_access_token
+from app.modules.food.api.router import _ingredient_out
+from app.modules.food.api.schemas import IngredientOut
+from app.modules.food.domain.models import Ingredient
+from app.modules.food.service.macros import MacroPer100g, compute_template_totals
+from app.modules.nutrition.service.calculators import NutritionInputs, age_years_from_birth_date, calculate_targets
+from benchmarks.datagen import DatasetSpec, TenantData, generate, load_api
+from benchmarks.stats import summarize
+
+
+AS_OF = date(2026, 6, 1)
+
+# Field compared against the baseline for each kind of result.
+PRIMARY = {"micro": "median_us", "e2e": "p50_ms"}
+
+
+def time_rounds(fn: Callable[[], object], *, number: int, rounds: int, warmup: int = 3) -> dict:
+    """Per-call timings (µs) of `fn`, called `number` times per round."""
+    for _ in range(warmup):
+        fn()
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - started) / number * 1e6)
+    return {
+        "kind": "micro",
+        "number": number,
+        "rounds": rounds,
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "mean_us": round(statistics.fmean(per_call), 3),
+    }
+
+
+def serialization_benchmarks(data: TenantData, *, rounds: int, size: int = 200) -> dict[str, dict]:
+    """A full `GET /api/food/ingredients?limit=200` page, rendered both ways."""
+    rows = [Ingredient(**row) for row in data.ingredients[:size]]
+    field = create_model_field(name="response", type_=list[IngredientOut], mode="serialization")
+
+    def response_model() -> bytes:
+        # The previous path: build models, then FastAPI validates and re-encodes them for response_model.
+        models = [
+            IngredientOut(
+                id=str(row.id),
+                tenant_id=str(row.tenant_id),
+                catalog_ingredient_id=None,
+                name=row.name,
+                kcal_per_100g=float(row.kcal_per_100g),
+                protein_g_per_100g=float(row.protein_g_per_100g),
+                carbs_g_per_100g=float(row.carbs_g_per_100g),
+                fat_g_per_100g=float(row.fat_g_per_100g),
+                serving_size_g=None if row.serving_size_g is None else float(row.serving_size_g),
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+            )
+            for row in rows
+        ]
+        content = anyio.run(lambda: serialize_response(field=field, response_content=models, is_coroutine=False))
+        return JSONResponse(content).body
+
+    def orjson_dicts() -> bytes:
+        return json_response([_ingredient_out(row) for row in rows]).body
+
+    assert response_model() == orjson_dicts()
+    return {
+        f"micro/ingredients_{size}_response_model": time_rounds(response_model, number=5, rounds=rounds),
+        f"micro/ingredients_{size}_orjson": time_rounds(orjson_dicts, number=5, rounds=rounds),
+    }
+
+
+def micro_benchmarks(data: TenantData, *, rounds: int) -> dict[str, dict]:
+    ingredients = {
+        row["id"]: MacroPer100g(
+            kcal=row["kcal_per_100g"],
+            protein_g=row["protein_g_per_100g"],
+            carbs_g=row["carbs_g_per_100g"],
+            fat_g=row["fat_g_per_100g"],
+        )
+        for row in data.ingredients
+    }
+    recipes: dict[object, list[tuple[MacroPer100g, Decimal]]] = {row["id"]: [] for row in data.templates}
+    for item in data.items:
+        recipes[item["dish_template_id"]].append((ingredients[item["ingredient_id"]], item["quantity_g"]))
+    templates = list(recipes.values())
+    profiles = [
+        NutritionInputs(
+            sex=p["sex"],
+            age_years=age_years_from_birth_date(birth_date=p["birth_date"], as_of=AS_OF),
+            height_cm=p["height_cm"],
+            weight_kg=float(p["weight_kg"]),
+            activity_level=p["activity_level"],
+            goal=p["goal"],
+            override_kcal=p["override_kcal"],
+        )
+        for p in data.profiles
+    ]
+
+    def all_templates() -> None:
+        for items in templates:
+            compute_template_totals(items)
+
+    def all_profiles() -> None:
+        for inputs in profiles:
+            calculate_targets(inputs)
+
+    results = {
+        "micro/compute_template_totals": time_rounds(all_templates, number=1, rounds=rounds),
+        "micro/calculate_targets": time_rounds(all_profiles, number=10, rounds=rounds),
+        **serialization_benchmarks(data, rounds=rounds),
+    }
+    # Report per template / per profile, not per batch.
+    for name, size in (("micro/compute_template_totals", len(templates)), ("micro/calculate_targets", len(profiles))):
+        result = results[name]
+        result["batch"] = size
+        for key in ("min_us", "median_us", "mean_us"):
+            result[key] = round(result[key] / max(1, size), 3)
+    return results
+
+
+def scenarios(data: TenantData) -> list[tuple[str, str, dict | None]]:
+    ingredient_id = data.items[0]["ingredient_id"]
+    template_id = data.templates[0]["id"]
+    template_items = [i for i in data.items if i["dish_template_id"] == template_id]
+    template_body = {
+        "name": data.templates[0]["name"],
+        "items": [{"ingredient_id": str(i["ingredient_id"]), "quantity_g": float(i["quantity_g"])} for i in template_items],
+    }
+    return [
+        ("GET", "/api/auth/me", None),
+        ("GET", "/api/food/ingredients?limit=50", None),
+        ("GET", "/api/food/ingredients?limit=200", None),
+        ("GET", "/api/food/ingredients?query=pollo&limit=20", None),
+        ("GET", f"/api/food/ingredients/{ingredient_id}", None),
+        ("GET", f"/api/food/ingredients/{ingredient_id}/used-by", None),
+        ("GET", "/api/food/dish-templates?limit=50", None),
+        ("GET", f"/api/food/dish-templates/{template_id}", None),
+        ("PUT", f"/api/food/dish-templates/{template_id}", template_body),
+        ("GET", "/api/nutrition/profile/me", None),
+        ("GET", "/api/nutrition/targets/me", None),
+    ]
+
+
+def _label(method: str, path: str, data: TenantData) -> str:
+    # Stable names across runs: ids are deterministic, but shorter without them.
+    for placeholder, value in (
+        ("{template_id}", str(data.templates[0]["id"])),
+        ("{ingredient_id}", str(data.items[0]["ingredient_id"])),
+    ):
+        path = path.replace(value, placeholder)
+    return f"{method} {path}"
+
+
+def reset_schema(engine: Engine) -> None:
+    # Postgres search needs the extensions and functions from the migrations, so reuse that schema.
+    if engine.dialect.name != "postgresql":
+        Base.metadata.create_all(engine)
+        return
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} CASCADE"))
+
+
+def e2e_benchmarks(backend: str, url: str, spec: DatasetSpec, *, requests: int, warmup: int = 10) -> dict[str, dict]:
+    engine = create_engine(url)
+    try:
+        reset_schema(engine)
+        factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+        with factory() as session:
+            tenants = load_api(session, spec)
+        data = tenants[0]
+
+        app = create_app()
+
+        def override_db_session():
+            session: Session = factory()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[db_session] = override_db_session
+        install_query_listeners()
+        # No lifespan: the dev seed must not touch the configured DATABASE_URL.
+        client = TestClient(app)
+        token = create_access_token(
+            sub=str(data.worker["id"]), tenant_id=str(data.tenant["id"]), role=data.worker["role"], access_mode="active"
+        )
+        headers = {"Authorization": f"Bearer {token.token}"}
+
+        results = {}
+        for method, path, body in scenarios(data):
+            for _ in range(warmup):
+                client.request(method, path, json=body, headers=headers).raise_for_status()
+            latencies = []
+            with observe_query_stats() as finished:
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    res = client.request(method, path, json=body, headers=headers)
+                    latencies.append(time.perf_counter() - started)
+                    res.raise_for_status()
+            results[f"e2e/{backend}/{_label(method, path, data)}"] = {
+                "kind": "e2e",
+                **summarize(latencies),
+                "statements": max((s.statements for s in finished), default=0),
+                "bytes": len(res.content),
+            }
+        client.close()
+        return results
+    finally:
+        engine.dispose()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(args: argparse.Namespace) -> dict:
+    spec = DatasetSpec(
+        tenants=args.tenants,
+        ingredients=args.ingredients,
+        dish_templates=args.dish_templates,
+        clients=args.clients,
+        weeks=0,
+        seed=args.seed,
+    )
+    results: dict[str, dict] = {}
+    if "micro" in args.only:
+        results.update(micro_benchmarks(next(generate(spec)), rounds=args.rounds))
+    if "e2e" in args.only:
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_url = f"sqlite+pysqlite:///{Path(tmp) / 'bench.db'}"
+            results.update(e2e_benchmarks("sqlite", sqlite_url, spec, requests=args.requests))
+        if args.postgres_url:
+            results.update(e2e_benchmarks("postgres", args.postgres_url, spec, requests=args.requests))
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spec": asdict(spec),
+            "rounds": args.rounds,
+            "requests": args.requests,
+        },
+        "results": results,
+    }
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    field: str
+    baseline: float | None
+    current: float | None
+    status: str  # ok | regression | improvement | new | missing
+
+    @property
+    def change(self) -> float | None:
+        if not self.baseline or self.current is None:
+            return None
+        return self.current / self.baseline - 1
+
+
+def compare(current: dict, baseline: dict, *, threshold: float) -> list[Comparison]:
+    rows = []
+    now, before = current["results"], baseline["results"]
+    for name in sorted(set(now) | set(before)):
+        if name not in before:
+            rows.append(Comparison(name, "", None, None, "new"))
+            continue
+        if name not in now:
+            rows.append(Comparison(name, "", None, None, "missing"))
+            continue
+        field = PRIMARY[now[name]["kind"]]
+        base, value = before[name][field], now[name][field]
+        status = "ok"
+        if base and value > base * (1 + threshold):
+            status = "regression"
+        elif base and value < base * (1 - threshold):
+            status = "improvement"
+        rows.append(Comparison(name, field, base, value, status))
+        # Statement counts are deterministic: any increase is a regression, whatever the threshold.
+        if "statements" in now[name] and now[name]["statements"] > before[name].get("statements", 0):
+            rows.append(Comparison(name, "statements", before[name]["statements"], now[name]["statements"], "regression"))
+    return rows
+
+
+def format_comparison(rows: list[Comparison]) -> str:
+    lines = []
+    for row in rows:
+        change = f"{row.change:+.1%}" if row.change is not None else ""
+        values = f"{row.baseline} -> {row.current}" if row.field else ""
+        lines.append(f"{row.status:<11} {row.name}  {row.field} {values} {change}".rstrip())
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", type=Path, help="compare against this results file")
+    parser.add_argument("--compare", type=Path, help="compare this results file instead of running")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown that counts as a regression")
+    parser.add_argument("--only", nargs="+", choices=("micro", "e2e"), default=["micro", "e2e"])
+    parser.add_argument("--postgres-url", help="throwaway Postgres database for the e2e run")
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tenants", type=int, default=2)
+    parser.add_argument("--ingredients", type=int, default=DatasetSpec.ingredients)
+    parser.add_argument("--dish-templates", type=int, default=DatasetSpec.dish_templates)
+    parser.add_argument("--clients", type=int, default=DatasetSpec.clients)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    args = parser.parse_args()
+
+    if args.compare:
+        if not args.baseline:
+            parser.error("--compare needs --baseline")
+        current = json.loads(args.compare.read_text())
+    else:
+        current = run(args)
+        payload = json.dumps(current, indent=2, sort_keys=True)
+        if args.output:
+            args.output.write_text(payload + "\n")
+        else:
+            print(payload)
+
+    if not args.baseline:
+        return 0
+    rows = compare(current, json.loads(args.baseline.read_text()), threshold=args.threshold)
+    print(format_comparison(rows), file=sys.stderr)
+    return 1 if any(row.status == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
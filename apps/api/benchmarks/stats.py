@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import statistics
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "max_ms": round(max(values, default=0.0) * 1000, 1),
+        "mean_ms": round(statistics.fmean(values) * 1000, 1) if values else 0.0,
+    }
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import os
-from collections.abc import Generator
+import uuid
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from datetime import timedelta
 from pathlib import Path
 
 import pytest
@@ -14,8 +17,14 @@ os.environ.setdefault("API_ENVIRONMENT", "development")
 
 from app.bootstrap.api import create_app
 from app.core.db.base import Base
+from app.core.db.instrumentation import observe_query_stats
 from app.core.dependencies.auth import db_session
 from app.modules.auth.domain import models as _auth_models  # noqa: F401
+from app.modules.auth.domain.enums import SubscriptionStatus, TenantStatus, UserRole
+from app.modules.auth.domain.models import Tenant, User
+from app.modules.auth.security.jwt_tokens import create_access_token
+from app.modules.auth.service.access_mode import now_utc
+from benchmarks.datagen import DatasetSpec, TenantData, load_api
 
 
 @pytest.fixture()
@@ -61,3 +70,118 @@ def client(session_factory) -> Generator[TestClient, None, None]:
 
     with TestClient(app) as api_client:
         yield api_client
+
+
+@pytest.fixture()
+def query_budget():
+    """
+    Fail the test if a request made inside the block goes over its SQL budget.
+
+        with query_budget(max_statements=3):
+            client.get("/api/auth/me", headers=headers)
+
+    `max_repeats` caps how often one statement fingerprint may run per request,
+    which is what catches N+1 loops that a plain count would let creep in.
+    """
+
+    @contextmanager
+    def budget(max_statements: int, *, max_repeats: int = 1):
+        with observe_query_stats() as finished:
+            yield finished
+
+        assert finished, "no request was made inside query_budget()"
+        problems = []
+        for stats in finished:
+            if stats.statements > max_statements:
+                problems.append(f"{stats.name}: {stats.statements} statements (budget {max_statements})")
+            for sql, count in stats.repeated(max_repeats):
+                problems.append(f"{stats.name}: {count}x {sql}")
+        if problems:
+            pytest.fail("query budget exceeded:\n" + "\n".join(problems), pytrace=False)
+
+    return budget
+
+
+@pytest.fixture()
+def make_worker(db: Session) -> Callable[[], User]:
+    """Create a verified worker in a fresh trial tenant; call it once per user needed."""
+
+    def create() -> User:
+        tenant = Tenant(
+            id=uuid.uuid4(),
+            status=TenantStatus.active.value,
+            subscription_status=SubscriptionStatus.trial.value,
+            trial_starts_at=now_utc() - timedelta(days=1),
+            trial_ends_at=now_utc() + timedelta(days=30),
+        )
+        user = User(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            role=UserRole.worker.value,
+            email=f"{uuid.uuid4().hex}@example.com",
+            email_verified_at=now_utc(),
+            password_hash="unused",
+            is_active=True,
+        )
+        db.add_all([tenant, user])
+        db.commit()
+        return user
+
+    return create
+
+
+@pytest.fixture()
+def worker(make_worker) -> User:
+    return make_worker()
+
+
+def _bearer(sub, tenant_id, role: str, access_mode: str, extra: dict[str, str]) -> dict[str, str]:
+    token = create_access_token(sub=str(sub), tenant_id=str(tenant_id), role=role, access_mode=access_mode)
+    return {"Authorization": f"Bearer {token.token}", **extra}
+
+
+@pytest.fixture()
+def auth_headers() -> Callable[..., dict[str, str]]:
+    """Bearer headers for `user`: `auth_headers(worker)` or `auth_headers(worker, access_mode="read_only")`."""
+
+    def headers(user: User, access_mode: str = "active", **extra: str) -> dict[str, str]:
+        return _bearer(user.id, user.tenant_id, user.role, access_mode, extra)
+
+    return headers
+
+
+@pytest.fixture()
+def tenant_data(db: Session) -> Callable[..., list[TenantData]]:
+    """Seed `benchmarks.datagen` tenants: `tenant_data(tenants=2, ingredients=40, dish_templates=0)`."""
+
+    def load(**spec) -> list[TenantData]:
+        return load_api(db, DatasetSpec(**spec))
+
+    return load
+
+
+@pytest.fixture()
+def tenant_headers() -> Callable[..., dict[str, str]]:
+    """Bearer headers for a seeded tenant's worker; extra keyword arguments become headers."""
+
+    def headers(data: TenantData, access_mode: str = "active", **extra: str) -> dict[str, str]:
+        return _bearer(data.worker["id"], data.tenant["id"], data.worker["role"], access_mode, extra)
+
+    return headers
+
+
+@pytest.fixture()
+def all_pages(client: TestClient) -> Callable[..., list[dict]]:
+    """Follow `X-Next-Cursor` to the end: `all_pages("/api/food/ingredients", headers, limit=5)`."""
+
+    def fetch(path: str, headers: dict[str, str], **params) -> list[dict]:
+        rows, after = [], None
+        while True:
+            res = client.get(path, params={**params, **({"after": after} if after else {})}, headers=headers)
+            assert res.status_code == 200, res.text
+            rows += res.json()
+            after = res.headers.get("X-Next-Cursor")
+            if not after:
+                return rows
+
+    return fetch
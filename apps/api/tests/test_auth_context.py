@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.modules.auth.domain.models import User
+from app.modules.auth.service.user_cache import UserCache, UserSnapshot, invalidate_user, user_cache
+
+
+def _snapshot(user_id: uuid.UUID | None = None) -> UserSnapshot:
+    return UserSnapshot(
+        id=user_id or uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        role="worker",
+        email="w@example.com",
+        is_active=True,
+        email_verified_at=None,
+    )
+
+
+class _Statements:
+    def __init__(self, engine) -> None:
+        self.sql: list[str] = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.sql.append(statement)
+
+    def user_lookups(self) -> int:
+        return sum(1 for s in self.sql if "FROM users" in s)
+
+
+def test_user_lookup_is_cached_per_token(client: TestClient, worker: User, auth_headers, engine) -> None:
+    user_cache.clear()
+    headers = auth_headers(worker)
+    statements = _Statements(engine)
+
+    for _ in range(2):
+        res = client.get("/api/nutrition/profile/me", headers=headers)
+        assert res.json() == {"detail": "nutrition_profile_not_found"}
+
+    assert statements.user_lookups() == 1
+
+
+def test_invalidate_user_picks_up_deactivation(client: TestClient, db: Session, worker: User, auth_headers) -> None:
+    user_cache.clear()
+    headers = auth_headers(worker)
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    worker.is_active = False
+    db.commit()
+    # Still served from the cache until the user is invalidated.
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    invalidate_user(worker.id)
+    res = client.get("/api/auth/me", headers=headers)
+    assert res.status_code == 403
+    assert res.json() == {"detail": "user_inactive"}
+
+
+def test_read_only_token_is_rejected_on_writes(client: TestClient, worker: User, auth_headers) -> None:
+    res = client.post(
+        "/api/food/ingredients",
+        headers=auth_headers(worker, access_mode="read_only"),
+        json={
+            "name": "Arroz",
+            "kcal_per_100g": 350,
+            "protein_g_per_100g": 7,
+            "carbs_g_per_100g": 77,
+            "fat_g_per_100g": 1,
+            "serving_size_g": None,
+        },
+    )
+    assert res.status_code == 403
+    assert res.json() == {"detail": "read_only"}
+
+    assert client.get("/api/food/ingredients", headers={"Authorization": "Bearer nope"}).json() == {
+        "detail": "invalid_token"
+    }
+    assert client.get("/api/food/ingredients").json() == {"detail": "missing_token"}
+
+
+def test_cache_entries_expire_after_ttl() -> None:
+    now = [0.0]
+    cache = UserCache(ttl_seconds=10, max_entries=10, clock=lambda: now[0])
+    snapshot = _snapshot()
+    cache.put((snapshot.id, 1), snapshot)
+
+    now[0] = 9.9
+    assert cache.get((snapshot.id, 1)) == snapshot
+    now[0] = 10.0
+    assert cache.get((snapshot.id, 1)) is None
+    assert len(cache) == 0
+
+
+def test_cache_is_size_bounded_lru() -> None:
+    cache = UserCache(ttl_seconds=60, max_entries=2)
+    a, b, c = _snapshot(), _snapshot(), _snapshot()
+    cache.put((a.id, 1), a)
+    cache.put((b.id, 1), b)
+    assert cache.get((a.id, 1)) == a
+
+    cache.put((c.id, 1), c)
+
+    assert len(cache) == 2
+    assert cache.get((b.id, 1)) is None
+    assert cache.get((a.id, 1)) == a
+    assert cache.get((c.id, 1)) == c
+
+
+def test_invalidate_drops_every_token_of_the_user() -> None:
+    cache = UserCache(ttl_seconds=60, max_entries=10)
+    user, other = _snapshot(), _snapshot()
+    cache.put((user.id, 1), user)
+    cache.put((user.id, 2), user)
+    cache.put((other.id, 1), other)
+
+    cache.invalidate(user.id)
+
+    assert cache.get((user.id, 1)) is None
+    assert cache.get((user.id, 2)) is None
+    assert cache.get((other.id, 1)) == other
+
+
+def test_zero_ttl_disables_caching() -> None:
+    cache = UserCache(ttl_seconds=0, max_entries=10)
+    snapshot = _snapshot()
+    cache.put((snapshot.id, 1), snapshot)
+    assert cache.get((snapshot.id, 1)) is None
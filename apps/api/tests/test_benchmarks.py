@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from benchmarks.datagen import DAYS, MEALS, DatasetSpec, generate
+from benchmarks.load import StepStats, parse_mix
+from benchmarks.runner import compare, e2e_benchmarks, micro_benchmarks
+
+
+SPEC = DatasetSpec(tenants=2, ingredients=40, dish_templates=8, items_per_template=3, clients=2, weeks=1)
+
+
+def test_datagen_is_deterministic_per_tenant():
+    first = list(generate(SPEC, password_hash="x"))
+    again = list(generate(SPEC, password_hash="x"))
+    assert [t.tenant["id"] for t in first] == [t.tenant["id"] for t in again]
+    assert [i["name"] for i in first[1].ingredients] == [i["name"] for i in again[1].ingredients]
+    assert first[0].plans == again[0].plans
+
+    # Adding tenants does not reshuffle the existing ones.
+    wider = list(generate(replace(SPEC, tenants=3), password_hash="x"))
+    assert wider[1].items == first[1].items
+    assert first[0].tenant["id"] != first[1].tenant["id"]
+
+
+def test_datagen_shapes():
+    data = next(generate(SPEC, password_hash="x"))
+    assert len(data.ingredients) == 40
+    assert len(data.items) == 8 * 3
+    assert len(data.profiles) == 1 + 2
+    assert len(data.plans) == 2 * len(DAYS) * len(MEALS)
+    ingredient_ids = {i["id"] for i in data.ingredients}
+    assert all(item["ingredient_id"] in ingredient_ids for item in data.items)
+
+
+def _result(kind: str, value: float, statements: int | None = None) -> dict:
+    field = "median_us" if kind == "micro" else "p50_ms"
+    row = {"kind": kind, field: value}
+    if statements is not None:
+        row["statements"] = statements
+    return row
+
+
+def test_compare_flags_slowdowns_and_extra_statements():
+    baseline = {
+        "results": {
+            "micro/a": _result("micro", 10.0),
+            "e2e/sqlite/GET /x": _result("e2e", 5.0, statements=2),
+            "e2e/sqlite/GET /gone": _result("e2e", 5.0, statements=1),
+        }
+    }
+    current = {
+        "results": {
+            "micro/a": _result("micro", 12.0),
+            "e2e/sqlite/GET /x": _result("e2e", 5.1, statements=3),
+            "e2e/sqlite/GET /new": _result("e2e", 1.0, statements=1),
+        }
+    }
+
+    rows = compare(current, baseline, threshold=0.15)
+
+    statuses = {(row.name, row.field): row.status for row in rows}
+    assert statuses[("micro/a", "median_us")] == "regression"
+    assert statuses[("e2e/sqlite/GET /x", "p50_ms")] == "ok"
+    assert statuses[("e2e/sqlite/GET /x", "statements")] == "regression"
+    assert statuses[("e2e/sqlite/GET /gone", "")] == "missing"
+    assert statuses[("e2e/sqlite/GET /new", "")] == "new"
+    assert {row.status for row in compare(baseline, baseline, threshold=0.15)} == {"ok"}
+
+
+def test_runner_smoke(tmp_path: Path):
+    data = next(generate(SPEC, password_hash="x"))
+    micro = micro_benchmarks(data, rounds=2)
+    assert micro["micro/compute_template_totals"]["batch"] == 8
+
+    e2e = e2e_benchmarks("sqlite", f"sqlite+pysqlite:///{tmp_path / 'bench.db'}", SPEC, requests=2, warmup=1)
+    assert e2e["e2e/sqlite/GET /api/food/ingredients?limit=50"]["count"] == 2
+    assert e2e["e2e/sqlite/GET /api/auth/me"]["statements"] >= 0
+
+
+def test_load_mix_and_step_report():
+    assert parse_mix(["coach:1", "client"]) == [("coach", 1), ("client", 1)]
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix(["admin:2"])
+
+    stats = StepStats(latencies=[0.01, 0.02, 0.03], statuses={"200": 3, "503": 1}, errors=1)
+    report = stats.report(elapsed=2.0)
+    assert report["count"] == 3
+    assert report["error_rate"] == 0.25
+    assert report["per_second"] == 1.5
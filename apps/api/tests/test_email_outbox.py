@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.modules.auth.domain.enums import EmailOutboxStatus
+from app.modules.auth.domain.models import EmailOutboxMessage
+from app.modules.auth.infrastructure.sendgrid_client import SendGridClient
+from app.modules.auth.service import email_outbox
+from app.modules.auth.service.email_outbox import backoff_delay, deliver_pending, enqueue_email
+
+
+class FakeSendGrid:
+    """Local stand-in for the SendGrid mail API; replies with queued status codes."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict] = []
+        self.client_ports: set[int] = set()
+        self.statuses: list[int] = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                fake.requests.append(
+                    {"path": self.path, "auth": self.headers["Authorization"], "json": json.loads(body)}
+                )
+                fake.client_ports.add(self.client_address[1])
+                status = fake.statuses.pop(0) if fake.statuses else 202
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def sendgrid() -> Generator[FakeSendGrid, None, None]:
+    fake = FakeSendGrid()
+    try:
+        yield fake
+    finally:
+        fake.close()
+
+
+@pytest.fixture()
+def sender(sendgrid: FakeSendGrid) -> Generator[SendGridClient, None, None]:
+    client = SendGridClient(api_key="test-key", from_email="no-reply@example.com", base_url=sendgrid.base_url)
+    try:
+        yield client
+    finally:
+        client.close()
+
+
+def _outbox(db: Session) -> list[EmailOutboxMessage]:
+    db.expire_all()
+    return db.execute(select(EmailOutboxMessage).order_by(EmailOutboxMessage.to_email)).scalars().all()
+
+
+def _enqueue(db: Session, *emails: str) -> None:
+    for email in emails:
+        enqueue_email(db, to_email=email, subject="Hola", html="<p>hola</p>")
+    db.commit()
+
+
+def test_register_writes_outbox_row_without_calling_sendgrid(
+    client: TestClient, db: Session, sendgrid: FakeSendGrid, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "sendgrid_api_key", "test-key")
+    monkeypatch.setattr(settings, "sendgrid_from_email", "no-reply@example.com")
+    monkeypatch.setattr(settings, "sendgrid_api_base_url", sendgrid.base_url)
+
+    res = client.post("/api/auth/register", json={"email": "outbox@example.com", "password": "12345678aA!"})
+    assert res.status_code == 200
+
+    assert sendgrid.requests == []
+    [row] = _outbox(db)
+    assert row.to_email == "outbox@example.com"
+    assert row.status == EmailOutboxStatus.pending.value
+    assert res.json()["dev_verify_token"] in row.html
+
+
+def test_runner_sends_batch_over_one_keep_alive_connection(
+    db: Session, session_factory, sendgrid: FakeSendGrid, sender: SendGridClient
+) -> None:
+    _enqueue(db, "a@example.com", "b@example.com", "c@example.com")
+
+    result = deliver_pending(session_factory, sender, batch_size=10)
+
+    assert (result.claimed, result.sent) == (3, 3)
+    assert sorted(r["json"]["personalizations"][0]["to"][0]["email"] for r in sendgrid.requests) == [
+        "a@example.com",
+        "b@example.com",
+        "c@example.com",
+    ]
+    assert {r["path"] for r in sendgrid.requests} == {"/v3/mail/send"}
+    assert {r["auth"] for r in sendgrid.requests} == {"Bearer test-key"}
+    assert len(sendgrid.client_ports) == 1
+    assert all(row.status == EmailOutboxStatus.sent.value and row.sent_at is not None for row in _outbox(db))
+
+    # Nothing left to claim.
+    assert deliver_pending(session_factory, sender).claimed == 0
+
+
+def test_batch_size_limits_each_claim(db: Session, session_factory, sender: SendGridClient) -> None:
+    _enqueue(db, "a@example.com", "b@example.com", "c@example.com")
+
+    assert deliver_pending(session_factory, sender, batch_size=2).sent == 2
+    assert deliver_pending(session_factory, sender, batch_size=2).sent == 1
+
+
+def test_retryable_failure_backs_off_then_succeeds(
+    db: Session, session_factory, sendgrid: FakeSendGrid, sender: SendGridClient
+) -> None:
+    _enqueue(db, "retry@example.com")
+    sendgrid.statuses = [503]
+    now = datetime.now(timezone.utc)
+
+    first = deliver_pending(session_factory, sender, now=now)
+    assert (first.retried, first.sent) == (1, 0)
+    [row] = _outbox(db)
+    assert row.status == EmailOutboxStatus.pending.value
+    assert row.attempts == 1
+    assert row.last_error == "sendgrid_failed: 503"
+    # The backoff counts from the failure, which came after the claim.
+    due = row.next_attempt_at.replace(tzinfo=timezone.utc)
+    assert now + backoff_delay(1) <= due < now + backoff_delay(1) + timedelta(seconds=5)
+
+    # Not due yet.
+    assert deliver_pending(session_factory, sender, now=due - timedelta(seconds=1)).claimed == 0
+
+    later = deliver_pending(session_factory, sender, now=due)
+    assert later.sent == 1
+    [row] = _outbox(db)
+    assert (row.status, row.attempts, row.last_error) == (EmailOutboxStatus.sent.value, 2, None)
+
+
+def test_permanent_failure_and_exhausted_retries_are_recorded(
+    db: Session,
+    session_factory,
+    sendgrid: FakeSendGrid,
+    sender: SendGridClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "email_outbox_max_attempts", 1)
+    _enqueue(db, "bad-request@example.com", "overloaded@example.com")
+    sendgrid.statuses = [400, 429]
+
+    result = deliver_pending(session_factory, sender, batch_size=10)
+
+    assert result.failed == 2
+    rows = _outbox(db)
+    assert [row.status for row in rows] == [EmailOutboxStatus.failed.value] * 2
+    assert sorted(row.last_error for row in rows) == ["sendgrid_failed: 400", "sendgrid_failed: 429"]
+
+
+def test_unreachable_provider_is_retried(db: Session, session_factory) -> None:
+    _enqueue(db, "offline@example.com")
+    offline = SendGridClient(api_key="k", from_email="f@example.com", base_url="http://127.0.0.1:9", timeout=1.0)
+    try:
+        result = deliver_pending(session_factory, offline)
+    finally:
+        offline.close()
+
+    assert result.retried == 1
+    [row] = _outbox(db)
+    assert row.status == EmailOutboxStatus.pending.value
+    assert row.last_error.startswith("sendgrid_unreachable")
+
+
+def test_expired_lease_is_reclaimed_and_stale_outcome_ignored(
+    db: Session, session_factory, sender: SendGridClient
+) -> None:
+    _enqueue(db, "lease@example.com")
+    now = datetime.now(timezone.utc)
+
+    with session_factory() as session:
+        [stale] = email_outbox.claim_batch(session, limit=1, now=now)
+
+    # The first runner died; once the lease runs out another one claims and sends it.
+    after_lease = now + timedelta(seconds=settings.email_outbox_lease_seconds)
+    assert deliver_pending(session_factory, sender, now=after_lease).sent == 1
+
+    # A late outcome from the first runner must not overwrite the newer claim.
+    with session_factory() as session:
+        email_outbox._record(session, stale, status=EmailOutboxStatus.failed.value)
+        session.commit()
+    [row] = _outbox(db)
+    assert (row.status, row.attempts) == (EmailOutboxStatus.sent.value, 2)
+
+
+def test_each_outcome_is_recorded_before_the_next_send(
+    db: Session, session_factory, sender: SendGridClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _enqueue(db, "a@example.com", "b@example.com")
+    send = sender.send
+    calls = []
+
+    def crash_on_second(**kwargs) -> None:
+        calls.append(kwargs["to_email"])
+        if len(calls) == 2:
+            raise RuntimeError("runner killed")
+        send(**kwargs)
+
+    monkeypatch.setattr(sender, "send", crash_on_second)
+    with pytest.raises(RuntimeError):
+        deliver_pending(session_factory, sender, batch_size=10)
+
+    first, second = _outbox(db)
+    assert first.status == EmailOutboxStatus.sent.value
+    assert (second.status, second.attempts) == (EmailOutboxStatus.pending.value, 1)
+
+
+def test_unsent_messages_are_released_before_the_lease_runs_out(
+    db: Session, session_factory, sendgrid: FakeSendGrid, sender: SendGridClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # A send may take the whole lease, so none can start safely.
+    monkeypatch.setattr(settings, "email_outbox_lease_seconds", 10)
+    monkeypatch.setattr(settings, "sendgrid_timeout_seconds", 10.0)
+    _enqueue(db, "a@example.com", "b@example.com")
+
+    result = deliver_pending(session_factory, sender, batch_size=10)
+
+    assert (result.claimed, result.sent, result.released) == (2, 0, 2)
+    assert sendgrid.requests == []
+    assert [(row.status, row.attempts) for row in _outbox(db)] == [(EmailOutboxStatus.pending.value, 0)] * 2
+    # Handed back: due again right away, not after the lease.
+    monkeypatch.setattr(settings, "email_outbox_lease_seconds", 120)
+    assert deliver_pending(session_factory, sender, batch_size=10).sent == 2
+
+
+def test_without_sendgrid_messages_are_marked_skipped(db: Session, session_factory) -> None:
+    _enqueue(db, "dev@example.com")
+
+    assert deliver_pending(session_factory, None).skipped == 1
+    [row] = _outbox(db)
+    assert row.status == EmailOutboxStatus.skipped.value
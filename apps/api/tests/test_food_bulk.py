@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import csv
+import importlib
+import io
+
+import orjson
+import pytest
+
+# `app.modules.food.api` re-exports the APIRouter under the module's own name.
+food_router = importlib.import_module("app.modules.food.api.router")
+
+
+@pytest.fixture()
+def tenants(tenant_data):
+    return tenant_data(tenants=2, ingredients=40, dish_templates=0, clients=0, weeks=0)
+
+
+def _library(client, headers) -> list[dict]:
+    res = client.get("/api/food/ingredients:export", headers=headers)
+    assert res.status_code == 200
+    return [orjson.loads(line) for line in res.content.splitlines()]
+
+
+def test_csv_import_reports_bad_rows_and_inserts_the_rest(client, tenants, tenant_headers):
+    headers = tenant_headers(tenants[0], **{"Content-Type": "text/csv"})
+    body = (
+        "﻿Name;kcal_per_100g;protein_g_per_100g;carbs_g_per_100g;fat_g_per_100g;serving_size_g;notes\n"
+        "Garbanzo cocido;139;7,2;18,6;2,1;150;x\n"
+        '"Pan de ""masa madre""\nrústico";250;8,5;48;1,2;;\n'
+        "Sin calorías;;1;1;1;;\n"
+        "Negativo;-5;1;1;1;;\n"
+        "Columnas;1;2\n"
+        "\n"
+        "Aceite de oliva;884;0;0;100;10;\n"
+    )
+
+    res = client.post("/api/food/ingredients:import", content=body.encode(), headers=headers)
+
+    assert res.status_code == 200, res.text
+    report = res.json()
+    assert (report["imported"], report["failed"]) == (3, 3)
+    assert [error["line"] for error in report["errors"]] == [5, 6, 7]
+    assert report["errors"][0]["error"].startswith("kcal_per_100g:")
+    assert report["errors"][2]["error"] == "expected 7 columns, got 3"
+
+    imported = {row["name"]: row for row in _library(client, headers)}
+    assert imported["Garbanzo cocido"]["protein_g_per_100g"] == 7.2
+    assert imported["Garbanzo cocido"]["serving_size_g"] == 150.0
+    assert imported['Pan de "masa madre"\nrústico']["serving_size_g"] is None
+
+
+def test_ndjson_import_in_batches(client, tenants, monkeypatch, tenant_headers):
+    monkeypatch.setattr(food_router, "IMPORT_BATCH_SIZE", 7)
+    headers = tenant_headers(tenants[0], **{"Content-Type": "application/x-ndjson"})
+    rows = [
+        {"name": f"Ingrediente {i}", "kcal_per_100g": 100 + i, "protein_g_per_100g": 1, "carbs_g_per_100g": "2.5", "fat_g_per_100g": 0}
+        for i in range(30)
+    ]
+    lines = [orjson.dumps(row) for row in rows] + [b"{not json", b"[1, 2]", b'{"name": ""}']
+
+    res = client.post("/api/food/ingredients:import", content=b"\n".join(lines), headers=headers)
+
+    assert res.status_code == 200, res.text
+    report = res.json()
+    assert (report["imported"], report["failed"]) == (30, 3)
+    assert [(e["line"], e["error"]) for e in report["errors"][:2]] == [(31, "invalid JSON"), (32, "expected a JSON object")]
+    assert len(_library(client, headers)) == 40 + 30
+    # Nothing leaked into the other tenant.
+    assert len(_library(client, tenant_headers(tenants[1]))) == 40
+
+
+def test_import_rejects_unreadable_bodies(client, tenants, tenant_headers):
+    headers = tenant_headers(tenants[0])
+    url = "/api/food/ingredients:import"
+
+    res = client.post(url, content=b"name,kcal\n", headers={**headers, "Content-Type": "text/plain"})
+    assert (res.status_code, res.json()) == (415, {"detail": "unsupported_import_format"})
+
+    res = client.post(f"{url}?format=csv", content=b"name,kcal_per_100g\nx,1\n", headers=headers)
+    assert res.status_code == 400
+    assert res.json()["detail"] == "missing_columns:protein_g_per_100g,carbs_g_per_100g,fat_g_per_100g"
+
+    res = client.post(f"{url}?format=ndjson", content=b'{"name": "\xff"}\n', headers=headers)
+    assert (res.status_code, res.json()) == (400, {"detail": "invalid_encoding"})
+
+    res = client.post(f"{url}?format=ndjson", content=b"", headers=tenant_headers(tenants[0], "read_only"))
+    assert (res.status_code, res.json()) == (403, {"detail": "read_only"})
+
+
+def test_import_is_all_or_nothing_past_the_row_limit(client, tenants, monkeypatch, tenant_headers):
+    monkeypatch.setattr(food_router, "MAX_IMPORT_ROWS", 5)
+    monkeypatch.setattr(food_router, "IMPORT_BATCH_SIZE", 2)
+    headers = tenant_headers(tenants[0], **{"Content-Type": "text/csv"})
+    body = "name,kcal_per_100g,protein_g_per_100g,carbs_g_per_100g,fat_g_per_100g\n" + "x,1,1,1,1\n" * 6
+
+    res = client.post("/api/food/ingredients:import", content=body.encode(), headers=headers)
+
+    assert (res.status_code, res.json()) == (413, {"detail": "import_too_large"})
+    assert len(_library(client, headers)) == 40
+
+
+def test_export_streams_the_tenant_library(client, tenants, monkeypatch, tenant_headers):
+    monkeypatch.setattr(food_router, "EXPORT_CHUNK_SIZE", 16)
+    data = tenants[0]
+    headers = tenant_headers(data)
+
+    ndjson = client.get("/api/food/ingredients:export", headers=headers)
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert ndjson.headers["content-disposition"] == 'attachment; filename="ingredients.ndjson"'
+    rows = [orjson.loads(line) for line in ndjson.content.splitlines()]
+    assert sorted(row["id"] for row in rows) == sorted(str(row["id"]) for row in data.ingredients)
+    assert [row["name"] for row in rows] == sorted(row["name"] for row in rows)
+
+    res = client.get("/api/food/ingredients:export?format=csv", headers=headers)
+    assert res.headers["content-type"] == "text/csv; charset=utf-8"
+    table = list(csv.DictReader(io.StringIO(res.text)))
+    assert [row["id"] for row in table] == [row["id"] for row in rows]
+    assert table[0]["created_at"] == rows[0]["created_at"]
+
+    # The export reads back in as an import.
+    other = tenant_headers(tenants[1], **{"Content-Type": "text/csv"})
+    res = client.post("/api/food/ingredients:import", content=res.content, headers=other)
+    assert res.json() == {"imported": 40, "failed": 0, "errors": []}
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.modules.food.domain.models import CatalogIngredient, Ingredient
+from app.modules.food.service.catalog import catalog_row, load_catalog_file, upsert_catalog_ingredients
+
+
+def _bedca(source_id: str, name: str, kcal: float, protein: float = 10) -> dict:
+    row = {
+        "source_id": source_id,
+        "name": name,
+        "kcal_per_100g": kcal,
+        "protein_g_per_100g": protein,
+        "carbs_g_per_100g": 0,
+        "fat_g_per_100g": 1,
+    }
+    return catalog_row(row, source="bedca", now=datetime.now(timezone.utc))
+
+
+@pytest.fixture()
+def tenants(db, tenant_data):
+    data = tenant_data(tenants=2, ingredients=12, dish_templates=0, clients=0, weeks=0)
+    upsert_catalog_ingredients(
+        db,
+        [_bedca(str(i), f"{food} bedca", 100 + i) for i, food in enumerate(["arroz", "lenteja", "pollo", "zanahoria"])],
+    )
+    db.commit()
+    return data
+
+
+def _catalog_id(db, name: str):
+    return db.execute(select(CatalogIngredient.id).where(CatalogIngredient.name == name)).scalar_one()
+
+
+def test_library_lists_own_ingredients_and_the_catalogue(client, db, tenants, tenant_headers, all_pages):
+    headers = tenant_headers(tenants[0])
+
+    rows = all_pages("/api/food/ingredients", headers, limit=5)
+
+    assert len(rows) == 12 + 4
+    assert [(r["name"], r["id"]) for r in rows] == sorted((r["name"], r["id"]) for r in rows)
+    shared = [r for r in rows if r["catalog_ingredient_id"]]
+    assert {r["name"] for r in shared} == {"arroz bedca", "lenteja bedca", "pollo bedca", "zanahoria bedca"}
+    assert all(r["tenant_id"] is None and r["id"] == r["catalog_ingredient_id"] for r in shared)
+
+    found = client.get("/api/food/ingredients", params={"query": "lenteja"}, headers=headers).json()
+    assert [r["name"] for r in found if r["catalog_ingredient_id"]] == ["lenteja bedca"]
+
+
+def test_customizing_a_catalogue_item_is_copy_on_write(client, db, tenants, tenant_headers, all_pages):
+    headers, other = tenant_headers(tenants[0]), tenant_headers(tenants[1])
+    catalog_id = str(_catalog_id(db, "pollo bedca"))
+    payload = {"name": "pollo bedca (sin piel)", "kcal_per_100g": 110, "protein_g_per_100g": 23, "carbs_g_per_100g": 0, "fat_g_per_100g": 1.5}
+
+    res = client.put(f"/api/food/ingredients/{catalog_id}", json=payload, headers=headers)
+
+    assert res.status_code == 200, res.text
+    assert res.json()["id"] == catalog_id
+    assert res.json()["tenant_id"] == str(tenants[0].tenant["id"])
+    assert db.execute(select(func.count()).select_from(Ingredient).where(Ingredient.catalog_ingredient_id.is_not(None))).scalar() == 1
+    # Listed once, with the tenant's values; other tenants still see the catalogue.
+    names = [r["name"] for r in all_pages("/api/food/ingredients", headers, limit=50) if r["id"] == catalog_id]
+    assert names == ["pollo bedca (sin piel)"]
+    assert client.get(f"/api/food/ingredients/{catalog_id}", headers=other).json()["name"] == "pollo bedca"
+
+    # A second edit updates the same copy.
+    res = client.put(f"/api/food/ingredients/{catalog_id}", json={**payload, "kcal_per_100g": 105}, headers=headers)
+    assert res.json()["kcal_per_100g"] == 105
+    assert db.execute(select(func.count()).select_from(Ingredient).where(Ingredient.catalog_ingredient_id.is_not(None))).scalar() == 1
+
+    # Deleting the copy reverts to the catalogue item.
+    assert client.delete(f"/api/food/ingredients/{catalog_id}", headers=headers).status_code == 200
+    res = client.get(f"/api/food/ingredients/{catalog_id}", headers=headers)
+    assert (res.json()["name"], res.json()["tenant_id"]) == ("pollo bedca", None)
+
+    res = client.delete(f"/api/food/ingredients/{catalog_id}", headers=headers)
+    assert (res.status_code, res.json()) == (409, {"detail": "catalog_ingredient_read_only"})
+
+
+def test_dish_templates_resolve_catalogue_items(client, db, tenants, tenant_headers):
+    headers = tenant_headers(tenants[0])
+    rice = str(_catalog_id(db, "arroz bedca"))
+    own = str(tenants[0].ingredients[0]["id"])
+    body = {"name": "Arroz con guarnición", "items": [{"ingredient_id": rice, "quantity_g": 200}, {"ingredient_id": own, "quantity_g": 100}]}
+    own_kcal = float(tenants[0].ingredients[0]["kcal_per_100g"])
+
+    res = client.post("/api/food/dish-templates", json=body, headers=headers)
+    assert res.status_code == 200, res.text
+    template = res.json()
+    items = {item["ingredient_id"]: item for item in template["items"]}
+    assert set(items) == {rice, own}
+    assert items[rice]["ingredient_name"] == "arroz bedca"
+    assert template["totals"]["kcal"] == 200.0 + own_kcal
+
+    customized = {"name": "arroz integral", "kcal_per_100g": 150, "protein_g_per_100g": 3, "carbs_g_per_100g": 30, "fat_g_per_100g": 1}
+    client.put(f"/api/food/ingredients/{rice}", json=customized, headers=headers)
+    template = client.get(f"/api/food/dish-templates/{template['id']}", headers=headers).json()
+    items = {item["ingredient_id"]: item for item in template["items"]}
+    assert items[rice]["ingredient_name"] == "arroz integral"
+    assert template["totals"]["kcal"] == 300.0 + own_kcal
+
+    used_by = client.get(f"/api/food/ingredients/{rice}/used-by", headers=headers).json()
+    assert [t["name"] for t in used_by] == ["Arroz con guarnición"]
+
+    # Another tenant can use the catalogue item, but not this tenant's own ingredient.
+    other = tenant_headers(tenants[1])
+    res = client.post("/api/food/dish-templates", json=body, headers=other)
+    assert (res.status_code, res.json()) == (404, {"detail": "ingredient_not_found"})
+    res = client.post("/api/food/dish-templates", json={**body, "items": body["items"][:1]}, headers=other)
+    assert res.json()["totals"]["kcal"] == 200.0
+
+
+def test_catalogue_reload_updates_items_in_place(db, tmp_path):
+    path = tmp_path / "bedca.csv"
+    path.write_text(
+        "source_id,name,kcal_per_100g,protein_g_per_100g,carbs_g_per_100g,fat_g_per_100g\n"
+        "1,Garbanzo,364,19,61,6\n"
+        "2,Aceite de oliva,899,0,0,99.9\n"
+        ",Sin id,1,1,1,1\n",
+        encoding="utf-8",
+    )
+    first = load_catalog_file(db, path, source="bedca")
+    assert (first.written, first.errors) == (2, [(4, "source_id: required")])
+    chickpea = db.execute(select(CatalogIngredient).where(CatalogIngredient.source_id == "1")).scalar_one()
+
+    path.write_text(
+        "source_id,name,kcal_per_100g,protein_g_per_100g,carbs_g_per_100g,fat_g_per_100g\n1,Garbanzo seco,360,20,60,6\n",
+        encoding="utf-8",
+    )
+    load_catalog_file(db, path, source="bedca")
+    db.expire_all()
+
+    assert db.execute(select(func.count()).select_from(CatalogIngredient)).scalar() == 2
+    reloaded = db.get(CatalogIngredient, chickpea.id)
+    assert (reloaded.name, reloaded.kcal_per_100g) == ("Garbanzo seco", 360)
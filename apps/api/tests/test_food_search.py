@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import uuid
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.bootstrap.api import create_app
+from app.core.db.base import Base
+from app.core.dependencies.auth import current_user, db_session
+from app.modules.auth.domain.models import Tenant
+from app.modules.food.domain.models import DishTemplate, Ingredient
+from app.modules.food.service.search import Cursor, InvalidCursor, decode_cursor, encode_cursor
+
+
+class TestFoodLibrarySearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine(
+            "sqlite+pysqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        cls.SessionLocal = sessionmaker(bind=cls.engine, expire_on_commit=False)
+        Base.metadata.create_all(cls.engine)
+
+    @classmethod
+    def tearDownClass(cls):
+        Base.metadata.drop_all(cls.engine)
+        cls.engine.dispose()
+
+    def setUp(self):
+        with self.SessionLocal() as session:
+            session.execute(delete(DishTemplate))
+            session.execute(delete(Ingredient))
+            session.execute(delete(Tenant))
+            session.commit()
+
+        self.tenant_id = uuid.uuid4()
+        self.other_tenant_id = uuid.uuid4()
+        self._add_tenants()
+
+        self.app = create_app()
+        self.current_user_ctx = SimpleNamespace(
+            id=uuid.uuid4(),
+            tenant_id=self.tenant_id,
+            role="worker",
+            is_active=True,
+        )
+
+        def override_db_session():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        self.app.dependency_overrides[current_user] = lambda: self.current_user_ctx
+        self.app.dependency_overrides[db_session] = override_db_session
+        self.client = TestClient(self.app)
+
+    def tearDown(self):
+        self.client.close()
+        self.app.dependency_overrides.clear()
+
+    def _add_tenants(self):
+        now = datetime.now(timezone.utc)
+        with self.SessionLocal() as session:
+            session.add_all(
+                [
+                    Tenant(id=self.tenant_id, created_at=now, status="active", subscription_status="trial"),
+                    Tenant(id=self.other_tenant_id, created_at=now, status="active", subscription_status="trial"),
+                ]
+            )
+            session.commit()
+
+    def _add_ingredients(self, names: list[str], tenant_id: uuid.UUID | None = None):
+        now = datetime.now(timezone.utc)
+        with self.SessionLocal() as session:
+            session.add_all(
+                [
+                    Ingredient(
+                        id=uuid.uuid4(),
+                        tenant_id=tenant_id or self.tenant_id,
+                        name=name,
+                        kcal_per_100g=Decimal("100"),
+                        protein_g_per_100g=Decimal("10"),
+                        carbs_g_per_100g=Decimal("5"),
+                        fat_g_per_100g=Decimal("1"),
+                        serving_size_g=None,
+                        created_at=now,
+                        updated_at=None,
+                    )
+                    for name in names
+                ]
+            )
+            session.commit()
+
+    def _walk(self, path: str, params: dict) -> tuple[list[list[str]], list[str | None]]:
+        pages: list[list[str]] = []
+        cursors: list[str | None] = []
+        after = None
+        while True:
+            res = self.client.get(path, params={**params, **({"after": after} if after else {})})
+            self.assertEqual(res.status_code, 200)
+            pages.append([row["name"] for row in res.json()])
+            after = res.headers.get("X-Next-Cursor")
+            cursors.append(after)
+            if after is None:
+                return pages, cursors
+
+    def test_cursor_pages_cover_library_once_in_name_order(self):
+        # Duplicate names make sure the id tie-breaker keeps pages disjoint.
+        names = [f"Item {i:02d}" for i in range(7)] + ["Item 03", "Item 03"]
+        self._add_ingredients(names)
+        self._add_ingredients(["Item 99"], tenant_id=self.other_tenant_id)
+
+        pages, cursors = self._walk("/api/food/ingredients", {"limit": 3})
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 3])
+        self.assertEqual([name for page in pages for name in page], sorted(names))
+        self.assertIsNone(cursors[-1])
+
+    def test_query_ranks_prefix_matches_first_and_pages_by_relevance(self):
+        self._add_ingredients(["Arroz con pollo", "Pollo asado", "Pechuga de pollo", "Pollo al curry", "Tomate"])
+
+        first = self.client.get("/api/food/ingredients", params={"query": "  POLLO ", "limit": 10})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(
+            [row["name"] for row in first.json()],
+            ["Pollo al curry", "Pollo asado", "Arroz con pollo", "Pechuga de pollo"],
+        )
+        self.assertNotIn("X-Next-Cursor", first.headers)
+
+        pages, _ = self._walk("/api/food/ingredients", {"query": "pollo", "limit": 1})
+        self.assertEqual(
+            [name for page in pages for name in page],
+            ["Pollo al curry", "Pollo asado", "Arroz con pollo", "Pechuga de pollo"],
+        )
+
+    def test_query_wildcards_are_matched_literally(self):
+        self._add_ingredients(["Leche 100%", "Leche entera", "Azucar_moreno", "Azucar blanco"])
+
+        percent = self.client.get("/api/food/ingredients", params={"query": "%"})
+        self.assertEqual([row["name"] for row in percent.json()], ["Leche 100%"])
+
+        underscore = self.client.get("/api/food/ingredients", params={"query": "r_m"})
+        self.assertEqual([row["name"] for row in underscore.json()], ["Azucar_moreno"])
+
+    def test_invalid_or_foreign_cursor_is_rejected(self):
+        self._add_ingredients(["Avena", "Arroz", "Almendra"])
+        first = self.client.get("/api/food/ingredients", params={"query": "a", "limit": 1})
+        cursor = first.headers["X-Next-Cursor"]
+
+        for params in (
+            {"after": "not-a-cursor"},
+            {"after": cursor},
+            {"after": cursor, "query": "ar"},
+        ):
+            res = self.client.get("/api/food/ingredients", params=params)
+            self.assertEqual(res.status_code, 400)
+            self.assertEqual(res.json(), {"detail": "invalid_cursor"})
+
+    def test_offset_is_still_supported(self):
+        self._add_ingredients(["A", "B", "C"])
+
+        res = self.client.get("/api/food/ingredients", params={"limit": 1, "offset": 1})
+        self.assertEqual([row["name"] for row in res.json()], ["B"])
+        self.assertIn("X-Next-Cursor", res.headers)
+
+    def test_dish_templates_use_the_same_cursor_paging(self):
+        now = datetime.now(timezone.utc)
+        with self.SessionLocal() as session:
+            session.add_all(
+                [
+                    DishTemplate(id=uuid.uuid4(), tenant_id=self.tenant_id, name=name, created_at=now, updated_at=None)
+                    for name in ("Ensalada", "Lentejas", "Sopa de lentejas", "Tortilla")
+                ]
+            )
+            session.add(
+                DishTemplate(id=uuid.uuid4(), tenant_id=self.other_tenant_id, name="Lentejas", created_at=now)
+            )
+            session.commit()
+
+        pages, _ = self._walk("/api/food/dish-templates", {"limit": 3})
+        self.assertEqual(pages, [["Ensalada", "Lentejas", "Sopa de lentejas"], ["Tortilla"]])
+
+        pages, _ = self._walk("/api/food/dish-templates", {"query": "lentejas", "limit": 1})
+        self.assertEqual([name for page in pages for name in page], ["Lentejas", "Sopa de lentejas"])
+
+
+class TestCursorEncoding(unittest.TestCase):
+    def test_round_trip_is_bound_to_query(self):
+        cursor = Cursor(score=4.25, name="Pollo ñ", id=uuid.uuid4())
+        token = encode_cursor(cursor, "pollo")
+
+        self.assertEqual(decode_cursor(token, "pollo"), cursor)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(token, "arroz")
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(token[:-3], "pollo")
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.modules.food.domain.models import DishTemplate
+from app.modules.food.service.catalog import catalog_row, load_catalog_file, upsert_catalog_ingredients
+from app.modules.food.service.macros import MacroPer100g, compute_template_totals
+
+
+_MACROS = ("kcal", "protein_g", "carbs_g", "fat_g")
+
+
+@pytest.fixture()
+def tenant(tenant_data):
+    return tenant_data(tenants=1, ingredients=40, dish_templates=30, items_per_template=5, clients=0, weeks=0)[0]
+
+
+def _expected_totals(data) -> dict[str, dict[str, float]]:
+    ingredients = {row["id"]: row for row in data.ingredients}
+    items: dict = {}
+    for item in data.items:
+        row = ingredients[item["ingredient_id"]]
+        per_100g = MacroPer100g(
+            kcal=row["kcal_per_100g"],
+            protein_g=row["protein_g_per_100g"],
+            carbs_g=row["carbs_g_per_100g"],
+            fat_g=row["fat_g_per_100g"],
+        )
+        items.setdefault(str(item["dish_template_id"]), []).append((per_100g, item["quantity_g"]))
+    return {
+        template_id: {macro: float(getattr(compute_template_totals(rows), macro)) for macro in _MACROS}
+        for template_id, rows in items.items()
+    }
+
+
+def test_stored_totals_match_the_computed_ones(tenant, tenant_headers, all_pages):
+    rows = all_pages("/api/food/dish-templates", tenant_headers(tenant), limit=200)
+
+    assert {row["id"]: row["totals"] for row in rows} == _expected_totals(tenant)
+
+
+def test_list_sorts_and_filters_by_totals(client, tenant, tenant_headers, all_pages):
+    headers = tenant_headers(tenant)
+    expected = _expected_totals(tenant)
+
+    rows = all_pages("/api/food/dish-templates", headers, sort="-kcal", limit=7)
+    assert [row["id"] for row in rows] == sorted(expected, key=lambda i: (expected[i]["kcal"], i), reverse=True)
+
+    proteins = sorted(t["protein_g"] for t in expected.values())
+    low, high = proteins[5], proteins[24]
+    rows = all_pages("/api/food/dish-templates", headers, sort="protein_g", min_protein_g=low, max_protein_g=high, limit=4)
+    assert [row["id"] for row in rows] == sorted(
+        (i for i, t in expected.items() if low <= t["protein_g"] <= high), key=lambda i: (expected[i]["protein_g"], i)
+    )
+
+    first = client.get("/api/food/dish-templates", params={"sort": "fat_g", "limit": 5}, headers=headers)
+    after = first.headers["X-Next-Cursor"]
+    res = client.get("/api/food/dish-templates", params={"sort": "kcal", "after": after}, headers=headers)
+    assert (res.status_code, res.json()) == (400, {"detail": "invalid_cursor"})
+
+
+def test_ingredient_edits_refresh_the_templates_using_it(client, db, tenant, tenant_headers, all_pages):
+    headers = tenant_headers(tenant)
+    item = tenant.items[0]
+    template_id = str(item["dish_template_id"])
+    before = client.get(f"/api/food/dish-templates/{template_id}", headers=headers).json()["totals"]
+    row = next(r for r in tenant.ingredients if r["id"] == item["ingredient_id"])
+    payload = {
+        "name": row["name"],
+        "kcal_per_100g": float(row["kcal_per_100g"]) + 100,
+        "protein_g_per_100g": float(row["protein_g_per_100g"]),
+        "carbs_g_per_100g": float(row["carbs_g_per_100g"]),
+        "fat_g_per_100g": float(row["fat_g_per_100g"]),
+    }
+
+    res = client.put(f"/api/food/ingredients/{item['ingredient_id']}", json=payload, headers=headers)
+
+    assert res.status_code == 200, res.text
+    listed = {row["id"]: row["totals"] for row in all_pages("/api/food/dish-templates", headers, limit=200)}
+    added = float(item["quantity_g"])
+    assert listed[template_id]["kcal"] == pytest.approx(before["kcal"] + added)
+    assert listed[template_id]["protein_g"] == before["protein_g"]
+    assert client.get(f"/api/food/dish-templates/{template_id}", headers=headers).json()["totals"] == listed[template_id]
+
+
+def test_catalogue_changes_refresh_the_templates_using_it(client, db, tmp_path, tenant_data, tenant_headers):
+    data = tenant_data(tenants=1, ingredients=1, dish_templates=0, clients=0, weeks=0)[0]
+    headers = tenant_headers(data)
+    row = {"source_id": "1", "name": "lenteja", "kcal_per_100g": 350, "protein_g_per_100g": 24, "carbs_g_per_100g": 50, "fat_g_per_100g": 1}
+    upsert_catalog_ingredients(db, [catalog_row(row, source="bedca", now=datetime.now(timezone.utc))])
+    db.commit()
+    lentil = client.get("/api/food/ingredients", params={"query": "lenteja"}, headers=headers).json()[0]["id"]
+    body = {"name": "Lentejas", "items": [{"ingredient_id": lentil, "quantity_g": 80}]}
+    template_id = uuid.UUID(client.post("/api/food/dish-templates", json=body, headers=headers).json()["id"])
+
+    def stored_kcal() -> Decimal:
+        db.expire_all()
+        return db.execute(select(DishTemplate.total_kcal).where(DishTemplate.id == template_id)).scalar_one()
+
+    assert stored_kcal() == Decimal("280.00")
+
+    customized = {"name": "lenteja pardina", "kcal_per_100g": 300, "protein_g_per_100g": 24, "carbs_g_per_100g": 50, "fat_g_per_100g": 1}
+    client.put(f"/api/food/ingredients/{lentil}", json=customized, headers=headers)
+    assert stored_kcal() == Decimal("240.00")
+
+    client.delete(f"/api/food/ingredients/{lentil}", headers=headers)
+    assert stored_kcal() == Decimal("280.00")
+
+    path = tmp_path / "bedca.csv"
+    path.write_text(
+        "source_id,name,kcal_per_100g,protein_g_per_100g,carbs_g_per_100g,fat_g_per_100g\n1,lenteja,325,24,50,1\n",
+        encoding="utf-8",
+    )
+    load_catalog_file(db, path, source="bedca")
+    assert stored_kcal() == Decimal("260.00")
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.jobs import Job, JobRunner, JobSchedule, JobStatus, Schedule, enqueue, registry
+from app.core.jobs.queue import JobRegistry, claim_next, mark_done, retry_delay
+from app.core.jobs.runner import ensure_schedules
+from app.modules.auth.domain.models import EmailVerificationToken, Tenant, User
+from app.modules.auth.service.maintenance import PURGE_VERIFICATION_TOKENS, purge_verification_tokens_job
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = datetime.now(timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, **kwargs) -> None:
+        self.now += timedelta(**kwargs)
+
+
+@pytest.fixture()
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture()
+def jobs() -> JobRegistry:
+    return JobRegistry()
+
+
+@pytest.fixture()
+def runner(session_factory, jobs: JobRegistry, clock: Clock) -> JobRunner:
+    return JobRunner(
+        session_factory,
+        workers=2,
+        job_registry=jobs,
+        visibility_timeout_seconds=60,
+        poll_seconds=0.01,
+        backoff_seconds=10,
+        clock=clock,
+    )
+
+
+def _jobs(db: Session) -> list[Job]:
+    db.expire_all()
+    return db.execute(select(Job).order_by(Job.created_at)).scalars().all()
+
+
+def _enqueue(db: Session, clock: Clock, kind: str, payload: dict | None = None, **kwargs) -> None:
+    enqueue(db, kind, payload, run_at=clock.now, **kwargs)
+    db.commit()
+
+
+def test_enqueued_job_runs_once_and_records_timing(db: Session, runner: JobRunner, jobs: JobRegistry, clock) -> None:
+    seen: list[dict] = []
+    jobs.register("test.echo")(lambda session, payload: seen.append(payload))
+    _enqueue(db, clock, "test.echo", {"n": 1})
+
+    assert runner.run_until_idle() == 1
+    assert runner.run_until_idle() == 0
+
+    assert seen == [{"n": 1}]
+    [job] = _jobs(db)
+    assert (job.status, job.attempts, job.last_error) == (JobStatus.done.value, 1, None)
+    assert job.duration_ms is not None and job.finished_at is not None
+    stats = runner.metrics.snapshot()["test.echo"]
+    assert (stats.runs, stats.succeeded) == (1, 1)
+
+
+def test_higher_priority_runs_first_and_future_jobs_wait(
+    db: Session, runner: JobRunner, jobs: JobRegistry, clock
+) -> None:
+    order: list[str] = []
+    jobs.register("test.order")(lambda session, payload: order.append(payload["name"]))
+    _enqueue(db, clock, "test.order", {"name": "low"})
+    _enqueue(db, clock, "test.order", {"name": "high"}, priority=10)
+    enqueue(db, "test.order", {"name": "later"}, priority=100, run_at=clock.now + timedelta(minutes=5))
+    db.commit()
+
+    runner.run_until_idle()
+    assert order == ["high", "low"]
+
+    clock.advance(minutes=5)
+    runner.run_until_idle()
+    assert order == ["high", "low", "later"]
+
+
+def test_unregistered_kinds_are_left_alone(db: Session, runner: JobRunner, clock) -> None:
+    _enqueue(db, clock, "other.service")
+
+    assert runner.run_until_idle() == 0
+    [job] = _jobs(db)
+    assert job.status == JobStatus.queued.value
+
+
+def test_failure_rolls_back_and_retries_with_backoff_then_fails(
+    db: Session, runner: JobRunner, jobs: JobRegistry, clock
+) -> None:
+    @jobs.register("test.flaky")
+    def flaky(session: Session, payload: dict) -> None:
+        session.add(Tenant(id=uuid.uuid4()))
+        raise RuntimeError("boom")
+
+    _enqueue(db, clock, "test.flaky", max_attempts=2)
+
+    assert runner.run_one()
+    [job] = _jobs(db)
+    assert (job.status, job.attempts, job.last_error) == (JobStatus.queued.value, 1, "RuntimeError: boom")
+    assert db.execute(select(Tenant)).first() is None
+
+    # Not due until the backoff has passed.
+    assert not runner.run_one()
+    clock.advance(seconds=retry_delay(1, 10).total_seconds())
+    assert runner.run_one()
+
+    [job] = _jobs(db)
+    assert (job.status, job.attempts) == (JobStatus.failed.value, 2)
+    stats = runner.metrics.snapshot()["test.flaky"]
+    assert (stats.retried, stats.failed) == (1, 1)
+
+
+def test_expired_visibility_timeout_hands_job_to_another_worker(
+    db: Session, session_factory, runner: JobRunner, jobs: JobRegistry, clock
+) -> None:
+    runs: list[int] = []
+    jobs.register("test.slow")(lambda session, payload: runs.append(1))
+    _enqueue(db, clock, "test.slow")
+
+    # A worker claims the job and then dies.
+    with session_factory() as session:
+        stale = claim_next(
+            session, kinds=["test.slow"], worker_id="dead", visibility_timeout=timedelta(seconds=60), now=clock.now
+        )
+    assert stale is not None
+    assert not runner.run_one()
+
+    clock.advance(seconds=60)
+    assert runner.run_one()
+    assert runs == [1]
+
+    # The dead worker's late completion must not touch the newer claim.
+    with session_factory() as session:
+        assert not mark_done(session, stale, now=clock.now, duration_ms=1)
+        session.commit()
+    [job] = _jobs(db)
+    assert (job.status, job.attempts) == (JobStatus.done.value, 2)
+
+
+def test_job_timed_out_on_last_attempt_is_failed(
+    db: Session, session_factory, runner: JobRunner, jobs: JobRegistry, clock
+) -> None:
+    jobs.register("test.hang")(lambda session, payload: None)
+    _enqueue(db, clock, "test.hang", max_attempts=1)
+    with session_factory() as session:
+        claim_next(
+            session, kinds=["test.hang"], worker_id="dead", visibility_timeout=timedelta(seconds=60), now=clock.now
+        )
+
+    clock.advance(seconds=61)
+    assert not runner.run_one()
+    [job] = _jobs(db)
+    assert (job.status, job.last_error) == (JobStatus.failed.value, "visibility_timeout")
+
+
+def test_schedules_enqueue_once_per_interval(db: Session, session_factory, runner: JobRunner, clock) -> None:
+    schedule = Schedule("test.every-hour", "test.tick", timedelta(hours=1), payload={"x": 1})
+    with session_factory() as session:
+        ensure_schedules(session, [schedule], now=clock.now)
+        # A second runner registering the same schedule is harmless.
+        ensure_schedules(session, [schedule], now=clock.now)
+
+    assert runner.tick_schedules() == 1
+    assert runner.tick_schedules() == 0
+    clock.advance(minutes=59)
+    assert runner.tick_schedules() == 0
+
+    # Missed ticks collapse into one run.
+    clock.advance(hours=5)
+    assert runner.tick_schedules() == 1
+
+    jobs_ = _jobs(db)
+    assert [(j.kind, j.payload) for j in jobs_] == [("test.tick", {"x": 1})] * 2
+    [row] = db.execute(select(JobSchedule)).scalars().all()
+    assert row.next_run_at.replace(tzinfo=timezone.utc) == clock.now + timedelta(hours=1)
+
+
+def test_worker_threads_drain_the_queue_and_stop(db: Session, runner: JobRunner, jobs: JobRegistry, clock) -> None:
+    done = threading.Event()
+    seen: list[int] = []
+    lock = threading.Lock()
+
+    @jobs.register("test.count")
+    def count(session: Session, payload: dict) -> None:
+        with lock:
+            seen.append(payload["i"])
+            if len(seen) == 10:
+                done.set()
+
+    for i in range(10):
+        enqueue(db, "test.count", {"i": i}, run_at=clock.now)
+    db.commit()
+
+    stop = threading.Event()
+    runner.start(stop)
+    try:
+        assert done.wait(10)
+    finally:
+        stop.set()
+        runner.join()
+
+    assert sorted(seen) == list(range(10))
+    assert {job.status for job in _jobs(db)} == {JobStatus.done.value}
+
+
+def test_purge_verification_tokens_keeps_live_tokens(db: Session) -> None:
+    now = datetime.now(timezone.utc)
+    tenant = Tenant(id=uuid.uuid4())
+    user = User(id=uuid.uuid4(), tenant_id=tenant.id, role="worker", email="purge@example.com", password_hash="x")
+    db.add_all([tenant, user])
+    db.flush()
+
+    def token(**kwargs) -> EmailVerificationToken:
+        return EmailVerificationToken(
+            id=uuid.uuid4(), tenant_id=tenant.id, user_id=user.id, token_hash=uuid.uuid4().bytes, **kwargs
+        )
+
+    live = token(expires_at=now + timedelta(hours=1))
+    db.add_all(
+        [
+            live,
+            token(expires_at=now - timedelta(days=3)),
+            token(expires_at=now + timedelta(hours=1), consumed_at=now - timedelta(days=2)),
+        ]
+    )
+    db.commit()
+
+    purge_verification_tokens_job(db, {})
+    db.commit()
+
+    assert [t.id for t in db.execute(select(EmailVerificationToken)).scalars()] == [live.id]
+    assert registry.get(PURGE_VERIFICATION_TOKENS) is purge_verification_tokens_job
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import re
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.db.instrumentation import InstrumentedQueuePool, pool_status
+from app.core.web.metrics import CONTENT_TYPE, MetricsRegistry
+from app.modules.auth.domain.models import User
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_endpoint_reports_route_latency_and_sql(client: TestClient, worker: User, auth_headers) -> None:
+    assert client.get("/api/health").status_code == 200
+    missing = client.get(f"/api/food/ingredients/{uuid.uuid4()}", headers=auth_headers(worker))
+    assert missing.status_code == 404
+    assert client.get("/no/such/path").status_code == 404
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == CONTENT_TYPE
+    samples = _samples(res.text)
+
+    health = 'method="GET",route="/api/health",status="200"'
+    assert samples[f'http_request_duration_seconds_count{{{health}}}'] == 1
+    assert samples[f'http_request_duration_seconds_bucket{{{health},le="+Inf"}}'] == 1
+    assert samples[f'http_request_db_statements_sum{{{health}}}'] == 0
+
+    # Labelled by template, not by the raw path; SQL run in the threadpool is attributed to the request.
+    ingredient = 'method="GET",route="/api/food/ingredients/{ingredient_id}",status="404"'
+    assert samples[f'http_request_duration_seconds_count{{{ingredient}}}'] == 1
+    assert samples[f'http_request_db_statements_sum{{{ingredient}}}'] >= 1
+    assert samples[f'http_request_db_seconds_sum{{{ingredient}}}'] > 0
+
+    assert samples['http_request_duration_seconds_count{method="GET",route="<unmatched>",status="404"}'] == 1
+    assert samples['http_requests_in_flight{method="GET"}'] == 0
+    assert samples["db_statements_total"] >= 1
+    assert "auth_password_hash_pending" in samples
+
+    # The scrape itself is not recorded.
+    assert not any('route="/metrics"' in name for name in samples)
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("job_seconds", "Job time.", ("kind",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(('say "hi"',), value)
+
+    samples = _samples(registry.render())
+
+    labels = 'kind="say \\"hi\\""'
+    assert samples[f'job_seconds_bucket{{{labels},le="0.1"}}'] == 2
+    assert samples[f'job_seconds_bucket{{{labels},le="1.0"}}'] == 3
+    assert samples[f'job_seconds_bucket{{{labels},le="+Inf"}}'] == 4
+    assert samples[f"job_seconds_count{{{labels}}}"] == 4
+    assert samples[f"job_seconds_sum{{{labels}}}"] == pytest.approx(3.65)
+
+
+def test_instrumented_pool_reports_usage_and_timeouts(tmp_path: Path) -> None:
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        with engine.connect():
+            status = pool_status(engine)
+            assert (status.size, status.checked_out, status.overflow) == (1, 1, 0)
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+
+        status = pool_status(engine)
+        assert (status.checked_out, status.checked_in) == (0, 1)
+        assert (status.wait.checkouts, status.wait.timeouts) == (2, 1)
+        assert status.wait.wait_seconds_max >= 0.05
+    finally:
+        engine.dispose()
+
+
+def test_metric_names_are_valid(client: TestClient) -> None:
+    client.get("/api/health")
+    for line in client.get("/metrics").text.splitlines():
+        if line.startswith("# TYPE"):
+            assert re.fullmatch(r"# TYPE [a-zA-Z_:][a-zA-Z0-9_:]* (counter|gauge|histogram)", line)
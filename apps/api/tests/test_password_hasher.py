@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.modules.auth.domain.enums import SubscriptionStatus, TenantStatus, UserRole
+from app.modules.auth.domain.models import Tenant, User
+from app.modules.auth.security.passwords import hash_password, hash_rounds, needs_rehash, verify_password
+from app.modules.auth.service import password_hasher as password_hasher_module
+from app.modules.auth.service.access_mode import now_utc
+from app.modules.auth.service.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def _create_worker(db: Session, *, email: str, password: str, rounds: int) -> User:
+    tenant = Tenant(
+        id=uuid.uuid4(),
+        status=TenantStatus.active.value,
+        subscription_status=SubscriptionStatus.trial.value,
+        trial_starts_at=now_utc() - timedelta(days=1),
+        trial_ends_at=now_utc() + timedelta(days=30),
+    )
+    db.add(tenant)
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        role=UserRole.worker.value,
+        email=email,
+        email_verified_at=now_utc(),
+        password_hash=hash_password(password, rounds),
+        is_active=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_needs_rehash_follows_configured_rounds() -> None:
+    password_hash = hash_password("12345678aA!", 4)
+    assert hash_rounds(password_hash) == 4
+    assert needs_rehash(password_hash, 4) is False
+    assert needs_rehash(password_hash, 5) is True
+    assert needs_rehash("not-a-bcrypt-hash", 4) is True
+
+
+def test_login_rehashes_when_cost_changes(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user = _create_worker(db, email="rehash@example.com", password="12345678aA!", rounds=4)
+    monkeypatch.setattr(settings, "auth_bcrypt_rounds", 5)
+
+    res = client.post("/api/auth/login", json={"email": "rehash@example.com", "password": "12345678aA!"})
+    assert res.status_code == 200
+
+    db.expire_all()
+    stored = db.execute(select(User.password_hash).where(User.id == user.id)).scalar_one()
+    assert hash_rounds(stored) == 5
+    assert verify_password("12345678aA!", stored)
+
+    # Wrong passwords never trigger a rehash.
+    monkeypatch.setattr(settings, "auth_bcrypt_rounds", 6)
+    res = client.post("/api/auth/login", json={"email": "rehash@example.com", "password": "wrong-password"})
+    assert res.status_code == 401
+    db.expire_all()
+    assert db.execute(select(User.password_hash).where(User.id == user.id)).scalar_one() == stored
+
+
+def test_login_returns_503_when_hasher_is_saturated(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _create_worker(db, email="busy@example.com", password="12345678aA!", rounds=4)
+
+    async def busy(*args, **kwargs):
+        raise PasswordHasherBusy("full")
+
+    monkeypatch.setattr(password_hasher_module.password_hasher, "verify", busy)
+    res = client.post("/api/auth/login", json={"email": "busy@example.com", "password": "12345678aA!"})
+    assert res.status_code == 503
+    assert res.json() == {"detail": "auth_busy"}
+
+
+def test_hasher_caps_pending_work_and_reports_queue_depth() -> None:
+    hasher = PasswordHasher(pool="thread", workers=1, max_pending=2)
+    release = threading.Event()
+
+    def blocked(value: str) -> str:
+        release.wait(5)
+        return value
+
+    async def scenario():
+        first = asyncio.ensure_future(hasher._run(blocked, "a"))
+        second = asyncio.ensure_future(hasher._run(blocked, "b"))
+        await asyncio.sleep(0.05)
+
+        stats = hasher.stats()
+        assert (stats.pending, stats.queue_depth) == (2, 1)
+
+        with pytest.raises(PasswordHasherBusy):
+            await hasher._run(blocked, "c")
+
+        release.set()
+        return await asyncio.gather(first, second)
+
+    try:
+        assert asyncio.run(scenario()) == ["a", "b"]
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert stats.pending == 0
+    assert stats.completed == 2
+    assert stats.rejected == 1
+    assert stats.max_queue_depth == 1
+
+
+def test_process_pool_hashes_and_verifies() -> None:
+    hasher = PasswordHasher(pool="process", workers=1, max_pending=4)
+
+    async def scenario():
+        password_hash = await hasher.hash("12345678aA!")
+        return await hasher.verify("12345678aA!", password_hash), await hasher.verify("nope", password_hash)
+
+    try:
+        assert asyncio.run(scenario()) == (True, False)
+    finally:
+        hasher.shutdown()
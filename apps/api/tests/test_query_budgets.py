@@ -0,0 +1,497 @@
+"""
+SQL statement and response-size budgets for every API endpoint.
+
+The data set is seeded once per module at realistic volumes (a tenant with 5k
+ingredients, a 2k-item shared catalogue and 500 dish templates), so a reintroduced per-row lookup shows
+up as extra statements, not as a slower and flakier timing. Budgets are exact
+current counts: when a change legitimately adds a query, update the budget in
+the same change.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Callable, Generator
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.bootstrap.api import create_app
+from app.core.db.base import Base
+from app.core.dependencies.auth import db_session
+from app.modules.auth.domain.enums import SubscriptionStatus, TenantStatus, UserRole
+from app.modules.auth.domain.models import Tenant, User
+from app.modules.auth.security import hash_password
+from app.modules.auth.security.jwt_tokens import create_access_token
+from app.modules.auth.service.user_cache import user_cache
+from app.modules.food.domain.models import CatalogIngredient, DishTemplate, DishTemplateItem, Ingredient
+from app.modules.food.service.library import refresh_template_totals
+from app.modules.nutrition.domain.models import NutritionProfile
+
+
+INGREDIENTS = 5_000
+CATALOG_INGREDIENTS = 2_000
+# Catalogue items the tenant has customized.
+OVERLAYS = 100
+DISH_TEMPLATES = 500
+ITEMS_PER_TEMPLATE = 6
+PASSWORD = "Budget-pass-123"
+
+_FOODS = ["pollo", "arroz", "tomate", "lenteja", "atún", "avena", "yogur", "pan", "huevo", "manzana"]
+_STYLES = ["crudo", "cocido", "integral", "light", "en conserva"]
+
+
+@dataclass
+class BudgetEnv:
+    client: TestClient
+    session_factory: Callable[[], Session]
+    tenant_id: uuid.UUID
+    user: User
+    headers: dict[str, str]
+    ingredient_id: uuid.UUID
+    template_id: uuid.UUID
+    ingredient_ids: list[uuid.UUID] = field(default_factory=list)
+    catalog_ids: list[uuid.UUID] = field(default_factory=list)
+
+
+def _seed(session: Session) -> BudgetEnv:
+    now = datetime.now(timezone.utc)
+    tenant = Tenant(
+        id=uuid.uuid4(),
+        status=TenantStatus.active.value,
+        subscription_status=SubscriptionStatus.trial.value,
+        trial_starts_at=now - timedelta(days=1),
+        trial_ends_at=now + timedelta(days=30),
+    )
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        role=UserRole.worker.value,
+        email="budget@example.com",
+        email_verified_at=now,
+        password_hash=hash_password(PASSWORD),
+        is_active=True,
+    )
+    session.add_all([tenant, user])
+    session.flush()
+    session.add(
+        NutritionProfile(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            user_id=user.id,
+            sex="female",
+            birth_date=date(1990, 5, 17),
+            height_cm=168,
+            weight_kg=Decimal("61.5"),
+            activity_level="moderate",
+            goal="maintain",
+        )
+    )
+
+    ingredient_ids = [uuid.uuid4() for _ in range(INGREDIENTS)]
+    session.execute(
+        insert(Ingredient),
+        [
+            {
+                "id": ingredient_id,
+                "tenant_id": tenant.id,
+                "name": f"{_FOODS[i % len(_FOODS)]} {_STYLES[i % len(_STYLES)]} {i:04d}",
+                "kcal_per_100g": Decimal(50 + i % 400),
+                "protein_g_per_100g": Decimal(i % 30),
+                "carbs_g_per_100g": Decimal(i % 70),
+                "fat_g_per_100g": Decimal(i % 20),
+                "serving_size_g": Decimal(100) if i % 3 == 0 else None,
+                "created_at": now,
+            }
+            for i, ingredient_id in enumerate(ingredient_ids)
+        ],
+    )
+
+    catalog_ids = [uuid.uuid4() for _ in range(CATALOG_INGREDIENTS)]
+    session.execute(
+        insert(CatalogIngredient),
+        [
+            {
+                "id": catalog_id,
+                "source": "bedca",
+                "source_id": str(i),
+                "name": f"{_FOODS[i % len(_FOODS)]} {_STYLES[(i + 2) % len(_STYLES)]} bedca {i:04d}",
+                "kcal_per_100g": Decimal(40 + i % 500),
+                "protein_g_per_100g": Decimal(i % 25),
+                "carbs_g_per_100g": Decimal(i % 60),
+                "fat_g_per_100g": Decimal(i % 15),
+                "serving_size_g": None,
+                "created_at": now,
+            }
+            for i, catalog_id in enumerate(catalog_ids)
+        ],
+    )
+    session.execute(
+        insert(Ingredient),
+        [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant.id,
+                "catalog_ingredient_id": catalog_id,
+                "name": f"{_FOODS[i % len(_FOODS)]} casero {i:04d}",
+                "kcal_per_100g": Decimal(60),
+                "protein_g_per_100g": Decimal(5),
+                "carbs_g_per_100g": Decimal(5),
+                "fat_g_per_100g": Decimal(2),
+                "serving_size_g": Decimal(120),
+                "created_at": now,
+            }
+            for i, catalog_id in enumerate(catalog_ids[:OVERLAYS])
+        ],
+    )
+
+    template_ids = [uuid.uuid4() for _ in range(DISH_TEMPLATES)]
+    session.execute(
+        insert(DishTemplate),
+        [
+            {"id": template_id, "tenant_id": tenant.id, "name": f"Plato {i:03d}", "created_at": now}
+            for i, template_id in enumerate(template_ids)
+        ],
+    )
+    # Core insert: the ORM one splits the batch by which of the two ids is set.
+    session.execute(
+        insert(DishTemplateItem.__table__),
+        [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant.id,
+                "dish_template_id": template_id,
+                # The first 1000 ingredients are shared by the templates; the rest are unused.
+                # Every third item uses a catalogue item instead, customized or not.
+                "ingredient_id": None if k % 3 == 2 else ingredient_ids[(t * ITEMS_PER_TEMPLATE + k) % 1000],
+                "catalog_ingredient_id": catalog_ids[t % 200] if k % 3 == 2 else None,
+                "quantity_g": Decimal(40 + 10 * k),
+                "created_at": now + timedelta(microseconds=k),
+            }
+            for t, template_id in enumerate(template_ids)
+            for k in range(ITEMS_PER_TEMPLATE)
+        ],
+    )
+    refresh_template_totals(session, template_ids)
+    session.commit()
+
+    token = create_access_token(sub=str(user.id), tenant_id=str(tenant.id), role=user.role, access_mode="active")
+    return BudgetEnv(
+        client=None,  # type: ignore[arg-type]
+        session_factory=None,  # type: ignore[arg-type]
+        tenant_id=tenant.id,
+        user=user,
+        headers={"Authorization": f"Bearer {token.token}"},
+        ingredient_id=ingredient_ids[0],
+        template_id=template_ids[0],
+        ingredient_ids=ingredient_ids,
+        catalog_ids=catalog_ids,
+    )
+
+
+@pytest.fixture(scope="module")
+def env(tmp_path_factory: pytest.TempPathFactory) -> Generator[BudgetEnv, None, None]:
+    db_path: Path = tmp_path_factory.mktemp("budgets") / "budgets.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    with factory() as session:
+        seeded = _seed(session)
+
+    app = create_app()
+
+    def override_db_session():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[db_session] = override_db_session
+    with TestClient(app) as client:
+        seeded.client = client
+        seeded.session_factory = factory
+        yield seeded
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _cold_user_cache() -> Generator[None, None, None]:
+    # Budgets are for the cold path: the user lookup is part of the count.
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def _fresh_ingredient(env: BudgetEnv) -> uuid.UUID:
+    row = Ingredient(
+        id=uuid.uuid4(),
+        tenant_id=env.tenant_id,
+        name="borrable",
+        kcal_per_100g=Decimal(10),
+        protein_g_per_100g=Decimal(1),
+        carbs_g_per_100g=Decimal(1),
+        fat_g_per_100g=Decimal(1),
+    )
+    with env.session_factory() as session:
+        session.add(row)
+        session.commit()
+    return row.id
+
+
+def _fresh_template(env: BudgetEnv) -> uuid.UUID:
+    template = DishTemplate(id=uuid.uuid4(), tenant_id=env.tenant_id, name="borrable")
+    with env.session_factory() as session:
+        session.add(template)
+        session.flush()
+        session.add(
+            DishTemplateItem(
+                id=uuid.uuid4(),
+                tenant_id=env.tenant_id,
+                dish_template_id=template.id,
+                ingredient_id=env.ingredient_id,
+                quantity_g=Decimal(100),
+            )
+        )
+        session.flush()
+        refresh_template_totals(session, [template.id])
+        session.commit()
+    return template.id
+
+
+def _template_payload(env: BudgetEnv, name: str = "Plato nuevo") -> dict:
+    ids = env.ingredient_ids[:6] + env.catalog_ids[OVERLAYS - 1 : OVERLAYS + 1]
+    return {
+        "name": name,
+        "items": [{"ingredient_id": str(i), "quantity_g": 50 + 10 * n} for n, i in enumerate(ids)],
+    }
+
+
+def _seeded_ingredient(env: BudgetEnv) -> tuple[dict, None]:
+    return {"ingredient_id": env.ingredient_id}, None
+
+
+def _fresh_ingredient_id(env: BudgetEnv) -> tuple[dict, None]:
+    return {"ingredient_id": _fresh_ingredient(env)}, None
+
+
+def _catalog_ingredient(env: BudgetEnv) -> tuple[dict, None]:
+    return {"ingredient_id": env.catalog_ids[1_999]}, None
+
+
+def _fresh_overlay_id(env: BudgetEnv) -> tuple[dict, None]:
+    catalog_id = env.catalog_ids[1_000]
+    with env.session_factory() as session:
+        session.add(
+            Ingredient(
+                id=uuid.uuid4(),
+                tenant_id=env.tenant_id,
+                catalog_ingredient_id=catalog_id,
+                name="personalizado",
+                kcal_per_100g=Decimal(10),
+                protein_g_per_100g=Decimal(1),
+                carbs_g_per_100g=Decimal(1),
+                fat_g_per_100g=Decimal(1),
+            )
+        )
+        session.commit()
+    return {"ingredient_id": catalog_id}, None
+
+
+def _seeded_template(env: BudgetEnv) -> tuple[dict, None]:
+    return {"template_id": env.template_id}, None
+
+
+def _fresh_template_id(env: BudgetEnv) -> tuple[dict, None]:
+    return {"template_id": _fresh_template(env)}, None
+
+
+_INGREDIENT_PAYLOAD = {
+    "name": "garbanzo cocido",
+    "kcal_per_100g": 139,
+    "protein_g_per_100g": 7.2,
+    "carbs_g_per_100g": 18.6,
+    "fat_g_per_100g": 2.1,
+    "serving_size_g": 150,
+}
+
+_PROFILE_PAYLOAD = {
+    "sex": "female",
+    "birth_date": "1990-05-17",
+    "height_cm": 168,
+    "weight_kg": 60.0,
+    "activity_level": "moderate",
+    "goal": "cut",
+}
+
+
+@dataclass(frozen=True)
+class Case:
+    method: str
+    path: str
+    max_statements: int
+    max_bytes: int
+    # Builds `(format params, json body)` against the seeded data.
+    prepare: Callable[[BudgetEnv], tuple[dict, dict | None]] = lambda env: ({}, None)
+    status: int = 200
+    auth: bool = True
+    max_repeats: int = 1
+
+
+CASES = {
+    # food
+    "list_ingredients": Case("GET", "/api/food/ingredients", 2, 18_000),
+    "list_ingredients_max_page": Case("GET", "/api/food/ingredients?limit=200", 2, 72_000),
+    "search_ingredients": Case("GET", "/api/food/ingredients?query=pollo&limit=50", 2, 18_000),
+    "get_ingredient": Case(
+        "GET", "/api/food/ingredients/{ingredient_id}", 2, 400, _seeded_ingredient
+    ),
+    "create_ingredient": Case("POST", "/api/food/ingredients", 2, 400, lambda env: ({}, _INGREDIENT_PAYLOAD)),
+    "update_ingredient": Case(
+        "PUT",
+        "/api/food/ingredients/{ingredient_id}",
+        4,
+        400,
+        lambda env: ({"ingredient_id": env.ingredient_ids[4_999]}, _INGREDIENT_PAYLOAD),
+    ),
+    # The templates using the ingredient get their totals refreshed in one UPDATE, however many there are.
+    "update_used_ingredient": Case(
+        "PUT",
+        "/api/food/ingredients/{ingredient_id}",
+        4,
+        400,
+        lambda env: ({"ingredient_id": env.ingredient_ids[1]}, _INGREDIENT_PAYLOAD),
+    ),
+    "get_catalog_ingredient": Case(
+        "GET", "/api/food/ingredients/{ingredient_id}", 2, 400, _catalog_ingredient
+    ),
+    # The first edit of a catalogue item writes the tenant's copy.
+    "customize_catalog_ingredient": Case(
+        "PUT",
+        "/api/food/ingredients/{ingredient_id}",
+        5,
+        450,
+        lambda env: ({"ingredient_id": env.catalog_ids[1_500]}, _INGREDIENT_PAYLOAD),
+    ),
+    "ingredient_used_by": Case(
+        "GET", "/api/food/ingredients/{ingredient_id}/used-by", 3, 2_000, _seeded_ingredient
+    ),
+    "delete_ingredient": Case(
+        "DELETE", "/api/food/ingredients/{ingredient_id}", 4, 100, _fresh_ingredient_id
+    ),
+    "revert_catalog_ingredient": Case(
+        "DELETE", "/api/food/ingredients/{ingredient_id}", 4, 100, _fresh_overlay_id
+    ),
+    "export_ingredients": Case("GET", "/api/food/ingredients:export", 2, 1_300_000),
+    "export_ingredients_csv": Case("GET", "/api/food/ingredients:export?format=csv", 2, 580_000),
+    "list_dish_templates": Case("GET", "/api/food/dish-templates", 2, 13_000),
+    "list_dish_templates_by_kcal": Case("GET", "/api/food/dish-templates?sort=-kcal", 2, 13_000),
+    "filter_dish_templates": Case(
+        "GET", "/api/food/dish-templates?sort=protein_g&min_protein_g=40&max_kcal=900&query=plato", 2, 13_000
+    ),
+    "list_dish_templates_max_page": Case("GET", "/api/food/dish-templates?limit=200", 2, 52_000),
+    "get_dish_template": Case(
+        "GET", "/api/food/dish-templates/{template_id}", 3, 1_200, _seeded_template
+    ),
+    "create_dish_template": Case(
+        "POST", "/api/food/dish-templates", 7, 1_500, lambda env: ({}, _template_payload(env))
+    ),
+    "update_dish_template": Case(
+        "PUT",
+        "/api/food/dish-templates/{template_id}",
+        10,
+        1_500,
+        lambda env: ({"template_id": _fresh_template(env)}, _template_payload(env, "Plato editado")),
+        # The response re-reads the template it just updated.
+        max_repeats=2,
+    ),
+    "delete_dish_template": Case(
+        "DELETE", "/api/food/dish-templates/{template_id}", 3, 100, _fresh_template_id
+    ),
+    # nutrition
+    "get_profile": Case("GET", "/api/nutrition/profile/me", 2, 550),
+    "put_profile": Case("PUT", "/api/nutrition/profile/me", 3, 550, lambda env: ({}, _PROFILE_PAYLOAD)),
+    "get_targets": Case("GET", "/api/nutrition/targets/me", 2, 250),
+    # auth
+    "me": Case("GET", "/api/auth/me", 2, 250),
+    "login": Case(
+        "POST",
+        "/api/auth/login",
+        2,
+        500,
+        lambda env: ({}, {"email": "budget@example.com", "password": PASSWORD}),
+        auth=False,
+    ),
+    "register": Case(
+        "POST",
+        "/api/auth/register",
+        5,
+        150,
+        lambda env: ({}, {"email": f"{uuid.uuid4().hex}@example.com", "password": "12345678aA!"}),
+        auth=False,
+    ),
+}
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_endpoint_stays_within_budget(name: str, env: BudgetEnv, query_budget) -> None:
+    case = CASES[name]
+    params, body = case.prepare(env)
+    headers = env.headers if case.auth else {}
+
+    with query_budget(max_statements=case.max_statements, max_repeats=case.max_repeats):
+        res = env.client.request(case.method, case.path.format(**params), json=body, headers=headers)
+
+    assert res.status_code == case.status, res.text
+    assert len(res.content) <= case.max_bytes, f"{name}: {len(res.content)} bytes (ceiling {case.max_bytes})"
+
+
+def test_verify_email_stays_within_budget(env: BudgetEnv, query_budget) -> None:
+    res = env.client.post("/api/auth/register", json={"email": "verify-budget@example.com", "password": "12345678aA!"})
+    token = res.json()["dev_verify_token"]
+
+    with query_budget(max_statements=6):
+        res = env.client.get("/api/auth/verify-email", params={"token": token})
+
+    assert res.status_code == 200
+    assert len(res.content) <= 100
+
+
+def test_bulk_import_stays_within_budget(env: BudgetEnv, query_budget) -> None:
+    # 1,200 rows go in as three 500-row INSERT batches: the repeat is per batch, not per row.
+    header = "name,kcal_per_100g,protein_g_per_100g,carbs_g_per_100g,fat_g_per_100g,serving_size_g\n"
+    body = header + "".join(f"importado {i},120,10.5,3,2,{i % 3 * 50 or ''}\n" for i in range(1_200))
+
+    with query_budget(max_statements=4, max_repeats=3):
+        res = env.client.post(
+            "/api/food/ingredients:import",
+            content=body.encode(),
+            headers={**env.headers, "Content-Type": "text/csv"},
+        )
+
+    assert res.status_code == 200, res.text
+    assert res.json()["imported"] == 1_200
+    assert len(res.content) <= 100
+
+
+def test_every_route_has_a_budget(env: BudgetEnv) -> None:
+    budgeted = {(c.method, c.path.split("?")[0]) for c in CASES.values()} | {
+        ("GET", "/api/auth/verify-email"),
+        ("POST", "/api/food/ingredients:import"),
+    }
+    # POST /verify-email shares its handler (and queries) with the GET link.
+    exempt = {("POST", "/api/auth/verify-email")}
+    routes = {
+        (method, route.path)
+        for route in env.client.app.routes
+        if route.path.startswith("/api/") and route.path != "/api/health"
+        for method in getattr(route, "methods", ())
+    }
+    missing = sorted(routes - budgeted - exempt)
+    assert not missing, f"endpoints without a query budget: {missing}"
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db.instrumentation import fingerprint, install_query_listeners, start_query_stats, stop_query_stats
+from app.modules.auth.domain.models import User
+from app.modules.auth.service.user_cache import user_cache
+
+
+@pytest.fixture(autouse=True)
+def _listeners_and_empty_cache():
+    install_query_listeners()
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.mark.parametrize(
+    ("sql", "expected"),
+    [
+        (
+            "SELECT users.id FROM users WHERE users.id = %(pk_1)s::UUID LIMIT %(param_1)s",
+            "SELECT users.id FROM users WHERE users.id = ?::UUID LIMIT ?",
+        ),
+        (
+            "select * from t1 where name = 'it''s' and n in (1, 2, 3) and k = :k -- note",
+            "select * from t1 where name = ? and n in (?...) and k = ?",
+        ),
+        (
+            "SELECT x FROM t WHERE a = ? AND b = $2 AND c IN (?, ?)",
+            "SELECT x FROM t WHERE a = ? AND b = ? AND c IN (?...)",
+        ),
+    ],
+)
+def test_fingerprint_normalizes_literals_and_placeholders(sql: str, expected: str) -> None:
+    assert fingerprint(sql) == expected
+
+
+def test_repeated_statement_is_reported_as_n_plus_one(
+    db: Session, make_worker, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr(settings, "db_repeated_query_threshold", 2)
+    ids = [make_worker().id for _ in range(3)]
+
+    stats, token = start_query_stats(lambda: "GET /test/loop")
+    with caplog.at_level(logging.WARNING, logger="app.db.queries"):
+        for user_id in ids:
+            db.execute(select(User.email).where(User.id == user_id)).one()
+        db.execute(text("SELECT 1")).one()
+        stop_query_stats(token)
+
+    assert stats.statements == 4
+    [record] = caplog.records
+    assert record.getMessage().startswith("Possible N+1 on GET /test/loop: 3 runs of SELECT users.email FROM users")
+
+
+def test_no_warning_below_threshold_or_when_disabled(
+    db: Session, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    for threshold in (0, 5):
+        monkeypatch.setattr(settings, "db_repeated_query_threshold", threshold)
+        _, token = start_query_stats()
+        with caplog.at_level(logging.WARNING, logger="app.db.queries"):
+            for _ in range(3):
+                db.execute(text("SELECT 1")).one()
+            stop_query_stats(token)
+    assert caplog.records == []
+
+
+def test_slow_query_is_logged_with_route(
+    client: TestClient, worker: User, auth_headers, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    headers = auth_headers(worker)
+    monkeypatch.setattr(settings, "db_slow_query_ms", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.queries"):
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages
+    assert all(" on GET /api/auth/me: SELECT " in m for m in messages)
+
+
+def test_query_budget_fixture_passes_and_fails(client: TestClient, worker: User, auth_headers, query_budget) -> None:
+    headers = auth_headers(worker)
+
+    with query_budget(max_statements=5) as requests:
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+    [me] = requests
+    assert me.name == "GET /api/auth/me"
+    assert me.statements >= 1
+
+    user_cache.clear()
+    with pytest.raises(pytest.fail.Exception, match="GET /api/auth/me: .* statements \\(budget 0\\)"):
+        with query_budget(max_statements=0):
+            client.get("/api/auth/me", headers=headers)
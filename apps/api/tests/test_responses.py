@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.core.web.responses import dumps
+from app.modules.auth.api.schemas import LoginOut, MeOut
+from app.modules.food.api.schemas import (
+    DishTemplateListItemOut,
+    DishTemplateOut,
+    DishTemplateUsedByOut,
+    IngredientOut,
+)
+from app.modules.nutrition.api.schemas import NutritionProfileOut, NutritionTargetsOut
+from benchmarks.datagen import PASSWORD
+
+
+def test_dumps_matches_pydantic_json():
+    row = {
+        "id": uuid.uuid4(),
+        "tenant_id": uuid.uuid4(),
+        "catalog_ingredient_id": None,
+        "name": "Atún en conserva",
+        "kcal_per_100g": Decimal("116.00"),
+        "protein_g_per_100g": Decimal("25.51"),
+        "carbs_g_per_100g": Decimal("0"),
+        "fat_g_per_100g": Decimal("0.82"),
+        "serving_size_g": None,
+        "created_at": datetime(2026, 1, 5, 9, 0, 0, 123456, tzinfo=timezone.utc),
+        "updated_at": None,
+    }
+    model = IngredientOut(
+        **{
+            **row,
+            "id": str(row["id"]),
+            "tenant_id": str(row["tenant_id"]),
+            **{k: float(v) for k, v in row.items() if isinstance(v, Decimal)},
+        }
+    )
+    assert dumps(row) == model.model_dump_json().encode()
+
+
+@pytest.fixture()
+def seeded(tenant_data, tenant_headers):
+    data = tenant_data(ingredients=30, dish_templates=5, items_per_template=3, clients=1, weeks=0)[0]
+    return data, tenant_headers(data)
+
+
+def test_orjson_routes_match_their_response_models(client, seeded):
+    data, headers = seeded
+    ingredient_id = data.items[0]["ingredient_id"]
+    template_id = data.templates[0]["id"]
+    cases = [
+        ("/api/auth/me", MeOut),
+        ("/api/food/ingredients?limit=200", list[IngredientOut]),
+        (f"/api/food/ingredients/{ingredient_id}", IngredientOut),
+        (f"/api/food/ingredients/{ingredient_id}/used-by", list[DishTemplateUsedByOut]),
+        ("/api/food/dish-templates", list[DishTemplateListItemOut]),
+        (f"/api/food/dish-templates/{template_id}", DishTemplateOut),
+        ("/api/nutrition/profile/me", NutritionProfileOut),
+        ("/api/nutrition/targets/me", NutritionTargetsOut),
+    ]
+    for path, model in cases:
+        res = client.get(path, headers=headers)
+        assert res.status_code == 200, (path, res.text)
+        assert res.headers["content-type"] == "application/json"
+        adapter = TypeAdapter(model)
+        # Byte-identical to what response_model validation would have produced.
+        assert adapter.dump_json(adapter.validate_json(res.content)) == res.content, path
+
+    res = client.post("/api/auth/login", json={"email": data.worker_email, "password": PASSWORD})
+    assert res.status_code == 200
+    LoginOut.model_validate_json(res.content)
+
+
+def test_openapi_still_publishes_response_schemas(client):
+    spec = client.get("/openapi.json").json()
+    ok = spec["paths"]["/api/food/ingredients"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert ok["items"]["$ref"].endswith("/IngredientOut")
+    for name in ("DishTemplateOut", "NutritionProfileOut", "NutritionTargetsOut", "MeOut", "LoginOut"):
+        assert name in spec["components"]["schemas"]
@@ -672,6 +672,7 @@ export default function FoodLibraryPage() {
                       }`}
                     >
                       <p className="font-medium">{template.name}</p>
+                      <p className="text-xs text-neutral-400">{template.totals.kcal} kcal</p>
                     </button>
                   </li>
                 );
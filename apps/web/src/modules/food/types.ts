@@ -1,6 +1,9 @@
 export type Ingredient = {
   id: string;
-  tenant_id: string;
+  // null for a shared catalogue item the tenant has not customized.
+  tenant_id: string | null;
+  // Set for catalogue items, customized or not.
+  catalog_ingredient_id: string | null;
   name: string;
   kcal_per_100g: number;
   protein_g_per_100g: number;
@@ -24,6 +27,7 @@ export type DishTemplateListItem = {
   id: string;
   tenant_id: string;
   name: string;
+  totals: MacroTotals;
   created_at: string;
   updated_at: string | null;
 };
@@ -0,0 +1,160 @@
+"""
+Latencia de endpoints ajenos al login durante una rafaga de logins.
+
+Mide primero la latencia de las sondas (`/api/health` y `/api/auth/me`) en reposo
+y despues mientras `--concurrency` hilos hacen `--logins` logins seguidos. Si bcrypt
+o las consultas de auth bloquean el event loop, el p99 de las sondas se dispara.
+
+Solo usa la libreria estandar:
+
+    python scripts/bench_login_burst.py --base-url http://127.0.0.1:8000 \\
+        --email admin@example.com --password secreto --logins 200 --concurrency 32
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+def _request(url: str, data: Optional[dict] = None, token: Optional[str] = None, timeout: float = 30.0):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    req = urllib.request.Request(url, data=body, headers=headers)
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def login(base_url: str, email: str, password: str) -> str:
+    _, body = _request(f"{base_url}/api/auth/login", {"email": email, "password": password})
+    return json.loads(body)["access_token"]
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[k]
+
+
+def resumen(valores: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(valores),
+        "p50_ms": round(_percentil(valores, 50) * 1000, 1),
+        "p95_ms": round(_percentil(valores, 95) * 1000, 1),
+        "p99_ms": round(_percentil(valores, 99) * 1000, 1),
+        "max_ms": round(max(valores, default=0.0) * 1000, 1),
+        "media_ms": round(statistics.fmean(valores) * 1000, 1) if valores else 0.0,
+    }
+
+
+def sondear(base_url: str, token: str, parar: threading.Event, intervalo: float) -> Dict[str, List[float]]:
+    """Pide las sondas en bucle hasta que se activa `parar`; devuelve latencias por ruta."""
+    rutas = {"/api/health": None, "/api/auth/me": token}
+    latencias: Dict[str, List[float]] = {ruta: [] for ruta in rutas}
+    errores = 0
+    while not parar.is_set():
+        for ruta, tok in rutas.items():
+            inicio = time.perf_counter()
+            try:
+                _request(f"{base_url}{ruta}", token=tok)
+            except (urllib.error.URLError, OSError):
+                errores += 1
+                continue
+            latencias[ruta].append(time.perf_counter() - inicio)
+        parar.wait(intervalo)
+    if errores:
+        print(f"  sondas con error: {errores}", file=sys.stderr)
+    return latencias
+
+
+def fase(base_url: str, token: str, intervalo: float, trabajo) -> Dict[str, List[float]]:
+    parar = threading.Event()
+    resultado: Dict[str, List[float]] = {}
+
+    def correr():
+        resultado.update(sondear(base_url, token, parar, intervalo))
+
+    hilo = threading.Thread(target=correr, daemon=True)
+    hilo.start()
+    try:
+        trabajo()
+    finally:
+        parar.set()
+        hilo.join()
+    return resultado
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--idle-seconds", type=float, default=3.0, help="duracion de la fase en reposo")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="pausa entre rondas de sondas")
+    parser.add_argument("--json", action="store_true", help="imprime el resultado como JSON")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    token = login(base_url, args.email, args.password)
+
+    reposo = fase(base_url, token, args.probe_interval, lambda: time.sleep(args.idle_seconds))
+
+    logins_ok: List[float] = []
+    logins_error = 0
+    lock = threading.Lock()
+
+    def un_login(_):
+        nonlocal logins_error
+        inicio = time.perf_counter()
+        try:
+            login(base_url, args.email, args.password)
+        except (urllib.error.URLError, OSError):
+            with lock:
+                logins_error += 1
+            return
+        with lock:
+            logins_ok.append(time.perf_counter() - inicio)
+
+    def rafaga():
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(un_login, range(args.logins)))
+
+    inicio_rafaga = time.perf_counter()
+    durante = fase(base_url, token, args.probe_interval, rafaga)
+    duracion = time.perf_counter() - inicio_rafaga
+
+    informe = {
+        "logins": {
+            **resumen(logins_ok),
+            "errores": logins_error,
+            "por_segundo": round(len(logins_ok) / duracion, 1) if duracion else 0.0,
+        },
+        "reposo": {ruta: resumen(v) for ruta, v in reposo.items()},
+        "durante_rafaga": {ruta: resumen(v) for ruta, v in durante.items()},
+    }
+
+    if args.json:
+        print(json.dumps(informe, indent=2))
+        return 0
+
+    print(f"Logins: {informe['logins']}")
+    for ruta in reposo:
+        print(f"{ruta}")
+        print(f"  reposo:         {informe['reposo'][ruta]}")
+        print(f"  durante rafaga: {informe['durante_rafaga'][ruta]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
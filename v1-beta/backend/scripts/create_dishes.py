@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models.plato import Plato, PlatoIngrediente, MomentoDia
 from app.models.ingrediente import Ingrediente, CategoriaIngrediente
+from app.services.plato_totales import recalcular_platos
 from decimal import Decimal
 
 def get_db():
@@ -96,43 +97,7 @@ def create_plato(db: Session, nombre: str, momentos: list, descripcion: str, ing
 
 
 def recalc_plato_totals(db: Session, plato: Plato) -> None:
-    total_calorias = Decimal(0)
-    total_proteinas = Decimal(0)
-    total_carbohidratos = Decimal(0)
-    total_grasas = Decimal(0)
-    total_fibra = Decimal(0)
-    total_peso = Decimal(0)
-
-    for pi in plato.ingredientes:
-        ing = db.query(Ingrediente).filter(Ingrediente.id == pi.ingrediente_id).first()
-        if not ing:
-            continue
-        ratio = Decimal(pi.cantidad_gramos) / Decimal(100)
-        cal = ing.calorias_por_100g * ratio
-        prot = ing.proteinas_por_100g * ratio
-        carb = ing.carbohidratos_por_100g * ratio
-        gras = ing.grasas_por_100g * ratio
-        fibra = (ing.fibra_por_100g or 0) * ratio
-
-        pi.calorias_aportadas = cal
-        pi.proteinas_aportadas = prot
-        pi.carbohidratos_aportados = carb
-        pi.grasas_aportadas = gras
-
-        total_calorias += cal
-        total_proteinas += prot
-        total_carbohidratos += carb
-        total_grasas += gras
-        total_fibra += Decimal(str(fibra))
-        total_peso += Decimal(pi.cantidad_gramos)
-
-    plato.calorias_totales = total_calorias
-    plato.proteinas_totales = total_proteinas
-    plato.carbohidratos_totales = total_carbohidratos
-    plato.grasas_totales = total_grasas
-    plato.fibra_totales = total_fibra
-    plato.peso_total_gramos = total_peso
-
+    recalcular_platos(db, [plato.id])
     db.commit()
 
 
@@ -1,10 +1,9 @@
-from decimal import Decimal
-
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
 from app.models.ingrediente import Ingrediente
 from app.models.plato import MomentoDia, Plato, PlatoIngrediente
+from app.services.plato_totales import recalcular_platos
 
 
 def create_plato(
@@ -31,12 +30,6 @@ def create_plato(
     db.commit()
     db.refresh(plato)
 
-    total_calorias = Decimal(0)
-    total_proteinas = Decimal(0)
-    total_carbohidratos = Decimal(0)
-    total_grasas = Decimal(0)
-    total_peso = Decimal(0)
-
     inserted = 0
     for ing_name, grams in ingredientes_data:
         ing = db.query(Ingrediente).filter(Ingrediente.nombre == ing_name).first()
@@ -44,36 +37,10 @@ def create_plato(
             print(f"  ERROR: Ingrediente no encontrado: {ing_name} (plato: {nombre})")
             continue
 
-        ratio = Decimal(grams) / Decimal(100)
-        cal = ing.calorias_por_100g * ratio
-        prot = ing.proteinas_por_100g * ratio
-        carb = ing.carbohidratos_por_100g * ratio
-        gras = ing.grasas_por_100g * ratio
-
-        db.add(
-            PlatoIngrediente(
-                plato_id=plato.id,
-                ingrediente_id=ing.id,
-                cantidad_gramos=grams,
-                calorias_aportadas=cal,
-                proteinas_aportadas=prot,
-                carbohidratos_aportados=carb,
-                grasas_aportadas=gras,
-            )
-        )
-
-        total_calorias += cal
-        total_proteinas += prot
-        total_carbohidratos += carb
-        total_grasas += gras
-        total_peso += Decimal(grams)
+        db.add(PlatoIngrediente(plato_id=plato.id, ingrediente_id=ing.id, cantidad_gramos=grams))
         inserted += 1
 
-    plato.calorias_totales = total_calorias
-    plato.proteinas_totales = total_proteinas
-    plato.carbohidratos_totales = total_carbohidratos
-    plato.grasas_totales = total_grasas
-    plato.peso_total_gramos = total_peso
+    recalcular_platos(db, [plato.id])
     db.commit()
 
     print(f"Creado: {nombre} ({inserted}/{len(ingredientes_data)} ingredientes)")
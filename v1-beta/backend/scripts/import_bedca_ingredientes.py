@@ -1,14 +1,16 @@
 import argparse
+import io
 import json
 import os
 import sys
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
-from typing import cast
 import xml.etree.ElementTree as ET
 
 from app.services.bedca_client import (
+    BEDCA_ENDPOINT,
     BedcaClient,
+    ResponseCache,
     build_level_2_query,
     build_level_3_query,
     build_level_3f_query,
@@ -105,30 +107,60 @@ def _build_notas(food_id, origin, fg_id):
     )
 
 
-def _parse_food_values(food_elem):
-    values = {}
-    if food_elem is None:
-        return values
-    food_elem = cast(ET.Element, food_elem)
-    for food_value in food_elem.findall("foodvalue"):
-        c_id = _get_text(food_value, "c_id")
-        if not c_id:
-            continue
-        value_type = _get_text(food_value, "value_type")
-        if value_type and value_type not in ALLOWED_VALUE_TYPES:
-            continue
-        raw_value = _get_text(food_value, "best_location")
-        unit = _get_text(food_value, "v_unit")
-        if (raw_value is None or raw_value.strip() == "") and value_type != "LZ":
-            continue
-        parsed_value = 0.0 if value_type == "LZ" else _parse_float(raw_value)
-        if parsed_value is None:
+def _normalize_food_value(food_value):
+    c_id = _get_text(food_value, "c_id")
+    if not c_id:
+        return None
+    value_type = _get_text(food_value, "value_type")
+    if value_type and value_type not in ALLOWED_VALUE_TYPES:
+        return None
+    raw_value = _get_text(food_value, "best_location")
+    unit = _get_text(food_value, "v_unit")
+    if (raw_value is None or raw_value.strip() == "") and value_type != "LZ":
+        return None
+    parsed_value = 0.0 if value_type == "LZ" else _parse_float(raw_value)
+    if parsed_value is None:
+        return None
+    return c_id, {"value": parsed_value, "unit": unit, "value_type": value_type}
+
+
+def _iter_food_records(source):
+    """
+    Recorre una respuesta de nivel 2 con iterparse y genera un registro por
+    alimento: {"f_id", "nombre", "values": {c_id: {value, unit, value_type}}}.
+
+    Cada foodvalue se normaliza y se libera al cerrarse, así que la memoria no
+    crece con el número de componentes ni de alimentos de la respuesta.
+    """
+    root = None
+    food = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            elif elem.tag == "food" and food is None:
+                food = {"f_id": None, "nombre": None, "values": {}}
             continue
-        existing = values.get(c_id)
-        if existing and existing.get("value_type") != "LZ":
+        if food is None:
             continue
-        values[c_id] = {"value": parsed_value, "unit": unit, "value_type": value_type}
-    return values
+        if elem.tag == "foodvalue":
+            parsed = _normalize_food_value(elem)
+            elem.clear()
+            if parsed is None:
+                continue
+            c_id, record = parsed
+            existing = food["values"].get(c_id)
+            if existing and existing.get("value_type") != "LZ":
+                continue
+            food["values"][c_id] = record
+        elif elem.tag == "f_id":
+            food["f_id"] = (elem.text or "").strip() or None
+        elif elem.tag == "f_ori_name":
+            food["nombre"] = elem.text
+        elif elem.tag == "food":
+            yield food
+            food = None
+            root.clear()
 
 
 def _extract_macros(values, min_required):
@@ -226,7 +258,142 @@ def _load_output_items(output_path):
     return data
 
 
-def main():
+def _checkpoint_path(args):
+    return args.checkpoint or f"{args.output}.checkpoint.jsonl"
+
+
+def _load_checkpoint(path):
+    """f_id -> item (None si se descartó) de los alimentos ya procesados."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Última línea cortada por una interrupción: se vuelve a pedir.
+                continue
+            done[record["f_id"]] = record.get("item")
+    return done
+
+
+def _build_item(food, food_id, fg_id, origin, min_required, supermercado):
+    if food is None:
+        return None, "parse"
+
+    nombre = _collapse_spaces(food["nombre"] or "")
+    if not nombre:
+        return None, "skipped"
+
+    macros, missing = _extract_macros(food["values"], min_required)
+    if macros is None:
+        return None, "skipped"
+
+    if not _validate_macros(macros):
+        return None, "skipped"
+
+    categoria = FG_ID_TO_CATEGORIA.get(fg_id, "Otros")
+    categoria = _refine_categoria(nombre, categoria, fg_id)
+
+    return {
+        "nombre": nombre,
+        "categoria": categoria,
+        "supermercado": supermercado,
+        "calorias_por_100g": macros["kcal"],
+        "proteinas_por_100g": macros["proteina"],
+        "carbohidratos_por_100g": macros["carbohidratos"],
+        "grasas_por_100g": macros["grasas"],
+        "fibra_por_100g": macros.get("fibra"),
+        "sal_por_100g": macros.get("sal"),
+        "notas": _build_notas(food_id, origin, fg_id),
+        "fuente": "BEDCA",
+        "fuente_id": str(food_id),
+        "bedca_origen": origin,
+        "bedca_fg_id": fg_id,
+    }, "ok"
+
+
+def _ingrediente_row(item, categorias):
+    try:
+        categoria_value = categorias(item["categoria"])
+    except ValueError:
+        categoria_value = categorias.OTROS
+    return {
+        "nombre": item["nombre"],
+        "categoria": categoria_value,
+        "supermercado": item["supermercado"],
+        "calorias_por_100g": item["calorias_por_100g"],
+        "proteinas_por_100g": item["proteinas_por_100g"],
+        "carbohidratos_por_100g": item["carbohidratos_por_100g"],
+        "grasas_por_100g": item["grasas_por_100g"],
+        "fibra_por_100g": Decimal(str(item.get("fibra_por_100g") or 0)),
+        "sal_por_100g": Decimal(str(item.get("sal_por_100g") or 0)),
+        "notas": item.get("notas"),
+        "bedca_id": str(item["fuente_id"]),
+    }
+
+
+def _upsert_ingredientes(db, items, batch_size=500, update_existing=True):
+    """
+    Escribe los items en `ingredientes` con un INSERT ... ON CONFLICT (bedca_id)
+    de varias filas por lote: una ida y vuelta y un commit cada `batch_size`.
+    Antes de cada commit actualiza, también por lote, los aportes y totales de
+    los platos que usan los ingredientes escritos e invalida sus resúmenes
+    semanales cacheados, igual que la edición de un ingrediente desde la API.
+
+    Devuelve (filas escritas, items sin f_id de BEDCA que no se pueden casar).
+    """
+    from sqlalchemy.dialects.postgresql import insert
+    from sqlalchemy.sql import func
+
+    from app.models.ingrediente import Ingrediente, CategoriaIngrediente
+    from app.services.plato_totales import propagar_ingredientes
+    from app.services.resumen_cache import invalidate_ingredientes
+
+    written = 0
+    ignored = 0
+    batch = {}
+
+    def flush():
+        stmt = insert(Ingrediente).values(list(batch.values()))
+        if update_existing:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Ingrediente.bedca_id],
+                set_={
+                    **{
+                        column: stmt.excluded[column]
+                        for column in next(iter(batch.values()))
+                        if column != "bedca_id"
+                    },
+                    "updated_at": func.now(),
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Ingrediente.bedca_id])
+        ids = db.execute(stmt.returning(Ingrediente.id)).scalars().all()
+        if update_existing:
+            propagar_ingredientes(db, ids)
+            invalidate_ingredientes(db, ids)
+        db.commit()
+        batch.clear()
+        return len(ids)
+
+    for item in items:
+        if item.get("fuente", "BEDCA") != "BEDCA" or not item.get("fuente_id"):
+            ignored += 1
+            continue
+        row = _ingrediente_row(item, CategoriaIngrediente)
+        # Un mismo f_id dos veces en un lote haría fallar el ON CONFLICT: gana el último.
+        batch[row["bedca_id"]] = row
+        if len(batch) >= batch_size:
+            written += flush()
+    if batch:
+        written += flush()
+    return written, ignored
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Importa alimentos BEDCA y genera un JSON local.")
     parser.add_argument("--group-ids", default="1,2,3,4,5,6,7,8,9,11")
     parser.add_argument("--origins", default="BEDCA,BEDCA2")
@@ -247,8 +414,39 @@ def main():
         default="backend/data/bedca_ingredientes.json",
         help="Ruta del fichero JSON de salida.",
     )
+    parser.add_argument("--endpoint", default=BEDCA_ENDPOINT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Peticiones simultáneas a BEDCA (el --rate-limit-ms es global).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="backend/data/bedca_cache",
+        help="Caché en disco de las respuestas XML, por consulta.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="No lee ni escribe la caché.")
+    parser.add_argument(
+        "--cache-max-age-days",
+        type=float,
+        default=30,
+        help="Las respuestas más antiguas se vuelven a pedir.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Progreso para reanudar (por defecto <output>.checkpoint.jsonl).",
+    )
+    parser.add_argument("--fresh", action="store_true", help="Ignora el checkpoint y empieza de cero.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Filas por INSERT ... ON CONFLICT con --write-db.",
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     group_ids = [int(value.strip()) for value in args.group_ids.split(",") if value.strip()]
     origins = [value.strip() for value in args.origins.split(",") if value.strip()]
@@ -257,36 +455,90 @@ def main():
     foods_queue = []
     errors_http = 0
     errors_parse = 0
+    fetched = {}
 
     client = None
     if not args.from_file:
-        client = BedcaClient(rate_limit_ms=args.rate_limit_ms)
+        cache = None
+        if not args.no_cache:
+            cache = ResponseCache(args.cache_dir, max_age_seconds=args.cache_max_age_days * 86400)
+        client = BedcaClient(endpoint=args.endpoint, rate_limit_ms=args.rate_limit_ms, cache=cache)
 
         try:
             client.post_query(build_level_3_query())
         except Exception:
             pass
 
-        assert client is not None
-        for fg_id in group_ids:
-            for origin in origins:
-                try:
-                    root = client.post_query(build_level_3f_query(fg_id, origin))
-                except Exception:
-                    errors_http += 1
-                    continue
-                if root is None:
-                    errors_parse += 1
+        listings = {
+            (fg_id, origin): build_level_3f_query(fg_id, origin) for fg_id in group_ids for origin in origins
+        }
+        roots = {}
+        for key, result in client.fetch_many(listings, workers=args.workers):
+            if isinstance(result, ET.ParseError):
+                errors_parse += 1
+            elif isinstance(result, Exception):
+                errors_http += 1
+            else:
+                roots[key] = ET.fromstring(result)
+
+        # Mismo orden que la importación secuencial, aunque las respuestas lleguen desordenadas.
+        seen = set()
+        for key in listings:
+            root = roots.get(key)
+            if root is None:
+                continue
+            fg_id, origin = key
+            for food in root.findall("food"):
+                f_id = _get_text(food, "f_id")
+                if not f_id or f_id.strip() in seen:
                     continue
-                for food in root.findall("food"):
-                    f_id = _get_text(food, "f_id")
-                    if not f_id:
-                        continue
-                    foods_queue.append((f_id.strip(), fg_id, origin))
+                seen.add(f_id.strip())
+                foods_queue.append((f_id.strip(), fg_id, origin))
 
         if args.limit is not None:
             foods_queue = foods_queue[: args.limit]
 
+        checkpoint_path = _checkpoint_path(args)
+        done = {} if args.fresh or args.dry_run else _load_checkpoint(checkpoint_path)
+        queue_info = {food_id: (fg_id, origin) for food_id, fg_id, origin in foods_queue}
+        pending = {
+            food_id: build_level_2_query(food_id) for food_id, _, _ in foods_queue if food_id not in done
+        }
+
+        checkpoint = None
+        if not args.dry_run:
+            checkpoint_dir = os.path.dirname(checkpoint_path)
+            if checkpoint_dir:
+                os.makedirs(checkpoint_dir, exist_ok=True)
+            checkpoint = open(checkpoint_path, "w" if args.fresh else "a", encoding="utf-8")
+        try:
+            for food_id, result in client.fetch_many(pending, workers=args.workers):
+                if isinstance(result, ET.ParseError):
+                    errors_parse += 1
+                    continue
+                if isinstance(result, Exception):
+                    errors_http += 1
+                    continue
+                fg_id, origin = queue_info[food_id]
+                try:
+                    food = next(_iter_food_records(io.BytesIO(result)), None)
+                except ET.ParseError:
+                    errors_parse += 1
+                    continue
+                item, status = _build_item(food, food_id, fg_id, origin, min_required, args.supermercado)
+                if status == "parse":
+                    errors_parse += 1
+                    continue
+                done[food_id] = item
+                if checkpoint is not None:
+                    checkpoint.write(json.dumps({"f_id": food_id, "item": item}, ensure_ascii=False) + "\n")
+                    checkpoint.flush()
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+            client.close()
+        fetched = {food_id: done[food_id] for food_id, _, _ in foods_queue if food_id in done}
+
     existing_items = []
     existing_index = {}
     if args.update_existing and not args.dry_run:
@@ -306,59 +558,11 @@ def main():
         added = len(output_items)
         total = added
     else:
-        assert client is not None
-        for food_id, fg_id, origin in foods_queue:
-            try:
-                root = client.post_query(build_level_2_query(food_id))
-            except Exception:
-                errors_http += 1
-                continue
-
-            if root is None:
-                errors_parse += 1
-                continue
-
-            food_elem = root.find("food")
-            if food_elem is None:
-                errors_parse += 1
-                continue
-
-            nombre = _get_text(food_elem, "f_ori_name") or ""
-            nombre = _collapse_spaces(nombre)
-            if not nombre:
-                skipped += 1
-                continue
-
-            values = _parse_food_values(food_elem)
-            macros, missing = _extract_macros(values, min_required)
-            if macros is None:
-                skipped += 1
-                continue
-
-            if not _validate_macros(macros):
+        for item in fetched.values():
+            if item is None:
                 skipped += 1
                 continue
 
-            categoria = FG_ID_TO_CATEGORIA.get(fg_id, "Otros")
-            categoria = _refine_categoria(nombre, categoria, fg_id)
-
-            item = {
-                "nombre": nombre,
-                "categoria": categoria,
-                "supermercado": args.supermercado,
-                "calorias_por_100g": macros["kcal"],
-                "proteinas_por_100g": macros["proteina"],
-                "carbohidratos_por_100g": macros["carbohidratos"],
-                "grasas_por_100g": macros["grasas"],
-                "fibra_por_100g": macros.get("fibra"),
-                "sal_por_100g": macros.get("sal"),
-                "notas": _build_notas(food_id, origin, fg_id),
-                "fuente": "BEDCA",
-                "fuente_id": str(food_id),
-                "bedca_origen": origin,
-                "bedca_fg_id": fg_id,
-            }
-
             key = (item["fuente"], item["fuente_id"])
             if args.update_existing and key in existing_index:
                 existing_index[key].update(item)
@@ -376,6 +580,8 @@ def main():
     print(f"Skipped: {skipped}")
     print(f"HTTP errors: {errors_http}")
     print(f"Parse errors: {errors_parse}")
+    if client is not None:
+        print(f"BEDCA requests: {client.requests_sent} (cache hits: {client.cache_hits})")
 
     if args.dry_run:
         examples = output_items[:3]
@@ -387,65 +593,23 @@ def main():
 
     _write_output(args.output, output_items)
     print(f"Output written to: {args.output}")
+    if client is not None and not errors_http and not errors_parse:
+        # Completo: la próxima importación empieza de cero (y tira de la caché).
+        if os.path.exists(_checkpoint_path(args)):
+            os.remove(_checkpoint_path(args))
 
     if args.write_db:
         from app.database import SessionLocal
-        from app.models.ingrediente import Ingrediente, CategoriaIngrediente
 
         db = SessionLocal()
-        batch_size = 100
-        batch_count = 0
-
         try:
-            for item in output_items:
-                try:
-                    categoria_value = CategoriaIngrediente(item["categoria"])
-                except ValueError:
-                    categoria_value = CategoriaIngrediente.OTROS
-
-                lookup = db.query(Ingrediente).filter(
-                    Ingrediente.nombre == item["nombre"],
-                    Ingrediente.categoria == categoria_value,
-                    Ingrediente.supermercado == item["supermercado"],
-                )
-                existing = lookup.first() if args.update_existing else None
-
-                if existing:
-                    existing.categoria = categoria_value  # type: ignore[assignment]
-                    existing.calorias_por_100g = item["calorias_por_100g"]
-                    existing.proteinas_por_100g = item["proteinas_por_100g"]
-                    existing.carbohidratos_por_100g = item["carbohidratos_por_100g"]
-                    existing.grasas_por_100g = item["grasas_por_100g"]
-                    fibra_value = item.get("fibra_por_100g") or 0
-                    sal_value = item.get("sal_por_100g") or 0
-                    existing.fibra_por_100g = Decimal(str(fibra_value))  # type: ignore[assignment]
-                    existing.sal_por_100g = Decimal(str(sal_value))  # type: ignore[assignment]
-                    existing.notas = item.get("notas")
-                else:
-                    ingrediente = Ingrediente(
-                        nombre=item["nombre"],
-                        categoria=categoria_value,
-                        supermercado=item["supermercado"],
-                        calorias_por_100g=item["calorias_por_100g"],
-                        proteinas_por_100g=item["proteinas_por_100g"],
-                        carbohidratos_por_100g=item["carbohidratos_por_100g"],
-                        grasas_por_100g=item["grasas_por_100g"],
-                        fibra_por_100g=Decimal(str(item.get("fibra_por_100g") or 0)),
-                        sal_por_100g=Decimal(str(item.get("sal_por_100g") or 0)),
-                        notas=item.get("notas"),
-                    )
-                    db.add(ingrediente)
-
-                batch_count += 1
-                if batch_count >= batch_size:
-                    db.commit()
-                    batch_count = 0
-
-            if batch_count:
-                db.commit()
+            written, ignored = _upsert_ingredientes(
+                db, output_items, batch_size=args.batch_size, update_existing=args.update_existing
+            )
         finally:
             db.close()
 
+        print(f"DB rows written: {written} (sin f_id de BEDCA: {ignored})")
         print("DB insert completed.")
     return 0
 
@@ -13,6 +13,10 @@ class Settings(BaseSettings):
     jwt_issuer: str | None = None
     jwt_audience: str | None = None
     bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    # 0 = desactivado (ver app/utils/query_log.py)
+    slow_query_ms: float = 0
+    repeated_query_threshold: int = 0
 
     class Config:
         env_file = ".env"
@@ -1,10 +1,13 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import get_settings
+from app.utils.query_log import install_query_log
 
 settings = get_settings()
 
 engine = create_engine(settings.database_url)
+if settings.slow_query_ms > 0 or settings.repeated_query_threshold > 0:
+    install_query_log(engine, settings.slow_query_ms, settings.repeated_query_threshold)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
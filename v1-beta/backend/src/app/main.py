@@ -4,7 +4,14 @@ from app.config import get_settings
 from app.database import engine
 from app.routers import ingredientes_router, platos_router, planificacion_router, clientes_platos_router, work_planner_router
 from app.routers.auth import router as auth_router
-from app.utils.schema import ensure_planificacion_items_schema
+from app.utils.query_log import QueryLogMiddleware
+from app.utils.schema import (
+    ensure_ingredientes_bedca_schema,
+    ensure_ingredientes_search_schema,
+    ensure_planificacion_items_schema,
+    ensure_platos_totales_schema,
+    ensure_resumen_cache_schema,
+)
 
 settings = get_settings()
 
@@ -42,6 +49,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Agrupa las consultas SQL por petición (slow log / N+1, ver utils/query_log.py).
+app.add_middleware(QueryLogMiddleware)
+
 app.include_router(auth_router)
 app.include_router(ingredientes_router)
 app.include_router(platos_router)
@@ -55,6 +65,10 @@ app.include_router(work_planner_router)
 def ensure_optional_schemas() -> None:
     # Avoid runtime errors when new tables are introduced.
     ensure_planificacion_items_schema(engine)
+    ensure_resumen_cache_schema(engine)
+    ensure_ingredientes_bedca_schema(engine)
+    ensure_ingredientes_search_schema(engine)
+    ensure_platos_totales_schema(engine)
 
 
 @app.get("/api/health")
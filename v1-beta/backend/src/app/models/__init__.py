@@ -1,6 +1,6 @@
 from app.models.ingrediente import Ingrediente, CategoriaIngrediente
 from app.models.plato import Plato, PlatoIngrediente, MomentoDia
-from app.models.planificacion import PlanificacionSemanal, PlanificacionItem, DiaSemana
+from app.models.planificacion import PlanificacionSemanal, PlanificacionItem, DiaSemana, ResumenSemanalCache
 from app.models.cliente_plato import ClientePlato, ClientePlatoIngrediente
 from app.models.work_planner import WorkTask, WorkAppointment, WorkNote
 
@@ -13,6 +13,7 @@ __all__ = [
     "PlanificacionSemanal",
     "PlanificacionItem",
     "DiaSemana",
+    "ResumenSemanalCache",
     "ClientePlato",
     "ClientePlatoIngrediente",
     "WorkTask",
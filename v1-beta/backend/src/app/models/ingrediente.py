@@ -43,5 +43,6 @@ class Ingrediente(Base):
     fibra_por_100g = Column(Numeric(10, 2), default=0)
     sal_por_100g = Column(Numeric(10, 2), default=0)
     notas = Column(Text)
+    bedca_id = Column(String(20), unique=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
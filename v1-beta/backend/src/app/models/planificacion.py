@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -18,6 +18,9 @@ class DiaSemana(str, enum.Enum):
 
 class PlanificacionSemanal(Base):
     __tablename__ = "planificacion_semanal"
+    __table_args__ = (
+        UniqueConstraint("semana_inicio", "dia", "momento", "client_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     semana_inicio = Column(Date, nullable=False)
@@ -61,3 +64,14 @@ class PlanificacionItem(Base):
 
     planificacion = relationship("PlanificacionSemanal", back_populates="items")
     cliente_plato = relationship("ClientePlato")
+
+
+class ResumenSemanalCache(Base):
+    __tablename__ = "resumen_semanal_cache"
+
+    client_id = Column(Integer, ForeignKey("usuarios.id", ondelete="CASCADE"), primary_key=True)
+    semana_inicio = Column(Date, primary_key=True)
+    # NULL = invalidado; la siguiente lectura lo recalcula.
+    payload = Column(JSON)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
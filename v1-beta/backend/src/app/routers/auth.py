@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.usuario import Usuario
 from app.schemas.auth import LoginRequest, TokenResponse, UsuarioResponse, UsuarioCreate
 from app.utils.security import (
-    verify_password, 
-    get_password_hash, 
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     get_current_user,
     require_auth,
@@ -15,11 +16,22 @@ from app.utils.security import (
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+def _buscar_por_email(db: Session, email: str):
+    user = db.query(Usuario).filter(Usuario.email == email).first()
+    # Devuelve la conexion al pool antes de esperar a bcrypt; si no, una rafaga de
+    # logins agota el pool y frena al resto de rutas.
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
+    return user
+
+
 @router.post("/login", response_model=TokenResponse)
 async def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(Usuario).filter(Usuario.email == request.email).first()
+    # La consulta va al threadpool y bcrypt a su propio pool: el event loop queda libre.
+    user = await run_in_threadpool(_buscar_por_email, db, request.email)
     
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email o contraseña incorrectos"
@@ -52,7 +64,9 @@ async def register_user(
     db: Session = Depends(get_db),
     admin: Usuario = Depends(require_admin)
 ):
-    existing = db.query(Usuario).filter(Usuario.email == request.email).first()
+    existing = await run_in_threadpool(
+        lambda: db.query(Usuario).filter(Usuario.email == request.email).first()
+    )
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -62,15 +76,17 @@ async def register_user(
     # Use model_dump or dict to unpack all fields including optional ones
     user_data = request.model_dump() if hasattr(request, 'model_dump') else request.dict()
     # Hash password
-    user_data['password_hash'] = get_password_hash(user_data.pop('password'))
+    user_data['password_hash'] = await get_password_hash_async(user_data.pop('password'))
     
     user = Usuario(**user_data)
     
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    def guardar():
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return UsuarioResponse.model_validate(user)
     
-    return UsuarioResponse.model_validate(user)
+    return await run_in_threadpool(guardar)
 
 
 @router.put("/usuarios/{user_id}", response_model=UsuarioResponse)
@@ -80,7 +96,7 @@ async def update_usuario(
     db: Session = Depends(get_db),
     admin: Usuario = Depends(require_admin)
 ):
-    user = db.query(Usuario).filter(Usuario.id == user_id).first()
+    user = await run_in_threadpool(lambda: db.query(Usuario).filter(Usuario.id == user_id).first())
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
@@ -88,19 +104,20 @@ async def update_usuario(
     update_data = request.model_dump(exclude_unset=True) if hasattr(request, 'model_dump') else request.dict(exclude_unset=True)
     
     if 'password' in update_data and update_data['password']:
-         update_data['password_hash'] = get_password_hash(update_data.pop('password'))
+         update_data['password_hash'] = await get_password_hash_async(update_data.pop('password'))
     
-    for key, value in update_data.items():
-        setattr(user, key, value)
-        
-    db.commit()
-    db.refresh(user)
+    def guardar():
+        for key, value in update_data.items():
+            setattr(user, key, value)
+        db.commit()
+        db.refresh(user)
+        return UsuarioResponse.model_validate(user)
     
-    return UsuarioResponse.model_validate(user)
+    return await run_in_threadpool(guardar)
 
 
 @router.get("/usuarios")
-async def list_usuarios(
+def list_usuarios(
     skip: int = 0,
     limit: int = 100,
     rol: str | None = None,
@@ -138,7 +155,7 @@ async def list_usuarios(
 
 
 @router.delete("/usuarios/{user_id}", status_code=204)
-async def delete_usuario(
+def delete_usuario(
     user_id: int,
     db: Session = Depends(get_db),
     admin: Usuario = Depends(require_admin)
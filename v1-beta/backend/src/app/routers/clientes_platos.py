@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
-from app.models import ClientePlato, ClientePlatoIngrediente, Plato, PlatoIngrediente, Ingrediente
+from app.models import ClientePlato, ClientePlatoIngrediente, Plato, PlatoIngrediente
 from app.models.usuario import Usuario
 from app.schemas.cliente_plato import ClientePlatoCreate, ClientePlatoUpdate, ClientePlatoResponse
+from app.services.platos_info import build_cliente_plato_details
+from app.services.resumen_cache import invalidate_cliente_platos
 from app.utils.security import require_auth
 
 router = APIRouter(prefix="/api/clientes", tags=["clientes_platos"])
@@ -17,57 +19,7 @@ def check_client_access(user: Usuario, client_id: int) -> bool:
 
 
 def build_cliente_plato_detail(db: Session, cliente_plato: ClientePlato) -> dict:
-    plato = db.query(Plato).filter(Plato.id == cliente_plato.plato_id).first()
-
-    ingredientes = []
-    total_cal = 0
-    total_prot = 0
-    total_carb = 0
-    total_grasas = 0
-    total_peso = 0
-
-    for cpi in cliente_plato.ingredientes:
-        ing = db.query(Ingrediente).filter(Ingrediente.id == cpi.ingrediente_id).first()
-        if not ing:
-            continue
-        factor = float(cpi.cantidad_gramos) / 100
-        cal = float(ing.calorias_por_100g) * factor
-        prot = float(ing.proteinas_por_100g) * factor
-        carb = float(ing.carbohidratos_por_100g) * factor
-        grasas = float(ing.grasas_por_100g) * factor
-        total_cal += cal
-        total_prot += prot
-        total_carb += carb
-        total_grasas += grasas
-        total_peso += float(cpi.cantidad_gramos)
-
-        ingredientes.append({
-            "ingrediente_id": cpi.ingrediente_id,
-            "ingrediente_nombre": ing.nombre,
-            "cantidad_gramos": float(cpi.cantidad_gramos),
-            "calorias_aportadas": round(cal, 2),
-            "proteinas_aportadas": round(prot, 2),
-            "carbohidratos_aportados": round(carb, 2),
-            "grasas_aportadas": round(grasas, 2),
-        })
-
-    momentos = cliente_plato.momentos_dia if cliente_plato.momentos_dia else (plato.momentos_dia if plato else [])
-
-    return {
-        "id": cliente_plato.id,
-        "client_id": cliente_plato.client_id,
-        "plato_id": cliente_plato.plato_id,
-        "plato_nombre": plato.nombre if plato else "",
-        "momentos_dia": momentos,
-        "calorias_totales": round(total_cal, 2),
-        "proteinas_totales": round(total_prot, 2),
-        "carbohidratos_totales": round(total_carb, 2),
-        "grasas_totales": round(total_grasas, 2),
-        "peso_total_gramos": round(total_peso, 2),
-        "ingredientes": ingredientes,
-        "created_at": cliente_plato.created_at,
-        "updated_at": cliente_plato.updated_at,
-    }
+    return build_cliente_plato_details(db, [cliente_plato])[0]
 
 
 @router.get("/{client_id}/platos", response_model=List[ClientePlatoResponse])
@@ -80,7 +32,7 @@ def list_client_platos(
         raise HTTPException(status_code=403, detail="No tienes acceso a este cliente")
 
     platos = db.query(ClientePlato).filter(ClientePlato.client_id == client_id).all()
-    return [build_cliente_plato_detail(db, p) for p in platos]
+    return build_cliente_plato_details(db, platos)
 
 
 @router.post("/{client_id}/platos", response_model=ClientePlatoResponse, status_code=201)
@@ -151,6 +103,8 @@ def create_client_plato(
                 )
             )
 
+        invalidate_cliente_platos(db, [cliente_plato.id])
+
     db.commit()
     db.refresh(cliente_plato)
     return build_cliente_plato_detail(db, cliente_plato)
@@ -191,6 +145,8 @@ def update_client_plato(
                 )
             )
 
+        invalidate_cliente_platos(db, [cliente_plato.id])
+
     db.commit()
     db.refresh(cliente_plato)
     return build_cliente_plato_detail(db, cliente_plato)
@@ -213,6 +169,7 @@ def delete_client_plato(
     if not cliente_plato:
         raise HTTPException(status_code=404, detail="Plato asociado no encontrado")
 
+    invalidate_cliente_platos(db, [cliente_plato.id])
     db.delete(cliente_plato)
     db.commit()
     return None
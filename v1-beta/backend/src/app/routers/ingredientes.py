@@ -5,6 +5,9 @@ from app.database import get_db
 from app.models import Ingrediente
 from app.models.usuario import Usuario
 from app.schemas import IngredienteCreate, IngredienteUpdate, IngredienteResponse
+from app.services.ingredientes_busqueda import buscar_ingredientes
+from app.services.plato_totales import CAMPOS_NUTRICIONALES, platos_con_ingrediente, propagar_ingrediente, recalcular_platos
+from app.services.resumen_cache import invalidate_ingrediente
 from app.utils.security import require_admin
 
 router = APIRouter(prefix="/api/ingredientes", tags=["ingredientes"])
@@ -22,10 +25,10 @@ def list_ingredientes(
     if categoria:
         query = query.filter(Ingrediente.categoria == categoria)
     if q:
-        tokens = [token for token in q.strip().split() if token]
-        for token in tokens:
-            query = query.filter(Ingrediente.nombre.ilike(f"%{token}%"))
-    return query.order_by(Ingrediente.categoria, Ingrediente.nombre).offset(skip).limit(limit).all()
+        query = buscar_ingredientes(db, query, q)
+    else:
+        query = query.order_by(Ingrediente.categoria, Ingrediente.nombre)
+    return query.offset(skip).limit(limit).all()
 
 
 @router.get("/categorias")
@@ -70,6 +73,9 @@ def update_ingrediente(
     for field, value in update_data.items():
         setattr(db_ingrediente, field, value)
     
+    if any(campo in update_data for campo in CAMPOS_NUTRICIONALES):
+        propagar_ingrediente(db, db_ingrediente.id)
+    invalidate_ingrediente(db, db_ingrediente.id)
     db.commit()
     db.refresh(db_ingrediente)
     return db_ingrediente
@@ -85,6 +91,9 @@ def delete_ingrediente(
     if not db_ingrediente:
         raise HTTPException(status_code=404, detail="Ingrediente no encontrado")
     
+    invalidate_ingrediente(db, db_ingrediente.id)
+    plato_ids = platos_con_ingrediente(db, db_ingrediente.id)
     db.delete(db_ingrediente)
+    recalcular_platos(db, plato_ids)
     db.commit()
     return None
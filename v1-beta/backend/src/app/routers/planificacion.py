@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, func, insert, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List
 from datetime import date, timedelta
 from app.database import get_db
 from app.models import (
@@ -10,7 +12,6 @@ from app.models import (
     PlatoIngrediente,
     ClientePlato,
     ClientePlatoIngrediente,
-    Ingrediente,
 )
 from app.models.usuario import Usuario
 from app.schemas import (
@@ -18,11 +19,14 @@ from app.schemas import (
     PlanificacionUpdate,
     PlanificacionBulkRequest,
     PlanificacionBulkResponse,
+    PlanificacionCloneRequest,
+    PlanificacionCloneResponse,
     PlanificacionResponse,
-    ResumenSemanal,
-    ResumenDiario,
 )
-from app.utils.security import require_auth
+from app.services.planificacion_clonar import SemanaOrigenVacia, clonar_semana
+from app.services.planificacion_semana import load_semana
+from app.services.resumen_cache import cache_stats, get_resumen_cacheado, invalidate_semana
+from app.utils.security import require_admin, require_auth
 
 router = APIRouter(prefix="/api/planificacion", tags=["planificacion"])
 
@@ -44,133 +48,94 @@ def check_client_access(user: Usuario, client_id: int):
     return False
 
 
-def build_plato_info_from_plato(db: Session, plato: Plato) -> dict:
-    ingredientes = []
-    for pi in db.query(PlatoIngrediente).filter(PlatoIngrediente.plato_id == plato.id).all():
-        ing = db.query(Ingrediente).filter(Ingrediente.id == pi.ingrediente_id).first()
-        if not ing:
-            continue
-        ingredientes.append({
-            "ingrediente_id": pi.ingrediente_id,
-            "ingrediente_nombre": ing.nombre,
-            "cantidad_gramos": float(pi.cantidad_gramos),
-        })
-
-    return {
-        "plato_nombre": plato.nombre,
-        "calorias": float(plato.calorias_totales or 0),
-        "proteinas": float(plato.proteinas_totales or 0),
-        "carbohidratos": float(plato.carbohidratos_totales or 0),
-        "grasas": float(plato.grasas_totales or 0),
-        "ingredientes": ingredientes,
-    }
-
-
-def build_plato_info_from_cliente_plato(db: Session, cliente_plato: ClientePlato) -> dict:
-    plato = db.query(Plato).filter(Plato.id == cliente_plato.plato_id).first()
-    ingredientes = []
-    total_cal = 0
-    total_prot = 0
-    total_carb = 0
-    total_grasas = 0
-
-    items = db.query(ClientePlatoIngrediente).filter(
-        ClientePlatoIngrediente.cliente_plato_id == cliente_plato.id
-    ).all()
-
-    for cpi in items:
-        ing = db.query(Ingrediente).filter(Ingrediente.id == cpi.ingrediente_id).first()
-        if not ing:
-            continue
-        factor = float(cpi.cantidad_gramos) / 100
-        cal = float(ing.calorias_por_100g) * factor
-        prot = float(ing.proteinas_por_100g) * factor
-        carb = float(ing.carbohidratos_por_100g) * factor
-        grasas = float(ing.grasas_por_100g) * factor
-        total_cal += cal
-        total_prot += prot
-        total_carb += carb
-        total_grasas += grasas
-
-        ingredientes.append({
-            "ingrediente_id": cpi.ingrediente_id,
-            "ingrediente_nombre": ing.nombre,
-            "cantidad_gramos": float(cpi.cantidad_gramos),
-        })
-
-    return {
-        "plato_nombre": plato.nombre if plato else "",
-        "calorias": round(total_cal, 2),
-        "proteinas": round(total_prot, 2),
-        "carbohidratos": round(total_carb, 2),
-        "grasas": round(total_grasas, 2),
-        "ingredientes": ingredientes,
-    }
-
-
-def ensure_cliente_plato_from_base(db: Session, client_id: int, plato_id: int, momento: str) -> ClientePlato:
-    plato = db.query(Plato).filter(Plato.id == plato_id).first()
-    if not plato:
+def ensure_cliente_platos_from_base(
+    db: Session, client_id: int, plato_ids: List[int], momento: str
+) -> Dict[int, ClientePlato]:
+    """
+    Devuelve el plato de cliente de cada plato base, creando los que falten con
+    los ingredientes de la receta. Consultas fijas sin importar cuantos platos haya.
+    """
+    ids = list(dict.fromkeys(plato_ids))
+    platos = {p.id: p for p in db.query(Plato).filter(Plato.id.in_(ids)).all()}
+    if len(platos) != len(ids):
         raise HTTPException(status_code=404, detail="Plato no encontrado")
 
-    existing = db.query(ClientePlato).filter(
+    resolved: Dict[int, ClientePlato] = {}
+    for cp in db.query(ClientePlato).filter(
         ClientePlato.client_id == client_id,
-        ClientePlato.plato_id == plato_id,
-    ).first()
+        ClientePlato.plato_id.in_(ids),
+    ).order_by(ClientePlato.id.asc()).all():
+        resolved.setdefault(cp.plato_id, cp)
 
-    if existing:
-        if momento:
-            current = set(existing.momentos_dia or [])
+    if momento:
+        for cp in resolved.values():
+            current = set(cp.momentos_dia or [])
             if momento not in current:
-                existing.momentos_dia = list(current.union({momento}))
-        return existing
+                cp.momentos_dia = list(current.union({momento}))
 
-    momentos_payload = [momento] if momento else (plato.momentos_dia or [])
-    cliente_plato = ClientePlato(
-        client_id=client_id,
-        plato_id=plato_id,
-        momentos_dia=momentos_payload,
-    )
-    db.add(cliente_plato)
+    missing = [pid for pid in ids if pid not in resolved]
+    if not missing:
+        return resolved
+
+    for pid in missing:
+        resolved[pid] = ClientePlato(
+            client_id=client_id,
+            plato_id=pid,
+            momentos_dia=[momento] if momento else (platos[pid].momentos_dia or []),
+        )
+        db.add(resolved[pid])
     db.flush()
 
     base_ingredientes = db.query(PlatoIngrediente).filter(
-        PlatoIngrediente.plato_id == plato.id
-    ).all()
-
-    for pi in base_ingredientes:
-        db.add(
-            ClientePlatoIngrediente(
-                cliente_plato_id=cliente_plato.id,
-                ingrediente_id=pi.ingrediente_id,
-                cantidad_gramos=float(pi.cantidad_gramos),
-            )
+        PlatoIngrediente.plato_id.in_(missing)
+    ).order_by(PlatoIngrediente.id.asc()).all()
+    db.add_all([
+        ClientePlatoIngrediente(
+            cliente_plato_id=resolved[pi.plato_id].id,
+            ingrediente_id=pi.ingrediente_id,
+            cantidad_gramos=float(pi.cantidad_gramos),
         )
-
-    return cliente_plato
-
-
-def get_or_create_slot(db: Session, semana_inicio: date, dia: str, momento: str, client_id: int) -> PlanificacionSemanal:
-    slot = db.query(PlanificacionSemanal).filter(
-        PlanificacionSemanal.semana_inicio == semana_inicio,
-        PlanificacionSemanal.dia == dia,
-        PlanificacionSemanal.momento == momento,
-        PlanificacionSemanal.client_id == client_id,
-    ).first()
-    if slot:
-        return slot
-    slot = PlanificacionSemanal(
-        semana_inicio=semana_inicio,
-        dia=dia,
-        momento=momento,
-        plato_id=None,
-        cliente_plato_id=None,
-        client_id=client_id,
-        notas=None,
-    )
-    db.add(slot)
-    db.flush()
-    return slot
+        for pi in base_ingredientes
+    ])
+
+    return resolved
+
+
+def upsert_slots(
+    db: Session,
+    semana_inicio: date,
+    dias: List[str],
+    momento: str,
+    client_id: int,
+    solo_vacios: bool = False,
+) -> Dict[str, int]:
+    """
+    Crea (o reutiliza) los slots de esos dias con un solo INSERT ... ON CONFLICT.
+
+    El DO UPDATE bloquea las filas existentes hasta el commit, asi dos escrituras
+    concurrentes sobre el mismo slot se aplican una detras de otra. Con
+    `solo_vacios` los slots que ya tienen algun plato no se tocan ni se devuelven.
+    """
+    ps = PlanificacionSemanal
+    stmt = pg_insert(ps).values([
+        {"semana_inicio": semana_inicio, "dia": dia, "momento": momento, "client_id": client_id}
+        for dia in dias
+    ])
+    vacio = None
+    if solo_vacios:
+        # SQLAlchemy no correlaciona subconsultas en el WHERE del ON CONFLICT: con
+        # `ps.id` el EXISTS llevaria su propio FROM y miraria toda la tabla.
+        fila = literal_column(f"{ps.__tablename__}.id")
+        vacio = ~select(PlanificacionItem.id).where(
+            PlanificacionItem.planificacion_id == fila,
+            PlanificacionItem.cliente_plato_id.isnot(None),
+        ).exists()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ps.semana_inicio, ps.dia, ps.momento, ps.client_id],
+        set_={"updated_at": func.now()},
+        where=vacio,
+    ).returning(ps.id, ps.dia)
+    return {dia: slot_id for slot_id, dia in db.execute(stmt)}
 
 
 @router.get("")
@@ -187,65 +152,7 @@ def list_planificacion(
     if user.rol != "admin":
         client_id = user.id
     
-    query = db.query(PlanificacionSemanal).filter(
-        PlanificacionSemanal.semana_inicio == semana_inicio
-    )
-    if client_id:
-        query = query.filter(PlanificacionSemanal.client_id == client_id)
-    
-    results = []
-    for p in query.all():
-        items = db.query(PlanificacionItem).filter(PlanificacionItem.planificacion_id == p.id).order_by(
-            PlanificacionItem.orden.asc(), PlanificacionItem.id.asc()
-        ).all()
-
-        plato = db.query(Plato).filter(Plato.id == p.plato_id).first() if p.plato_id else None
-        cliente_plato = (
-            db.query(ClientePlato).filter(ClientePlato.id == p.cliente_plato_id).first()
-            if p.cliente_plato_id else None
-        )
-        client = db.query(Usuario).filter(Usuario.id == p.client_id).first()
-
-        items_info = []
-        if items:
-            for it in items:
-                if not it.cliente_plato_id:
-                    continue
-                cp = db.query(ClientePlato).filter(ClientePlato.id == it.cliente_plato_id).first()
-                if not cp:
-                    continue
-                info = build_plato_info_from_cliente_plato(db, cp)
-                items_info.append({
-                    "orden": it.orden,
-                    "cliente_plato_id": it.cliente_plato_id,
-                    **info,
-                })
-
-        plato_info = None
-        if not items_info:
-            if cliente_plato:
-                plato_info = build_plato_info_from_cliente_plato(db, cliente_plato)
-            elif plato:
-                plato_info = build_plato_info_from_plato(db, plato)
-
-        results.append({
-            "id": p.id,
-            "semana_inicio": p.semana_inicio,
-            "dia": p.dia,
-            "momento": p.momento,
-            "plato_id": p.plato_id,
-            "cliente_plato_id": p.cliente_plato_id,
-            "plato_nombre": plato_info["plato_nombre"] if plato_info else None,
-            "calorias": plato_info["calorias"] if plato_info else None,
-            "client_id": p.client_id,
-            "client_nombre": client.nombre if client else "Desconocido",
-            "ingredientes": plato_info["ingredientes"] if plato_info else [],
-            "items": items_info,
-            "notas": p.notas,
-            "created_at": p.created_at,
-            "updated_at": p.updated_at,
-        })
-    return results
+    return load_semana(db, semana_inicio, client_id)
 
 
 @router.get("/resumen/{client_id}")
@@ -266,110 +173,22 @@ def get_resumen_semanal(
     if semana_inicio is None:
         semana_inicio = get_monday(date.today())
     
-    planificaciones = db.query(PlanificacionSemanal).filter(
-        PlanificacionSemanal.semana_inicio == semana_inicio,
-        PlanificacionSemanal.client_id == client_id
-    ).all()
-    
-    dias_data = []
-    for dia in DIAS:
-        comidas = []
-        calorias_dia = 0
-        proteinas_dia = 0
-        carbs_dia = 0
-        grasas_dia = 0
-        
-        for momento in MOMENTOS:
-            planif = next(
-                (p for p in planificaciones if p.dia == dia and p.momento == momento),
-                None
-            )
-
-            if not planif:
-                continue
-
-            items = db.query(PlanificacionItem).filter(
-                PlanificacionItem.planificacion_id == planif.id
-            ).order_by(PlanificacionItem.orden.asc(), PlanificacionItem.id.asc()).all()
-
-            comida_items = []
-            if items:
-                for it in items:
-                    if not it.cliente_plato_id:
-                        continue
-                    cp = db.query(ClientePlato).filter(ClientePlato.id == it.cliente_plato_id).first()
-                    if not cp:
-                        continue
-                    info = build_plato_info_from_cliente_plato(db, cp)
-                    comida_items.append({
-                        "orden": it.orden,
-                        "cliente_plato_id": it.cliente_plato_id,
-                        **info,
-                    })
-            elif planif.cliente_plato_id or planif.plato_id:
-                cliente_plato = (
-                    db.query(ClientePlato).filter(ClientePlato.id == planif.cliente_plato_id).first()
-                    if planif.cliente_plato_id else None
-                )
-                plato = db.query(Plato).filter(Plato.id == planif.plato_id).first() if planif.plato_id else None
-                plato_info = None
-                if cliente_plato:
-                    plato_info = build_plato_info_from_cliente_plato(db, cliente_plato)
-                    comida_items.append({
-                        "orden": 0,
-                        "cliente_plato_id": cliente_plato.id,
-                        **plato_info,
-                    })
-                elif plato:
-                    plato_info = build_plato_info_from_plato(db, plato)
-                    comida_items.append({
-                        "orden": 0,
-                        "plato_id": plato.id,
-                        **plato_info,
-                    })
-
-            if not comida_items:
-                continue
-
-            total_cal = sum(float(i.get("calorias") or 0) for i in comida_items)
-            total_prot = sum(float(i.get("proteinas") or 0) for i in comida_items)
-            total_carb = sum(float(i.get("carbohidratos") or 0) for i in comida_items)
-            total_gras = sum(float(i.get("grasas") or 0) for i in comida_items)
-
-            comidas.append({
-                "momento": momento,
-                "calorias": round(total_cal, 2),
-                "proteinas": round(total_prot, 2),
-                "carbohidratos": round(total_carb, 2),
-                "grasas": round(total_gras, 2),
-                "items": comida_items,
-                # Backwards-compat: keep single fields when there is exactly one item.
-                "plato_nombre": comida_items[0].get("plato_nombre") if len(comida_items) == 1 else None,
-                "cliente_plato_id": comida_items[0].get("cliente_plato_id") if len(comida_items) == 1 else None,
-            })
-
-            calorias_dia += float(total_cal)
-            proteinas_dia += float(total_prot)
-            carbs_dia += float(total_carb)
-            grasas_dia += float(total_gras)
-        
-        dias_data.append({
-            "dia": dia,
-            "calorias_totales": round(calorias_dia, 2),
-            "proteinas_totales": round(proteinas_dia, 2),
-            "carbohidratos_totales": round(carbs_dia, 2),
-            "grasas_totales": round(grasas_dia, 2),
-            "comidas": comidas,
-        })
-    
     return {
         "semana_inicio": semana_inicio,
         "client_id": client.id,
         "client_nombre": client.nombre,
-        "dias": dias_data,
+        **get_resumen_cacheado(db, client.id, semana_inicio),
     }
 
 
+@router.get("/resumen-cache/stats")
+def get_resumen_cache_stats(
+    db: Session = Depends(get_db),
+    admin: Usuario = Depends(require_admin),
+):
+    return cache_stats(db)
+
+
 @router.post("", status_code=201)
 def create_planificacion(
     planif_data: PlanificacionCreate,
@@ -411,32 +230,22 @@ def create_planificacion(
         existing.plato_id = planif_data.plato_id
         existing.cliente_plato_id = planif_data.cliente_plato_id
         existing.notas = planif_data.notas
-        db.commit()
-        db.refresh(existing)
 
         # Keep items in sync.
+        db.query(PlanificacionItem).filter(
+            PlanificacionItem.planificacion_id == existing.id
+        ).delete()
         if planif_data.cliente_plato_id is not None:
-            db.query(PlanificacionItem).filter(
-                PlanificacionItem.planificacion_id == existing.id
-            ).delete()
             db.add(PlanificacionItem(planificacion_id=existing.id, cliente_plato_id=planif_data.cliente_plato_id, orden=0))
-            db.commit()
-        elif planif_data.plato_id is not None:
-            db.query(PlanificacionItem).filter(
-                PlanificacionItem.planificacion_id == existing.id
-            ).delete()
-            db.commit()
-        else:
-            db.query(PlanificacionItem).filter(
-                PlanificacionItem.planificacion_id == existing.id
-            ).delete()
-            db.commit()
+
+        invalidate_semana(db, planif_data.client_id, planif_data.semana_inicio)
+        db.commit()
+        db.refresh(existing)
         return existing
     
     db_planif = PlanificacionSemanal(**planif_data.model_dump())
     db.add(db_planif)
-    db.commit()
-    db.refresh(db_planif)
+    db.flush()
 
     if planif_data.cliente_plato_id is not None:
         db.add(
@@ -446,7 +255,10 @@ def create_planificacion(
                 orden=0,
             )
         )
-        db.commit()
+
+    invalidate_semana(db, planif_data.client_id, planif_data.semana_inicio)
+    db.commit()
+    db.refresh(db_planif)
     return db_planif
 
 
@@ -462,7 +274,7 @@ def bulk_apply_planificacion(
     if payload.momento not in MOMENTOS:
         raise HTTPException(status_code=400, detail="Momento inválido")
 
-    dias = [d for d in payload.dias if d in DIAS]
+    dias = list(dict.fromkeys(d for d in payload.dias if d in DIAS))
     if not dias:
         raise HTTPException(status_code=400, detail="Dias inválidos")
 
@@ -472,67 +284,89 @@ def bulk_apply_planificacion(
         raise HTTPException(status_code=400, detail="Usa base_plato_ids o cliente_plato_ids, no ambos")
 
     # Resolve target cliente_plato ids.
-    resolved_cliente_ids: List[int] = []
     if base_ids:
-        for base_id in base_ids:
-            cp = ensure_cliente_plato_from_base(db, payload.client_id, base_id, payload.momento)
-            resolved_cliente_ids.append(cp.id)
+        resolved = ensure_cliente_platos_from_base(db, payload.client_id, base_ids, payload.momento)
+        resolved_cliente_ids = [resolved[base_id].id for base_id in base_ids]
     else:
         resolved_cliente_ids = [int(x) for x in cliente_ids]
 
     # Normalize (dedupe, keep order).
-    seen = set()
-    normalized_ids: List[int] = []
-    for cid in resolved_cliente_ids:
-        if cid in seen:
-            continue
-        seen.add(cid)
-        normalized_ids.append(cid)
-
-    applied = 0
-    skipped = 0
-
-    # Ensure slots exist.
-    slots: List[PlanificacionSemanal] = []
-    for dia in dias:
-        slots.append(get_or_create_slot(db, payload.semana_inicio, dia, payload.momento, payload.client_id))
-
-    db.flush()
+    normalized_ids = list(dict.fromkeys(resolved_cliente_ids))
 
-    for slot in slots:
-        existing_items = db.query(PlanificacionItem).filter(
-            PlanificacionItem.planificacion_id == slot.id
-        ).order_by(PlanificacionItem.orden.asc(), PlanificacionItem.id.asc()).all()
-
-        has_any = any(it.cliente_plato_id for it in existing_items)
-        if payload.mode == "skip_if_filled" and has_any:
-            skipped += 1
-            continue
-
-        if payload.mode == "replace":
-            db.query(PlanificacionItem).filter(
-                PlanificacionItem.planificacion_id == slot.id
-            ).delete()
-            existing_items = []
-            slot.cliente_plato_id = None
-            slot.plato_id = None
+    # In skip_if_filled mode filled slots are neither written nor returned.
+    slots = upsert_slots(
+        db, payload.semana_inicio, dias, payload.momento, payload.client_id,
+        solo_vacios=payload.mode == "skip_if_filled",
+    )
+    applied_ids = [slots[dia] for dia in dias if dia in slots]
+    skipped = len(dias) - len(applied_ids)
+
+    existing_by_slot: Dict[int, List[PlanificacionItem]] = {slot_id: [] for slot_id in applied_ids}
+    for it in db.query(PlanificacionItem).filter(
+        PlanificacionItem.planificacion_id.in_(applied_ids)
+    ).order_by(PlanificacionItem.orden.asc(), PlanificacionItem.id.asc()).all():
+        existing_by_slot[it.planificacion_id].append(it)
+
+    if payload.mode == "replace" and applied_ids:
+        db.execute(delete(PlanificacionItem).where(PlanificacionItem.planificacion_id.in_(applied_ids)))
+        db.execute(
+            update(PlanificacionSemanal)
+            .where(PlanificacionSemanal.id.in_(applied_ids))
+            .values(cliente_plato_id=None, plato_id=None)
+        )
+        for slot_id in applied_ids:
+            existing_by_slot[slot_id] = []
 
+    new_items = []
+    for slot_id in applied_ids:
         # Add mode: append new ids, skipping duplicates.
+        existing_items = existing_by_slot[slot_id]
         existing_ids = {it.cliente_plato_id for it in existing_items if it.cliente_plato_id}
-        start_order = max([it.orden for it in existing_items], default=-1) + 1
-        order = start_order
+        order = max([it.orden for it in existing_items], default=-1) + 1
         for cid in normalized_ids:
             if cid in existing_ids:
                 continue
-            db.add(PlanificacionItem(planificacion_id=slot.id, cliente_plato_id=cid, orden=order))
+            new_items.append({"planificacion_id": slot_id, "cliente_plato_id": cid, "orden": order})
             order += 1
 
-        applied += 1
+    if new_items:
+        db.execute(insert(PlanificacionItem).values(new_items))
 
+    applied = len(applied_ids)
+    invalidate_semana(db, payload.client_id, payload.semana_inicio)
     db.commit()
     return {"applied": applied, "skipped": skipped}
 
 
+@router.post("/clonar", response_model=PlanificacionCloneResponse)
+def clone_planificacion(
+    payload: PlanificacionCloneRequest,
+    db: Session = Depends(get_db),
+    user: Usuario = Depends(require_auth),
+):
+    destinos = list(dict.fromkeys(payload.client_ids or [payload.client_id]))
+    for cid in [payload.client_id, *destinos]:
+        if not check_client_access(user, cid):
+            raise HTTPException(status_code=403, detail="No tienes acceso a este cliente")
+
+    semanas = list(dict.fromkeys(payload.semanas_destino))
+    if not semanas:
+        raise HTTPException(status_code=400, detail="Indica al menos una semana destino")
+    if payload.semana_origen in semanas and payload.client_id in destinos:
+        raise HTTPException(status_code=400, detail="La semana destino no puede ser la de origen")
+
+    encontrados = db.query(Usuario.id).filter(Usuario.id.in_(destinos)).count()
+    if encontrados != len(destinos):
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+
+    try:
+        result = clonar_semana(db, payload.client_id, payload.semana_origen, semanas, destinos, payload.mode)
+    except SemanaOrigenVacia:
+        raise HTTPException(status_code=404, detail="La semana origen no tiene planificación")
+    db.commit()
+    return result
+
+
 @router.put("/{planif_id}")
 def update_planificacion(
     planif_id: int, 
@@ -552,6 +386,7 @@ def update_planificacion(
     for field, value in update_data.items():
         setattr(db_planif, field, value)
     
+    invalidate_semana(db, db_planif.client_id, db_planif.semana_inicio)
     db.commit()
     db.refresh(db_planif)
     return db_planif
@@ -571,6 +406,7 @@ def delete_planificacion(
     if not check_client_access(user, db_planif.client_id):
         raise HTTPException(status_code=403, detail="No tienes acceso a este cliente")
     
+    invalidate_semana(db, db_planif.client_id, db_planif.semana_inicio)
     db.delete(db_planif)
     db.commit()
     return None
@@ -13,40 +13,16 @@ from app.schemas import (
     PlatoIngredienteUpdate,
     PlatoIngredienteResponse,
 )
+from app.services.plato_totales import recalcular_platos
+from app.services.platos_info import build_plato_details
+from app.services.resumen_cache import invalidate_plato
 from app.utils.security import require_admin
 
 router = APIRouter(prefix="/api/platos", tags=["platos"])
 
 
 def get_plato_detail(db: Session, plato: Plato) -> dict:
-    ingredientes = []
-    for pi in plato.ingredientes:
-        ing = db.query(Ingrediente).filter(Ingrediente.id == pi.ingrediente_id).first()
-        ingredientes.append({
-            "id": pi.id,
-            "ingrediente_id": pi.ingrediente_id,
-            "ingrediente_nombre": ing.nombre if ing else "Desconocido",
-            "cantidad_gramos": float(pi.cantidad_gramos),
-            "calorias_aportadas": float(pi.calorias_aportadas or 0),
-            "proteinas_aportadas": float(pi.proteinas_aportadas or 0),
-            "carbohidratos_aportados": float(pi.carbohidratos_aportados or 0),
-            "grasas_aportadas": float(pi.grasas_aportadas or 0),
-        })
-    
-    return {
-        "id": plato.id,
-        "nombre": plato.nombre,
-        "descripcion": plato.descripcion,
-        "momentos_dia": plato.momentos_dia or [],
-        "calorias_totales": float(plato.calorias_totales or 0),
-        "proteinas_totales": float(plato.proteinas_totales or 0),
-        "carbohidratos_totales": float(plato.carbohidratos_totales or 0),
-        "grasas_totales": float(plato.grasas_totales or 0),
-        "peso_total_gramos": float(plato.peso_total_gramos or 0),
-        "created_at": plato.created_at,
-        "updated_at": plato.updated_at,
-        "ingredientes": ingredientes,
-    }
+    return build_plato_details(db, [plato])[0]
 
 
 @router.get("", response_model=List[PlatoResponse])
@@ -90,6 +66,7 @@ def create_plato(
         )
         db.add(db_pi)
     
+    recalcular_platos(db, [db_plato.id])
     db.commit()
     db.refresh(db_plato)
     return get_plato_detail(db, db_plato)
@@ -112,6 +89,7 @@ def update_plato(
     for field, value in update_data.items():
         setattr(db_plato, field, value)
     
+    invalidate_plato(db, db_plato.id)
     db.commit()
     db.refresh(db_plato)
     return get_plato_detail(db, db_plato)
@@ -127,6 +105,7 @@ def delete_plato(
     if not db_plato:
         raise HTTPException(status_code=404, detail="Plato no encontrado")
     
+    invalidate_plato(db, db_plato.id)
     db.delete(db_plato)
     db.commit()
     return None
@@ -160,6 +139,8 @@ def add_ingrediente_to_plato(
         cantidad_gramos=ing_data.cantidad_gramos,
     )
     db.add(db_pi)
+    recalcular_platos(db, [plato_id])
+    invalidate_plato(db, plato_id)
     db.commit()
     db.refresh(plato)
     return get_plato_detail(db, plato)
@@ -181,6 +162,8 @@ def update_ingrediente_in_plato(
         raise HTTPException(status_code=404, detail="Ingrediente no encontrado en el plato")
     
     db_pi.cantidad_gramos = ing_data.cantidad_gramos
+    recalcular_platos(db, [plato_id])
+    invalidate_plato(db, plato_id)
     db.commit()
     
     plato = db.query(Plato).filter(Plato.id == plato_id).first()
@@ -202,6 +185,8 @@ def remove_ingrediente_from_plato(
         raise HTTPException(status_code=404, detail="Ingrediente no encontrado en el plato")
     
     db.delete(db_pi)
+    recalcular_platos(db, [plato_id])
+    invalidate_plato(db, plato_id)
     db.commit()
     
     plato = db.query(Plato).filter(Plato.id == plato_id).first()
@@ -29,6 +29,8 @@ from app.schemas.planificacion import (
     ResumenSemanal,
     PlanificacionBulkRequest,
     PlanificacionBulkResponse,
+    PlanificacionCloneRequest,
+    PlanificacionCloneResponse,
 )
 from app.schemas.cliente_plato import (
     ClientePlatoCreate,
@@ -63,6 +65,8 @@ __all__ = [
     "ResumenSemanal",
     "PlanificacionBulkRequest",
     "PlanificacionBulkResponse",
+    "PlanificacionCloneRequest",
+    "PlanificacionCloneResponse",
     "ClientePlatoCreate",
     "ClientePlatoUpdate",
     "ClientePlatoResponse",
@@ -66,3 +66,17 @@ class PlanificacionBulkRequest(BaseModel):
 class PlanificacionBulkResponse(BaseModel):
     applied: int
     skipped: int
+
+
+class PlanificacionCloneRequest(BaseModel):
+    semana_origen: date
+    client_id: int
+    semanas_destino: List[date]
+    # Clientes destino; por defecto el mismo cliente de origen.
+    client_ids: Optional[List[int]] = None
+    mode: Literal["replace", "skip_if_filled"] = "skip_if_filled"
+
+
+class PlanificacionCloneResponse(BaseModel):
+    copied: int
+    skipped: int
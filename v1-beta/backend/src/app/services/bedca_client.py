@@ -1,52 +1,211 @@
+import hashlib
+import http.client
+import os
+import tempfile
+import threading
 import time
-import urllib.error
-import urllib.request
+import urllib.parse
 import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 BEDCA_ENDPOINT = "https://www.bedca.net/bdpub/procquery.php"
 
+# Errores de red tras los que merece la pena reconectar y reintentar.
+_RETRYABLE_ERRORS = (OSError, http.client.HTTPException)
+
+
+def check_well_formed(data):
+    """Valida el XML sin construir el árbol; lanza ET.ParseError como ET.fromstring."""
+    parser = expat.ParserCreate()
+    try:
+        parser.Parse(data, True)
+    except expat.ExpatError as exc:
+        raise ET.ParseError(str(exc)) from exc
+
+
+class BedcaError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimiter:
+    """Un hueco cada `interval_ms`, compartido por todos los hilos del cliente."""
+
+    def __init__(self, interval_ms):
+        self.interval = max(0, interval_ms) / 1000.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ResponseCache:
+    """
+    Respuestas XML en crudo, direccionadas por el hash de (endpoint, consulta).
+
+    Se escriben con rename atómico: una importación interrumpida nunca deja
+    un fichero a medias en la caché.
+    """
+
+    def __init__(self, directory, max_age_seconds=None):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+
+    def key(self, endpoint, xml_body):
+        return hashlib.sha256(f"{endpoint}\n{xml_body}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.xml")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if self.max_age_seconds is not None and time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                return None
+            with open(path, "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
 
 class BedcaClient:
-    def __init__(self, endpoint=BEDCA_ENDPOINT, timeout=30, retries=3, backoff=1.0, rate_limit_ms=200):
+    def __init__(
+        self,
+        endpoint=BEDCA_ENDPOINT,
+        timeout=30,
+        retries=3,
+        backoff=1.0,
+        rate_limit_ms=200,
+        cache=None,
+    ):
         self.endpoint = endpoint
         self.timeout = timeout
         self.retries = retries
         self.backoff = backoff
         self.rate_limit_ms = rate_limit_ms
-        self._next_request_time = 0.0
+        self.cache = cache
+        self.requests_sent = 0
+        self.cache_hits = 0
+        self._limiter = RateLimiter(rate_limit_ms)
+        self._url = urllib.parse.urlsplit(endpoint)
+        self._path = self._url.path or "/"
+        if self._url.query:
+            self._path += f"?{self._url.query}"
+        # Conexiones keep-alive libres; cada petición toma una y la devuelve al acabar.
+        self._idle = []
+        self._lock = threading.Lock()
 
-    def _apply_rate_limit(self):
-        if self.rate_limit_ms <= 0:
-            return
-        now = time.monotonic()
-        if now < self._next_request_time:
-            time.sleep(self._next_request_time - now)
-        self._next_request_time = time.monotonic() + (self.rate_limit_ms / 1000.0)
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        cls = http.client.HTTPSConnection if self._url.scheme == "https" else http.client.HTTPConnection
+        return cls(self._url.hostname, self._url.port, timeout=self.timeout)
 
-    def post_query(self, xml_body):
-        payload = xml_body.encode("utf-8")
-        headers = {"Content-Type": "text/xml"}
-        req = urllib.request.Request(self.endpoint, data=payload, headers=headers, method="POST")
+    def _release(self, conn):
+        with self._lock:
+            self._idle.append(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, payload):
         for attempt in range(self.retries + 1):
-            self._apply_rate_limit()
+            self._limiter.wait()
+            conn = self._acquire()
             try:
-                with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-                    data = resp.read()
-                return ET.fromstring(data)
-            except urllib.error.HTTPError as exc:
-                status = exc.code
-                retryable = status == 429 or 500 <= status < 600
-                if retryable and attempt < self.retries:
-                    time.sleep(self.backoff * (2 ** attempt))
-                    continue
-                raise
-            except urllib.error.URLError:
+                conn.request("POST", self._path, body=payload, headers={"Content-Type": "text/xml"})
+                resp = conn.getresponse()
+                data = resp.read()
+            except _RETRYABLE_ERRORS as exc:
+                # Conexión cerrada por el servidor o caída de red: se descarta y se abre otra.
+                conn.close()
                 if attempt < self.retries:
                     time.sleep(self.backoff * (2 ** attempt))
                     continue
-                raise
+                raise BedcaError(f"BEDCA no responde: {exc}") from exc
+
+            self._release(conn)
+            with self._lock:
+                self.requests_sent += 1
+            if resp.status == 200:
+                return data
+            retryable = resp.status == 429 or 500 <= resp.status < 600
+            if retryable and attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+                continue
+            raise BedcaError(f"BEDCA respondió {resp.status}", status=resp.status)
+
+    def fetch_raw(self, xml_body):
+        key = self.cache.key(self.endpoint, xml_body) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.cache_hits += 1
+                return cached
+
+        data = self._send(xml_body.encode("utf-8"))
+        # Solo se guarda lo que parsea: una página de error no debe quedarse en caché.
+        check_well_formed(data)
+        if key:
+            self.cache.put(key, data)
+        return data
+
+    def post_query(self, xml_body):
+        return ET.fromstring(self.fetch_raw(xml_body))
+
+    def fetch_many(self, queries, workers=4):
+        """
+        Descarga `queries` ({clave: xml}) con hasta `workers` peticiones en vuelo.
+
+        Genera (clave, bytes) o (clave, excepción) según van terminando; el
+        límite de peticiones por segundo es global, no por hilo.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(self.fetch_raw, xml_body): key for key, xml_body in queries.items()}
+            try:
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        yield key, future.result()
+                    except Exception as exc:
+                        yield key, exc
+            finally:
+                for future in futures:
+                    future.cancel()
 
 
 def build_level_3_query():
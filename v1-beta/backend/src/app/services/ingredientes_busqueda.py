@@ -0,0 +1,80 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import and_, case, func, literal, literal_column, or_, text
+from sqlalchemy.orm import Query, Session
+
+from app.models import Ingrediente
+
+_SPANISH = literal_column("'spanish'::regconfig")
+
+# Se detecta una vez por proceso: depende de ensure_ingredientes_search_schema.
+_busqueda_disponible: Optional[bool] = None
+
+
+def busqueda_avanzada_disponible(db: Session) -> bool:
+    global _busqueda_disponible
+    if _busqueda_disponible is None:
+        _busqueda_disponible = bool(db.execute(text(
+            "SELECT to_regprocedure('f_unaccent(text)') IS NOT NULL"
+            " AND EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+        )).scalar())
+    return _busqueda_disponible
+
+
+def _normalizar(valor):
+    # Misma expresion que idx_ingredientes_nombre_trgm.
+    return func.f_unaccent(func.lower(valor))
+
+
+def _escape_like(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _filtro_ilike(query: Query, tokens: List[str]) -> Query:
+    for token in tokens:
+        query = query.filter(Ingrediente.nombre.ilike(f"%{token}%"))
+    return query.order_by(Ingrediente.categoria, Ingrediente.nombre)
+
+
+def buscar_ingredientes(db: Session, query: Query, q: str) -> Query:
+    """
+    Filtra y ordena `query` por relevancia frente al texto `q`.
+
+    Orden: el nombre empieza por el texto > coincide por palabras (tsvector en
+    espanol, la ultima como prefijo) > contiene todos los terminos > se parece
+    por trigramas (tolera erratas como "pechga de pollo"). Todo ignora acentos y
+    se apoya en los indices GIN de init.sql. Sin pg_trgm/unaccent se usa ILIKE.
+    """
+    tokens = [token for token in q.strip().split() if token]
+    if not tokens or not busqueda_avanzada_disponible(db):
+        return _filtro_ilike(query, tokens)
+
+    palabras = [p for p in (re.sub(r"[\W_]", "", t) for t in tokens) if p]
+
+    nombre = _normalizar(Ingrediente.nombre)
+    texto = _normalizar(literal(" ".join(tokens)))
+
+    prefijo = nombre.like(_normalizar(literal(_escape_like(" ".join(tokens)))).op("||")("%"))
+    contiene = and_(*[
+        nombre.like(literal("%").op("||")(_normalizar(literal(_escape_like(t)))).op("||")("%"))
+        for t in tokens
+    ])
+    parecido = texto.op("<%")(nombre)
+    condiciones = [prefijo, contiene, parecido]
+
+    ranking = [(prefijo, 3)]
+    if palabras:
+        tsquery = " & ".join(palabras[:-1] + [palabras[-1] + ":*"])
+        palabras_match = func.to_tsvector(_SPANISH, func.f_unaccent(Ingrediente.nombre)).op("@@")(
+            func.to_tsquery(_SPANISH, func.f_unaccent(literal(tsquery)))
+        )
+        condiciones.append(palabras_match)
+        ranking.append((palabras_match, 2))
+    ranking.append((contiene, 1))
+
+    return query.filter(or_(*condiciones)).order_by(
+        case(*ranking, else_=0).desc(),
+        func.word_similarity(texto, nombre).desc(),
+        Ingrediente.nombre,
+    )
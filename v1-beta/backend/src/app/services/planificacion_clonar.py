@@ -0,0 +1,209 @@
+from datetime import date
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Date, Integer, and_, column, delete, func, insert, literal_column, null, select, true, union, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from app.models import (
+    ClientePlato,
+    ClientePlatoIngrediente,
+    PlanificacionItem,
+    PlanificacionSemanal,
+    Plato,
+    PlatoIngrediente,
+)
+from app.services.resumen_cache import invalidate_semanas
+
+
+class SemanaOrigenVacia(Exception):
+    """La semana origen no tiene ningun slot que copiar."""
+
+
+def _platos_origen(db: Session, client_id: int, semana_origen: date) -> Dict[int, int]:
+    # cliente_plato_id -> plato_id de todo lo que usa la semana origen (items y slots antiguos).
+    ps = PlanificacionSemanal
+    semana = (ps.client_id == client_id, ps.semana_inicio == semana_origen)
+    usados = union(
+        select(PlanificacionItem.cliente_plato_id)
+        .join(ps, ps.id == PlanificacionItem.planificacion_id)
+        .where(*semana),
+        select(ps.cliente_plato_id).where(*semana),
+    ).subquery()
+    rows = db.query(ClientePlato.id, ClientePlato.plato_id).filter(
+        ClientePlato.id.in_(select(usados.c.cliente_plato_id))
+    ).all()
+    return {cp_id: plato_id for cp_id, plato_id in rows}
+
+
+def _mapa_cliente_platos(
+    db: Session, client_id: int, destinos: List[int], platos_origen: Dict[int, int]
+) -> List[Tuple[int, int, int]]:
+    """
+    Filas (client_id destino, cliente_plato origen, cliente_plato destino).
+
+    Para otros clientes se usa su plato de cliente del mismo plato base; si no lo
+    tienen se crea con la receta base, igual que en el reparto por lotes.
+    """
+    mapa = [(client_id, cp_id, cp_id) for cp_id in platos_origen if client_id in destinos]
+    otros = [c for c in destinos if c != client_id]
+    if not otros or not platos_origen:
+        return mapa
+
+    plato_ids = set(platos_origen.values())
+    por_cliente: Dict[Tuple[int, int], int] = {}
+    for cp_id, cp_client, plato_id in db.query(
+        ClientePlato.id, ClientePlato.client_id, ClientePlato.plato_id
+    ).filter(
+        ClientePlato.client_id.in_(otros),
+        ClientePlato.plato_id.in_(plato_ids),
+    ).order_by(ClientePlato.id.asc()).all():
+        por_cliente.setdefault((cp_client, plato_id), cp_id)
+
+    faltan = [(c, p) for c in otros for p in plato_ids if (c, p) not in por_cliente]
+    if faltan:
+        pares = values(
+            column("client_id", Integer), column("plato_id", Integer), name="pares"
+        ).data(faltan)
+        nuevos = db.execute(
+            insert(ClientePlato)
+            .from_select(
+                ["client_id", "plato_id", "momentos_dia"],
+                select(pares.c.client_id, Plato.id, Plato.momentos_dia)
+                .join_from(pares, Plato, Plato.id == pares.c.plato_id),
+            )
+            .returning(ClientePlato.id, ClientePlato.client_id, ClientePlato.plato_id)
+        ).all()
+        for cp_id, cp_client, plato_id in nuevos:
+            por_cliente[(cp_client, plato_id)] = cp_id
+
+        db.execute(
+            insert(ClientePlatoIngrediente).from_select(
+                ["cliente_plato_id", "ingrediente_id", "cantidad_gramos"],
+                select(ClientePlato.id, PlatoIngrediente.ingrediente_id, PlatoIngrediente.cantidad_gramos)
+                .join(PlatoIngrediente, PlatoIngrediente.plato_id == ClientePlato.plato_id)
+                .where(ClientePlato.id.in_([n.id for n in nuevos]))
+                .order_by(ClientePlato.id, PlatoIngrediente.id),
+            )
+        )
+
+    for c in otros:
+        for cp_id, plato_id in platos_origen.items():
+            mapa.append((c, cp_id, por_cliente[(c, plato_id)]))
+    return mapa
+
+
+def clonar_semana(
+    db: Session,
+    client_id: int,
+    semana_origen: date,
+    semanas_destino: List[date],
+    client_ids: List[int],
+    mode: str,
+) -> dict:
+    """
+    Copia los slots e items de una semana a otras semanas y/o clientes.
+
+    Todo son INSERT ... SELECT: el numero de sentencias no depende de cuantos
+    slots, semanas o clientes haya. Con `skip_if_filled` no se tocan los slots
+    destino que ya tienen algo; con `replace` se sobrescriben. Los slots destino
+    que no existen en la semana origen se dejan como estan. No hace commit.
+
+    Lanza `SemanaOrigenVacia` si la semana origen no tiene slots.
+    """
+    ps = PlanificacionSemanal
+    total_origen = db.query(func.count(ps.id)).filter(
+        ps.client_id == client_id, ps.semana_inicio == semana_origen
+    ).scalar()
+    if not total_origen:
+        raise SemanaOrigenVacia(semana_origen)
+
+    mapa_rows = _mapa_cliente_platos(db, client_id, client_ids, _platos_origen(db, client_id, semana_origen))
+
+    clientes = values(column("client_id", Integer), name="clientes").data([(c,) for c in client_ids])
+    semanas = values(column("semana_inicio", Date), name="semanas").data([(s,) for s in semanas_destino])
+    origen = select(ps).where(ps.client_id == client_id, ps.semana_inicio == semana_origen).subquery("origen")
+
+    slots = (
+        select(semanas.c.semana_inicio, origen.c.dia, origen.c.momento, clientes.c.client_id, origen.c.plato_id)
+        .select_from(origen)
+        .join(clientes, true())
+        .join(semanas, true())
+    )
+    if mapa_rows:
+        mapa = values(
+            column("client_id", Integer),
+            column("origen_id", Integer),
+            column("destino_id", Integer),
+            name="mapa",
+        ).data(mapa_rows)
+        slots = slots.add_columns(mapa.c.destino_id, origen.c.notas).outerjoin(
+            mapa,
+            and_(mapa.c.client_id == clientes.c.client_id, mapa.c.origen_id == origen.c.cliente_plato_id),
+        )
+    else:
+        slots = slots.add_columns(null(), origen.c.notas)
+
+    stmt = pg_insert(ps).from_select(
+        ["semana_inicio", "dia", "momento", "client_id", "plato_id", "cliente_plato_id", "notas"],
+        slots,
+        include_defaults=False,
+    )
+    vacio = None
+    if mode == "skip_if_filled":
+        # Igual que en upsert_slots: el EXISTS se ata a la fila en conflicto por nombre,
+        # porque SQLAlchemy no correlaciona subconsultas en el WHERE del ON CONFLICT.
+        fila = literal_column(f"{ps.__tablename__}.id")
+        vacio = and_(
+            ps.plato_id.is_(None),
+            ps.cliente_plato_id.is_(None),
+            ~select(PlanificacionItem.id).where(PlanificacionItem.planificacion_id == fila).exists(),
+        )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ps.semana_inicio, ps.dia, ps.momento, ps.client_id],
+        set_={
+            "plato_id": stmt.excluded.plato_id,
+            "cliente_plato_id": stmt.excluded.cliente_plato_id,
+            "notas": stmt.excluded.notas,
+            "updated_at": func.now(),
+        },
+        where=vacio,
+    ).returning(ps.id)
+    copiados = db.execute(stmt).scalars().all()
+
+    if copiados:
+        db.execute(delete(PlanificacionItem).where(PlanificacionItem.planificacion_id.in_(copiados)))
+
+    if copiados and mapa_rows:
+        destino = aliased(PlanificacionSemanal)
+        fuente = aliased(PlanificacionSemanal)
+        items = (
+            select(destino.id, mapa.c.destino_id, PlanificacionItem.orden)
+            .select_from(destino)
+            .join(
+                fuente,
+                and_(
+                    fuente.client_id == client_id,
+                    fuente.semana_inicio == semana_origen,
+                    fuente.dia == destino.dia,
+                    fuente.momento == destino.momento,
+                ),
+            )
+            .join(PlanificacionItem, PlanificacionItem.planificacion_id == fuente.id)
+            .join(
+                mapa,
+                and_(mapa.c.client_id == destino.client_id, mapa.c.origen_id == PlanificacionItem.cliente_plato_id),
+            )
+            .where(destino.id.in_(copiados))
+            .order_by(destino.id, PlanificacionItem.orden, PlanificacionItem.id)
+        )
+        db.execute(
+            insert(PlanificacionItem).from_select(
+                ["planificacion_id", "cliente_plato_id", "orden"], items, include_defaults=False
+            )
+        )
+
+    invalidate_semanas(db, client_ids, semanas_destino)
+
+    total = total_origen * len(semanas_destino) * len(client_ids)
+    return {"copied": len(copiados), "skipped": total - len(copiados)}
@@ -0,0 +1,78 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.models import PlanificacionSemanal
+from app.services.platos_info import build_cliente_plato_infos, build_plato_infos
+
+
+def load_semana(db: Session, semana_inicio: date, client_id: Optional[int] = None) -> List[dict]:
+    """
+    Carga la planificacion de una semana (slots, items, platos e ingredientes).
+
+    El numero de consultas es fijo: no crece con los slots ni con los ingredientes.
+    La respuesta se monta en memoria con la misma forma que devolvia el router.
+    """
+    query = db.query(PlanificacionSemanal).options(
+        selectinload(PlanificacionSemanal.items),
+        joinedload(PlanificacionSemanal.client),
+    ).filter(
+        PlanificacionSemanal.semana_inicio == semana_inicio
+    )
+    if client_id:
+        query = query.filter(PlanificacionSemanal.client_id == client_id)
+    slots = query.all()
+
+    cliente_plato_ids = set()
+    plato_ids = set()
+    for p in slots:
+        cliente_plato_ids.update(it.cliente_plato_id for it in p.items if it.cliente_plato_id)
+        if p.cliente_plato_id:
+            cliente_plato_ids.add(p.cliente_plato_id)
+        if p.plato_id:
+            plato_ids.add(p.plato_id)
+
+    cliente_plato_infos = build_cliente_plato_infos(db, cliente_plato_ids)
+    plato_infos = build_plato_infos(db, plato_ids)
+
+    results = []
+    for p in slots:
+        items_info = []
+        for it in p.items:
+            if not it.cliente_plato_id:
+                continue
+            info = cliente_plato_infos.get(it.cliente_plato_id)
+            if not info:
+                continue
+            items_info.append({
+                "orden": it.orden,
+                "cliente_plato_id": it.cliente_plato_id,
+                **info,
+            })
+
+        plato_info = None
+        if not items_info:
+            if p.cliente_plato_id and p.cliente_plato_id in cliente_plato_infos:
+                plato_info = cliente_plato_infos[p.cliente_plato_id]
+            elif p.plato_id:
+                plato_info = plato_infos.get(p.plato_id)
+
+        results.append({
+            "id": p.id,
+            "semana_inicio": p.semana_inicio,
+            "dia": p.dia,
+            "momento": p.momento,
+            "plato_id": p.plato_id,
+            "cliente_plato_id": p.cliente_plato_id,
+            "plato_nombre": plato_info["plato_nombre"] if plato_info else None,
+            "calorias": plato_info["calorias"] if plato_info else None,
+            "client_id": p.client_id,
+            "client_nombre": p.client.nombre if p.client else "Desconocido",
+            "ingredientes": plato_info["ingredientes"] if plato_info else [],
+            "items": items_info,
+            "notas": p.notas,
+            "created_at": p.created_at,
+            "updated_at": p.updated_at,
+        })
+    return results
@@ -0,0 +1,117 @@
+from typing import Iterable, List
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.models import Ingrediente, Plato, PlatoIngrediente
+
+# Campos del ingrediente que cambian los aportes de los platos que lo usan.
+CAMPOS_NUTRICIONALES = (
+    "calorias_por_100g",
+    "proteinas_por_100g",
+    "carbohidratos_por_100g",
+    "grasas_por_100g",
+    "fibra_por_100g",
+)
+
+_SIN_SINCRONIZAR = {"synchronize_session": False}
+
+
+def _aporte(columna):
+    # Redondeado a centesimas, como se guardaba antes con el trigger de init.sql.
+    return func.round(columna * PlatoIngrediente.cantidad_gramos / 100, 2)
+
+
+def _actualizar_aportes(db: Session, condicion) -> None:
+    db.execute(
+        update(PlatoIngrediente)
+        .where(PlatoIngrediente.ingrediente_id == Ingrediente.id, condicion)
+        .values(
+            calorias_aportadas=_aporte(Ingrediente.calorias_por_100g),
+            proteinas_aportadas=_aporte(Ingrediente.proteinas_por_100g),
+            carbohidratos_aportados=_aporte(Ingrediente.carbohidratos_por_100g),
+            grasas_aportadas=_aporte(Ingrediente.grasas_por_100g),
+        ),
+        execution_options=_SIN_SINCRONIZAR,
+    )
+
+
+def _actualizar_totales(db: Session, plato_ids) -> None:
+    # Un solo UPDATE ... FROM con las sumas de cada plato; LEFT JOIN para dejar a 0 los que no tienen lineas.
+    plato = aliased(Plato)
+    sumas = (
+        select(
+            plato.id.label("plato_id"),
+            func.coalesce(func.sum(PlatoIngrediente.calorias_aportadas), 0).label("calorias"),
+            func.coalesce(func.sum(PlatoIngrediente.proteinas_aportadas), 0).label("proteinas"),
+            func.coalesce(func.sum(PlatoIngrediente.carbohidratos_aportados), 0).label("carbohidratos"),
+            func.coalesce(func.sum(PlatoIngrediente.grasas_aportadas), 0).label("grasas"),
+            func.coalesce(func.sum(_aporte(func.coalesce(Ingrediente.fibra_por_100g, 0))), 0).label("fibra"),
+            func.coalesce(func.sum(PlatoIngrediente.cantidad_gramos), 0).label("peso"),
+        )
+        .select_from(plato)
+        .outerjoin(PlatoIngrediente, PlatoIngrediente.plato_id == plato.id)
+        .outerjoin(Ingrediente, Ingrediente.id == PlatoIngrediente.ingrediente_id)
+        .where(plato.id.in_(plato_ids))
+        .group_by(plato.id)
+        .subquery()
+    )
+    db.execute(
+        update(Plato)
+        .where(Plato.id == sumas.c.plato_id)
+        .values(
+            calorias_totales=sumas.c.calorias,
+            proteinas_totales=sumas.c.proteinas,
+            carbohidratos_totales=sumas.c.carbohidratos,
+            grasas_totales=sumas.c.grasas,
+            fibra_totales=sumas.c.fibra,
+            peso_total_gramos=sumas.c.peso,
+            updated_at=func.now(),
+        ),
+        execution_options=_SIN_SINCRONIZAR,
+    )
+
+
+def recalcular_platos(db: Session, plato_ids: Iterable[int]) -> None:
+    """
+    Recalcula aportes por linea y totales de los platos indicados (dos UPDATE).
+
+    Es lo unico que mantiene aportes y totales: la base no tiene triggers en
+    plato_ingredientes (ver ensure_platos_totales_schema). Toda escritura que
+    cambie lineas de un plato debe llamarlo antes del commit. No hace commit.
+    """
+    ids = list({i for i in plato_ids if i is not None})
+    if not ids:
+        return
+    db.flush()
+    _actualizar_aportes(db, PlatoIngrediente.plato_id.in_(ids))
+    _actualizar_totales(db, ids)
+
+
+def propagar_ingrediente(db: Session, ingrediente_id: int) -> None:
+    """
+    Tras cambiar los valores por 100 g de un ingrediente, actualiza todos los
+    platos que lo usan con dos UPDATE por conjuntos, los use uno o mil platos.
+    """
+    propagar_ingredientes(db, [ingrediente_id])
+
+
+def propagar_ingredientes(db: Session, ingrediente_ids: Iterable[int]) -> None:
+    """Como propagar_ingrediente, para varios ingredientes a la vez (p. ej. un lote importado)."""
+    ids = list({i for i in ingrediente_ids if i is not None})
+    if not ids:
+        return
+    db.flush()
+    _actualizar_aportes(db, PlatoIngrediente.ingrediente_id.in_(ids))
+    _actualizar_totales(
+        db,
+        select(PlatoIngrediente.plato_id).where(PlatoIngrediente.ingrediente_id.in_(ids)),
+    )
+
+
+def platos_con_ingrediente(db: Session, ingrediente_id: int) -> List[int]:
+    return [
+        plato_id for (plato_id,) in db.query(PlatoIngrediente.plato_id).filter(
+            PlatoIngrediente.ingrediente_id == ingrediente_id
+        ).distinct()
+    ]
@@ -0,0 +1,257 @@
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ClientePlato,
+    ClientePlatoIngrediente,
+    Ingrediente,
+    Plato,
+    PlatoIngrediente,
+)
+
+
+def load_ingredientes_map(db: Session, ingrediente_ids: Iterable[int]) -> Dict[int, Ingrediente]:
+    """Carga todos los ingredientes pedidos con una sola consulta IN."""
+    ids = {i for i in ingrediente_ids if i is not None}
+    if not ids:
+        return {}
+    rows = db.query(Ingrediente).filter(Ingrediente.id.in_(ids)).all()
+    return {ing.id: ing for ing in rows}
+
+
+def load_platos_map(db: Session, plato_ids: Iterable[int]) -> Dict[int, Plato]:
+    ids = {i for i in plato_ids if i is not None}
+    if not ids:
+        return {}
+    rows = db.query(Plato).filter(Plato.id.in_(ids)).all()
+    return {plato.id: plato for plato in rows}
+
+
+def build_cliente_plato_infos(db: Session, cliente_plato_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    Resumen (nombre, macros e ingredientes) de varios platos de cliente.
+
+    Usa un numero fijo de consultas sin importar cuantos platos o ingredientes haya:
+    platos de cliente, sus lineas, los platos base y los ingredientes.
+    """
+    ids = {i for i in cliente_plato_ids if i is not None}
+    if not ids:
+        return {}
+
+    cliente_platos = db.query(ClientePlato).filter(ClientePlato.id.in_(ids)).all()
+    if not cliente_platos:
+        return {}
+
+    lineas = db.query(ClientePlatoIngrediente).filter(
+        ClientePlatoIngrediente.cliente_plato_id.in_([cp.id for cp in cliente_platos])
+    ).order_by(ClientePlatoIngrediente.id.asc()).all()
+
+    lineas_por_plato: Dict[int, List[ClientePlatoIngrediente]] = {}
+    for cpi in lineas:
+        lineas_por_plato.setdefault(cpi.cliente_plato_id, []).append(cpi)
+
+    platos = load_platos_map(db, [cp.plato_id for cp in cliente_platos])
+    ingredientes = load_ingredientes_map(db, [cpi.ingrediente_id for cpi in lineas])
+
+    infos = {}
+    for cp in cliente_platos:
+        infos[cp.id] = _cliente_plato_info(
+            platos.get(cp.plato_id),
+            lineas_por_plato.get(cp.id, []),
+            ingredientes,
+        )
+    return infos
+
+
+def build_plato_infos(db: Session, plato_ids: Iterable[int]) -> Dict[int, dict]:
+    """Resumen de platos base: macros almacenadas en `platos` e ingredientes de la receta."""
+    platos = load_platos_map(db, plato_ids)
+    if not platos:
+        return {}
+
+    lineas = db.query(PlatoIngrediente).filter(
+        PlatoIngrediente.plato_id.in_(list(platos.keys()))
+    ).order_by(PlatoIngrediente.id.asc()).all()
+    ingredientes = load_ingredientes_map(db, [pi.ingrediente_id for pi in lineas])
+
+    lineas_por_plato: Dict[int, List[PlatoIngrediente]] = {}
+    for pi in lineas:
+        lineas_por_plato.setdefault(pi.plato_id, []).append(pi)
+
+    infos = {}
+    for plato_id, plato in platos.items():
+        ingredientes_info = []
+        for pi in lineas_por_plato.get(plato_id, []):
+            ing = ingredientes.get(pi.ingrediente_id)
+            if not ing:
+                continue
+            ingredientes_info.append({
+                "ingrediente_id": pi.ingrediente_id,
+                "ingrediente_nombre": ing.nombre,
+                "cantidad_gramos": float(pi.cantidad_gramos),
+            })
+
+        infos[plato_id] = {
+            "plato_nombre": plato.nombre,
+            "calorias": float(plato.calorias_totales or 0),
+            "proteinas": float(plato.proteinas_totales or 0),
+            "carbohidratos": float(plato.carbohidratos_totales or 0),
+            "grasas": float(plato.grasas_totales or 0),
+            "ingredientes": ingredientes_info,
+        }
+    return infos
+
+
+def build_cliente_plato_details(db: Session, cliente_platos: List[ClientePlato]) -> List[dict]:
+    """
+    Detalle completo (aportes por ingrediente y totales) de varios platos de cliente.
+
+    Dos consultas para todo el lote: lineas con su ingrediente y platos base.
+    """
+    if not cliente_platos:
+        return []
+
+    lineas = db.query(ClientePlatoIngrediente, Ingrediente).join(
+        Ingrediente, Ingrediente.id == ClientePlatoIngrediente.ingrediente_id
+    ).filter(
+        ClientePlatoIngrediente.cliente_plato_id.in_([cp.id for cp in cliente_platos])
+    ).order_by(ClientePlatoIngrediente.id.asc()).all()
+
+    lineas_por_plato: Dict[int, List[tuple]] = {}
+    for cpi, ing in lineas:
+        lineas_por_plato.setdefault(cpi.cliente_plato_id, []).append((cpi, ing))
+
+    platos = load_platos_map(db, [cp.plato_id for cp in cliente_platos])
+
+    details = []
+    for cp in cliente_platos:
+        plato = platos.get(cp.plato_id)
+        ingredientes_info = []
+        totales = [0.0, 0.0, 0.0, 0.0]
+        total_peso = 0.0
+
+        for cpi, ing in lineas_por_plato.get(cp.id, []):
+            aportes = _aportes(ing, cpi.cantidad_gramos)
+            totales = [t + a for t, a in zip(totales, aportes)]
+            total_peso += float(cpi.cantidad_gramos)
+
+            cal, prot, carb, grasas = aportes
+            ingredientes_info.append({
+                "ingrediente_id": cpi.ingrediente_id,
+                "ingrediente_nombre": ing.nombre,
+                "cantidad_gramos": float(cpi.cantidad_gramos),
+                "calorias_aportadas": round(cal, 2),
+                "proteinas_aportadas": round(prot, 2),
+                "carbohidratos_aportados": round(carb, 2),
+                "grasas_aportadas": round(grasas, 2),
+            })
+
+        total_cal, total_prot, total_carb, total_grasas = totales
+        momentos = cp.momentos_dia if cp.momentos_dia else (plato.momentos_dia if plato else [])
+        details.append({
+            "id": cp.id,
+            "client_id": cp.client_id,
+            "plato_id": cp.plato_id,
+            "plato_nombre": plato.nombre if plato else "",
+            "momentos_dia": momentos,
+            "calorias_totales": round(total_cal, 2),
+            "proteinas_totales": round(total_prot, 2),
+            "carbohidratos_totales": round(total_carb, 2),
+            "grasas_totales": round(total_grasas, 2),
+            "peso_total_gramos": round(total_peso, 2),
+            "ingredientes": ingredientes_info,
+            "created_at": cp.created_at,
+            "updated_at": cp.updated_at,
+        })
+    return details
+
+
+def build_plato_details(db: Session, platos: List[Plato]) -> List[dict]:
+    """Detalle de varios platos base; los aportes ya vienen guardados en plato_ingredientes."""
+    if not platos:
+        return []
+
+    lineas = db.query(PlatoIngrediente, Ingrediente.nombre).outerjoin(
+        Ingrediente, Ingrediente.id == PlatoIngrediente.ingrediente_id
+    ).filter(
+        PlatoIngrediente.plato_id.in_([p.id for p in platos])
+    ).order_by(PlatoIngrediente.id.asc()).all()
+
+    ingredientes_por_plato: Dict[int, List[dict]] = {}
+    for pi, nombre in lineas:
+        ingredientes_por_plato.setdefault(pi.plato_id, []).append({
+            "id": pi.id,
+            "ingrediente_id": pi.ingrediente_id,
+            "ingrediente_nombre": nombre if nombre else "Desconocido",
+            "cantidad_gramos": float(pi.cantidad_gramos),
+            "calorias_aportadas": float(pi.calorias_aportadas or 0),
+            "proteinas_aportadas": float(pi.proteinas_aportadas or 0),
+            "carbohidratos_aportados": float(pi.carbohidratos_aportados or 0),
+            "grasas_aportadas": float(pi.grasas_aportadas or 0),
+        })
+
+    return [
+        {
+            "id": plato.id,
+            "nombre": plato.nombre,
+            "descripcion": plato.descripcion,
+            "momentos_dia": plato.momentos_dia or [],
+            "calorias_totales": float(plato.calorias_totales or 0),
+            "proteinas_totales": float(plato.proteinas_totales or 0),
+            "carbohidratos_totales": float(plato.carbohidratos_totales or 0),
+            "grasas_totales": float(plato.grasas_totales or 0),
+            "peso_total_gramos": float(plato.peso_total_gramos or 0),
+            "created_at": plato.created_at,
+            "updated_at": plato.updated_at,
+            "ingredientes": ingredientes_por_plato.get(plato.id, []),
+        }
+        for plato in platos
+    ]
+
+
+def _aportes(ing: Ingrediente, cantidad_gramos) -> Tuple[float, float, float, float]:
+    factor = float(cantidad_gramos) / 100
+    return (
+        float(ing.calorias_por_100g) * factor,
+        float(ing.proteinas_por_100g) * factor,
+        float(ing.carbohidratos_por_100g) * factor,
+        float(ing.grasas_por_100g) * factor,
+    )
+
+
+def _cliente_plato_info(
+    plato: Plato,
+    lineas: List[ClientePlatoIngrediente],
+    ingredientes: Dict[int, Ingrediente],
+) -> dict:
+    ingredientes_info = []
+    total_cal = 0
+    total_prot = 0
+    total_carb = 0
+    total_grasas = 0
+
+    for cpi in lineas:
+        ing = ingredientes.get(cpi.ingrediente_id)
+        if not ing:
+            continue
+        cal, prot, carb, grasas = _aportes(ing, cpi.cantidad_gramos)
+        total_cal += cal
+        total_prot += prot
+        total_carb += carb
+        total_grasas += grasas
+
+        ingredientes_info.append({
+            "ingrediente_id": cpi.ingrediente_id,
+            "ingrediente_nombre": ing.nombre,
+            "cantidad_gramos": float(cpi.cantidad_gramos),
+        })
+
+    return {
+        "plato_nombre": plato.nombre if plato else "",
+        "calorias": round(total_cal, 2),
+        "proteinas": round(total_prot, 2),
+        "carbohidratos": round(total_carb, 2),
+        "grasas": round(total_grasas, 2),
+        "ingredientes": ingredientes_info,
+    }
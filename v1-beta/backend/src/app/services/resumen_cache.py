@@ -0,0 +1,149 @@
+import threading
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import Date, Integer, column, func, select, true, union, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ClientePlato,
+    ClientePlatoIngrediente,
+    PlanificacionItem,
+    PlanificacionSemanal,
+    PlatoIngrediente,
+    ResumenSemanalCache,
+)
+from app.services.resumen_semanal import build_resumen_semanal
+
+# Contadores del proceso; con varios workers cada uno lleva los suyos.
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "invalidaciones": 0}
+
+
+def _contar(clave: str) -> None:
+    with _stats_lock:
+        _stats[clave] += 1
+
+
+def get_resumen_cacheado(db: Session, client_id: int, semana_inicio: date) -> dict:
+    """
+    Resumen semanal de un cliente servido desde `resumen_semanal_cache`.
+
+    En un fallo se calcula con build_resumen_semanal y se guarda solo si nadie lo
+    ha invalidado mientras tanto (la version de la fila no ha cambiado).
+    """
+    cache = ResumenSemanalCache
+    clave = (cache.client_id == client_id, cache.semana_inicio == semana_inicio)
+
+    fila = db.execute(select(cache.payload, cache.version).where(*clave)).first()
+    if fila is not None and fila.payload is not None:
+        _contar("hits")
+        return fila.payload
+
+    _contar("misses")
+    resumen = build_resumen_semanal(db, client_id, semana_inicio)
+
+    if fila is None:
+        db.execute(
+            pg_insert(cache)
+            .values(client_id=client_id, semana_inicio=semana_inicio, payload=resumen, version=0)
+            .on_conflict_do_nothing(index_elements=[cache.client_id, cache.semana_inicio])
+        )
+    else:
+        db.execute(
+            update(cache)
+            .where(*clave, cache.version == fila.version)
+            .values(payload=resumen, updated_at=func.now())
+        )
+    db.commit()
+    return resumen
+
+
+def cache_stats(db: Session) -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    consultas = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / consultas, 4) if consultas else 0.0
+    stats["entradas"] = db.query(func.count()).select_from(ResumenSemanalCache).filter(
+        ResumenSemanalCache.payload.isnot(None)
+    ).scalar()
+    return stats
+
+
+def _invalidar(db: Session, claves) -> None:
+    # Marca como invalidas las semanas seleccionadas por `claves` (client_id, semana_inicio).
+    # Se insertan aunque no existan para que una lectura en curso no guarde datos viejos.
+    cache = ResumenSemanalCache
+    stmt = pg_insert(cache).from_select(["client_id", "semana_inicio"], claves, include_defaults=False)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[cache.client_id, cache.semana_inicio],
+        set_={"payload": None, "version": cache.version + 1, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+    _contar("invalidaciones")
+
+
+def _semanas_con_cliente_platos(cliente_plato_ids):
+    ps = PlanificacionSemanal
+    return union(
+        select(ps.client_id, ps.semana_inicio)
+        .join(PlanificacionItem, PlanificacionItem.planificacion_id == ps.id)
+        .where(PlanificacionItem.cliente_plato_id.in_(cliente_plato_ids)),
+        select(ps.client_id, ps.semana_inicio).where(ps.cliente_plato_id.in_(cliente_plato_ids)),
+    )
+
+
+def invalidate_semana(db: Session, client_id: int, semana_inicio: date) -> None:
+    """Llamar antes del commit de cualquier escritura en la planificacion de esa semana."""
+    invalidate_semanas(db, [client_id], [semana_inicio])
+
+
+def invalidate_semanas(db: Session, client_ids: Iterable[int], semanas: Iterable[date]) -> None:
+    """Todas las combinaciones cliente x semana en una sola sentencia."""
+    client_ids = list(dict.fromkeys(client_ids))
+    semanas = list(dict.fromkeys(semanas))
+    if not client_ids or not semanas:
+        return
+    clientes = values(column("client_id", Integer), name="clientes").data([(c,) for c in client_ids])
+    semanas_v = values(column("semana_inicio", Date), name="semanas").data([(s,) for s in semanas])
+    _invalidar(db, select(clientes.c.client_id, semanas_v.c.semana_inicio).join_from(clientes, semanas_v, true()))
+
+
+def invalidate_cliente_platos(db: Session, cliente_plato_ids: Iterable[int]) -> None:
+    """Semanas que usan alguno de estos platos de cliente (ingredientes o cantidades editadas)."""
+    ids = list({i for i in cliente_plato_ids if i is not None})
+    if not ids:
+        return
+    _invalidar(db, _semanas_con_cliente_platos(ids))
+
+
+def invalidate_plato(db: Session, plato_id: int) -> None:
+    """Semanas con el plato base directamente o a traves de un plato de cliente (nombre)."""
+    ps = PlanificacionSemanal
+    cliente_platos = select(ClientePlato.id).where(ClientePlato.plato_id == plato_id)
+    _invalidar(db, union(
+        _semanas_con_cliente_platos(cliente_platos),
+        select(ps.client_id, ps.semana_inicio).where(ps.plato_id == plato_id),
+    ))
+
+
+def invalidate_ingrediente(db: Session, ingrediente_id: int) -> None:
+    """Semanas con algun plato (de cliente o base) que lleva este ingrediente."""
+    invalidate_ingredientes(db, [ingrediente_id])
+
+
+def invalidate_ingredientes(db: Session, ingrediente_ids: Iterable[int]) -> None:
+    """Semanas con algun plato que lleva alguno de estos ingredientes, en una sola sentencia."""
+    ids = list({i for i in ingrediente_ids if i is not None})
+    if not ids:
+        return
+    ps = PlanificacionSemanal
+    cliente_platos = select(ClientePlatoIngrediente.cliente_plato_id).where(
+        ClientePlatoIngrediente.ingrediente_id.in_(ids)
+    )
+    platos = select(PlatoIngrediente.plato_id).where(PlatoIngrediente.ingrediente_id.in_(ids))
+    _invalidar(db, union(
+        _semanas_con_cliente_platos(cliente_platos),
+        select(ps.client_id, ps.semana_inicio).where(ps.plato_id.in_(platos)),
+    ))
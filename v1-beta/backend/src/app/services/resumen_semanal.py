@@ -0,0 +1,202 @@
+from datetime import date
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Integer, cast, func, literal, null, select, union_all
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, aliased
+
+from app.models import (
+    ClientePlato,
+    ClientePlatoIngrediente,
+    DiaSemana,
+    Ingrediente,
+    MomentoDia,
+    PlanificacionItem,
+    PlanificacionSemanal,
+    Plato,
+    PlatoIngrediente,
+)
+
+DIAS = [d.value for d in DiaSemana]
+MOMENTOS = [m.value for m in MomentoDia]
+
+MACROS = ("calorias", "proteinas", "carbohidratos", "grasas")
+
+
+def _sin_id():
+    # NULL tipado para que las ramas del UNION ALL casen en PostgreSQL.
+    return cast(null(), Integer)
+
+
+def _ingrediente_json(linea):
+    return func.json_build_object(
+        "ingrediente_id", linea.ingrediente_id,
+        "ingrediente_nombre", Ingrediente.nombre,
+        "cantidad_gramos", linea.cantidad_gramos,
+    )
+
+
+def _macros_cliente_plato():
+    # Macros de un plato de cliente a partir de sus lineas; se redondean en Python
+    # igual que en platos_info para que el planificador y el resumen coincidan.
+    return [
+        func.coalesce(func.sum(
+            ClientePlatoIngrediente.cantidad_gramos * columna / 100
+        ), 0).label(nombre)
+        for nombre, columna in (
+            ("calorias", Ingrediente.calorias_por_100g),
+            ("proteinas", Ingrediente.proteinas_por_100g),
+            ("carbohidratos", Ingrediente.carbohidratos_por_100g),
+            ("grasas", Ingrediente.grasas_por_100g),
+        )
+    ]
+
+
+def _ingredientes_cliente_plato():
+    return func.json_agg(
+        aggregate_order_by(_ingrediente_json(ClientePlatoIngrediente), ClientePlatoIngrediente.id)
+    ).filter(Ingrediente.id.isnot(None)).label("ingredientes")
+
+
+def _resumen_query(client_id: int, semana_inicio: date):
+    ps = PlanificacionSemanal
+    semana = (ps.client_id == client_id, ps.semana_inicio == semana_inicio)
+    sin_items = ~select(PlanificacionItem.id).where(PlanificacionItem.planificacion_id == ps.id).exists()
+
+    # 1) Slots con items: un plato de cliente por item.
+    items = (
+        select(
+            ps.dia,
+            ps.momento,
+            PlanificacionItem.orden,
+            PlanificacionItem.id.label("item_id"),
+            PlanificacionItem.cliente_plato_id,
+            _sin_id().label("plato_id"),
+            func.coalesce(Plato.nombre, "").label("plato_nombre"),
+            *_macros_cliente_plato(),
+            _ingredientes_cliente_plato(),
+        )
+        .join(PlanificacionItem, PlanificacionItem.planificacion_id == ps.id)
+        .join(ClientePlato, ClientePlato.id == PlanificacionItem.cliente_plato_id)
+        .outerjoin(Plato, Plato.id == ClientePlato.plato_id)
+        .outerjoin(ClientePlatoIngrediente, ClientePlatoIngrediente.cliente_plato_id == ClientePlato.id)
+        .outerjoin(Ingrediente, Ingrediente.id == ClientePlatoIngrediente.ingrediente_id)
+        .where(*semana)
+        .group_by(ps.dia, ps.momento, PlanificacionItem.orden, PlanificacionItem.id, Plato.nombre)
+    )
+
+    # 2) Slots antiguos sin items que apuntan a un plato de cliente.
+    legacy_cliente = (
+        select(
+            ps.dia,
+            ps.momento,
+            literal(0).label("orden"),
+            _sin_id().label("item_id"),
+            ClientePlato.id.label("cliente_plato_id"),
+            _sin_id().label("plato_id"),
+            func.coalesce(Plato.nombre, "").label("plato_nombre"),
+            *_macros_cliente_plato(),
+            _ingredientes_cliente_plato(),
+        )
+        .join(ClientePlato, ClientePlato.id == ps.cliente_plato_id)
+        .outerjoin(Plato, Plato.id == ClientePlato.plato_id)
+        .outerjoin(ClientePlatoIngrediente, ClientePlatoIngrediente.cliente_plato_id == ClientePlato.id)
+        .outerjoin(Ingrediente, Ingrediente.id == ClientePlatoIngrediente.ingrediente_id)
+        .where(*semana, sin_items)
+        .group_by(ps.dia, ps.momento, ClientePlato.id, Plato.nombre)
+    )
+
+    # 3) Slots antiguos sin items con un plato base: totales guardados en `platos`.
+    cliente_plato_slot = aliased(ClientePlato)
+    receta = (
+        select(
+            func.json_agg(aggregate_order_by(_ingrediente_json(PlatoIngrediente), PlatoIngrediente.id))
+        )
+        .select_from(PlatoIngrediente)
+        .join(Ingrediente, Ingrediente.id == PlatoIngrediente.ingrediente_id)
+        .where(PlatoIngrediente.plato_id == Plato.id)
+        .scalar_subquery()
+    )
+    legacy_plato = (
+        select(
+            ps.dia,
+            ps.momento,
+            literal(0).label("orden"),
+            _sin_id().label("item_id"),
+            _sin_id().label("cliente_plato_id"),
+            Plato.id.label("plato_id"),
+            Plato.nombre.label("plato_nombre"),
+            func.coalesce(Plato.calorias_totales, 0).label("calorias"),
+            func.coalesce(Plato.proteinas_totales, 0).label("proteinas"),
+            func.coalesce(Plato.carbohidratos_totales, 0).label("carbohidratos"),
+            func.coalesce(Plato.grasas_totales, 0).label("grasas"),
+            receta.label("ingredientes"),
+        )
+        .join(Plato, Plato.id == ps.plato_id)
+        .outerjoin(cliente_plato_slot, cliente_plato_slot.id == ps.cliente_plato_id)
+        .where(*semana, sin_items, cliente_plato_slot.id.is_(None))
+    )
+
+    return union_all(items, legacy_cliente, legacy_plato)
+
+
+def build_resumen_semanal(db: Session, client_id: int, semana_inicio: date) -> dict:
+    """
+    Resumen nutricional por comida, dia y semana con una unica consulta agregada.
+
+    SQL suma las macros por item (ingredientes del plato de cliente, o totales de
+    `platos` en slots antiguos); aqui solo se agrupa y se da forma a la respuesta.
+    """
+    por_slot: Dict[Tuple[str, str], List[tuple]] = {}
+    for row in db.execute(_resumen_query(client_id, semana_inicio)):
+        item = {"orden": row.orden}
+        if row.plato_id is not None:
+            item["plato_id"] = row.plato_id
+        else:
+            item["cliente_plato_id"] = row.cliente_plato_id
+        item["plato_nombre"] = row.plato_nombre
+        for macro in MACROS:
+            item[macro] = round(float(getattr(row, macro) or 0), 2)
+        item["ingredientes"] = row.ingredientes or []
+
+        sort_key = (row.orden, row.item_id or 0)
+        por_slot.setdefault((row.dia, row.momento), []).append((sort_key, item))
+
+    dias_data = []
+    totales_semana = dict.fromkeys(MACROS, 0.0)
+    for dia in DIAS:
+        comidas = []
+        totales_dia = dict.fromkeys(MACROS, 0.0)
+
+        for momento in MOMENTOS:
+            filas = por_slot.get((dia, momento))
+            if not filas:
+                continue
+            comida_items = [item for _, item in sorted(filas, key=lambda f: f[0])]
+            totales = {macro: sum(i[macro] for i in comida_items) for macro in MACROS}
+
+            comidas.append({
+                "momento": momento,
+                **{macro: round(totales[macro], 2) for macro in MACROS},
+                "items": comida_items,
+                # Backwards-compat: keep single fields when there is exactly one item.
+                "plato_nombre": comida_items[0].get("plato_nombre") if len(comida_items) == 1 else None,
+                "cliente_plato_id": comida_items[0].get("cliente_plato_id") if len(comida_items) == 1 else None,
+            })
+            for macro in MACROS:
+                totales_dia[macro] += totales[macro]
+                totales_semana[macro] += totales[macro]
+
+        dias_data.append({
+            "dia": dia,
+            "calorias_totales": round(totales_dia["calorias"], 2),
+            "proteinas_totales": round(totales_dia["proteinas"], 2),
+            "carbohidratos_totales": round(totales_dia["carbohidratos"], 2),
+            "grasas_totales": round(totales_dia["grasas"], 2),
+            "comidas": comidas,
+        })
+
+    return {
+        **{f"{macro}_totales": round(totales_semana[macro], 2) for macro in MACROS},
+        "dias": dias_data,
+    }
@@ -0,0 +1,158 @@
+"""
+Registro de consultas lentas y detector de N+1 (opcional).
+
+Cada sentencia SQL se cronometra y se normaliza a una "huella" (sin literales
+ni parámetros) para atribuirla a la ruta que la ejecuta. Con
+`SLOW_QUERY_MS` se registran las sentencias lentas; con
+`REPEATED_QUERY_THRESHOLD` se avisa cuando una petición repite la misma huella
+más veces de las permitidas (la firma típica de un N+1).
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.db.queries")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+# Marcadores de psycopg2/sqlite y binds con nombre (pero no los casts `::`).
+_PARAMS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):(?!:)\w+|\?")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PARAMS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _LISTS.sub("(?...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+@dataclass
+class RequestQueries:
+    route: Callable[[], str] = lambda: "-"
+    statements: int = 0
+    seconds: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n > threshold]
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+_config = {"slow_query_ms": 0.0, "repeated_query_threshold": 0}
+_observers: List[Callable[[RequestQueries], None]] = []
+_installed_engines = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    queries = _current.get()
+    if queries is not None:
+        queries.statements += 1
+        queries.seconds += elapsed
+        queries.fingerprints[fingerprint(statement)] += 1
+
+    slow_ms = _config["slow_query_ms"]
+    if slow_ms > 0 and elapsed * 1000 >= slow_ms:
+        logger.warning(
+            "Consulta lenta (%.1f ms) en %s: %s",
+            elapsed * 1000,
+            queries.route() if queries is not None else "-",
+            fingerprint(statement)[:500],
+        )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+def install_query_log(engine: Engine, slow_query_ms: float = 0, repeated_query_threshold: int = 0) -> None:
+    """Engancha los listeners al engine (idempotente) y fija los umbrales (0 = desactivado)."""
+    _config["slow_query_ms"] = slow_query_ms
+    _config["repeated_query_threshold"] = repeated_query_threshold
+    if id(engine) in _installed_engines:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _installed_engines.add(id(engine))
+
+
+def _finish(queries: RequestQueries) -> None:
+    threshold = _config["repeated_query_threshold"]
+    if threshold > 0:
+        for sql, count in queries.repeated(threshold):
+            logger.warning("Posible N+1 en %s: %s ejecuciones de %s", queries.route(), count, sql[:500])
+    for observer in list(_observers):
+        observer(queries)
+
+
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    return f"{scope.get('method', '-')} {getattr(route, 'path', None) or scope.get('path', '-')}"
+
+
+class QueryLogMiddleware:
+    """Middleware ASGI: agrupa por petición las sentencias que cuentan los listeners."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(route=lambda: _route_name(scope))
+        token = _current.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            _finish(queries)
+
+
+@contextmanager
+def query_budget(engine: Engine, max_statements: int, max_repeats: int = 1) -> Iterator[List[RequestQueries]]:
+    """
+    Para tests: falla (AssertionError) si alguna petición hecha dentro del bloque
+    supera `max_statements` sentencias o repite una huella más de `max_repeats` veces.
+    """
+    install_query_log(engine, _config["slow_query_ms"], _config["repeated_query_threshold"])
+    finished: List[RequestQueries] = []
+    _observers.append(finished.append)
+    try:
+        yield finished
+    finally:
+        _observers.remove(finished.append)
+
+    assert finished, "No se hizo ninguna petición dentro de query_budget()"
+    problemas = []
+    for queries in finished:
+        if queries.statements > max_statements:
+            problemas.append(f"{queries.route()}: {queries.statements} sentencias (presupuesto {max_statements})")
+        for sql, count in queries.repeated(max_repeats):
+            problemas.append(f"{queries.route()}: {count}x {sql}")
+    assert not problemas, "Presupuesto de consultas superado:\n" + "\n".join(problemas)
@@ -1,5 +1,10 @@
+import logging
+
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
 
 
 def ensure_planificacion_items_schema(engine: Engine) -> None:
@@ -30,3 +35,99 @@ def ensure_planificacion_items_schema(engine: Engine) -> None:
         with conn.begin():
             for stmt in statements:
                 conn.execute(text(stmt))
+
+
+def ensure_resumen_cache_schema(engine: Engine) -> None:
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS resumen_semanal_cache (
+            client_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+            semana_inicio DATE NOT NULL,
+            payload JSON,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (client_id, semana_inicio)
+        );
+        """,
+    ]
+
+    with engine.connect() as conn:
+        with conn.begin():
+            for stmt in statements:
+                conn.execute(text(stmt))
+
+
+def ensure_ingredientes_bedca_schema(engine: Engine) -> None:
+    statements = [
+        "ALTER TABLE ingredientes ADD COLUMN IF NOT EXISTS bedca_id VARCHAR(20);",
+        # Las importaciones anteriores solo guardaban el f_id en las notas.
+        r"""
+        UPDATE ingredientes i
+        SET bedca_id = src.f_id
+        FROM (
+            SELECT DISTINCT ON (f_id) id, f_id
+            FROM (
+                SELECT id, substring(notas FROM 'BEDCA f_id: *([^[:space:]]+)') AS f_id
+                FROM ingredientes
+                WHERE bedca_id IS NULL AND notas LIKE '%BEDCA f_id:%'
+            ) parsed
+            WHERE f_id IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM ingredientes x WHERE x.bedca_id = parsed.f_id)
+            ORDER BY f_id, id
+        ) src
+        WHERE i.id = src.id;
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_ingredientes_bedca_id ON ingredientes(bedca_id);",
+    ]
+
+    with engine.connect() as conn:
+        with conn.begin():
+            for stmt in statements:
+                conn.execute(text(stmt))
+
+
+def ensure_platos_totales_schema(engine: Engine) -> None:
+    # Las bases creadas con el init.sql anterior mantenian aportes y totales con
+    # triggers por fila; ahora solo los mantiene app.services.plato_totales.
+    statements = [
+        "DROP TRIGGER IF EXISTS trigger_calcular_aportes ON plato_ingredientes;",
+        "DROP TRIGGER IF EXISTS trigger_actualizar_totales_plato ON plato_ingredientes;",
+        "DROP FUNCTION IF EXISTS calcular_aportes_ingrediente();",
+        "DROP FUNCTION IF EXISTS actualizar_totales_plato();",
+    ]
+
+    with engine.connect() as conn:
+        with conn.begin():
+            for stmt in statements:
+                conn.execute(text(stmt))
+
+
+def ensure_ingredientes_search_schema(engine: Engine) -> None:
+    statements = [
+        "CREATE EXTENSION IF NOT EXISTS unaccent;",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text)
+        RETURNS text AS $$
+            SELECT public.unaccent('public.unaccent', $1)
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_ingredientes_nombre_trgm
+        ON ingredientes USING GIN (f_unaccent(lower(nombre)) gin_trgm_ops);
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_ingredientes_nombre_fts
+        ON ingredientes USING GIN (to_tsvector('spanish', f_unaccent(nombre)));
+        """,
+    ]
+
+    # Las extensiones pueden no estar disponibles (sin contrib o sin permisos);
+    # en ese caso la busqueda sigue funcionando con ILIKE.
+    try:
+        with engine.connect() as conn:
+            with conn.begin():
+                for stmt in statements:
+                    conn.execute(text(stmt))
+    except SQLAlchemyError as exc:
+        logger.warning("Busqueda avanzada de ingredientes no disponible: %s", exc)
@@ -1,3 +1,6 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
@@ -11,6 +14,23 @@ from app.models.usuario import Usuario
 
 security = HTTPBearer(auto_error=False)
 
+# bcrypt es CPU puro: se limita a unos pocos hilos propios para que una rafaga de
+# logins no bloquee el event loop ni ocupe todo el threadpool de las rutas sync.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=max(1, get_settings().password_hash_workers),
+                    thread_name_prefix="password-hash",
+                )
+    return _hash_executor
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
@@ -24,6 +44,16 @@ def get_password_hash(password: str) -> str:
     ).decode('utf-8')
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     settings = get_settings()
     if settings.environment == "production" and settings.secret_key == "nutriorxata-secret-key-change-in-production-2024":
@@ -60,7 +90,7 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> Optional[Usuario]:
@@ -83,7 +113,7 @@ async def get_current_user(
     return user
 
 
-async def require_auth(
+def require_auth(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> Usuario:
@@ -94,7 +124,7 @@ async def require_auth(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = await get_current_user(credentials, db)
+    user = get_current_user(credentials, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -104,7 +134,7 @@ async def require_auth(
     return user
 
 
-async def require_admin(
+def require_admin(
     user: Usuario = Depends(require_auth)
 ) -> Usuario:
     if user.rol != "admin":
@@ -0,0 +1,81 @@
+"""
+Fixtures de los tests del backend.
+
+Necesitan un PostgreSQL desechable: `TEST_DATABASE_URL` apunta a una base que
+se vacía (DROP SCHEMA public CASCADE) y se recrea con `database/init.sql`.
+Sin esa variable los tests se saltan.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+# La configuración se lee al importar app.*, así que va antes de cualquier import.
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+INIT_SQL = Path(__file__).resolve().parents[2] / "database" / "init.sql"
+
+
+@pytest.fixture(scope="session")
+def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL no definida")
+
+    from app.database import engine
+    from app.utils.schema import (
+        ensure_ingredientes_bedca_schema,
+        ensure_ingredientes_search_schema,
+        ensure_planificacion_items_schema,
+        ensure_platos_totales_schema,
+        ensure_resumen_cache_schema,
+    )
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+        cursor.execute(INIT_SQL.read_text(encoding="utf-8"))
+        raw.commit()
+    finally:
+        raw.close()
+
+    ensure_planificacion_items_schema(engine)
+    ensure_resumen_cache_schema(engine)
+    ensure_ingredientes_bedca_schema(engine)
+    ensure_ingredientes_search_schema(engine)
+    ensure_platos_totales_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def query_budget(engine):
+    """
+    Falla si alguna petición hecha dentro del bloque supera su presupuesto SQL:
+
+        with query_budget(max_statements=3):
+            client.get("/api/auth/me", headers=headers)
+    """
+    from app.utils.query_log import query_budget as budget
+
+    @contextmanager
+    def check(max_statements: int, max_repeats: int = 1):
+        with budget(engine, max_statements, max_repeats) as finished:
+            yield finished
+
+    return check
@@ -0,0 +1,256 @@
+"""
+Importador BEDCA contra un servidor BEDCA falso en localhost.
+
+Salvo los de --write-db, no necesitan base de datos: comprueban la descarga
+(paralela, keep-alive, caché y checkpoint), el parseo y el JSON resultante.
+"""
+
+import importlib.util
+import io
+import json
+import threading
+import xml.etree.ElementTree as ET
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "import_bedca_ingredientes.py"
+
+# (grupo, origen) -> f_ids
+LISTADOS = {
+    (3, "BEDCA"): ["300", "301", "302"],
+    (4, "BEDCA"): ["400", "401"],
+    (6, "BEDCA2"): ["600"],
+}
+NOMBRES = {"300": "Pollo, pechuga", "301": "Ternera", "302": "Cerdo, lomo", "400": "Merluza", "401": "Atún", "600": "Avena"}
+
+
+def _food_xml(f_id):
+    valores = [("409", "690", "kJ"), ("416", "22.5", "g"), ("53", "0", "g"), ("410", "1,8", "g"), ("323", "60", "mg")]
+    foodvalues = "".join(
+        f"<foodvalue><c_id>{c}</c_id><best_location>{v}</best_location><v_unit>{u}</v_unit>"
+        f"<value_type>BE</value_type></foodvalue>"
+        for c, v, u in valores
+    )
+    return f"<food><f_id>{f_id}</f_id><f_ori_name>{NOMBRES[f_id]}</f_ori_name>{foodvalues}</food>"
+
+
+class FakeBedca(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        query = ET.fromstring(body)
+        level = query.find("type").get("level")
+        conds = [c.text for c in query.iter("cond3")]
+        server = self.server
+        with server.lock:
+            server.requests.append((level, tuple(conds)))
+            server.peers.add(self.client_address)
+
+        if level == "3":
+            payload = "<foodresponse><food><fg_id>3</fg_id></food></foodresponse>"
+        elif level == "3f":
+            ids = LISTADOS.get((int(conds[0]), conds[1]), [])
+            payload = "<foodresponse>" + "".join(f"<food><f_id>{i}</f_id></food>" for i in ids) + "</foodresponse>"
+        elif conds[0] in server.failing:
+            self._reply(404, b"no")
+            return
+        else:
+            payload = f"<foodresponse>{_food_xml(conds[0])}</foodresponse>"
+        self._reply(200, payload.encode("utf-8"))
+
+    def _reply(self, status, data):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def bedca():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBedca)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.peers = set()
+    server.failing = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def importer():
+    spec = importlib.util.spec_from_file_location("import_bedca_ingredientes", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(importer, bedca, tmp_path, *extra):
+    argv = [
+        "--endpoint", f"http://127.0.0.1:{bedca.server_address[1]}/bdpub/procquery.php",
+        "--group-ids", "3,4,6",
+        "--origins", "BEDCA,BEDCA2",
+        "--rate-limit-ms", "0",
+        "--workers", "3",
+        "--output", str(tmp_path / "bedca.json"),
+        "--cache-dir", str(tmp_path / "cache"),
+        *extra,
+    ]
+    assert importer.main(argv) == 0
+    return json.loads((tmp_path / "bedca.json").read_text(encoding="utf-8"))["items"]
+
+
+def _level_2(bedca):
+    return sorted(conds[0] for level, conds in bedca.requests if level == "2")
+
+
+def test_importa_en_paralelo_reutilizando_conexiones(importer, bedca, tmp_path):
+    items = _run(importer, bedca, tmp_path, "--no-cache")
+
+    assert [item["fuente_id"] for item in items] == ["300", "301", "302", "400", "401", "600"]
+    pollo = items[0]
+    assert pollo["categoria"] == "Carnes"
+    assert pollo["calorias_por_100g"] == 164.91
+    assert pollo["grasas_por_100g"] == 1.8
+    assert pollo["sal_por_100g"] == 0.15
+
+    # 1 nivel 3 + 6 listados + 6 alimentos; keep-alive: nunca más conexiones que peticiones en vuelo.
+    assert len(bedca.requests) == 13
+    assert len(bedca.peers) <= 3
+    assert not (tmp_path / "bedca.json.checkpoint.jsonl").exists()
+
+
+def test_reimportacion_sale_de_la_cache(importer, bedca, tmp_path):
+    first = _run(importer, bedca, tmp_path)
+    sent = len(bedca.requests)
+
+    again = _run(importer, bedca, tmp_path)
+
+    assert len(bedca.requests) == sent
+    assert again == first
+
+
+def test_reanuda_desde_el_checkpoint(importer, bedca, tmp_path):
+    bedca.failing = {"301", "600"}
+    items = _run(importer, bedca, tmp_path, "--no-cache")
+    assert [item["fuente_id"] for item in items] == ["300", "302", "400", "401"]
+    checkpoint = tmp_path / "bedca.json.checkpoint.jsonl"
+    assert len(checkpoint.read_text(encoding="utf-8").splitlines()) == 4
+
+    bedca.failing = set()
+    bedca.requests.clear()
+    items = _run(importer, bedca, tmp_path, "--no-cache")
+
+    # Solo se piden los dos que fallaron.
+    assert _level_2(bedca) == ["301", "600"]
+    assert sorted(item["fuente_id"] for item in items) == ["300", "301", "302", "400", "401", "600"]
+    assert not checkpoint.exists()
+
+
+def test_parseo_incremental_de_nivel_2(importer):
+    xml = (
+        "<foodresponse>"
+        + _food_xml("300")
+        + "<food><f_id>301</f_id><f_ori_name>Ternera</f_ori_name>"
+        "<foodvalue><c_id>416</c_id><best_location></best_location><value_type>LZ</value_type></foodvalue>"
+        "<foodvalue><c_id>416</c_id><best_location>20,5</best_location><v_unit>g</v_unit>"
+        "<value_type>BE</value_type></foodvalue>"
+        "<foodvalue><c_id>416</c_id><best_location>99</best_location><value_type>BE</value_type></foodvalue>"
+        "<foodvalue><c_id>53</c_id><best_location>3</best_location><value_type>XX</value_type></foodvalue>"
+        "</food>"
+        "</foodresponse>"
+    )
+
+    foods = list(importer._iter_food_records(io.BytesIO(xml.encode("utf-8"))))
+
+    assert [food["f_id"] for food in foods] == ["300", "301"]
+    assert foods[0]["nombre"] == "Pollo, pechuga"
+    assert foods[0]["values"]["409"] == {"value": 690.0, "unit": "kJ", "value_type": "BE"}
+    # El LZ se sustituye por el primer valor medido, que ya no se pisa; los tipos desconocidos se ignoran.
+    assert foods[1]["values"] == {"416": {"value": 20.5, "unit": "g", "value_type": "BE"}}
+
+
+def test_write_db_hace_upsert_por_bedca_id(importer, engine):
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    from app.models import PlanificacionSemanal, Plato, PlatoIngrediente, ResumenSemanalCache
+    from app.models.usuario import Usuario
+    from app.services.plato_totales import recalcular_platos
+    from app.utils.schema import ensure_ingredientes_bedca_schema
+
+    def item(f_id, nombre, kcal):
+        return {
+            "nombre": nombre,
+            "categoria": "Carnes",
+            "supermercado": "BEDCA",
+            "calorias_por_100g": kcal,
+            "proteinas_por_100g": 20,
+            "carbohidratos_por_100g": 0,
+            "grasas_por_100g": 2,
+            "fibra_por_100g": None,
+            "sal_por_100g": 0.15,
+            "notas": f"Fuente: BEDCA\nBEDCA f_id: {f_id}",
+            "fuente": "BEDCA",
+            "fuente_id": f_id,
+        }
+
+    with engine.begin() as conn:
+        # Importación anterior a la columna: el f_id solo estaba en las notas.
+        conn.execute(
+            text(
+                "INSERT INTO ingredientes (nombre, categoria, calorias_por_100g, notas) "
+                "VALUES ('Pollo viejo', 'Carnes', 100, 'Fuente: BEDCA\nBEDCA f_id: 9001\nBEDCA origen: BEDCA')"
+            )
+        )
+    ensure_ingredientes_bedca_schema(engine)
+
+    items = [item(str(9000 + i), f"BEDCA {i}", 150) for i in range(1, 8)] + [{"nombre": "Sin f_id"}]
+    with Session(engine) as db:
+        assert importer._upsert_ingredientes(db, items, batch_size=3) == (7, 1)
+
+        # Un plato planificado y con el resumen de la semana cacheado usa el ingrediente que cambia.
+        pollo_id = db.execute(text("SELECT id FROM ingredientes WHERE bedca_id = '9001'")).scalar_one()
+        plato = Plato(nombre="Pollo a la plancha BEDCA", momentos_dia=["comida"])
+        cliente = Usuario(nombre="Cliente BEDCA", email="cliente-bedca@example.com", password_hash="x", rol="cliente")
+        db.add_all([plato, cliente])
+        db.flush()
+        db.add(PlatoIngrediente(plato_id=plato.id, ingrediente_id=pollo_id, cantidad_gramos=200))
+        semana = date(2026, 1, 5)
+        db.add(PlanificacionSemanal(semana_inicio=semana, dia="lunes", momento="comida", client_id=cliente.id, plato_id=plato.id))
+        db.add(ResumenSemanalCache(client_id=cliente.id, semana_inicio=semana, payload={"total": 1}, version=0))
+        recalcular_platos(db, [plato.id])
+        db.commit()
+        assert float(db.get(Plato, plato.id).calorias_totales) == 300.0
+
+        items[0] = item("9001", "Pollo, pechuga", 165)
+        assert importer._upsert_ingredientes(db, items[:1], update_existing=False) == (0, 0)
+        assert importer._upsert_ingredientes(db, items[:2], batch_size=3) == (2, 0)
+
+        rows = db.execute(
+            text("SELECT nombre, calorias_por_100g FROM ingredientes WHERE bedca_id LIKE '900%' ORDER BY bedca_id")
+        ).all()
+        db.expire_all()
+        plato_kcal = db.get(Plato, plato.id).calorias_totales
+        cache = db.get(ResumenSemanalCache, (cliente.id, semana))
+        cache_invalidado = (cache.payload, cache.version)
+
+        db.execute(text("DELETE FROM platos WHERE id = :id"), {"id": plato.id})
+        db.execute(text("DELETE FROM usuarios WHERE id = :id"), {"id": cliente.id})
+        db.execute(text("DELETE FROM ingredientes WHERE bedca_id LIKE '900%'"))
+        db.commit()
+
+    assert len(rows) == 7
+    assert (rows[0].nombre, float(rows[0].calorias_por_100g)) == ("Pollo, pechuga", 165.0)
+    assert float(plato_kcal) == 330.0
+    assert cache_invalidado == (None, 1)
@@ -0,0 +1,75 @@
+"""
+Búsqueda de ingredientes por relevancia (`GET /api/ingredientes?q=`).
+
+Prueban la ruta con tsvector y trigramas, así que se saltan si la base no
+tiene `pg_trgm` y `unaccent` (sin ellas la búsqueda cae a ILIKE).
+"""
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.models import CategoriaIngrediente, Ingrediente
+from app.services.ingredientes_busqueda import busqueda_avanzada_disponible
+
+INGREDIENTES = [
+    # Empieza por el texto buscado.
+    ("Garbanzo cocido", CategoriaIngrediente.LEGUMBRES),
+    # Lo contiene como palabra (tsvector).
+    ("Hummus de garbanzo", CategoriaIngrediente.SALSAS),
+    # Lo contiene dentro de otra palabra.
+    ("Minigarbanzos", CategoriaIngrediente.LEGUMBRES),
+    # Solo se parece (trigramas).
+    ("Garbanso tostado", CategoriaIngrediente.LEGUMBRES),
+    ("Jalapeño en vinagre", CategoriaIngrediente.VERDURAS),
+    ("Pechuga de pollo", CategoriaIngrediente.CARNES),
+]
+
+
+@pytest.fixture(scope="module")
+def ingredientes(engine):
+    with Session(engine) as db:
+        if not busqueda_avanzada_disponible(db):
+            pytest.skip("la base no tiene pg_trgm/unaccent")
+        filas = [Ingrediente(nombre=nombre, categoria=categoria, calorias_por_100g=100) for nombre, categoria in INGREDIENTES]
+        db.add_all(filas)
+        db.commit()
+        ids = [fila.id for fila in filas]
+    yield ids
+    with Session(engine) as db:
+        db.execute(delete(Ingrediente).where(Ingrediente.id.in_(ids)))
+        db.commit()
+
+
+def _buscar(client, ids, **params):
+    res = client.get("/api/ingredientes", params={"limit": 1000, **params})
+    assert res.status_code == 200, res.text
+    return [fila["nombre"] for fila in res.json() if fila["id"] in ids]
+
+
+def test_ordena_prefijo_palabra_contiene_y_parecido(client, ingredientes):
+    assert _buscar(client, ingredientes, q="garbanzo") == [
+        "Garbanzo cocido",
+        "Hummus de garbanzo",
+        "Minigarbanzos",
+        "Garbanso tostado",
+    ]
+
+
+def test_ignora_acentos_y_mayusculas(client, ingredientes):
+    assert _buscar(client, ingredientes, q="jalapeno") == ["Jalapeño en vinagre"]
+    assert _buscar(client, ingredientes, q="jalapeño vinagre") == ["Jalapeño en vinagre"]
+    assert _buscar(client, ingredientes, q="JALAPENO") == ["Jalapeño en vinagre"]
+
+
+def test_tolera_erratas(client, ingredientes):
+    assert _buscar(client, ingredientes, q="pechga de pollo") == ["Pechuga de pollo"]
+
+
+def test_respeta_el_filtro_de_categoria(client, ingredientes):
+    assert _buscar(client, ingredientes, q="garbanzo", categoria="Legumbres") == [
+        "Garbanzo cocido",
+        "Minigarbanzos",
+        "Garbanso tostado",
+    ]
+    assert _buscar(client, ingredientes, q="garbanzo", categoria="Salsas") == ["Hummus de garbanzo"]
@@ -0,0 +1,115 @@
+"""
+`POST /api/planificacion/bulk` en modo skip_if_filled.
+"""
+
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models import ClientePlato, PlanificacionItem, PlanificacionSemanal, Plato
+from app.models.usuario import Usuario
+from app.utils.security import create_access_token
+
+SEMANA = date(2026, 3, 2)
+
+
+@pytest.fixture
+def cliente(engine):
+    with Session(engine) as db:
+        admin = Usuario(nombre="Admin bulk", email=f"{uuid.uuid4().hex}@example.com", password_hash="x", rol="admin")
+        cliente = Usuario(nombre="Cliente bulk", email=f"{uuid.uuid4().hex}@example.com", password_hash="x", rol="cliente")
+        plato = Plato(nombre="Plato bulk", momentos_dia=["cena"])
+        db.add_all([admin, cliente, plato])
+        db.flush()
+        cliente_plato = ClientePlato(client_id=cliente.id, plato_id=plato.id, momentos_dia=["cena"])
+        db.add(cliente_plato)
+        db.flush()
+        # El lunes ya tiene plato; el martes no.
+        lleno = PlanificacionSemanal(semana_inicio=SEMANA, dia="lunes", momento="cena", client_id=cliente.id)
+        db.add(lleno)
+        db.flush()
+        db.add(PlanificacionItem(planificacion_id=lleno.id, cliente_plato_id=cliente_plato.id))
+        db.commit()
+        datos = {
+            "token": create_access_token(data={"sub": str(admin.id)}),
+            "client_id": cliente.id,
+            "cliente_plato_id": cliente_plato.id,
+            "lleno_id": lleno.id,
+        }
+        ids = (admin.id, cliente.id, plato.id)
+    yield datos
+    with Session(engine) as db:
+        db.execute(delete(Usuario).where(Usuario.id.in_(ids[:2])))
+        db.execute(delete(Plato).where(Plato.id == ids[2]))
+        db.commit()
+
+
+def _slots(engine, client_id):
+    with Session(engine) as db:
+        return {
+            fila.dia: fila
+            for fila in db.execute(
+                select(PlanificacionSemanal).where(PlanificacionSemanal.client_id == client_id)
+            ).scalars()
+        }
+
+
+def test_skip_if_filled_no_toca_los_slots_llenos(client, engine, cliente):
+    antes = _slots(engine, cliente["client_id"])["lunes"].updated_at
+
+    res = client.post(
+        "/api/planificacion/bulk",
+        json={
+            "semana_inicio": str(SEMANA),
+            "client_id": cliente["client_id"],
+            "momento": "cena",
+            "dias": ["lunes", "martes"],
+            "cliente_plato_ids": [cliente["cliente_plato_id"]],
+            "mode": "skip_if_filled",
+        },
+        headers={"Authorization": f"Bearer {cliente['token']}"},
+    )
+
+    assert res.status_code == 200, res.text
+    assert res.json() == {"applied": 1, "skipped": 1}
+    slots = _slots(engine, cliente["client_id"])
+    assert slots["lunes"].updated_at == antes
+    with Session(engine) as db:
+        items = db.execute(
+            select(PlanificacionItem.planificacion_id).where(
+                PlanificacionItem.planificacion_id.in_([slots["lunes"].id, slots["martes"].id])
+            )
+        ).scalars().all()
+    assert sorted(items) == sorted([cliente["lleno_id"], slots["martes"].id])
+
+
+def test_skip_if_filled_rellena_slots_existentes_vacios(client, engine, cliente):
+    with Session(engine) as db:
+        vacio = PlanificacionSemanal(semana_inicio=SEMANA, dia="martes", momento="cena", client_id=cliente["client_id"])
+        db.add(vacio)
+        db.commit()
+        vacio_id = vacio.id
+
+    res = client.post(
+        "/api/planificacion/bulk",
+        json={
+            "semana_inicio": str(SEMANA),
+            "client_id": cliente["client_id"],
+            "momento": "cena",
+            "dias": ["lunes", "martes"],
+            "cliente_plato_ids": [cliente["cliente_plato_id"]],
+            "mode": "skip_if_filled",
+        },
+        headers={"Authorization": f"Bearer {cliente['token']}"},
+    )
+
+    assert res.status_code == 200, res.text
+    assert res.json() == {"applied": 1, "skipped": 1}
+    with Session(engine) as db:
+        items = db.execute(
+            select(PlanificacionItem.cliente_plato_id).where(PlanificacionItem.planificacion_id == vacio_id)
+        ).scalars().all()
+    assert items == [cliente["cliente_plato_id"]]
@@ -0,0 +1,188 @@
+"""
+`POST /api/planificacion/clonar`: qué escribe al copiar una semana.
+"""
+
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ClientePlato,
+    ClientePlatoIngrediente,
+    Ingrediente,
+    PlanificacionItem,
+    PlanificacionSemanal,
+    Plato,
+    PlatoIngrediente,
+)
+from app.models.usuario import Usuario
+from app.utils.security import create_access_token
+
+ORIGEN = date(2026, 4, 6)
+DESTINO = ORIGEN + timedelta(days=7)
+
+
+@pytest.fixture
+def semana(engine):
+    """
+    Cliente A con lunes y martes (cena) planificados en ORIGEN; el lunes lleva dos
+    platos en orden inverso al de creación. A tiene el arroz personalizado (200 g en
+    vez de los 100 g de la receta base). El cliente B no tiene platos propios.
+    """
+    with Session(engine) as db:
+        admin = Usuario(nombre="Admin clonar", email=f"{uuid.uuid4().hex}@example.com", password_hash="x", rol="admin")
+        a = Usuario(nombre="Cliente A", email=f"{uuid.uuid4().hex}@example.com", password_hash="x", rol="cliente")
+        b = Usuario(nombre="Cliente B", email=f"{uuid.uuid4().hex}@example.com", password_hash="x", rol="cliente")
+        arroz = Ingrediente(nombre=f"Arroz clonar {uuid.uuid4().hex[:6]}", calorias_por_100g=350)
+        platos = [Plato(nombre=f"Plato clonar {n}", momentos_dia=["cena"]) for n in range(2)]
+        db.add_all([admin, a, b, arroz, *platos])
+        db.flush()
+        db.add_all([PlatoIngrediente(plato_id=p.id, ingrediente_id=arroz.id, cantidad_gramos=100) for p in platos])
+        cps = [ClientePlato(client_id=a.id, plato_id=p.id, momentos_dia=["cena"]) for p in platos]
+        db.add_all(cps)
+        db.flush()
+        db.add_all([ClientePlatoIngrediente(cliente_plato_id=cp.id, ingrediente_id=arroz.id, cantidad_gramos=200) for cp in cps])
+        # Uno a uno: el INSERT por lotes del ORM no castea `dia` al enum dia_semana.
+        lunes = PlanificacionSemanal(semana_inicio=ORIGEN, dia="lunes", momento="cena", client_id=a.id, notas="Sin sal")
+        db.add(lunes)
+        db.flush()
+        martes = PlanificacionSemanal(semana_inicio=ORIGEN, dia="martes", momento="cena", client_id=a.id)
+        db.add(martes)
+        db.flush()
+        db.add_all([
+            PlanificacionItem(planificacion_id=lunes.id, cliente_plato_id=cps[1].id, orden=0),
+            PlanificacionItem(planificacion_id=lunes.id, cliente_plato_id=cps[0].id, orden=1),
+            PlanificacionItem(planificacion_id=martes.id, cliente_plato_id=cps[0].id, orden=0),
+        ])
+        db.commit()
+        datos = {
+            "headers": {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"},
+            "a": a.id,
+            "b": b.id,
+            "arroz": arroz.id,
+            "platos": [p.id for p in platos],
+            "cps": [cp.id for cp in cps],
+        }
+    yield datos
+    with Session(engine) as db:
+        db.execute(delete(Usuario).where(Usuario.id.in_([admin.id, datos["a"], datos["b"]])))
+        db.execute(delete(Plato).where(Plato.id.in_(datos["platos"])))
+        db.execute(delete(Ingrediente).where(Ingrediente.id == datos["arroz"]))
+        db.commit()
+
+
+def _clonar(client, semana, **body):
+    payload = {"semana_origen": str(ORIGEN), "client_id": semana["a"], "semanas_destino": [str(DESTINO)], **body}
+    return client.post("/api/planificacion/clonar", json=payload, headers=semana["headers"])
+
+
+def _items(engine, client_id, semana_inicio=DESTINO):
+    """{dia: [cliente_plato_id en orden]} de la cena de esa semana."""
+    with Session(engine) as db:
+        rows = db.execute(
+            select(PlanificacionSemanal.dia, PlanificacionItem.cliente_plato_id)
+            .join(PlanificacionItem, PlanificacionItem.planificacion_id == PlanificacionSemanal.id)
+            .where(
+                PlanificacionSemanal.client_id == client_id,
+                PlanificacionSemanal.semana_inicio == semana_inicio,
+                PlanificacionSemanal.momento == "cena",
+            )
+            .order_by(PlanificacionItem.orden, PlanificacionItem.id)
+        ).all()
+    items = {}
+    for dia, cp_id in rows:
+        items.setdefault(dia, []).append(cp_id)
+    return items
+
+
+def _slot(engine, client_id, dia, semana_inicio=DESTINO, cliente_plato_id=None):
+    # Crea un slot destino (vacio o con un plato) antes de clonar.
+    with Session(engine) as db:
+        slot = PlanificacionSemanal(semana_inicio=semana_inicio, dia=dia, momento="cena", client_id=client_id)
+        db.add(slot)
+        db.flush()
+        if cliente_plato_id:
+            db.add(PlanificacionItem(planificacion_id=slot.id, cliente_plato_id=cliente_plato_id))
+        db.commit()
+
+
+def test_copia_slots_e_items_en_orden(client, engine, semana):
+    res = _clonar(client, semana)
+
+    assert res.status_code == 200, res.text
+    assert res.json() == {"copied": 2, "skipped": 0}
+    cp0, cp1 = semana["cps"]
+    assert _items(engine, semana["a"]) == {"lunes": [cp1, cp0], "martes": [cp0]}
+    with Session(engine) as db:
+        notas = db.execute(
+            select(PlanificacionSemanal.notas).where(
+                PlanificacionSemanal.client_id == semana["a"],
+                PlanificacionSemanal.semana_inicio == DESTINO,
+                PlanificacionSemanal.dia == "lunes",
+            )
+        ).scalar_one()
+    assert notas == "Sin sal"
+
+
+def test_otros_clientes_reciben_su_plato_con_la_receta_base(client, engine, semana):
+    res = _clonar(client, semana, client_ids=[semana["b"]])
+
+    assert res.status_code == 200, res.text
+    assert res.json() == {"copied": 2, "skipped": 0}
+    with Session(engine) as db:
+        propios = dict(db.execute(
+            select(ClientePlato.plato_id, ClientePlato.id).where(ClientePlato.client_id == semana["b"])
+        ).all())
+        cantidades = db.execute(
+            select(ClientePlatoIngrediente.ingrediente_id, ClientePlatoIngrediente.cantidad_gramos)
+            .where(ClientePlatoIngrediente.cliente_plato_id.in_(propios.values()))
+        ).all()
+    assert sorted(propios) == sorted(semana["platos"])
+    assert cantidades == [(semana["arroz"], Decimal("100.00"))] * 2
+    p0, p1 = semana["platos"]
+    assert _items(engine, semana["b"]) == {"lunes": [propios[p1], propios[p0]], "martes": [propios[p0]]}
+    # El cliente origen no cambia.
+    assert _items(engine, semana["a"]) == {}
+
+
+def test_skip_if_filled_solo_rellena_slots_vacios(client, engine, semana):
+    cp0, cp1 = semana["cps"]
+    _slot(engine, semana["a"], "lunes")
+    _slot(engine, semana["a"], "martes", cliente_plato_id=cp1)
+
+    res = _clonar(client, semana, mode="skip_if_filled")
+
+    assert res.status_code == 200, res.text
+    assert res.json() == {"copied": 1, "skipped": 1}
+    assert _items(engine, semana["a"]) == {"lunes": [cp1, cp0], "martes": [cp1]}
+
+
+def test_replace_sobrescribe_slots_llenos(client, engine, semana):
+    cp0, cp1 = semana["cps"]
+    _slot(engine, semana["a"], "martes", cliente_plato_id=cp1)
+
+    res = _clonar(client, semana, mode="replace")
+
+    assert res.status_code == 200, res.text
+    assert res.json() == {"copied": 2, "skipped": 0}
+    assert _items(engine, semana["a"]) == {"lunes": [cp1, cp0], "martes": [cp0]}
+
+
+def test_rechaza_destino_igual_al_origen(client, engine, semana):
+    res = _clonar(client, semana, semanas_destino=[str(ORIGEN)])
+
+    assert res.status_code == 400
+    assert res.json() == {"detail": "La semana destino no puede ser la de origen"}
+    # A otro cliente sí se puede copiar la misma semana.
+    assert _clonar(client, semana, semanas_destino=[str(ORIGEN)], client_ids=[semana["b"]]).status_code == 200
+
+
+def test_semana_origen_vacia_da_404(client, semana):
+    res = _clonar(client, semana, semana_origen=str(ORIGEN - timedelta(days=7)))
+
+    assert res.status_code == 404
+    assert res.json() == {"detail": "La semana origen no tiene planificación"}
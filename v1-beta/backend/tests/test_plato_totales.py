@@ -0,0 +1,69 @@
+"""
+Aportes y totales de platos: solo los mantiene app.services.plato_totales.
+"""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Ingrediente, Plato, PlatoIngrediente
+from app.services.plato_totales import propagar_ingrediente, recalcular_platos
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+        session.rollback()
+
+
+def _totales(db, plato_id):
+    db.expire_all()
+    plato = db.get(Plato, plato_id)
+    return (plato.calorias_totales, plato.proteinas_totales, plato.fibra_totales, plato.peso_total_gramos)
+
+
+def test_plato_ingredientes_no_tiene_triggers(db):
+    triggers = db.execute(
+        text("SELECT tgname FROM pg_trigger WHERE tgrelid = 'plato_ingredientes'::regclass AND NOT tgisinternal")
+    ).scalars().all()
+
+    assert triggers == []
+
+
+def test_recalcular_y_propagar(db):
+    arroz = Ingrediente(nombre="Arroz totales", calorias_por_100g=350, proteinas_por_100g=7, fibra_por_100g=1.5)
+    aceite = Ingrediente(nombre="Aceite totales", calorias_por_100g=899, proteinas_por_100g=0, fibra_por_100g=None)
+    db.add_all([arroz, aceite])
+    db.flush()
+    platos = [Plato(nombre=f"Plato totales {n}", momentos_dia=["comida"]) for n in range(2)]
+    db.add_all(platos)
+    db.flush()
+    db.add_all([
+        PlatoIngrediente(plato_id=platos[0].id, ingrediente_id=arroz.id, cantidad_gramos=150),
+        PlatoIngrediente(plato_id=platos[0].id, ingrediente_id=aceite.id, cantidad_gramos=12.5),
+        PlatoIngrediente(plato_id=platos[1].id, ingrediente_id=arroz.id, cantidad_gramos=80),
+    ])
+
+    recalcular_platos(db, [p.id for p in platos])
+
+    assert _totales(db, platos[0].id) == (Decimal("637.38"), Decimal("10.50"), Decimal("2.25"), Decimal("162.50"))
+    assert _totales(db, platos[1].id) == (Decimal("280.00"), Decimal("5.60"), Decimal("1.20"), Decimal("80.00"))
+    aportes = db.execute(
+        select(PlatoIngrediente.calorias_aportadas).where(PlatoIngrediente.ingrediente_id == aceite.id)
+    ).scalar_one()
+    assert aportes == Decimal("112.38")
+
+    db.get(Ingrediente, arroz.id).calorias_por_100g = 360
+    propagar_ingrediente(db, arroz.id)
+
+    assert _totales(db, platos[0].id)[0] == Decimal("652.38")
+    assert _totales(db, platos[1].id)[0] == Decimal("288.00")
+
+    # Borrar una linea no recalcula nada hasta que se llama al servicio.
+    db.execute(delete(PlatoIngrediente).where(PlatoIngrediente.ingrediente_id == aceite.id))
+    assert _totales(db, platos[0].id)[0] == Decimal("652.38")
+    recalcular_platos(db, [platos[0].id])
+    assert _totales(db, platos[0].id) == (Decimal("540.00"), Decimal("10.50"), Decimal("2.25"), Decimal("150.00"))
@@ -0,0 +1,536 @@
+"""
+Presupuesto de sentencias SQL y de tamaño de respuesta para cada endpoint.
+
+Los datos se siembran una vez por módulo con volúmenes reales (5k ingredientes,
+500 platos y 30 clientes con la semana completa), así un N+1 que vuelva a
+aparecer se ve como sentencias de más y no como un tiempo más lento y poco
+fiable. Los presupuestos son los valores actuales exactos: si un cambio añade
+una consulta a propósito, se sube el presupuesto en el mismo cambio.
+"""
+
+import itertools
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pytest
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    CategoriaIngrediente,
+    ClientePlato,
+    ClientePlatoIngrediente,
+    Ingrediente,
+    PlanificacionItem,
+    PlanificacionSemanal,
+    Plato,
+    PlatoIngrediente,
+    ResumenSemanalCache,
+    WorkAppointment,
+    WorkNote,
+    WorkTask,
+)
+from app.models.usuario import Usuario
+from app.services.plato_totales import recalcular_platos
+from app.utils.security import create_access_token, get_password_hash
+
+INGREDIENTES = 5_000
+PLATOS = 500
+INGREDIENTES_POR_PLATO = 6
+CLIENTES = 30
+PLATOS_POR_CLIENTE = 10
+PASSWORD = "presupuesto-123"
+
+DIAS = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
+MOMENTOS = ["desayuno", "almuerzo", "comida", "merienda", "cena"]
+CATEGORIAS = list(CategoriaIngrediente)
+
+_ALIMENTOS = ["pollo", "arroz", "tomate", "lenteja", "atún", "avena", "yogur", "pan", "huevo", "manzana"]
+_ESTILOS = ["crudo", "cocido", "integral", "light", "en conserva"]
+
+
+def _lunes(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+SEMANA = _lunes(date.today())
+SEMANA_ANTERIOR = SEMANA - timedelta(days=7)
+
+
+@dataclass
+class BudgetEnv:
+    client: object
+    engine: object
+    admin_id: int
+    cliente_ids: List[int]
+    ingrediente_ids: List[int]
+    plato_ids: List[int]
+    # cliente_id -> ids de sus cliente_platos
+    cliente_platos: Dict[int, List[int]] = field(default_factory=dict)
+    tokens: Dict[str, str] = field(default_factory=dict)
+
+    def session(self) -> Session:
+        return Session(bind=self.engine)
+
+
+def _ids(db: Session, model, filas: List[dict]) -> List[int]:
+    return list(db.execute(insert(model).values(filas).returning(model.id)).scalars())
+
+
+def _seed(db: Session) -> dict:
+    password_hash = get_password_hash(PASSWORD)
+    admin_id = _ids(db, Usuario, [{
+        "nombre": "Admin presupuesto",
+        "email": "admin-presupuesto@example.com",
+        "password_hash": password_hash,
+        "rol": "admin",
+        "activo": True,
+    }])[0]
+    cliente_ids = _ids(db, Usuario, [
+        {
+            "nombre": f"Cliente {n:02d}",
+            "email": f"cliente-{n:02d}@example.com",
+            "password_hash": password_hash,
+            "rol": "cliente",
+            "activo": True,
+            "trabajador_id": admin_id,
+            "calorias_objetivo": 2000,
+        }
+        for n in range(CLIENTES)
+    ])
+
+    ingrediente_ids = _ids(db, Ingrediente, [
+        {
+            "nombre": f"{_ALIMENTOS[i % len(_ALIMENTOS)]} {_ESTILOS[i % len(_ESTILOS)]} {i:04d}",
+            "categoria": CATEGORIAS[i % len(CATEGORIAS)],
+            "calorias_por_100g": 50 + i % 400,
+            "proteinas_por_100g": i % 30,
+            "carbohidratos_por_100g": i % 70,
+            "grasas_por_100g": i % 20,
+        }
+        for i in range(INGREDIENTES)
+    ])
+
+    plato_ids = _ids(db, Plato, [
+        {"nombre": f"Plato {p:03d}", "momentos_dia": [MOMENTOS[p % len(MOMENTOS)], "cena"]}
+        for p in range(PLATOS)
+    ])
+    receta = {
+        plato_id: [ingrediente_ids[(p * INGREDIENTES_POR_PLATO + k) % 1000] for k in range(INGREDIENTES_POR_PLATO)]
+        for p, plato_id in enumerate(plato_ids)
+    }
+    db.execute(insert(PlatoIngrediente).values([
+        {"plato_id": plato_id, "ingrediente_id": ing_id, "cantidad_gramos": 40 + 10 * k}
+        for plato_id, ings in receta.items()
+        for k, ing_id in enumerate(ings)
+    ]))
+    recalcular_platos(db, plato_ids)
+
+    cliente_platos: Dict[int, List[int]] = {}
+    for n, cliente_id in enumerate(cliente_ids):
+        propios = plato_ids[n * PLATOS_POR_CLIENTE:(n + 1) * PLATOS_POR_CLIENTE]
+        cp_ids = _ids(db, ClientePlato, [
+            {"client_id": cliente_id, "plato_id": plato_id, "momentos_dia": MOMENTOS}
+            for plato_id in propios
+        ])
+        cliente_platos[cliente_id] = cp_ids
+        db.execute(insert(ClientePlatoIngrediente).values([
+            {"cliente_plato_id": cp_id, "ingrediente_id": ing_id, "cantidad_gramos": 50 + 5 * k}
+            for cp_id, plato_id in zip(cp_ids, propios)
+            for k, ing_id in enumerate(receta[plato_id])
+        ]))
+
+        # Semana actual y anterior completas: 7 días x 5 momentos, con dos platos por hueco.
+        for semana in (SEMANA, SEMANA_ANTERIOR):
+            huecos = [(dia, momento) for dia in DIAS for momento in MOMENTOS]
+            slot_ids = _ids(db, PlanificacionSemanal, [
+                {"semana_inicio": semana, "dia": dia, "momento": momento, "client_id": cliente_id}
+                for dia, momento in huecos
+            ])
+            db.execute(insert(PlanificacionItem).values([
+                {"planificacion_id": slot_id, "cliente_plato_id": cp_ids[(h + k) % len(cp_ids)], "orden": k}
+                for h, slot_id in enumerate(slot_ids)
+                for k in range(2)
+            ]))
+
+    inicio = datetime.combine(date.today(), datetime.min.time())
+    for d in range(30):
+        dia = inicio + timedelta(days=d, hours=9)
+        db.execute(insert(WorkTask).values(
+            titulo=f"Tarea {d}", fecha_limite=dia, asignado_a_id=admin_id, creado_por_id=admin_id,
+            estado="hecha" if d % 3 == 0 else "pendiente",
+        ))
+        db.execute(insert(WorkAppointment).values(
+            titulo=f"Cita {d}", empieza_en=dia, tipo="telefono" if d % 2 else "videollamada",
+            asignado_a_id=admin_id, creado_por_id=admin_id,
+        ))
+        db.execute(insert(WorkNote).values(
+            contenido=f"Nota {d}", fecha=dia.date(), usuario_id=admin_id, creado_por_id=admin_id,
+        ))
+    db.commit()
+
+    return {
+        "admin_id": admin_id,
+        "cliente_ids": cliente_ids,
+        "ingrediente_ids": ingrediente_ids,
+        "plato_ids": plato_ids,
+        "cliente_platos": cliente_platos,
+    }
+
+
+@pytest.fixture(scope="module")
+def env(engine, client) -> BudgetEnv:
+    with Session(bind=engine) as db:
+        seeded = _seed(db)
+    env = BudgetEnv(client=client, engine=engine, **seeded)
+    env.tokens["admin"] = create_access_token(data={"sub": str(env.admin_id)})
+    env.tokens["cliente"] = create_access_token(data={"sub": str(env.cliente_ids[0])})
+    return env
+
+
+def _nuevo(env: BudgetEnv, obj) -> int:
+    with env.session() as db:
+        db.add(obj)
+        db.commit()
+        return obj.id
+
+
+def _nuevo_ingrediente(env: BudgetEnv) -> int:
+    return _nuevo(env, Ingrediente(nombre="borrable", calorias_por_100g=10))
+
+
+def _nuevo_plato(env: BudgetEnv) -> int:
+    plato_id = _nuevo(env, Plato(nombre="borrable", momentos_dia=["cena"]))
+    with env.session() as db:
+        db.add(PlatoIngrediente(plato_id=plato_id, ingrediente_id=env.ingrediente_ids[0], cantidad_gramos=100))
+        db.commit()
+    return plato_id
+
+
+def _nuevo_cliente(env: BudgetEnv) -> int:
+    return _nuevo(env, Usuario(
+        nombre="Borrable", email=f"{uuid.uuid4().hex}@example.com", password_hash="x", rol="cliente",
+    ))
+
+
+_semanas_libres = itertools.count(10)
+
+
+def _nuevo_slot(env: BudgetEnv) -> int:
+    cliente_id = env.cliente_ids[2]
+    semana = SEMANA + timedelta(days=7 * next(_semanas_libres))
+    slot_id = _nuevo(env, PlanificacionSemanal(
+        semana_inicio=semana, dia="lunes", momento="cena", client_id=cliente_id,
+    ))
+    with env.session() as db:
+        db.add(PlanificacionItem(planificacion_id=slot_id, cliente_plato_id=env.cliente_platos[cliente_id][0]))
+        db.commit()
+    return slot_id
+
+
+def _sin_resumen(env: BudgetEnv, cliente_id: int) -> None:
+    with env.session() as db:
+        db.execute(delete(ResumenSemanalCache).where(ResumenSemanalCache.client_id == cliente_id))
+        db.commit()
+
+
+def _resumen_frio(env: BudgetEnv) -> Tuple[dict, None]:
+    cliente_id = env.cliente_ids[1]
+    _sin_resumen(env, cliente_id)
+    return {"client_id": cliente_id}, None
+
+
+def _resumen_caliente(env: BudgetEnv) -> Tuple[dict, None]:
+    cliente_id = env.cliente_ids[1]
+    env.client.get(f"/api/planificacion/resumen/{cliente_id}", headers=_headers(env, "admin"))
+    return {"client_id": cliente_id}, None
+
+
+def _plato_nuevo_payload(env: BudgetEnv) -> Tuple[dict, dict]:
+    return {}, {
+        "nombre": "Plato nuevo",
+        "momentos_dia": ["comida"],
+        "ingredientes": [
+            {"ingrediente_id": i, "cantidad_gramos": 50 + 10 * n} for n, i in enumerate(env.ingrediente_ids[:8])
+        ],
+    }
+
+
+_INGREDIENTE_PAYLOAD = {
+    "nombre": "garbanzo cocido",
+    "categoria": "Legumbres",
+    "calorias_por_100g": 139,
+    "proteinas_por_100g": 7.2,
+    "carbohidratos_por_100g": 18.6,
+    "grasas_por_100g": 2.1,
+}
+
+
+def _tarea(env: BudgetEnv) -> Tuple[dict, None]:
+    return {"task_id": _nuevo(env, WorkTask(titulo="borrable", asignado_a_id=env.admin_id))}, None
+
+
+def _cita(env: BudgetEnv) -> Tuple[dict, None]:
+    cita = WorkAppointment(titulo="borrable", empieza_en=datetime.now(), asignado_a_id=env.admin_id)
+    return {"appointment_id": _nuevo(env, cita)}, None
+
+
+def _nota(env: BudgetEnv) -> Tuple[dict, None]:
+    return {"note_id": _nuevo(env, WorkNote(contenido="borrable", usuario_id=env.admin_id))}, None
+
+
+def _headers(env: BudgetEnv, auth: Optional[str]) -> dict:
+    return {"Authorization": f"Bearer {env.tokens[auth]}"} if auth else {}
+
+
+@dataclass(frozen=True)
+class Case:
+    method: str
+    path: str
+    max_statements: int
+    max_bytes: int
+    # Devuelve `(parámetros del path, cuerpo json)` sobre los datos sembrados.
+    prepare: Callable[[BudgetEnv], Tuple[dict, Optional[dict]]] = lambda env: ({}, None)
+    status: int = 200
+    auth: Optional[str] = "admin"
+    max_repeats: int = 1
+
+
+CASES = {
+    # auth
+    "login": Case(
+        "POST", "/api/auth/login", 1, 790,
+        lambda env: ({}, {"email": "cliente-00@example.com", "password": PASSWORD}), auth=None,
+    ),
+    "me": Case("GET", "/api/auth/me", 1, 540),
+    "register": Case(
+        "POST", "/api/auth/register", 4, 550,
+        lambda env: ({}, {"nombre": "Nuevo", "email": f"{uuid.uuid4().hex}@example.com", "password": PASSWORD}),
+    ),
+    # El usuario del token y el usuario editado son la misma consulta.
+    "update_usuario": Case(
+        "PUT", "/api/auth/usuarios/{user_id}", 4, 540,
+        lambda env: ({"user_id": env.cliente_ids[3]}, {"peso": 70.5, "objetivo": "mantenimiento"}),
+        max_repeats=2,
+    ),
+    "list_usuarios": Case("GET", "/api/auth/usuarios?rol=cliente", 3, 17_000),
+    # El usuario del token y el usuario borrado son la misma consulta.
+    "delete_usuario": Case(
+        "DELETE", "/api/auth/usuarios/{user_id}", 3, 100,
+        lambda env: ({"user_id": _nuevo_cliente(env)}, None), status=204,
+        max_repeats=2,
+    ),
+    # ingredientes
+    "list_ingredientes": Case("GET", "/api/ingredientes", 1, 41_000),
+    "list_ingredientes_categoria": Case("GET", "/api/ingredientes?categoria=Carnes&limit=500", 1, 150_000),
+    "search_ingredientes": Case("GET", "/api/ingredientes?q=pollo&limit=50", 2, 21_000),
+    "list_categorias": Case("GET", "/api/ingredientes/categorias", 1, 180, auth=None),
+    "get_ingrediente": Case(
+        "GET", "/api/ingredientes/{ingrediente_id}", 1, 400,
+        lambda env: ({"ingrediente_id": env.ingrediente_ids[0]}, None),
+    ),
+    "create_ingrediente": Case(
+        "POST", "/api/ingredientes", 3, 400, lambda env: ({}, _INGREDIENTE_PAYLOAD), status=201,
+    ),
+    # Lo usan 3 platos y un cliente: propaga totales e invalida resúmenes.
+    "update_ingrediente": Case(
+        "PUT", "/api/ingredientes/{ingrediente_id}", 7, 390,
+        lambda env: ({"ingrediente_id": env.ingrediente_ids[1]}, {"calorias_por_100g": 120}),
+    ),
+    "delete_ingrediente": Case(
+        "DELETE", "/api/ingredientes/{ingrediente_id}", 5, 100,
+        lambda env: ({"ingrediente_id": _nuevo_ingrediente(env)}, None), status=204,
+    ),
+    # platos
+    "list_platos": Case("GET", "/api/platos", 1, 36_000),
+    "list_platos_momento": Case("GET", "/api/platos?momento_dia=cena&limit=500", 1, 180_000),
+    "get_plato": Case(
+        "GET", "/api/platos/{plato_id}", 2, 1_900, lambda env: ({"plato_id": env.plato_ids[0]}, None),
+    ),
+    # Relee el plato tras guardar la cabecera y tras recalcular totales.
+    "create_plato": Case("POST", "/api/platos", 8, 2_400, _plato_nuevo_payload, status=201, max_repeats=2),
+    "update_plato": Case(
+        "PUT", "/api/platos/{plato_id}", 6, 1_900,
+        lambda env: ({"plato_id": env.plato_ids[1]}, {"descripcion": "Editado"}),
+    ),
+    "delete_plato": Case(
+        "DELETE", "/api/platos/{plato_id}", 6, 100,
+        lambda env: ({"plato_id": _nuevo_plato(env)}, None), status=204,
+    ),
+    "add_ingrediente_plato": Case(
+        "POST", "/api/platos/{plato_id}/ingredientes", 10, 860,
+        lambda env: (
+            {"plato_id": _nuevo_plato(env)},
+            {"ingrediente_id": env.ingrediente_ids[4_999], "cantidad_gramos": 30},
+        ),
+    ),
+    "update_ingrediente_plato": Case(
+        "PUT", "/api/platos/{plato_id}/ingredientes/{ingrediente_id}", 8, 600,
+        lambda env: (
+            {"plato_id": _nuevo_plato(env), "ingrediente_id": env.ingrediente_ids[0]},
+            {"cantidad_gramos": 80},
+        ),
+    ),
+    "remove_ingrediente_plato": Case(
+        "DELETE", "/api/platos/{plato_id}/ingredientes/{ingrediente_id}", 8, 360,
+        lambda env: ({"plato_id": _nuevo_plato(env), "ingrediente_id": env.ingrediente_ids[0]}, None),
+    ),
+    # planificacion
+    "list_planificacion": Case(
+        "GET", "/api/planificacion?client_id={client_id}", 7, 71_000,
+        lambda env: ({"client_id": env.cliente_ids[0]}, None),
+    ),
+    "list_planificacion_cliente": Case("GET", "/api/planificacion", 7, 71_000, auth="cliente"),
+    # Todos los clientes: selectinload trocea los items en lotes de 500 ids.
+    "list_planificacion_todos": Case("GET", "/api/planificacion", 9, 2_200_000, max_repeats=3),
+    # El usuario del token y el cliente consultado son la misma consulta.
+    "resumen_frio": Case(
+        "GET", "/api/planificacion/resumen/{client_id}", 5, 65_000, _resumen_frio, max_repeats=2,
+    ),
+    "resumen_caliente": Case(
+        "GET", "/api/planificacion/resumen/{client_id}", 3, 65_000, _resumen_caliente, max_repeats=2,
+    ),
+    "resumen_cache_stats": Case("GET", "/api/planificacion/resumen-cache/stats", 2, 87),
+    # El usuario del token y el cliente de la planificación son la misma consulta.
+    "create_planificacion": Case(
+        "POST", "/api/planificacion", 8, 270,
+        lambda env: ({}, {
+            "semana_inicio": str(SEMANA + timedelta(days=7 * 20)),
+            "dia": "martes",
+            "momento": "comida",
+            "client_id": env.cliente_ids[4],
+            "cliente_plato_id": env.cliente_platos[env.cliente_ids[4]][0],
+        }),
+        status=201,
+        max_repeats=2,
+    ),
+    "bulk_planificacion": Case(
+        "POST", "/api/planificacion/bulk", 12, 30,
+        lambda env: ({}, {
+            "semana_inicio": str(SEMANA),
+            "client_id": env.cliente_ids[5],
+            "momento": "cena",
+            "dias": DIAS,
+            "base_plato_ids": env.plato_ids[400:405],
+        }),
+    ),
+    "clonar_planificacion": Case(
+        "POST", "/api/planificacion/clonar", 11, 32,
+        lambda env: ({}, {
+            "semana_origen": str(SEMANA_ANTERIOR),
+            "client_id": env.cliente_ids[6],
+            "semanas_destino": [str(SEMANA + timedelta(days=7 * n)) for n in range(1, 5)],
+            "client_ids": env.cliente_ids[6:9],
+            "mode": "replace",
+        }),
+    ),
+    "update_planificacion": Case(
+        "PUT", "/api/planificacion/{planif_id}", 5, 280,
+        lambda env: ({"planif_id": _nuevo_slot(env)}, {"notas": "Sin sal"}),
+    ),
+    "delete_planificacion": Case(
+        "DELETE", "/api/planificacion/{planif_id}", 6, 100,
+        lambda env: ({"planif_id": _nuevo_slot(env)}, None), status=204,
+    ),
+    # clientes_platos
+    "list_cliente_platos": Case(
+        "GET", "/api/clientes/{client_id}/platos", 4, 19_000,
+        lambda env: ({"client_id": env.cliente_ids[0]}, None),
+    ),
+    # Busca el plato de cliente existente y lo relee tras crearlo.
+    "create_cliente_plato": Case(
+        "POST", "/api/clientes/{client_id}/platos", 13, 1_800,
+        lambda env: ({"client_id": env.cliente_ids[9]}, {"plato_id": env.plato_ids[450]}),
+        status=201,
+        max_repeats=2,
+    ),
+    "update_cliente_plato": Case(
+        "PUT", "/api/clientes/{client_id}/platos/{cliente_plato_id}", 8, 1_900,
+        lambda env: (
+            {"client_id": env.cliente_ids[10], "cliente_plato_id": env.cliente_platos[env.cliente_ids[10]][0]},
+            {"ingredientes": [
+                {"ingrediente_id": i, "cantidad_gramos": 60} for i in env.ingrediente_ids[10:16]
+            ]},
+        ),
+    ),
+    "delete_cliente_plato": Case(
+        "DELETE", "/api/clientes/{client_id}/platos/{cliente_plato_id}", 6, 100,
+        lambda env: (
+            {"client_id": env.cliente_ids[11], "cliente_plato_id": env.cliente_platos[env.cliente_ids[11]][-1]},
+            None,
+        ),
+        status=204,
+    ),
+    # work_planner
+    "list_tasks": Case("GET", "/api/work-planner/tasks", 2, 8_900),
+    # El usuario del token y el asignado son la misma consulta.
+    "create_task": Case(
+        "POST", "/api/work-planner/tasks", 4, 280,
+        lambda env: ({}, {"titulo": "Llamar", "asignado_a_id": env.admin_id}), status=201,
+        max_repeats=2,
+    ),
+    "update_task": Case(
+        "PUT", "/api/work-planner/tasks/{task_id}", 5, 280,
+        lambda env: (_tarea(env)[0], {"estado": "hecha", "asignado_a_id": env.admin_id}),
+        max_repeats=2,
+    ),
+    "delete_task": Case("DELETE", "/api/work-planner/tasks/{task_id}", 3, 100, _tarea, status=204),
+    "list_appointments": Case("GET", "/api/work-planner/appointments", 2, 9_800),
+    "create_appointment": Case(
+        "POST", "/api/work-planner/appointments", 4, 340,
+        lambda env: ({}, {
+            "titulo": "Revisión", "empieza_en": datetime.now().isoformat(), "asignado_a_id": env.admin_id,
+        }),
+        status=201,
+        max_repeats=2,
+    ),
+    "update_appointment": Case(
+        "PUT", "/api/work-planner/appointments/{appointment_id}", 5, 340,
+        lambda env: (_cita(env)[0], {"tipo": "videollamada", "asignado_a_id": env.admin_id}),
+        max_repeats=2,
+    ),
+    "delete_appointment": Case(
+        "DELETE", "/api/work-planner/appointments/{appointment_id}", 3, 100, _cita, status=204,
+    ),
+    "list_notes": Case("GET", "/api/work-planner/notes", 2, 6_700),
+    "create_note": Case(
+        "POST", "/api/work-planner/notes", 4, 230,
+        lambda env: ({}, {"contenido": "Revisar menú", "usuario_id": env.admin_id}), status=201,
+        max_repeats=2,
+    ),
+    "update_note": Case(
+        "PUT", "/api/work-planner/notes/{note_id}", 5, 220,
+        lambda env: (_nota(env)[0], {"contenido": "Hecho", "usuario_id": env.admin_id}),
+        max_repeats=2,
+    ),
+    "delete_note": Case("DELETE", "/api/work-planner/notes/{note_id}", 3, 100, _nota, status=204),
+    "summary": Case("GET", "/api/work-planner/summary", 4, 4_000),
+}
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_endpoint_stays_within_budget(name: str, env: BudgetEnv, query_budget) -> None:
+    case = CASES[name]
+    params, body = case.prepare(env)
+
+    with query_budget(case.max_statements, case.max_repeats):
+        res = env.client.request(
+            case.method, case.path.format(**params), json=body, headers=_headers(env, case.auth)
+        )
+
+    assert res.status_code == case.status, res.text
+    assert len(res.content) <= case.max_bytes, f"{name}: {len(res.content)} bytes (límite {case.max_bytes})"
+
+
+def test_every_route_has_a_budget(env: BudgetEnv) -> None:
+    budgeted = {(c.method, c.path.split("?")[0]) for c in CASES.values()}
+    routes = {
+        (method, route.path)
+        for route in env.client.app.routes
+        if route.path.startswith("/api/") and route.path != "/api/health"
+        for method in getattr(route, "methods", ())
+    }
+    missing = sorted(routes - budgeted)
+    assert not missing, f"endpoints sin presupuesto de consultas: {missing}"
@@ -1,6 +1,16 @@
 -- NutriOrxata Database Schema
 -- Gestión de ingredientes, platos y planificación semanal
 
+-- Búsqueda de ingredientes sin acentos y tolerante a erratas
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- unaccent() no es IMMUTABLE; este envoltorio permite usarlo en índices
+CREATE OR REPLACE FUNCTION f_unaccent(text)
+RETURNS text AS $$
+    SELECT public.unaccent('public.unaccent', $1)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
 -- Categorías de ingredientes
 CREATE TYPE categoria_ingrediente AS ENUM (
     'Pasta y arroz',
@@ -43,6 +53,7 @@ CREATE TABLE ingredientes (
     fibra_por_100g DECIMAL(10,2) DEFAULT 0,
     sal_por_100g DECIMAL(10,2) DEFAULT 0,
     notas TEXT,
+    bedca_id VARCHAR(20),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -208,78 +219,8 @@ CREATE TABLE work_notes (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Función para calcular aportes de un ingrediente en un plato
-CREATE OR REPLACE FUNCTION calcular_aportes_ingrediente()
-RETURNS TRIGGER AS $$
-DECLARE
-    ing RECORD;
-    factor DECIMAL(10,4);
-BEGIN
-    SELECT * INTO ing FROM ingredientes WHERE id = NEW.ingrediente_id;
-    factor := NEW.cantidad_gramos / 100.0;
-    
-    NEW.calorias_aportadas := ROUND(ing.calorias_por_100g * factor, 2);
-    NEW.proteinas_aportadas := ROUND(ing.proteinas_por_100g * factor, 2);
-    NEW.carbohidratos_aportados := ROUND(ing.carbohidratos_por_100g * factor, 2);
-    NEW.grasas_aportadas := ROUND(ing.grasas_por_100g * factor, 2);
-    
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
--- Trigger para calcular aportes al insertar/actualizar ingrediente en plato
-CREATE TRIGGER trigger_calcular_aportes
-BEFORE INSERT OR UPDATE ON plato_ingredientes
-FOR EACH ROW
-EXECUTE FUNCTION calcular_aportes_ingrediente();
-
--- Función para actualizar totales del plato
-CREATE OR REPLACE FUNCTION actualizar_totales_plato()
-RETURNS TRIGGER AS $$
-DECLARE
-    plato_id_target INTEGER;
-BEGIN
-    plato_id_target := COALESCE(NEW.plato_id, OLD.plato_id);
-    
-    UPDATE platos
-    SET 
-        calorias_totales = COALESCE((
-            SELECT SUM(calorias_aportadas)
-            FROM plato_ingredientes
-            WHERE plato_id = plato_id_target
-        ), 0),
-        proteinas_totales = COALESCE((
-            SELECT SUM(proteinas_aportadas)
-            FROM plato_ingredientes
-            WHERE plato_id = plato_id_target
-        ), 0),
-        carbohidratos_totales = COALESCE((
-            SELECT SUM(carbohidratos_aportados)
-            FROM plato_ingredientes
-            WHERE plato_id = plato_id_target
-        ), 0),
-        grasas_totales = COALESCE((
-            SELECT SUM(grasas_aportadas)
-            FROM plato_ingredientes
-            WHERE plato_id = plato_id_target
-        ), 0),
-        peso_total_gramos = COALESCE((
-            SELECT SUM(cantidad_gramos)
-            FROM plato_ingredientes
-            WHERE plato_id = plato_id_target
-        ), 0),
-        updated_at = CURRENT_TIMESTAMP
-    WHERE id = plato_id_target;
-    
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
--- Trigger para actualizar totales después de modificar ingredientes
-CREATE TRIGGER trigger_actualizar_totales_plato
-AFTER INSERT OR UPDATE OR DELETE ON plato_ingredientes
-FOR EACH ROW
-EXECUTE FUNCTION actualizar_totales_plato();
+-- Los aportes de plato_ingredientes y los totales de platos los mantiene el
+-- backend (app.services.plato_totales) con UPDATE por conjuntos, sin triggers por fila.
 
 -- Función para actualizar timestamp
 CREATE OR REPLACE FUNCTION update_updated_at()
@@ -302,6 +243,10 @@ CREATE TRIGGER update_work_notes_updated_at BEFORE UPDATE ON work_notes FOR EACH
 -- Índices para búsquedas
 CREATE INDEX idx_ingredientes_nombre ON ingredientes(nombre);
 CREATE INDEX idx_ingredientes_categoria ON ingredientes(categoria);
+CREATE INDEX idx_ingredientes_nombre_trgm ON ingredientes USING GIN (f_unaccent(lower(nombre)) gin_trgm_ops);
+CREATE INDEX idx_ingredientes_nombre_fts ON ingredientes USING GIN (to_tsvector('spanish', f_unaccent(nombre)));
+-- Clave de la importación BEDCA (ON CONFLICT); los ingredientes propios la dejan a NULL
+CREATE UNIQUE INDEX idx_ingredientes_bedca_id ON ingredientes(bedca_id);
 CREATE INDEX idx_platos_nombre ON platos(nombre);
 CREATE INDEX idx_platos_momentos ON platos USING GIN (momentos_dia);
 CREATE INDEX idx_planificacion_semana ON planificacion_semanal(semana_inicio, client_id);